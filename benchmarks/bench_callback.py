@@ -0,0 +1,215 @@
+"""コールバック受信の負荷テスト
+
+services.callback.CallbackServer をローカルで起動し、記録したコールバックのペイロードに署名を付けて
+複数のクライアントスレッドから送信します。受信（200応答）と、ハンドラの処理完了までの
+イベント数/秒、応答レイテンシ、CPU時間を計測します。
+--reply を指定すると、ハンドラの戻り値をローカルのLINEWORKS APIサーバー（benchmarks.mock_server）へ返信します。
+
+使用方法:
+    python -m benchmarks.bench_callback --events 20000 --clients 1,10,50
+    python -m benchmarks.bench_callback --handler-latency 0.01 --workers 32 --reply --output result.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_send import (  # noqa: E402
+    BENCH_BOT_ID, _cpu_seconds, _peak_rss_mb, _write_private_key, configure_environment, percentile
+)
+from benchmarks.mock_server import MockLineWorksServer  # noqa: E402
+
+BENCH_SECRET = 'bench-bot-secret'
+DEFAULT_PAYLOADS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures', 'callback_payloads.jsonl'
+)
+
+
+def load_payloads(path: str) -> List[bytes]:
+    """記録したコールバックのボディを読み込む（1行1イベント）"""
+    with open(path, 'rb') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def post_events(url: str, payloads: Sequence[bytes], events: int, clients: int) -> List[List[float]]:
+    """署名付きのコールバックを複数のクライアントスレッドから送信し、応答レイテンシ[ms]を返す
+
+    Args:
+        url: コールバックURL
+        payloads: 送信するボディ（順に繰り返す）
+        events: 送信するイベント数
+        clients: クライアントスレッド数（それぞれ keep-alive の接続を1本使用する）
+
+    Returns:
+        List[List[float]]: [成功した応答のレイテンシ, 失敗した応答のレイテンシ]
+    """
+    from services.callback import BOT_ID_HEADER, SIGNATURE_HEADER, sign
+
+    signed = [(body, {
+        SIGNATURE_HEADER: sign(body, BENCH_SECRET),
+        BOT_ID_HEADER: BENCH_BOT_ID,
+        'Content-Type': 'application/json',
+    }) for body in payloads]
+    counter = itertools.count()
+    lock = threading.Lock()
+    ok: List[float] = []
+    failed: List[float] = []
+
+    def client() -> None:
+        local_ok, local_failed = [], []
+        with requests.Session() as session:
+            while True:
+                index = next(counter)
+                if index >= events:
+                    break
+                body, headers = signed[index % len(signed)]
+                start = time.perf_counter()
+                try:
+                    status = session.post(url, data=body, headers=headers, timeout=10).status_code
+                except requests.exceptions.RequestException:
+                    status = 0
+                latency = (time.perf_counter() - start) * 1000
+                (local_ok if status == 200 else local_failed).append(latency)
+        with lock:
+            ok.extend(local_ok)
+            failed.extend(local_failed)
+
+    threads = [threading.Thread(target=client, name=f'bench-client-{i}') for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [ok, failed]
+
+
+def run_scenario(payloads: Sequence[bytes], events: int, clients: int, workers: int,
+                 handler_latency: float, reply: bool, warmup: int = 0) -> Dict[str, object]:
+    """1つのクライアント数で受信から処理完了までを計測する
+
+    Args:
+        payloads: 送信するボディ
+        events: 送信するイベント数
+        clients: クライアントスレッド数
+        workers: ハンドラを実行するスレッド数
+        handler_latency: ハンドラ1回あたりの処理時間（秒）
+        reply: ハンドラの戻り値を返信するかどうか
+        warmup: 計測前に送信するイベント数
+
+    Returns:
+        Dict[str, object]: 計測結果
+    """
+    import lineworks_bot
+    from services.callback import CallbackDispatcher, CallbackServer
+
+    dispatcher = CallbackDispatcher(lineworks_bot.tenants.client_for_bot if reply else None, workers=workers)
+
+    @dispatcher.on('message')
+    def handler(event):
+        if handler_latency > 0:
+            time.sleep(handler_latency)
+        if reply and event.user_id:
+            return f"受け付けました: {event.text or event.content.get('type')}"
+        return None
+
+    with CallbackServer(dispatcher, secret=BENCH_SECRET, host='127.0.0.1', port=0) as server:
+        if warmup:
+            post_events(server.url, payloads, warmup, clients)
+            dispatcher.join()
+        before = dispatcher.stats()
+        cpu_start = _cpu_seconds()
+        start = time.perf_counter()
+        ok, failed = post_events(server.url, payloads, events, clients)
+        acked = time.perf_counter() - start
+        dispatcher.join()
+        handled = time.perf_counter() - start
+        cpu = _cpu_seconds() - cpu_start
+    after = dispatcher.stats()
+    dispatcher.close()
+
+    latencies = sorted(ok)
+    return {
+        'clients': clients,
+        'workers': workers,
+        'events': events,
+        'accepted': len(ok),
+        'rejected': len(failed),
+        'handled': after['handled'] - before['handled'],
+        'handler_errors': after['failed'] - before['failed'],
+        'replied': after['replied'] - before['replied'],
+        'ack_events_per_sec': round(len(ok) / acked, 1) if acked > 0 else 0.0,
+        'handled_events_per_sec': round(len(ok) / handled, 1) if handled > 0 else 0.0,
+        'ack_p50_ms': round(percentile(latencies, 0.50), 3),
+        'ack_p99_ms': round(percentile(latencies, 0.99), 3),
+        'cpu_us_per_event': round(cpu / events * 1e6, 1) if events else 0.0,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _print_table(results: List[Dict[str, object]]) -> None:
+    """計測結果を表形式で表示する"""
+    print(f"{'clients':>7} {'workers':>7} {'ack ev/s':>9} {'handled ev/s':>12} {'p50ms':>8} {'p99ms':>8} "
+          f"{'cpu us/ev':>9} {'rejected':>8} {'errors':>6}")
+    for row in results:
+        print(
+            f"{row['clients']:>7} {row['workers']:>7} {row['ack_events_per_sec']:>9} "
+            f"{row['handled_events_per_sec']:>12} {row['ack_p50_ms']:>8} {row['ack_p99_ms']:>8} "
+            f"{row['cpu_us_per_event']:>9} {row['rejected']:>8} {row['handler_errors']:>6}"
+        )
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="コールバック受信の負荷テスト")
+    parser.add_argument('--events', type=int, default=5000, help='クライアント数ごとに送信するイベント数')
+    parser.add_argument('--clients', default='1,10,50', help='クライアントスレッド数（カンマ区切り）')
+    parser.add_argument('--workers', type=int, default=8, help='ハンドラを実行するスレッド数')
+    parser.add_argument('--handler-latency', type=float, default=0.0, help='ハンドラ1回あたりの処理時間（秒）')
+    parser.add_argument('--reply', action='store_true', help='ローカルのAPIサーバーへ返信する')
+    parser.add_argument('--payloads', default=DEFAULT_PAYLOADS, help='記録したコールバックのJSONLファイル')
+    parser.add_argument('--warmup', type=int, default=200, help='計測前に送信するイベント数')
+    parser.add_argument('--output', help='結果を書き込むJSONファイル')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """負荷テストを実行する"""
+    args = _parse_args(argv)
+    payloads = load_payloads(args.payloads)
+    key_path = _write_private_key()
+    results = []
+    try:
+        with MockLineWorksServer() as server:
+            # services の読み込み前に返信先をローカルサーバーへ向ける
+            configure_environment(server, key_path, pool_size=max(args.workers, 10), rate_limit=0)
+            for clients in (int(value) for value in args.clients.split(',')):
+                results.append(run_scenario(
+                    payloads, args.events, clients, args.workers, args.handler_latency, args.reply, args.warmup
+                ))
+    finally:
+        os.unlink(key_path)
+
+    _print_table(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'handler_latency': args.handler_latency,
+                'reply': args.reply,
+                'results': results,
+            }, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
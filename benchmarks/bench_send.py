@@ -0,0 +1,368 @@
+"""メッセージ送信のスループットベンチマーク
+
+ローカルのLINEWORKS APIサーバー（benchmarks.mock_server）に対して、
+以下の送信経路を複数の同時実行数で実行し、スループット・レイテンシ・CPU時間・メモリ使用量を計測します。
+
+- send_bot_message: lineworks_bot.send_bot_message（トークンキャッシュを含む1件ずつの送信）
+- api_client: APIClient.send_bot_message（共有クライアントによる送信）
+- bulk: lineworks_bot.send_bot_message_bulk（スレッドプールによる一斉送信）
+- bulk_template: services.bulk.send_bulk に MessageTemplate を渡す一斉送信（ユーザーごとに本文を差し込み）
+- async: AsyncAPIClient.send_many（asyncioによる一斉送信、aiohttpが必要）
+
+結果はJSONで保存でき、--baseline で以前の結果と比較できます。
+
+使用方法:
+    python -m benchmarks.bench_send --messages 2000 --concurrency 1,10,50 --output result.json
+    python -m benchmarks.bench_send --baseline result.json --max-regression 0.1
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_server import MockLineWorksServer, MockServerConfig  # noqa: E402
+
+SCENARIOS = ('send_bot_message', 'api_client', 'bulk', 'bulk_template', 'async')
+BENCH_BOT_ID = 'bench-bot'
+
+# (レイテンシ[ms], 成功可否) の列
+Samples = List[Tuple[float, bool]]
+
+
+def percentile(sorted_values: Sequence[float], ratio: float) -> float:
+    """ソート済みの値から最近傍順位法でパーセンタイル値を求める
+
+    Args:
+        sorted_values: 昇順にソートされた値
+        ratio: 0.0〜1.0 の割合（例: p95 なら 0.95）
+
+    Returns:
+        float: パーセンタイル値（値が空の場合は0.0）
+    """
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(ratio * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _cpu_seconds() -> float:
+    """プロセスのCPU時間（ユーザー + システム）を返す"""
+    if resource is None:
+        return time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """プロセスの最大常駐メモリ（MB）を返す"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KB、macOS は byte 単位
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _write_private_key() -> str:
+    """ベンチマーク用の秘密鍵を一時ファイルに書き出してパスを返す"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with tempfile.NamedTemporaryFile(suffix='.key', delete=False) as key_file:
+        key_file.write(key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        ))
+        return key_file.name
+
+
+def configure_environment(server: MockLineWorksServer, key_path: str, pool_size: int, rate_limit: float) -> None:
+    """ライブラリをローカルサーバーへ向ける環境変数を設定する
+
+    config.settings は読み込み時に環境変数を参照するため、ライブラリのimport前に呼び出してください。
+    """
+    os.environ.update({
+        'BASE_API_URL': server.base_api_url,
+        'AUTH_URL': server.auth_url,
+        'PRIVATE_KEY_FILE': key_path,
+        'CLIENT_ID': 'bench-client',
+        'CLIENT_SECRET': 'bench-secret',
+        'SERVICE_ACCOUNT': 'bench@example.com',
+        'BOT_ID': BENCH_BOT_ID,
+        'HTTP_POOL_MAXSIZE': str(pool_size),
+        'RATE_LIMIT_GLOBAL': str(rate_limit),
+        'RATE_LIMIT_PER_BOT': str(rate_limit),
+    })
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+
+def _run_threaded(send: Callable[[str], bool], user_ids: List[str], concurrency: int) -> Samples:
+    """スレッドプールで send を実行し、1件ごとのレイテンシを計測する"""
+    def timed(user_id: str) -> Tuple[float, bool]:
+        start = time.perf_counter()
+        try:
+            success = send(user_id)
+        except Exception:
+            success = False
+        return (time.perf_counter() - start) * 1000, success
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(timed, user_ids))
+
+
+def _build_scenarios() -> Dict[str, Callable[[List[str], int], Samples]]:
+    """送信経路ごとの実行関数を作成する（環境変数の設定後に呼び出す）"""
+    import lineworks_bot
+    from services.api import APIClient
+    from services.bulk import send_bulk
+    from services.payload import MessageTemplate
+
+    text = "ベンチマークメッセージ"
+    content = {"type": "text", "text": text}
+
+    def run_send_bot_message(user_ids: List[str], concurrency: int) -> Samples:
+        return _run_threaded(lambda user_id: lineworks_bot.send_bot_message(user_id, text), user_ids, concurrency)
+
+    def run_api_client(user_ids: List[str], concurrency: int) -> Samples:
+        client = APIClient(
+            lineworks_bot.token_manager.get_token(),
+            token_refresher=lineworks_bot.token_manager.refresh_if_stale
+        )
+
+        def send(user_id: str) -> bool:
+            client.send_bot_message(BENCH_BOT_ID, user_id, content)
+            return True
+
+        return _run_threaded(send, user_ids, concurrency)
+
+    def run_bulk(user_ids: List[str], concurrency: int) -> Samples:
+        results = lineworks_bot.send_bot_message_bulk(user_ids, text, concurrency=concurrency)
+        return [(result.latency_ms, result.success) for result in results]
+
+    template = MessageTemplate({"type": "text", "text": "{user_id} さんへの" + text})
+
+    def run_bulk_template(user_ids: List[str], concurrency: int) -> Samples:
+        client = lineworks_bot.tenants.get(lineworks_bot.DEFAULT_TENANT).client()
+        results = send_bulk(client, BENCH_BOT_ID, user_ids, template, concurrency=concurrency)
+        return [(result.latency_ms, result.success) for result in results]
+
+    scenarios = {
+        'send_bot_message': run_send_bot_message,
+        'api_client': run_api_client,
+        'bulk': run_bulk,
+        'bulk_template': run_bulk_template,
+    }
+
+    try:
+        from services.async_api import AsyncAPIClient
+    except ImportError:
+        return scenarios
+
+    def run_async(user_ids: List[str], concurrency: int) -> Samples:
+        async def main() -> Samples:
+            async with AsyncAPIClient(lineworks_bot.token_manager.get_token(), limit=concurrency) as client:
+                results = await client.send_many(BENCH_BOT_ID, user_ids, content, concurrency=concurrency)
+            return [(result.latency_ms, result.success) for result in results]
+
+        return asyncio.run(main())
+
+    scenarios['async'] = run_async
+    return scenarios
+
+
+def measure(
+    name: str,
+    run: Callable[[List[str], int], Samples],
+    messages: int,
+    concurrency: int,
+    warmup: int = 0
+) -> Dict[str, object]:
+    """1つの送信経路・同時実行数の組み合わせを計測する
+
+    Args:
+        name: 送信経路の名前
+        run: 送信経路の実行関数
+        messages: 送信するメッセージ数
+        concurrency: 同時実行数
+        warmup: 計測前に送信するメッセージ数（接続確立・トークン取得を計測から除く）
+
+    Returns:
+        Dict[str, object]: 計測結果
+    """
+    if warmup:
+        run([f"warmup{i}@example.com" for i in range(warmup)], concurrency)
+
+    user_ids = [f"user{i}@example.com" for i in range(messages)]
+    cpu_start = _cpu_seconds()
+    start = time.perf_counter()
+    samples = run(user_ids, concurrency)
+    duration = time.perf_counter() - start
+    cpu = _cpu_seconds() - cpu_start
+
+    latencies = sorted(latency for latency, _ in samples)
+    succeeded = sum(1 for _, success in samples if success)
+    return {
+        'scenario': name,
+        'concurrency': concurrency,
+        'messages': messages,
+        'succeeded': succeeded,
+        'failed': len(samples) - succeeded,
+        'duration_s': round(duration, 4),
+        'msgs_per_sec': round(len(samples) / duration, 1) if duration > 0 else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'cpu_s': round(cpu, 4),
+        'cpu_us_per_msg': round(cpu / len(samples) * 1e6, 1) if samples else 0.0,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def compare(results: List[Dict[str, object]], baseline: List[Dict[str, object]],
+            max_regression: float) -> List[str]:
+    """ベースラインと比較し、スループットが許容値を超えて低下した組み合わせを返す
+
+    Args:
+        results: 今回の計測結果
+        baseline: ベースラインの計測結果
+        max_regression: 許容するスループット低下の割合（例: 0.1 で10%）
+
+    Returns:
+        List[str]: 性能が低下した組み合わせの説明
+    """
+    previous = {(row['scenario'], row['concurrency']): row for row in baseline}
+    regressions = []
+    for row in results:
+        base = previous.get((row['scenario'], row['concurrency']))
+        if not base or not base['msgs_per_sec']:
+            continue
+        change = row['msgs_per_sec'] / base['msgs_per_sec'] - 1
+        print(
+            f"{row['scenario']:>16} c={row['concurrency']:<4} "
+            f"msgs/s {base['msgs_per_sec']:>9} -> {row['msgs_per_sec']:>9} ({change:+.1%})  "
+            f"p99 {base['p99_ms']:>8} -> {row['p99_ms']:>8} ms"
+        )
+        if change < -max_regression:
+            regressions.append(f"{row['scenario']} c={row['concurrency']}: {change:+.1%}")
+    return regressions
+
+
+def _print_table(results: List[Dict[str, object]]) -> None:
+    """計測結果を表形式で表示する"""
+    print(f"{'scenario':>16} {'conc':>5} {'msgs/s':>9} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} "
+          f"{'cpu us/msg':>10} {'fail':>5} {'rssMB':>7}")
+    for row in results:
+        rss = row['peak_rss_mb']
+        print(
+            f"{row['scenario']:>16} {row['concurrency']:>5} {row['msgs_per_sec']:>9} "
+            f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8} "
+            f"{row['cpu_us_per_msg']:>10} {row['failed']:>5} {rss if rss is None else round(rss, 1):>7}"
+        )
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=1000, help='組み合わせごとの送信メッセージ数')
+    parser.add_argument('--concurrency', default='1,10,50', help='同時実行数（カンマ区切り）')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='送信経路（カンマ区切り）')
+    parser.add_argument('--warmup', type=int, default=20, help='計測前に送信するメッセージ数')
+    parser.add_argument('--latency', type=float, default=0.002, help='サーバーの応答遅延（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='応答遅延の揺らぎの最大幅（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='500応答の割合')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='429応答の割合')
+    parser.add_argument('--retry-after', type=float, default=0.0, help='429応答の Retry-After（秒）')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='クライアント側レート制限（1秒あたり、0で無制限）')
+    parser.add_argument('--seed', type=int, default=0, help='エラー注入の乱数シード')
+    parser.add_argument('--output', help='結果を保存するJSONファイル')
+    parser.add_argument('--baseline', help='比較対象の結果JSONファイル')
+    parser.add_argument('--max-regression', type=float, default=0.1,
+                        help='ベースラインに対して許容するスループット低下の割合')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """ベンチマークを実行して結果を表示・保存する
+
+    Returns:
+        int: 終了コード（ベースラインより性能が低下した場合は1）
+    """
+    args = _parse_args(argv)
+    levels = [int(level) for level in args.concurrency.split(',') if level]
+    names = [name for name in args.scenarios.split(',') if name]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"不明なシナリオ: {', '.join(sorted(unknown))}")
+
+    config = MockServerConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    key_path = _write_private_key()
+    try:
+        with MockLineWorksServer(config) as server:
+            configure_environment(server, key_path, max(levels), args.rate_limit)
+            scenarios = _build_scenarios()
+            results = []
+            for name in names:
+                if name not in scenarios:
+                    print(f"{name}: 依存パッケージがないためスキップします", file=sys.stderr)
+                    continue
+                for level in levels:
+                    results.append(measure(name, scenarios[name], args.messages, level, args.warmup))
+            server_counts = server.counts()
+    finally:
+        os.unlink(key_path)
+
+    _print_table(results)
+
+    if args.output:
+        document = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'server': vars(config),
+                'messages': args.messages,
+                'rate_limit': args.rate_limit,
+            },
+            'results': results,
+            'server_responses': server_counts,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print("性能低下: " + ", ".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""ベンチマーク用のローカルLINEWORKS APIサーバー
+
+AUTH_URL（トークン発行）と BASE_API_URL（メッセージ送信・ボット情報取得）の代わりに応答する
+スレッド型HTTPサーバーです。応答遅延・エラー率・429応答の割合を設定でき、
+requests-mock では計測できない実際のネットワークスタックを含めた性能を測定できます。
+
+使用方法:
+    with MockLineWorksServer(MockServerConfig(latency=0.005)) as server:
+        os.environ['BASE_API_URL'] = server.base_api_url
+        os.environ['AUTH_URL'] = server.auth_url
+"""
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+API_PREFIX = '/v1.0'
+AUTH_PATH = '/oauth2/v2.0/token'
+
+
+@dataclass
+class MockServerConfig:
+    """ローカルサーバーの応答設定
+
+    Attributes:
+        latency: API応答までの遅延（秒）
+        jitter: 遅延に加える一様乱数の最大幅（秒）
+        error_rate: 500応答を返す割合（0.0〜1.0）
+        throttle_rate: 429応答を返す割合（0.0〜1.0）
+        retry_after: 429応答の Retry-After（秒）
+        token_latency: トークン発行の遅延（秒）
+        seed: 乱数のシード（再現性のため）
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 0.0
+    token_latency: float = 0.0
+    seed: Optional[int] = None
+
+
+class _ThreadingServer(ThreadingHTTPServer):
+    """多数の同時接続を受け付けるHTTPサーバー"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class MockLineWorksServer:
+    """LINEWORKS APIの代わりに応答するローカルHTTPサーバー"""
+
+    def __init__(self, config: Optional[MockServerConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        """
+        Args:
+            config: 応答設定（省略時は遅延・エラーなし）
+            host: 待ち受けアドレス
+            port: 待ち受けポート（0で空きポートを自動選択）
+        """
+        self.config = config or MockServerConfig()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._server = _ThreadingServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """サーバーのURL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_api_url(self) -> str:
+        """BASE_API_URL に設定するURL"""
+        return f"{self.base_url}{API_PREFIX}"
+
+    @property
+    def auth_url(self) -> str:
+        """AUTH_URL に設定するURL"""
+        return f"{self.base_url}{AUTH_PATH}"
+
+    def start(self) -> 'MockLineWorksServer':
+        """バックグラウンドスレッドでサーバーを起動します。"""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, name='mock-lineworks-server', daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """サーバーを停止します。"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> 'MockLineWorksServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def counts(self) -> Dict[str, int]:
+        """種別・ステータスごとの応答数を返します。
+
+        Returns:
+            Dict[str, int]: 例 {"token 200": 1, "message 201": 998, "message 429": 2}
+        """
+        with self._lock:
+            return dict(self._counts)
+
+    def _record(self, kind: str, status: int) -> None:
+        """応答数を記録する"""
+        key = f"{kind} {status}"
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def _decide(self) -> Tuple[int, float]:
+        """注入する応答ステータスと遅延を決める"""
+        config = self.config
+        with self._lock:
+            roll = self._random.random()
+            delay = config.latency + (self._random.uniform(0, config.jitter) if config.jitter else 0.0)
+        if roll < config.throttle_rate:
+            return 429, delay
+        if roll < config.throttle_rate + config.error_rate:
+            return 500, delay
+        return 0, delay
+
+    def _handler_class(self):
+        """このサーバーの設定を参照するリクエストハンドラを作成する"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get('Content-Length') or 0)
+                return self.rfile.read(length) if length else b''
+
+            def _reply(self, kind: str, status: int, payload: Optional[dict] = None,
+                       headers: Optional[Dict[str, str]] = None) -> None:
+                body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                server._record(kind, status)
+
+            def _api(self, kind: str, status: int, payload: Optional[dict]) -> None:
+                injected, delay = server._decide()
+                if delay > 0:
+                    time.sleep(delay)
+                if injected == 429:
+                    self._reply(kind, 429, {"code": "TOO_MANY_REQUESTS"},
+                                {'Retry-After': f"{server.config.retry_after:g}"})
+                elif injected == 500:
+                    self._reply(kind, 500, {"code": "SERVER_ERROR"})
+                else:
+                    self._reply(kind, status, payload)
+
+            def do_POST(self):
+                self._read_body()
+                path = self.path.split('?')[0]
+                if path == AUTH_PATH:
+                    if server.config.token_latency > 0:
+                        time.sleep(server.config.token_latency)
+                    self._reply('token', 200, {
+                        "access_token": f"mock-token-{time.monotonic_ns()}",
+                        "token_type": "Bearer",
+                        "expires_in": 86400
+                    })
+                elif path.startswith(f"{API_PREFIX}/bots/") and path.endswith('/messages'):
+                    self._api('message', 201, None)
+                else:
+                    self._reply('unknown', 404, {"code": "NOT_FOUND"})
+
+            def do_GET(self):
+                parts = self.path.split('?')[0].split('/')
+                # ['', 'v1.0', 'bots', '{botId}']
+                if len(parts) == 4 and parts[1] == API_PREFIX[1:] and parts[2] == 'bots':
+                    self._api('bot_info', 200, {"botId": parts[3], "botName": "mock bot"})
+                else:
+                    self._reply('unknown', 404, {"code": "NOT_FOUND"})
+
+        return Handler
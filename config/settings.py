@@ -1,15 +1,440 @@
-"""設定関連の定数を管理するモジュール"""
+"""設定関連の定数を管理するモジュール
+
+設定は起動時に .env ファイルとプロセスの環境変数から一度だけ読み込んで検証し、
+変更できない Settings オブジェクトとして保持します（リクエストごとに環境変数を参照しません）。
+reload_settings で読み込み直すと、検証に成功した場合のみ新しいオブジェクトに丸ごと差し替えます。
+
+モジュールの定数（CLIENT_ID など）は起動時の値です。再読み込みに追従する必要がある値は
+get_settings() から参照してください。
+"""
+import dataclasses
 import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Configuration constants
-SERVICE_ACCOUNT = os.getenv('SERVICE_ACCOUNT')
-PRIVATE_KEY_FILE = os.getenv('PRIVATE_KEY_FILE')
-CLIENT_ID = os.getenv('CLIENT_ID')
-CLIENT_SECRET = os.getenv('CLIENT_SECRET')
-BASE_API_URL = "https://www.worksapis.com/v1.0"
-AUTH_URL = "https://auth.worksmobile.com/oauth2/v2.0/token"
-BOT_ID = os.getenv('BOT_ID', "10087978")
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Mapping, Optional, Tuple
+
+from dotenv import dotenv_values, find_dotenv
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# .env file read at startup and on reload (ENV_FILE overrides the search from this package upwards)
+ENV_FILE = os.getenv('ENV_FILE') or find_dotenv()
+
+_TRUE = ('true', '1', 'yes', 'on')
+_FALSE = ('false', '0', 'no', 'off')
+
+
+class SettingsError(ValueError):
+    """設定値が不正な場合の例外（不正な項目をすべて含む）"""
+
+    def __init__(self, errors: Tuple[str, ...]):
+        super().__init__("設定が不正です: " + "; ".join(errors))
+        self.errors = errors
+
+
+def _setting(env: str, default: Any, kind: str = 'str', minimum: Optional[float] = None,
+             maximum: Optional[float] = None, choices: Tuple[str, ...] = (), case: Optional[str] = None,
+             reloadable: bool = False) -> Any:
+    """環境変数から読み込む設定項目を定義する
+
+    Args:
+        env: 環境変数名
+        default: 環境変数が未設定の場合の値
+        kind: 値の種類（'str'、'int'、'float'、'bool'、'url'）
+        minimum: 数値の最小値
+        maximum: 数値の最大値
+        choices: 指定できる値
+        case: 文字列を 'upper' / 'lower' にそろえる
+        reloadable: 再読み込みで反映される項目かどうか（False の項目は起動時の値を使い続け、再起動後に反映）
+    """
+    return field(default=default, metadata={
+        'env': env, 'kind': kind, 'minimum': minimum, 'maximum': maximum, 'choices': choices, 'case': case,
+        'reloadable': reloadable
+    })
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """検証済みの設定（変更不可）"""
+
+    # Configuration constants
+    service_account: Optional[str] = _setting('SERVICE_ACCOUNT', None, reloadable=True)
+    private_key_file: Optional[str] = _setting('PRIVATE_KEY_FILE', None, reloadable=True)
+    client_id: Optional[str] = _setting('CLIENT_ID', None, reloadable=True)
+    client_secret: Optional[str] = _setting('CLIENT_SECRET', None, reloadable=True)
+    base_api_url: str = _setting('BASE_API_URL', "https://www.worksapis.com/v1.0", 'url', reloadable=True)
+    auth_url: str = _setting(
+        'AUTH_URL', "https://auth.worksmobile.com/oauth2/v2.0/token", 'url', reloadable=True)
+    bot_id: str = _setting('BOT_ID', "10087978", reloadable=True)
+    # JSON file listing additional tenants (client credentials, private key and bot IDs per tenant)
+    tenants_file: Optional[str] = _setting('TENANTS_FILE', None)
+
+    # HTTP connection pool settings
+    http_pool_connections: int = _setting('HTTP_POOL_CONNECTIONS', 10, 'int', minimum=1)
+    http_pool_maxsize: int = _setting('HTTP_POOL_MAXSIZE', 20, 'int', minimum=1)
+    http_pool_block: bool = _setting('HTTP_POOL_BLOCK', False, 'bool')
+    http_keep_alive: bool = _setting('HTTP_KEEP_ALIVE', True, 'bool')
+
+    # HTTP timeouts in seconds (0 disables) and the overall deadline for one send_bot_message call
+    # (token fetch, rate limit wait, retries and the POST share the remaining time; 0 disables)
+    http_connect_timeout: float = _setting('HTTP_CONNECT_TIMEOUT', 3.05, 'float', minimum=0)
+    http_read_timeout: float = _setting('HTTP_READ_TIMEOUT', 10.0, 'float', minimum=0)
+    send_deadline: float = _setting('SEND_DEADLINE', 30.0, 'float', minimum=0)
+
+    # JSON encoder for request bodies (auto uses orjson when installed / orjson / json)
+    json_backend: str = _setting('JSON_BACKEND', 'auto', choices=('auto', 'orjson', 'json'), case='lower')
+
+    # Client-side rate limit settings (requests per second, 0 disables the limit)
+    rate_limit_global: float = _setting('RATE_LIMIT_GLOBAL', 50.0, 'float', minimum=0)
+    rate_limit_global_burst: float = _setting('RATE_LIMIT_GLOBAL_BURST', 50.0, 'float', minimum=0)
+    rate_limit_per_bot: float = _setting('RATE_LIMIT_PER_BOT', 20.0, 'float', minimum=0)
+    rate_limit_per_bot_burst: float = _setting('RATE_LIMIT_PER_BOT_BURST', 20.0, 'float', minimum=0)
+    rate_limit_max_throttle_retries: int = _setting('RATE_LIMIT_MAX_THROTTLE_RETRIES', 3, 'int', minimum=0)
+
+    # Retry policy settings
+    retry_max_attempts: int = _setting('RETRY_MAX_ATTEMPTS', 3, 'int', minimum=1)
+    retry_base_delay: float = _setting('RETRY_BASE_DELAY', 0.2, 'float', minimum=0)
+    retry_max_delay: float = _setting('RETRY_MAX_DELAY', 5.0, 'float', minimum=0)
+    retry_deadline: float = _setting('RETRY_DEADLINE', 30.0, 'float', minimum=0)
+
+    # Circuit breaker settings (per endpoint class: token / message / bot_info)
+    circuit_breaker_enabled: bool = _setting('CIRCUIT_BREAKER_ENABLED', True, 'bool')
+    circuit_breaker_failure_rate: float = _setting(
+        'CIRCUIT_BREAKER_FAILURE_RATE', 0.5, 'float', minimum=0, maximum=1)
+    circuit_breaker_slow_call_duration: float = _setting(
+        'CIRCUIT_BREAKER_SLOW_CALL_DURATION', 5.0, 'float', minimum=0)
+    circuit_breaker_slow_call_rate: float = _setting(
+        'CIRCUIT_BREAKER_SLOW_CALL_RATE', 0.8, 'float', minimum=0, maximum=1)
+    circuit_breaker_min_requests: int = _setting('CIRCUIT_BREAKER_MIN_REQUESTS', 20, 'int', minimum=1)
+    circuit_breaker_window: float = _setting('CIRCUIT_BREAKER_WINDOW', 30.0, 'float', minimum=0)
+    circuit_breaker_open_duration: float = _setting('CIRCUIT_BREAKER_OPEN_DURATION', 30.0, 'float', minimum=0)
+    circuit_breaker_half_open_probes: int = _setting('CIRCUIT_BREAKER_HALF_OPEN_PROBES', 3, 'int', minimum=1)
+    circuit_breaker_divert_to_outbox: bool = _setting('CIRCUIT_BREAKER_DIVERT_TO_OUTBOX', False, 'bool')
+
+    # Bot info cache settings (seconds, BOT_INFO_CACHE_TTL=0 disables the cache)
+    bot_info_cache_size: int = _setting('BOT_INFO_CACHE_SIZE', 1024, 'int', minimum=1)
+    bot_info_cache_ttl: float = _setting('BOT_INFO_CACHE_TTL', 300.0, 'float', minimum=0)
+    bot_info_cache_negative_ttl: float = _setting('BOT_INFO_CACHE_NEGATIVE_TTL', 60.0, 'float', minimum=0)
+    bot_info_cache_stale_ttl: float = _setting('BOT_INFO_CACHE_STALE_TTL', 600.0, 'float', minimum=0)
+
+    # Message coalescing settings (merge bursts of text messages to the same user)
+    coalesce_window: float = _setting('COALESCE_WINDOW', 2.0, 'float', minimum=0)
+    coalesce_max_messages: int = _setting('COALESCE_MAX_MESSAGES', 20, 'int', minimum=1)
+    coalesce_max_length: int = _setting('COALESCE_MAX_LENGTH', 2000, 'int', minimum=1)
+    coalesce_workers: int = _setting('COALESCE_WORKERS', 4, 'int', minimum=1)
+
+    # Duplicate message suppression (seconds, DEDUP_WINDOW=0 disables; DEDUP_PATH persists the index)
+    dedup_window: float = _setting('DEDUP_WINDOW', 0.0, 'float', minimum=0)
+    dedup_max_entries: int = _setting('DEDUP_MAX_ENTRIES', 100000, 'int', minimum=1)
+    dedup_path: str = _setting('DEDUP_PATH', '')
+
+    # Outbound message queue (outbox) settings
+    outbox_path: str = _setting('OUTBOX_PATH', os.path.join(_ROOT, 'logs', 'outbox.db'))
+    outbox_workers: int = _setting('OUTBOX_WORKERS', 4, 'int', minimum=1)
+    outbox_max_attempts: int = _setting('OUTBOX_MAX_ATTEMPTS', 10, 'int', minimum=1)
+    outbox_lease_seconds: float = _setting('OUTBOX_LEASE_SECONDS', 60.0, 'float', minimum=0)
+
+    # Bot callback (webhook) server settings (BOT_SECRET verifies X-WORKS-Signature)
+    bot_secret: str = _setting('BOT_SECRET', '')
+    callback_host: str = _setting('CALLBACK_HOST', '127.0.0.1')
+    callback_port: int = _setting('CALLBACK_PORT', 8080, 'int', minimum=0, maximum=65535)
+    callback_path: str = _setting('CALLBACK_PATH', '/callback')
+    callback_workers: int = _setting('CALLBACK_WORKERS', 8, 'int', minimum=1)
+    callback_queue_size: int = _setting('CALLBACK_QUEUE_SIZE', 10000, 'int', minimum=1)
+    callback_max_body: int = _setting('CALLBACK_MAX_BODY', 1024 * 1024, 'int', minimum=1)
+
+    # Settings reload (poll ENV_FILE every SETTINGS_WATCH_INTERVAL seconds, 0 disables; signal e.g. SIGHUP)
+    settings_watch_interval: float = _setting('SETTINGS_WATCH_INTERVAL', 0.0, 'float', minimum=0)
+    settings_reload_signal: str = _setting('SETTINGS_RELOAD_SIGNAL', '')
+
+    # Logging settings
+    log_level: str = _setting(
+        'LOG_LEVEL', 'INFO', choices=('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'), case='upper',
+        reloadable=True)
+    log_format: str = _setting('LOG_FORMAT', 'text', choices=('text', 'json'), case='lower')
+    log_async: bool = _setting('LOG_ASYNC', False, 'bool')
+    log_queue_size: int = _setting('LOG_QUEUE_SIZE', 10000, 'int', minimum=1)
+    log_overflow_policy: str = _setting('LOG_OVERFLOW_POLICY', 'block', choices=('block', 'drop', 'sample'))
+    log_sample_rate: float = _setting('LOG_SAMPLE_RATE', 0.1, 'float', minimum=0, maximum=1)
+    log_batch_size: int = _setting('LOG_BATCH_SIZE', 100, 'int', minimum=1)
+
+    # Tracing settings (per-phase span timings)
+    trace_enabled: bool = _setting('TRACE_ENABLED', False, 'bool')
+    trace_exporter: str = _setting('TRACE_EXPORTER', 'file', choices=('file', 'otel'), case='lower')
+    trace_file: str = _setting('TRACE_FILE', os.path.join(_ROOT, 'logs', 'trace.jsonl'))
+    trace_sample_rate: float = _setting('TRACE_SAMPLE_RATE', 1.0, 'float', minimum=0, maximum=1)
+
+    # Sampling profiler settings
+    profiler_enabled: bool = _setting('PROFILER_ENABLED', False, 'bool')
+    profiler_interval: float = _setting('PROFILER_INTERVAL', 0.01, 'float', minimum=0)
+    profiler_output: str = _setting('PROFILER_OUTPUT', os.path.join(_ROOT, 'logs', 'profile.collapsed'))
+    profiler_signal: str = _setting('PROFILER_SIGNAL', '')  # e.g. SIGUSR2
+
+    @classmethod
+    def from_environ(cls, environ: Mapping[str, str]) -> 'Settings':
+        """環境変数の値から設定を作成し、すべての項目を検証します。
+
+        Args:
+            environ: 環境変数名と値（未設定・空文字の数値項目は既定値を使用）
+
+        Returns:
+            Settings: 検証済みの設定
+
+        Raises:
+            SettingsError: 不正な項目がある場合（不正な項目をすべて含む）
+        """
+        values: Dict[str, Any] = {}
+        errors = []
+        for spec in dataclasses.fields(cls):
+            meta = spec.metadata
+            raw = environ.get(meta['env'])
+            if raw is None or (raw == '' and meta['kind'] != 'str'):
+                continue
+            try:
+                values[spec.name] = _parse(raw, meta)
+            except ValueError as e:
+                errors.append(f"{meta['env']}={raw!r}: {e}")
+        if errors:
+            raise SettingsError(tuple(errors))
+        return cls(**values)
+
+    def env(self) -> Dict[str, Any]:
+        """環境変数名をキーとした設定値を返します。"""
+        return {spec.metadata['env']: getattr(self, spec.name) for spec in dataclasses.fields(self)}
+
+    @classmethod
+    def reloadable(cls) -> FrozenSet[str]:
+        """再読み込みで反映される項目の名前を返します（その他の項目は再起動後に反映）。"""
+        return frozenset(spec.name for spec in dataclasses.fields(cls) if spec.metadata['reloadable'])
+
+    def changed(self, other: 'Settings') -> FrozenSet[str]:
+        """値が異なる項目の名前を返します。
+
+        Args:
+            other: 比較する設定
+
+        Returns:
+            FrozenSet[str]: 値が異なる項目（属性名）
+        """
+        return frozenset(
+            spec.name for spec in dataclasses.fields(self) if getattr(self, spec.name) != getattr(other, spec.name)
+        )
+
+
+def _parse(raw: str, meta: Mapping[str, Any]) -> Any:
+    """環境変数の文字列を設定項目の型に変換して検証する"""
+    kind = meta['kind']
+    if kind == 'bool':
+        value = raw.strip().lower()
+        if value in _TRUE:
+            return True
+        if value in _FALSE:
+            return False
+        raise ValueError("true または false を指定してください")
+    if kind in ('int', 'float'):
+        try:
+            number = int(raw) if kind == 'int' else float(raw)
+        except ValueError:
+            raise ValueError("整数を指定してください" if kind == 'int' else "数値を指定してください") from None
+        if meta['minimum'] is not None and number < meta['minimum']:
+            raise ValueError(f"{meta['minimum']:g} 以上を指定してください")
+        if meta['maximum'] is not None and number > meta['maximum']:
+            raise ValueError(f"{meta['maximum']:g} 以下を指定してください")
+        return number
+    if meta['case'] == 'upper':
+        raw = raw.upper()
+    elif meta['case'] == 'lower':
+        raw = raw.lower()
+    if meta['choices'] and raw not in meta['choices']:
+        raise ValueError(f"{' / '.join(meta['choices'])} のいずれかを指定してください")
+    if kind == 'url' and not raw.startswith(('http://', 'https://')):
+        raise ValueError("http:// または https:// で始まるURLを指定してください")
+    return raw
+
+
+# .env ファイルから os.environ に反映した変数名（再読み込み時にファイルの値で置き換える）
+_file_keys: FrozenSet[str] = frozenset()
+_lock = threading.Lock()
+
+
+def read_environ(env_file: Optional[str] = None) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """.env ファイルとプロセスの環境変数を合わせた値を返します。
+
+    プロセスの環境変数を優先します（load_dotenv と同じ）。ただし、以前に .env ファイルから
+    反映した変数はファイルの現在の値で置き換えます。
+
+    Args:
+        env_file: .env ファイルのパス（省略時は ENV_FILE）
+
+    Returns:
+        Tuple[Dict[str, str], Dict[str, str]]: 合わせた値と、そのうち .env ファイルから採用した値
+    """
+    path = env_file or ENV_FILE
+    file_values: Dict[str, str] = {}
+    if path and os.path.isfile(path):
+        file_values = {key: value for key, value in dotenv_values(path).items() if value is not None}
+    process = {key: value for key, value in os.environ.items() if key not in _file_keys}
+    from_file = {key: value for key, value in file_values.items() if key not in process}
+    return {**from_file, **process}, from_file
+
+
+def _apply_file_values(from_file: Mapping[str, str]) -> None:
+    """.env ファイルの値を os.environ に反映する（ライブラリが参照する変数のため）"""
+    global _file_keys
+    for key in _file_keys - set(from_file):
+        os.environ.pop(key, None)
+    os.environ.update(from_file)
+    _file_keys = frozenset(from_file)
+
+
+def load_settings(env_file: Optional[str] = None) -> Settings:
+    """.env ファイルと環境変数から設定を読み込んで検証します（現在の設定は変更しません）。
+
+    Args:
+        env_file: .env ファイルのパス（省略時は ENV_FILE）
+
+    Returns:
+        Settings: 検証済みの設定
+
+    Raises:
+        SettingsError: 不正な項目がある場合
+    """
+    environ, _ = read_environ(env_file)
+    return Settings.from_environ(environ)
+
+
+def get_settings() -> Settings:
+    """現在の設定を返します（再読み込みで差し替えられた場合は新しい設定）。"""
+    return _settings
+
+
+def set_settings(settings: Settings) -> Settings:
+    """現在の設定を差し替えます。
+
+    Args:
+        settings: 新しい設定
+
+    Returns:
+        Settings: 差し替える前の設定
+    """
+    global _settings
+    with _lock:
+        previous, _settings = _settings, settings
+    return previous
+
+
+def reload_settings(env_file: Optional[str] = None) -> Tuple[Settings, Settings]:
+    """.env ファイルと環境変数から設定を読み込み直し、検証に成功した場合のみ差し替えます。
+
+    Args:
+        env_file: .env ファイルのパス（省略時は ENV_FILE）
+
+    Returns:
+        Tuple[Settings, Settings]: 差し替える前と後の設定
+
+    Raises:
+        SettingsError: 不正な項目がある場合（現在の設定はそのまま）
+    """
+    global _settings
+    with _lock:
+        environ, from_file = read_environ(env_file)
+        settings = Settings.from_environ(environ)
+        _apply_file_values(from_file)
+        previous, _settings = _settings, settings
+    return previous, settings
+
+
+# 起動時に一度だけ読み込んで検証する
+_environ, _from_file = read_environ()
+_settings: Settings = Settings.from_environ(_environ)
+_apply_file_values(_from_file)
+
+# 起動時の設定値（モジュールの定数として参照する場合）
+SERVICE_ACCOUNT = _settings.service_account
+PRIVATE_KEY_FILE = _settings.private_key_file
+CLIENT_ID = _settings.client_id
+CLIENT_SECRET = _settings.client_secret
+BASE_API_URL = _settings.base_api_url
+AUTH_URL = _settings.auth_url
+BOT_ID = _settings.bot_id
+TENANTS_FILE = _settings.tenants_file
+
+HTTP_POOL_CONNECTIONS = _settings.http_pool_connections
+HTTP_POOL_MAXSIZE = _settings.http_pool_maxsize
+HTTP_POOL_BLOCK = _settings.http_pool_block
+HTTP_KEEP_ALIVE = _settings.http_keep_alive
+
+HTTP_CONNECT_TIMEOUT = _settings.http_connect_timeout
+HTTP_READ_TIMEOUT = _settings.http_read_timeout
+SEND_DEADLINE = _settings.send_deadline
+
+JSON_BACKEND = _settings.json_backend
+
+RATE_LIMIT_GLOBAL = _settings.rate_limit_global
+RATE_LIMIT_GLOBAL_BURST = _settings.rate_limit_global_burst
+RATE_LIMIT_PER_BOT = _settings.rate_limit_per_bot
+RATE_LIMIT_PER_BOT_BURST = _settings.rate_limit_per_bot_burst
+RATE_LIMIT_MAX_THROTTLE_RETRIES = _settings.rate_limit_max_throttle_retries
+
+RETRY_MAX_ATTEMPTS = _settings.retry_max_attempts
+RETRY_BASE_DELAY = _settings.retry_base_delay
+RETRY_MAX_DELAY = _settings.retry_max_delay
+RETRY_DEADLINE = _settings.retry_deadline
+
+CIRCUIT_BREAKER_ENABLED = _settings.circuit_breaker_enabled
+CIRCUIT_BREAKER_FAILURE_RATE = _settings.circuit_breaker_failure_rate
+CIRCUIT_BREAKER_SLOW_CALL_DURATION = _settings.circuit_breaker_slow_call_duration
+CIRCUIT_BREAKER_SLOW_CALL_RATE = _settings.circuit_breaker_slow_call_rate
+CIRCUIT_BREAKER_MIN_REQUESTS = _settings.circuit_breaker_min_requests
+CIRCUIT_BREAKER_WINDOW = _settings.circuit_breaker_window
+CIRCUIT_BREAKER_OPEN_DURATION = _settings.circuit_breaker_open_duration
+CIRCUIT_BREAKER_HALF_OPEN_PROBES = _settings.circuit_breaker_half_open_probes
+CIRCUIT_BREAKER_DIVERT_TO_OUTBOX = _settings.circuit_breaker_divert_to_outbox
+
+BOT_INFO_CACHE_SIZE = _settings.bot_info_cache_size
+BOT_INFO_CACHE_TTL = _settings.bot_info_cache_ttl
+BOT_INFO_CACHE_NEGATIVE_TTL = _settings.bot_info_cache_negative_ttl
+BOT_INFO_CACHE_STALE_TTL = _settings.bot_info_cache_stale_ttl
+
+COALESCE_WINDOW = _settings.coalesce_window
+COALESCE_MAX_MESSAGES = _settings.coalesce_max_messages
+COALESCE_MAX_LENGTH = _settings.coalesce_max_length
+COALESCE_WORKERS = _settings.coalesce_workers
+
+DEDUP_WINDOW = _settings.dedup_window
+DEDUP_MAX_ENTRIES = _settings.dedup_max_entries
+DEDUP_PATH = _settings.dedup_path
+
+OUTBOX_PATH = _settings.outbox_path
+OUTBOX_WORKERS = _settings.outbox_workers
+OUTBOX_MAX_ATTEMPTS = _settings.outbox_max_attempts
+OUTBOX_LEASE_SECONDS = _settings.outbox_lease_seconds
+
+BOT_SECRET = _settings.bot_secret
+CALLBACK_HOST = _settings.callback_host
+CALLBACK_PORT = _settings.callback_port
+CALLBACK_PATH = _settings.callback_path
+CALLBACK_WORKERS = _settings.callback_workers
+CALLBACK_QUEUE_SIZE = _settings.callback_queue_size
+CALLBACK_MAX_BODY = _settings.callback_max_body
+
+SETTINGS_WATCH_INTERVAL = _settings.settings_watch_interval
+SETTINGS_RELOAD_SIGNAL = _settings.settings_reload_signal
+
+LOG_LEVEL = _settings.log_level
+LOG_FORMAT = _settings.log_format
+LOG_ASYNC = _settings.log_async
+LOG_QUEUE_SIZE = _settings.log_queue_size
+LOG_OVERFLOW_POLICY = _settings.log_overflow_policy
+LOG_SAMPLE_RATE = _settings.log_sample_rate
+LOG_BATCH_SIZE = _settings.log_batch_size
+
+TRACE_ENABLED = _settings.trace_enabled
+TRACE_EXPORTER = _settings.trace_exporter
+TRACE_FILE = _settings.trace_file
+TRACE_SAMPLE_RATE = _settings.trace_sample_rate
+
+PROFILER_ENABLED = _settings.profiler_enabled
+PROFILER_INTERVAL = _settings.profiler_interval
+PROFILER_OUTPUT = _settings.profiler_output
+PROFILER_SIGNAL = _settings.profiler_signal
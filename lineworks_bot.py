@@ -1,55 +1,534 @@
-"""LINEWORKSボットのメインスクリプト"""
+"""LINEWORKSボットのメインスクリプト
 
-from config.settings import PRIVATE_KEY_FILE, BOT_ID
-from services.auth import get_private_key, get_access_token
-from services.message import send_message
-from services.logger import logger
+コマンドラインから実行すると、CSV または JSONL の送信先へ一斉送信します::
 
+    python lineworks_bot.py recipients.csv --message "{name}さん、お知らせです" --output results.jsonl
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
 
-def send_bot_message(user_id: str, message: str) -> bool:
+from config.settings import (
+    PRIVATE_KEY_FILE, BOT_ID, OUTBOX_WORKERS, TENANTS_FILE, CIRCUIT_BREAKER_DIVERT_TO_OUTBOX, SEND_DEADLINE,
+    BOT_SECRET, CALLBACK_HOST, CALLBACK_PORT, Settings
+)
+from services.auth import PrivateKeyProvider, JWTSigner, TokenManager
+from services.broadcast import (
+    FORMATS, Checkpoint, ProgressReporter, Recipient, RecipientSender, ResultWriter,
+    broadcast, count_recipients, read_recipients
+)
+from services.bulk import SendResult, send_bulk
+from services.callback import CallbackDispatcher, CallbackServer
+from services.circuit import CircuitOpenError, get_circuit_breakers
+from services.content import validate_content
+from services.deadline import deadline_scope
+from services.dedup import get_dedup_index
+from services.message import send_message, send_message_coalesced
+from services.outbox import Outbox, OutboxWorkerPool
+from services.logger import logger, correlation_scope
+from services.profiler import profiler, install_signal_handler
+from services.reload import reloader, install_signal_handler as install_reload_signal_handler
+from services.tenants import Tenant, TenantRegistry, TenantRoutingClient, TokenUnavailableError
+from services.tracing import tracer
+
+DEFAULT_TENANT = 'default'
+
+# 設定の再読み込みで既定テナントのトークンを取り直す項目
+_CREDENTIAL_SETTINGS = frozenset({
+    'client_id', 'client_secret', 'service_account', 'private_key_file', 'auth_url', 'base_api_url'
+})
+
+# プロセス全体で共有する秘密鍵・アクセストークンキャッシュ
+key_provider = PrivateKeyProvider(PRIVATE_KEY_FILE)
+token_manager = TokenManager(signer=JWTSigner(key_provider.get))
+
+# テナントレジストリ（環境変数の認証情報を既定テナントとし、TENANTS_FILE のテナントを追加する）
+tenants = TenantRegistry()
+tenants.add(Tenant(DEFAULT_TENANT, token_manager, default_bot_id=BOT_ID))
+if TENANTS_FILE:
+    tenants.load(TENANTS_FILE)
+
+# ボットのコールバックのハンドラ（返信はイベントを受信したボットのテナントから送信する）
+callbacks = CallbackDispatcher(tenants.client_for_bot)
+
+# 送信キューとワーカーは初回利用時に作成する
+_outbox: Optional[Outbox] = None
+_outbox_workers: Optional[OutboxWorkerPool] = None
+_outbox_lock = threading.Lock()
+
+# PROFILER_SIGNAL が設定されていれば、シグナルでプロファイラを切り替えられるようにする
+install_signal_handler(profiler)
+
+
+@reloader.on_change
+def _apply_settings(previous: Settings, current: Settings) -> None:
+    """再読み込みした設定を既定テナントとロガーに反映する
+
+    認証情報が変わった場合は新しい認証情報でトークンを取り直し、取得できるまでは既存のトークンで送信を続けます。
+    """
+    changed = current.changed(previous)
+    if 'private_key_file' in changed:
+        key_provider.set_path(current.private_key_file)
+    if changed & _CREDENTIAL_SETTINGS:
+        token_manager.rotate()
+    if 'bot_id' in changed:
+        tenants.get(DEFAULT_TENANT).default_bot_id = current.bot_id
+    if 'log_level' in changed:
+        logger.set_level(current.log_level)
+
+
+# SETTINGS_RELOAD_SIGNAL・SETTINGS_WATCH_INTERVAL が設定されていれば、再起動せずに設定を読み込み直す
+install_reload_signal_handler(reloader)
+reloader.watch()
+
+
+def _message_content(message: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """送信するメッセージコンテンツを作成し、送信前に検証します。
+
+    Args:
+        message: テキスト、またはメッセージコンテンツ
+
+    Returns:
+        Dict[str, Any]: 検証済みのメッセージコンテンツ
+
+    Raises:
+        ContentValidationError: コンテンツが不正な場合
+    """
+    if isinstance(message, str):
+        message = {"type": "text", "text": message}
+    return validate_content(message)
+
+
+def send_bot_message(
+    user_id: str,
+    message: Union[str, Dict[str, Any]],
+    bot_id: Optional[str] = None,
+    tenant: Optional[str] = None,
+    deadline: Optional[float] = None
+) -> bool:
     """LINEWORKSボットを使用してメッセージを送信します。
 
     このメインの実行関数は以下の処理を行います：
-    1. 秘密鍵を読み込み
-    2. アクセストークンを取得
+    1. 送信に使用するテナントとボットを決定
+    2. テナントのキャッシュ済みアクセストークンを取得（期限切れ時のみ秘密鍵を読み込んで再取得）
     3. 指定されたユーザーにメッセージを送信
 
     Args:
         user_id (str): メッセージを送信する対象のユーザーID（例：'user@domain'）
-        message (str): 送信するメッセージの内容
+        message (Union[str, Dict[str, Any]]): 送信するテキスト、または services.content で作成したメッセージコンテンツ
+        bot_id (Optional[str]): 送信に使用するボットID（省略時はテナントの既定のボット）
+        tenant (Optional[str]): テナント名（省略時はボットIDから判別、判別できなければ既定のテナント）
+        deadline (Optional[float]): この呼び出し全体の制限時間（秒、省略時は SEND_DEADLINE、0で無制限）。
+            トークン取得・レート制限の待機・再試行・送信は残り時間の範囲内で行われ、超過した場合はFalseを返します
 
     Returns:
         bool: 送信が成功した場合はTrue、失敗した場合はFalse
 
     Note:
         アクセストークンの取得に失敗した場合、メッセージは送信されません。
+        DEDUP_WINDOW 秒以内に同じユーザーへ同じ内容を送信済みの場合は、送信せずにTrueを返します。
+        同じ内容を送信中の場合はその結果を待ち、成功していればTrueを返し、失敗していれば改めて送信します。
+        不正なメッセージコンテンツはHTTPリクエストの前に検出され、Falseを返します。
+        メッセージ送信APIのサーキットブレーカーが開いている場合は直ちにFalseを返します
+        （CIRCUIT_BREAKER_DIVERT_TO_OUTBOX が true の場合は送信キューに追加してTrueを返します）。
     """
-    try:
-        logger.info(f"メッセージ送信開始: ユーザー {user_id}")
-        
-        private_key = get_private_key(PRIVATE_KEY_FILE)
-        if not private_key:
-            logger.error("秘密鍵の取得に失敗しました")
+    dedup = get_dedup_index()
+    recorded = False
+    with correlation_scope(), deadline_scope(SEND_DEADLINE if deadline is None else deadline), \
+            tracer.span('send_bot_message') as span:
+        try:
+            content = _message_content(message)
+            target, bot_id = tenants.resolve(tenant, bot_id)
+            span.set_attribute('tenant', target.name)
+            span.set_attribute('bot_id', bot_id)
+            if dedup is not None:
+                if dedup.reserve(bot_id, user_id, content):
+                    span.set_attribute('duplicate', True)
+                    return True
+                recorded = True
+            logger.info("メッセージ送信開始: ユーザー %s（テナント %s、ボット %s）", user_id, target.name, bot_id)
+
+            access_token = target.token_manager.get_token()
+            if not access_token:
+                logger.error("アクセストークンの取得に失敗しました")
+                span.set_attribute('error', 'token_unavailable')
+                if recorded:
+                    dedup.forget(bot_id, user_id, content)
+                return False
+
+            send_message(
+                content=content,
+                bot_id=bot_id,
+                user_id=user_id,
+                access_token=access_token,
+                token_refresher=target.token_manager.refresh_if_stale
+            )
+
+            if recorded:
+                dedup.confirm(bot_id, user_id, content)
+            logger.info("メッセージ送信完了")
+            return True
+
+        except CircuitOpenError as e:
+            span.record_exception(e)
+            if CIRCUIT_BREAKER_DIVERT_TO_OUTBOX:
+                try:
+                    entry_id = _get_outbox().enqueue(bot_id, user_id, content)
+                except Exception as enqueue_error:
+                    logger.error("送信キューへの追加に失敗しました: %s", enqueue_error, exc_info=enqueue_error)
+                    span.record_exception(enqueue_error)
+                    if recorded:
+                        dedup.forget(bot_id, user_id, content)
+                    return False
+                logger.warning("回路が開いているため送信キューに追加しました: ID %s ユーザー %s", entry_id, user_id)
+                if recorded:
+                    dedup.confirm(bot_id, user_id, content)
+                return True
+            logger.error("メッセージを送信できませんでした: %s", e)
+            if recorded:
+                dedup.forget(bot_id, user_id, content)
             return False
+        except Exception as e:
+            logger.error("メッセージ送信処理中にエラーが発生しました: %s", e, exc_info=e)
+            span.record_exception(e)
+            if recorded:
+                dedup.forget(bot_id, user_id, content)
+            return False
+
+
+def send_bot_message_coalesced(
+    user_id: str,
+    message: Union[str, Dict[str, Any]],
+    bot_id: Optional[str] = None,
+    tenant: Optional[str] = None
+) -> Future:
+    """同じユーザーへの短時間の連続メッセージをまとめて送信します。
+
+    アラートの連投など、同じユーザーへ続けて送るメッセージを COALESCE_WINDOW 秒まで溜め、
+    改行で連結して1通で送信します（連結後の本文は COALESCE_MAX_LENGTH 文字以内）。
+    呼び出しはすぐに戻り、送信結果は返り値の Future で受け取れます。
 
-        access_token = get_access_token(private_key)
+    Args:
+        user_id: メッセージを送信する対象のユーザーID
+        message: 送信するテキスト、または services.content で作成したメッセージコンテンツ
+        bot_id: 送信に使用するボットID（省略時はテナントの既定のボット）
+        tenant: テナント名（省略時はボットIDから判別、判別できなければ既定のテナント）
+
+    Returns:
+        Future: APIレスポンス（送信失敗時は例外、重複として破棄した場合はNone）を結果とする Future
+    """
+    dedup = get_dedup_index()
+    recorded = False
+    future: Future
+    try:
+        content = _message_content(message)
+        target, bot_id = tenants.resolve(tenant, bot_id)
+        if dedup is not None:
+            if dedup.reserve(bot_id, user_id, content):
+                future = Future()
+                future.set_result(None)
+                return future
+            recorded = True
+        access_token = target.token_manager.get_token()
         if not access_token:
-            logger.error("アクセストークンの取得に失敗しました")
-            return False
-        
-        send_message(
-            content={
-                "type": "text",
-                "text": message
-            },
-            bot_id=BOT_ID,
-            user_id=user_id,
-            access_token=access_token
+            raise TokenUnavailableError(f"アクセストークンの取得に失敗しました（テナント: {target.name}）")
+        future = send_message_coalesced(
+            content, bot_id, user_id, access_token, target.token_manager.refresh_if_stale
         )
-        
-        logger.info("メッセージ送信完了")
-        return True
-        
     except Exception as e:
-        logger.error(f"メッセージ送信処理中にエラーが発生しました: {e}", exc_info=e)
-        return False
\ No newline at end of file
+        logger.error("メッセージ送信処理中にエラーが発生しました: %s", e, exc_info=e)
+        future = Future()
+        future.set_exception(e)
+
+    if recorded:
+        def record_outcome(done: Future) -> None:
+            if done.cancelled() or done.exception() is not None:
+                dedup.forget(bot_id, user_id, content)
+            else:
+                dedup.confirm(bot_id, user_id, content)
+
+        future.add_done_callback(record_outcome)
+    return future
+
+
+def send_bot_message_bulk(
+    user_ids: Iterable[str],
+    message: Union[str, Dict[str, Any]],
+    concurrency: int = 10,
+    bot_id: Optional[str] = None,
+    tenant: Optional[str] = None
+) -> List[SendResult]:
+    """LINEWORKSボットを使用して同じメッセージを複数のユーザーへ送信します。
+
+    アクセストークン・HTTPセッション・シリアライズ済みのメッセージを全ユーザーで共有し、
+    上限付きのスレッドプールで並列に送信します。
+
+    Args:
+        user_ids: メッセージを送信する対象のユーザーIDの列
+        message: 送信するテキスト、または services.content で作成したメッセージコンテンツ
+        concurrency: 同時送信数の上限
+        bot_id: 送信に使用するボットID（省略時はテナントの既定のボット）
+        tenant: テナント名（省略時はボットIDから判別、判別できなければ既定のテナント）
+
+    Returns:
+        List[SendResult]: ユーザーごとの送信結果（成功可否、ステータス、レイテンシ、エラー）。
+            DEDUP_WINDOW 秒以内に同じ内容を送信済みのユーザーは送信せず、duplicate=True となります
+    """
+    user_ids = list(user_ids)
+    with correlation_scope():
+        logger.info("一斉送信開始: %s ユーザー", len(user_ids))
+
+        try:
+            content = _message_content(message)
+            target, bot_id = tenants.resolve(tenant, bot_id)
+            client = target.client()
+        except Exception as e:
+            logger.error("一斉送信の準備中にエラーが発生しました: %s", e, exc_info=e)
+            return [
+                SendResult(user_id=user_id, success=False, error=str(e) or type(e).__name__)
+                for user_id in user_ids
+            ]
+
+        dedup = get_dedup_index()
+        if dedup is None:
+            return send_bulk(client, bot_id, user_ids, content, concurrency=concurrency)
+
+        duplicates = []
+        targets: List[str] = []
+        try:
+            for user_id in user_ids:
+                duplicate = dedup.reserve(bot_id, user_id, content)
+                duplicates.append(duplicate)
+                if not duplicate:
+                    targets.append(user_id)
+            sent = send_bulk(client, bot_id, targets, content, concurrency=concurrency) if targets else []
+        except BaseException:
+            # 予約したまま残すと、同じメッセージの送信が結果を待ち続ける
+            for user_id in targets:
+                dedup.forget(bot_id, user_id, content)
+            raise
+        sent = iter(sent)
+        results = []
+        for user_id, duplicate in zip(user_ids, duplicates):
+            if duplicate:
+                results.append(SendResult(user_id=user_id, success=True, attempts=0, duplicate=True))
+                continue
+            result = next(sent)
+            if result.success:
+                dedup.confirm(bot_id, user_id, content)
+            else:
+                dedup.forget(bot_id, user_id, content)
+            results.append(result)
+        return results
+
+
+def _get_outbox() -> Outbox:
+    """プロセス全体で共有する送信キューを返します。"""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = Outbox()
+        return _outbox
+
+
+def _outbox_client() -> TenantRoutingClient:
+    """送信キューのワーカーが使用するクライアントを作成します（ボットIDごとにテナントへ振り分け）。"""
+    return TenantRoutingClient(tenants)
+
+
+def enqueue_bot_message(
+    user_id: str,
+    message: Union[str, Dict[str, Any]],
+    bot_id: Optional[str] = None,
+    tenant: Optional[str] = None
+) -> Optional[int]:
+    """メッセージを永続送信キューに追加し、すぐに戻ります。
+
+    実際の送信は start_outbox_workers で起動したワーカーが行います。
+    プロセスが異常終了しても、未配送のメッセージは次回起動時に再送されます。
+
+    Args:
+        user_id: メッセージを送信する対象のユーザーID
+        message: 送信するテキスト、または services.content で作成したメッセージコンテンツ
+        bot_id: 送信に使用するボットID（省略時はテナントの既定のボット）
+        tenant: テナント名（省略時はボットIDから判別、判別できなければ既定のテナント）
+
+    Returns:
+        Optional[int]: 送信キューのエントリID（DEDUP_WINDOW 秒以内に同じ内容を追加済みの場合はNone）
+
+    Raises:
+        ContentValidationError: メッセージコンテンツが不正な場合（キューには追加されない）
+    """
+    content = _message_content(message)
+    _, bot_id = tenants.resolve(tenant, bot_id)
+    dedup = get_dedup_index()
+    if dedup is not None and dedup.check_and_record(bot_id, user_id, content):
+        return None
+    try:
+        return _get_outbox().enqueue(bot_id, user_id, content)
+    except BaseException:
+        if dedup is not None:
+            dedup.forget(bot_id, user_id, content)
+        raise
+
+
+def start_outbox_workers(workers: int = OUTBOX_WORKERS) -> None:
+    """送信キューを配送するワーカースレッドを起動します。
+
+    Args:
+        workers: ワーカースレッド数
+    """
+    global _outbox_workers
+    outbox = _get_outbox()
+    with _outbox_lock:
+        if _outbox_workers is None:
+            _outbox_workers = OutboxWorkerPool(outbox, _outbox_client, workers=workers)
+        _outbox_workers.start()
+
+
+def stop_outbox_workers(timeout: Optional[float] = None) -> None:
+    """送信キューのワーカースレッドを停止します。
+
+    Args:
+        timeout: 各スレッドの終了を待つ秒数
+    """
+    global _outbox_workers
+    with _outbox_lock:
+        workers, _outbox_workers = _outbox_workers, None
+    if workers is not None:
+        workers.stop(timeout)
+
+
+def circuit_stats() -> Dict[str, Dict[str, Any]]:
+    """エンドポイントの種類ごとのサーキットブレーカーの状態と統計情報を返します。
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 種類（'token'、'message'、'bot_info'）ごとの状態、呼び出し数、失敗数など
+            （サーキットブレーカーが無効の場合は空）
+    """
+    breakers = get_circuit_breakers()
+    return breakers.stats() if breakers is not None else {}
+
+
+def outbox_stats() -> Dict[str, float]:
+    """送信キューの統計情報（深さ、エンキュー遅延、配送レート）を返します。
+
+    Returns:
+        Dict[str, float]: 統計情報
+    """
+    return _get_outbox().stats()
+
+
+def start_callback_server(
+    host: str = CALLBACK_HOST,
+    port: int = CALLBACK_PORT,
+    secret: Union[str, Dict[str, str], None] = BOT_SECRET
+) -> CallbackServer:
+    """ボットのコールバックを受信するサーバーをバックグラウンドで起動します。
+
+    受信したイベントは callbacks に登録したハンドラで処理されます::
+
+        @lineworks_bot.callbacks.on('message')
+        def echo(event):
+            return f"受け付けました: {event.text}"
+
+        server = lineworks_bot.start_callback_server()
+
+    Args:
+        host: 待ち受けアドレス
+        port: 待ち受けポート
+        secret: Bot Secret、またはボットIDごとの Bot Secret
+
+    Returns:
+        CallbackServer: 起動したサーバー（stop() で停止）
+    """
+    return CallbackServer(callbacks, secret=secret, host=host, port=port).start()
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="CSV または JSONL の送信先へメッセージを一斉送信します")
+    parser.add_argument('input', help='送信先のファイル（CSV は1行目がヘッダー、JSONL は1行1オブジェクト）')
+    parser.add_argument('--format', choices=FORMATS, help='入力形式（省略時は拡張子から判定）')
+    parser.add_argument('--user-field', default='user_id', help='送信先ユーザーIDの列名')
+    message = parser.add_mutually_exclusive_group()
+    message.add_argument('--message', help='行に message がない場合に送信するテキスト（{列名} に行の値を差し込む）')
+    message.add_argument('--content', help='行に message がない場合に送信するメッセージコンテンツのJSONファイル')
+    parser.add_argument('--bot-id', help='行に bot_id がない場合に使用するボットID')
+    parser.add_argument('--tenant', help='行に tenant がない場合に使用するテナント名')
+    parser.add_argument('--concurrency', type=int, default=10, help='同時送信数')
+    parser.add_argument('--output', help='行ごとの送信結果を書き込むJSONLファイル')
+    parser.add_argument('--checkpoint', help='チェックポイントファイル（省略時は出力または入力ファイル名 + .checkpoint）')
+    parser.add_argument('--resume', action='store_true', help='チェックポイントの位置から再開する')
+    parser.add_argument('--progress-interval', type=float, default=1.0, help='進捗の表示間隔（秒）')
+    parser.add_argument('--no-count', action='store_true', help='事前に行数を数えない（残り時間を表示しない）')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """コマンドラインから一斉送信を実行します。
+
+    Returns:
+        int: 終了コード（全件成功で0、失敗した行がある場合は1、中断した場合は130）
+    """
+    args = _parse_args(argv)
+    message: Optional[Union[str, Dict[str, Any]]] = args.message
+    if args.content:
+        with open(args.content, encoding='utf-8') as f:
+            message = json.load(f)
+    try:
+        sender = RecipientSender(tenants, message, bot_id=args.bot_id, tenant=args.tenant)
+    except ValueError as e:
+        print(f"メッセージが不正です: {e}", file=sys.stderr)
+        return 2
+
+    checkpoint_path = args.checkpoint or f"{args.output or args.input}.checkpoint"
+    checkpoint = Checkpoint.load(checkpoint_path) if args.resume else Checkpoint(checkpoint_path)
+    if checkpoint.offset:
+        print(f"{checkpoint.offset:,} 行目から再開します", file=sys.stderr)
+    total = None if args.no_count else count_recipients(args.input, args.format)
+    progress = ProgressReporter(total, args.progress_interval, done=checkpoint.offset)
+    writer = ResultWriter(args.output, append=args.resume) if args.output else None
+    save_lock = threading.Lock()
+    saved_at = [0.0]
+
+    def on_result(recipient: Recipient, result: SendResult) -> None:
+        if writer is not None:
+            writer.write(recipient, result)
+        progress.update(result)
+        checkpoint.mark_done(recipient.row)
+        # チェックポイントの書き込みは表示間隔ごとに1回まで
+        with save_lock:
+            now = time.monotonic()
+            if now - saved_at[0] >= args.progress_interval:
+                saved_at[0] = now
+                if writer is not None:
+                    writer.flush()
+                checkpoint.save()
+
+    recipients = read_recipients(args.input, args.format, args.user_field, start=checkpoint.offset)
+    progress.start()
+    interrupted = False
+    try:
+        with correlation_scope():
+            broadcast(recipients, sender, args.concurrency, on_result)
+    except KeyboardInterrupt:
+        interrupted = True
+    finally:
+        progress.stop()
+        if writer is not None:
+            writer.close()
+        checkpoint.save()
+
+    if interrupted:
+        print(f"中断しました。--resume で {checkpoint.offset:,} 行目から再開できます", file=sys.stderr)
+        return 130
+    return 1 if progress.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
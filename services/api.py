@@ -1,18 +1,151 @@
 """LINEWORKS API通信を担当するモジュール"""
+import contextlib
+import functools
+import logging
+import threading
+import time
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, ContextManager, List, Mapping, Optional, Tuple, Union
 from urllib.parse import quote
 
+from .botinfo import BotInfoCache, FetchResult, get_bot_info_cache
+from .circuit import CallOutcome, CircuitBreakerRegistry, CircuitOpenError, get_circuit_breakers
+from .content import validate_content
+from .deadline import DeadlineExceededError, remaining, request_timeout
 from .logger import logger
-from config.settings import BASE_API_URL
+from .metrics import API_REQUESTS, API_REQUEST_DURATION, API_RETRIES
+from .payload import MessageTemplate, dumps
+from .ratelimit import RateLimiter, get_rate_limiter, parse_retry_after
+from .retry import RetryPolicy, RequestAttempt, DEFAULT_RETRY_POLICY
+from .session import get_session
+from .tracing import tracer
+from config.settings import RATE_LIMIT_MAX_THROTTLE_RETRIES, get_settings
+
+
+def encode_message_body(content: Dict[str, Any]) -> bytes:
+    """メッセージ送信APIのリクエストボディを検証してシリアライズします。
+
+    同じ内容を多数のユーザーへ送る場合は、一度だけシリアライズして使い回せます。
+
+    Args:
+        content: メッセージコンテンツ
+
+    Returns:
+        bytes: JSONエンコード済みのリクエストボディ
+
+    Raises:
+        ContentValidationError: コンテンツが不正な場合（リクエストは送信されない）
+    """
+    with tracer.span('api.serialize'):
+        return dumps({"content": validate_content(content)})
+
+
+@functools.lru_cache(maxsize=65536)
+def message_endpoint(bot_id: str, user_id: str) -> str:
+    """メッセージ送信APIのエンドポイントを返します（ユーザーIDはURLエンコード済み）。
+
+    Args:
+        bot_id: ボットID
+        user_id: 送信先のユーザーID
+
+    Returns:
+        str: APIエンドポイント（例：'/bots/{bot_id}/users/{user_id}/messages'）
+    """
+    return f"/bots/{bot_id}/users/{quote(user_id)}/messages"
+
+
+def render_message_body(
+    content: Union[Dict[str, Any], bytes, MessageTemplate],
+    user_id: str,
+    values: Optional[Mapping[str, Any]] = None
+) -> bytes:
+    """送信先ユーザーごとのリクエストボディを返します。
+
+    Args:
+        content: メッセージコンテンツ、シリアライズ済みのボディ、または MessageTemplate
+        user_id: 送信先のユーザーID（テンプレートの {user_id} に差し込む）
+        values: テンプレートのプレースホルダーに差し込む値
+
+    Returns:
+        bytes: シリアライズ済みのリクエストボディ
+    """
+    if isinstance(content, bytes):
+        return content
+    if isinstance(content, MessageTemplate):
+        return content.render({'user_id': user_id, **values} if values else {'user_id': user_id})
+    return encode_message_body(content)
+
+
+def endpoint_class(endpoint: str) -> str:
+    """エンドポイントを計測・監視用の分類名に変換します。
+
+    ユーザーIDなどを含むパスをそのままラベルにしないよう、種類ごとにまとめます。
+
+    Args:
+        endpoint: APIエンドポイント（例：'/bots/{bot_id}/users/{user_id}/messages'）
+
+    Returns:
+        str: 'message'、'bot_info' または 'other'
+    """
+    parts = endpoint.strip('/').split('/')
+    if parts[-1] == 'messages':
+        return 'message'
+    if len(parts) == 2 and parts[0] == 'bots':
+        return 'bot_info'
+    return 'other'
+
+
+# APIClient が保持する準備済みリクエスト（送信先URLごと）の上限
+def _bearer_token(headers: Mapping[str, str]) -> Optional[str]:
+    """Authorization ヘッダーから送信したアクセストークンを取り出す"""
+    value = headers.get('Authorization') or ''
+    return value[len('Bearer '):] if value.startswith('Bearer ') else None
+
+
+_PREPARED_CACHE_SIZE = 4096
 
 
 class APIClient:
     """LINEWORKS APIとの通信を行うクラス"""
 
-    def __init__(self, access_token: str):
+    def __init__(
+        self,
+        access_token: str,
+        session: Optional[requests.Session] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        token_refresher: Optional[Callable[[str], Optional[str]]] = None,
+        bot_info_cache: Optional[BotInfoCache] = None,
+        circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+        timeout: Optional[Tuple[Optional[float], Optional[float]]] = None
+    ):
         """APIクライアントの初期化
 
+        Args:
+            access_token: APIアクセストークン
+            session: 使用するHTTPセッション（省略時はプロセス共有のセッション）
+            rate_limiter: 使用するレートリミッター（省略時はプロセス共有のリミッター）
+            retry_policy: 再試行ポリシー（省略時は既定のポリシー）
+            token_refresher: 401応答時に失効したトークンを受け取り、新しいトークンを返す関数
+            bot_info_cache: ボット情報のキャッシュ（省略時はプロセス共有のキャッシュ）
+            circuit_breakers: エンドポイントの種類ごとのサーキットブレーカー（省略時はプロセス共有のもの）
+            timeout: (接続, 読み取り) のタイムアウト秒数（省略時は HTTP_CONNECT_TIMEOUT と HTTP_READ_TIMEOUT）
+        """
+        self.session = session if session is not None else get_session()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        self.retry_policy = retry_policy if retry_policy is not None else DEFAULT_RETRY_POLICY
+        self.token_refresher = token_refresher
+        self.bot_info_cache = bot_info_cache if bot_info_cache is not None else get_bot_info_cache()
+        self.circuit_breakers = circuit_breakers if circuit_breakers is not None else get_circuit_breakers()
+        self.timeout = timeout
+        # クライアント作成時点の BASE_API_URL（設定の再読み込み後は新しく作成したクライアントに反映）
+        self.base_url = get_settings().base_api_url
+        self._local = threading.local()
+        self._set_token(access_token)
+
+    def _set_token(self, access_token: str) -> None:
+        """アクセストークンと認証ヘッダーを設定する
+
         Args:
             access_token: APIアクセストークン
         """
@@ -21,12 +154,24 @@ class APIClient:
             'Content-Type': 'application/json',
             'Authorization': f"Bearer {access_token}"
         }
+        # 認証ヘッダーが変わるため、準備済みのリクエストを作り直す
+        # （雛形・Session.send の引数・URLごとのリクエストの組を1つの属性で差し替える）
+        self._prepared: Optional[
+            Tuple[requests.PreparedRequest, Dict[str, Any], Dict[str, requests.PreparedRequest]]
+        ] = None
+
+    @property
+    def last_attempts(self) -> List[RequestAttempt]:
+        """呼び出し元スレッドで直前に実行したリクエストの試行記録"""
+        return getattr(self._local, 'attempts', [])
 
     def _make_request(
         self, 
         method: str, 
         endpoint: str, 
-        data: Optional[Dict[str, Any]] = None
+        data: Optional[Dict[str, Any]] = None,
+        body: Optional[bytes] = None,
+        bot_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """API リクエストを実行する
 
@@ -34,6 +179,8 @@ class APIClient:
             method: HTTPメソッド（'GET', 'POST', 'PUT', 'DELETE'）
             endpoint: APIエンドポイント（例：'/bots/{bot_id}/users/{user_id}/messages'）
             data: リクエストボディ（省略可）
+            body: シリアライズ済みのリクエストボディ（指定時は data より優先）
+            bot_id: レート制限の対象とするボットID（省略可）
 
         Returns:
             Dict[str, Any]: レスポンスデータ
@@ -42,65 +189,437 @@ class APIClient:
             requests.exceptions.ConnectionError: ネットワークエラー発生時
             requests.exceptions.RequestException: APIリクエストエラー発生時
         """
-        url = f"{BASE_API_URL}{endpoint}"
-        
+        with tracer.span('api.request', **{'http.method': method, 'endpoint': endpoint_class(endpoint)}):
+            response = self._send_request(method, endpoint, data, body, bot_id)
+
+        if response.content:
+            return response.json()
+        return {}
+
+    def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        body: Optional[bytes] = None,
+        bot_id: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """API リクエストを実行し、レスポンスオブジェクトを返す
+
+        送信前にレートリミッターで送信枠を確保し、429 応答を受けた場合は
+        Retry-After に従って送信を控えてから再送します。
+
+        Args:
+            method: HTTPメソッド（'GET', 'POST', 'PUT', 'DELETE'）
+            endpoint: APIエンドポイント
+            data: リクエストボディ（省略可）
+            body: シリアライズ済みのリクエストボディ（指定時は data より優先）
+            bot_id: レート制限の対象とするボットID（省略可）
+            headers: 追加のリクエストヘッダー（省略可）
+
+        Returns:
+            requests.Response: 成功したレスポンス
+
+        Raises:
+            CircuitOpenError: エンドポイントのサーキットブレーカーが開いている場合（リクエストは送信されない）
+            DeadlineExceededError: 呼び出し全体（deadline_scope）の制限時間を超える場合
+            requests.exceptions.ConnectionError: ネットワークエラー発生時
+            requests.exceptions.RequestException: APIリクエストエラー発生時
+        """
+        url = f"{self.base_url}{endpoint}"
+        kind = endpoint_class(endpoint)
+        policy = self.retry_policy
+        started = time.monotonic()
+        attempts: List[RequestAttempt] = []
+        self._local.attempts = attempts
+        retries = 0
+        throttle_retries = 0
+        token_refreshed = False
+
         try:
+            while True:
+                attempt_start = time.perf_counter()
+                self._local.sent_token = None
+                try:
+                    response = self._send_once(method, url, data, body, bot_id, headers, kind)
+                except requests.exceptions.RequestException as e:
+                    attempts.append(RequestAttempt(
+                        attempt=len(attempts) + 1,
+                        latency_ms=(time.perf_counter() - attempt_start) * 1000,
+                        error=str(e) or type(e).__name__
+                    ))
+                    if (
+                        retries + 1 < policy.max_attempts
+                        and policy.should_retry_exception(method, e)
+                        and self._wait_before_retry(retries + 1, started)
+                    ):
+                        retries += 1
+                        API_RETRIES.inc(endpoint=kind, reason='exception')
+                        logger.warning(
+                            "リクエストを再試行します（%s回目）: %s %s - %s", retries, method, endpoint, e
+                        )
+                        continue
+                    raise
+
+                status = response.status_code
+                attempts.append(RequestAttempt(
+                    attempt=len(attempts) + 1,
+                    latency_ms=(time.perf_counter() - attempt_start) * 1000,
+                    status=status
+                ))
+
+                if status == 429 and throttle_retries < RATE_LIMIT_MAX_THROTTLE_RETRIES \
+                        and not self._deadline_exceeded(started):
+                    throttle_retries += 1
+                    API_RETRIES.inc(endpoint=kind, reason='throttled')
+                    self.rate_limiter.throttle(
+                        parse_retry_after(response.headers.get('Retry-After')), bot_id
+                    )
+                    continue
+
+                if status == 401 and not token_refreshed and self._refresh_token(self._local.sent_token):
+                    token_refreshed = True
+                    API_RETRIES.inc(endpoint=kind, reason='unauthorized')
+                    logger.info("アクセストークンを再取得してリクエストを再試行します")
+                    continue
+
+                if (
+                    retries + 1 < policy.max_attempts
+                    and policy.should_retry_status(method, status)
+                    and self._wait_before_retry(retries + 1, started)
+                ):
+                    retries += 1
+                    API_RETRIES.inc(endpoint=kind, reason='status')
+                    logger.warning(
+                        "リクエストを再試行します（%s回目）: %s %s - ステータス %s",
+                        retries, method, endpoint, status
+                    )
+                    continue
+
+                response.raise_for_status()
+                self.rate_limiter.record_success(bot_id)
+                API_REQUESTS.inc(endpoint=kind, method=method, status=status)
+                API_REQUEST_DURATION.observe(time.monotonic() - started, endpoint=kind)
+                if logger.is_enabled_for(logging.INFO):
+                    fields = self._log_fields(method, endpoint, bot_id, status, body, started, attempts)
+                    logger.info(
+                        "APIリクエスト完了: %s %s ステータス %s（%.1fms）",
+                        method, endpoint, status, fields['duration_ms'], extra=fields
+                    )
+                return response
+
+        except (CircuitOpenError, DeadlineExceededError) as e:
+            API_REQUESTS.inc(
+                endpoint=kind, method=method,
+                status='circuit_open' if isinstance(e, CircuitOpenError) else 'deadline_exceeded'
+            )
+            logger.warning(
+                "リクエストを送信しませんでした: %s", e,
+                extra=self._log_fields(method, endpoint, bot_id, None, body, started, attempts)
+            )
+            raise
+        except requests.exceptions.ConnectionError as e:
+            API_REQUESTS.inc(endpoint=kind, method=method, status='error')
+            API_REQUEST_DURATION.observe(time.monotonic() - started, endpoint=kind)
+            logger.error(
+                "ネットワークエラーが発生しました: %s", e, exc_info=e,
+                extra=self._log_fields(method, endpoint, bot_id, None, body, started, attempts)
+            )
+            raise
+        except requests.exceptions.RequestException as e:
+            status = e.response.status_code if e.response is not None else None
+            API_REQUESTS.inc(endpoint=kind, method=method, status=status or 'error')
+            API_REQUEST_DURATION.observe(time.monotonic() - started, endpoint=kind)
+            fields = self._log_fields(method, endpoint, bot_id, status, body, started, attempts)
+            if e.response is not None:
+                logger.error(
+                    "APIエラーが発生しました: %s - レスポンス: %s", e, e.response.text,
+                    exc_info=e, extra=fields
+                )
+            else:
+                logger.error("APIエラーが発生しました: %s", e, exc_info=e, extra=fields)
+            raise
+
+    @staticmethod
+    def _log_fields(
+        method: str,
+        endpoint: str,
+        bot_id: Optional[str],
+        status: Optional[int],
+        body: Optional[bytes],
+        started: float,
+        attempts: List[RequestAttempt]
+    ) -> Dict[str, Any]:
+        """構造化ログに出力するリクエストの項目を作成する
+
+        Args:
+            method: HTTPメソッド
+            endpoint: APIエンドポイント
+            bot_id: ボットID
+            status: 最終的なステータスコード
+            body: シリアライズ済みのリクエストボディ
+            started: リクエスト開始時刻（time.monotonic）
+            attempts: 試行記録
+
+        Returns:
+            Dict[str, Any]: ログの extra に渡す項目
+        """
+        return {
+            'bot_id': bot_id,
+            'method': method,
+            'endpoint': endpoint,
+            'status': status,
+            'bytes': len(body) if body is not None else 0,
+            'duration_ms': round((time.monotonic() - started) * 1000, 1),
+            'attempt': len(attempts),
+        }
+
+    def _deadline_exceeded(self, started: float, delay: float = 0.0) -> bool:
+        """再試行ポリシーまたは呼び出し全体（deadline_scope）の制限時間を超えるかどうかを返す
+
+        Args:
+            started: リクエスト開始時刻（time.monotonic）
+            delay: これから待機する秒数
+
+        Returns:
+            bool: 制限時間を超える場合はTrue
+        """
+        left = remaining()
+        if left is not None and delay >= left:
+            return True
+        deadline = self.retry_policy.deadline
+        return deadline is not None and time.monotonic() - started + delay >= deadline
+
+    def _wait_before_retry(self, retry: int, started: float) -> bool:
+        """バックオフ時間だけ待機する（制限時間を超える場合は待機しない）
+
+        Args:
+            retry: これから行う再試行の回数（1始まり）
+            started: リクエスト開始時刻（time.monotonic）
+
+        Returns:
+            bool: 再試行してよい場合はTrue
+        """
+        delay = self.retry_policy.backoff(retry)
+        if self._deadline_exceeded(started, delay):
+            return False
+        time.sleep(delay)
+        return True
+
+    def _refresh_token(self, used_token: Optional[str]) -> bool:
+        """401応答を受けてアクセストークンを再取得する
+
+        失効したトークンとして、現在のトークンではなく失敗したリクエストで送信したトークンを渡します
+        （他のスレッドが既に新しいトークンに切り替えた場合に、そのトークンを破棄しないため）。
+
+        Args:
+            used_token: 401応答を受けたリクエストで送信したトークン
+
+        Returns:
+            bool: 送信したトークンと異なるトークンを取得できた場合はTrue
+        """
+        if self.token_refresher is None:
+            return False
+        if used_token is None:
+            used_token = self.access_token
+        try:
+            new_token = self.token_refresher(used_token)
+        except Exception as e:
+            logger.error("アクセストークンの再取得に失敗しました: %s", e, exc_info=e)
+            return False
+        if not new_token or new_token == used_token:
+            return False
+        if new_token != self.access_token:
+            self._set_token(new_token)
+        return True
+
+    def _send_once(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict[str, Any]],
+        body: Optional[bytes],
+        bot_id: Optional[str],
+        headers: Optional[Dict[str, str]] = None,
+        kind: str = 'other'
+    ) -> requests.Response:
+        """送信枠を確保してHTTPリクエストを1回実行する
+
+        エンドポイントの種類のサーキットブレーカーが開いている場合は、送信枠を確保せずに失敗します。
+        例外と5xx応答はサーキットブレーカーに失敗として記録します。
+
+        Args:
+            method: HTTPメソッド
+            url: リクエストURL
+            data: リクエストボディ
+            body: シリアライズ済みのリクエストボディ
+            bot_id: レート制限の対象とするボットID
+            headers: 追加のリクエストヘッダー
+            kind: エンドポイントの種類（サーキットブレーカーの選択に使用）
+
+        Returns:
+            requests.Response: レスポンス（ステータスコードは未検査）
+
+        Raises:
+            CircuitOpenError: サーキットブレーカーが開いている場合
+        """
+        with self._circuit(kind) as outcome:
+            with tracer.span('api.rate_limit_wait'):
+                self.rate_limiter.acquire(bot_id)
+            outcome.start()
+            response = self._send_http(method, url, data, body, headers)
+            outcome.failed = response.status_code >= 500
+            return response
+
+    def _circuit(self, kind: str) -> ContextManager[CallOutcome]:
+        """エンドポイントの種類のサーキットブレーカーで呼び出しを保護するコンテキストを返す"""
+        if self.circuit_breakers is None:
+            return contextlib.nullcontext(CallOutcome())
+        return self.circuit_breakers.get(kind).call()
+
+    def _send_http(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict[str, Any]],
+        body: Optional[bytes],
+        headers: Optional[Dict[str, str]]
+    ) -> requests.Response:
+        """HTTPリクエストを1回実行する
+
+        Args:
+            method: HTTPメソッド
+            url: リクエストURL
+            data: リクエストボディ
+            body: シリアライズ済みのリクエストボディ
+            headers: 追加のリクエストヘッダー
+
+        Returns:
+            requests.Response: レスポンス（ステータスコードは未検査）
+
+        Raises:
+            DeadlineExceededError: 呼び出し全体の制限時間を過ぎている場合（リクエストは送信されない）
+        """
+        if logger.is_enabled_for(logging.DEBUG):
+            logger.debug("リクエスト送信: %s %s ボディ: %s", method, url, body if body is not None else data)
+
+        # 接続・読み取りのタイムアウトは呼び出し全体の残り時間で切り詰める
+        timeout = request_timeout(*self.timeout) if self.timeout is not None else request_timeout()
+        with tracer.span('api.http', **{'http.method': method, 'http.url': url}) as span:
+            if method == 'POST' and body is not None and headers is None \
+                    and isinstance(self.session, requests.Session):
+                request, settings = self._prepare_post(url, body)
+                self._local.sent_token = _bearer_token(request.headers)
+                response = self.session.send(request, timeout=timeout, **settings)
+                span.set_attribute('http.status_code', response.status_code)
+                return response
+
+            headers = self.headers if headers is None else {**self.headers, **headers}
+            self._local.sent_token = _bearer_token(headers)
             if method == 'GET':
-                response = requests.get(url, headers=self.headers)
+                response = self.session.get(url, headers=headers, timeout=timeout)
             elif method == 'POST':
-                response = requests.post(url, json=data, headers=self.headers)
+                if body is not None:
+                    response = self.session.post(url, data=body, headers=headers, timeout=timeout)
+                else:
+                    response = self.session.post(url, json=data, headers=headers, timeout=timeout)
             elif method == 'PUT':
-                response = requests.put(url, json=data, headers=self.headers)
+                if body is not None:
+                    response = self.session.put(url, data=body, headers=headers, timeout=timeout)
+                else:
+                    response = self.session.put(url, json=data, headers=headers, timeout=timeout)
             elif method == 'DELETE':
-                response = requests.delete(url, headers=self.headers)
+                response = self.session.delete(url, headers=headers, timeout=timeout)
             else:
                 raise ValueError(f"サポートされていないHTTPメソッド: {method}")
-            
-            response.raise_for_status()
-            
-            if response.content:
-                return response.json()
-            return {}
-            
-        except requests.exceptions.ConnectionError as e:
-            logger.error(f"ネットワークエラーが発生しました: {e}", exc_info=e)
-            raise
-        except requests.exceptions.RequestException as e:
-            error_msg = f"APIエラーが発生しました: {e}"
-            if hasattr(e, 'response') and e.response is not None:
-                error_msg += f" - レスポンス: {e.response.text}"
-            logger.error(error_msg, exc_info=e)
-            raise
+            span.set_attribute('http.status_code', response.status_code)
+            return response
+
+    def _prepare_post(self, url: str, body: bytes) -> Tuple[requests.PreparedRequest, Dict[str, Any]]:
+        """URLごとに準備済みのPOSTリクエストを複製し、ボディを設定して返す
+
+        ヘッダーのマージと環境変数（プロキシ等）の参照はクライアントごとに一度、
+        URLの解析はURL（ボットとユーザーの組）ごとに一度だけ行います。
+
+        Args:
+            url: リクエストURL（送信先のホストはクライアント内で共通）
+            body: シリアライズ済みのリクエストボディ
+
+        Returns:
+            Tuple[requests.PreparedRequest, Dict[str, Any]]: 送信するリクエストと Session.send の引数
+        """
+        state = self._prepared
+        if state is None:
+            headers = self.headers
+            template = self.session.prepare_request(requests.Request('POST', url, headers=headers, data=b''))
+            settings = self.session.merge_environment_settings(url, {}, None, None, None)
+            state = (template, settings, {url: template})
+            if self.headers is headers:  # 作成中にトークンが切り替わった場合は保存しない
+                self._prepared = state
+        template, settings, cache = state
+
+        prepared = cache.get(url)
+        if prepared is None:
+            prepared = template.copy()
+            prepared.prepare_url(url, None)
+            if len(cache) >= _PREPARED_CACHE_SIZE:
+                cache.clear()
+            cache[url] = prepared
+        request = prepared.copy()
+        request.body = body
+        request.headers['Content-Length'] = str(len(body))
+        return request, settings
 
     def send_bot_message(
         self, 
         bot_id: str, 
         user_id: str, 
-        content: Dict[str, Any]
+        content: Union[Dict[str, Any], bytes, MessageTemplate],
+        values: Optional[Mapping[str, Any]] = None
     ) -> Dict[str, Any]:
         """ボットメッセージを送信する
 
         Args:
             bot_id: ボットID
             user_id: 送信先のユーザーID
-            content: メッセージコンテンツ
+            content: メッセージコンテンツ、encode_message_body でシリアライズ済みのボディ、
+                または MessageTemplate
+            values: テンプレートのプレースホルダーに差し込む値（{user_id} は自動で設定）
 
         Returns:
             Dict[str, Any]: APIレスポンス
         """
-        encoded_user_id = quote(user_id)
-        endpoint = f"/bots/{bot_id}/users/{encoded_user_id}/messages"
-        
-        logger.info(f"ユーザー {user_id} へメッセージ送信開始")
-        
-        data = {
-            "content": content
-        }
-        
-        response = self._make_request('POST', endpoint, data)
-        
+        logger.info("ユーザー %s へメッセージ送信開始", user_id)
+
+        body = render_message_body(content, user_id, values)
+
+        response = self.post_bot_message(bot_id, user_id, body)
+
         logger.info("メッセージ送信成功")
-        return response
+        if response.content:
+            return response.json()
+        return {}
+
+    def post_bot_message(self, bot_id: str, user_id: str, body: bytes) -> requests.Response:
+        """シリアライズ済みのボディでボットメッセージを送信する
+
+        一斉送信などでステータスコードを参照したい場合に使用します。
+
+        Args:
+            bot_id: ボットID
+            user_id: 送信先のユーザーID
+            body: encode_message_body でシリアライズ済みのリクエストボディ
+
+        Returns:
+            requests.Response: APIレスポンス
+
+        Raises:
+            requests.exceptions.RequestException: APIリクエストが失敗した場合
+        """
+        endpoint = message_endpoint(bot_id, user_id)
+        with tracer.span('api.request', **{'http.method': 'POST', 'endpoint': 'message'}):
+            return self._send_request('POST', endpoint, body=body, bot_id=bot_id)
 
     def get_bot_info(self, bot_id: str) -> Dict[str, Any]:
         """ボット情報を取得する
@@ -110,8 +629,39 @@ class APIClient:
 
         Returns:
             Dict[str, Any]: ボット情報
+
+        Raises:
+            BotNotFoundError: ボットが存在しない場合（キャッシュ有効時）
+            requests.exceptions.RequestException: APIリクエストが失敗した場合
         """
-        endpoint = f"/bots/{bot_id}"
-        logger.info(f"ボット情報取得: {bot_id}")
-        
-        return self._make_request('GET', endpoint)
\ No newline at end of file
+        if self.bot_info_cache is None:
+            logger.info("ボット情報取得: %s", bot_id)
+            return self._make_request('GET', f"/bots/{bot_id}", bot_id=bot_id)
+        return self.bot_info_cache.get(bot_id, self._fetch_bot_info)
+
+    def _fetch_bot_info(self, bot_id: str, etag: Optional[str]) -> FetchResult:
+        """ボット情報を取得する（ETag を指定した場合は変更がなければ304を受け取る）
+
+        Args:
+            bot_id: ボットID
+            etag: If-None-Match に指定する ETag（省略可）
+
+        Returns:
+            FetchResult: 取得結果（存在しないボットの場合は status=404）
+        """
+        logger.info("ボット情報取得: %s", bot_id)
+        headers = {'If-None-Match': etag} if etag else None
+        try:
+            with tracer.span('api.request', **{'http.method': 'GET', 'endpoint': 'bot_info'}):
+                response = self._send_request('GET', f"/bots/{bot_id}", bot_id=bot_id, headers=headers)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return FetchResult(404)
+            raise
+        if response.status_code == 304:
+            return FetchResult(304, etag=response.headers.get('ETag'))
+        return FetchResult(
+            response.status_code,
+            response.json() if response.content else {},
+            response.headers.get('ETag')
+        )
\ No newline at end of file
@@ -0,0 +1,367 @@
+"""asyncio 対応の LINEWORKS API 通信を担当するモジュール"""
+import asyncio
+import json
+import time
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Tuple, Union
+
+import aiohttp
+import jwt
+import requests
+
+from .api import encode_message_body, message_endpoint, render_message_body
+from .auth import ClientCredentials, JWTSigner, build_jwt_payload
+from .bulk import SendResult
+from .deadline import remaining, request_timeout
+from .logger import logger
+from .payload import MessageTemplate, dumps
+from config.settings import HTTP_POOL_MAXSIZE, get_settings
+
+
+def _client_timeout(stage: str = 'request') -> aiohttp.ClientTimeout:
+    """接続・読み取りのタイムアウトと呼び出し全体の残り時間から aiohttp のタイムアウトを作成します。
+
+    Args:
+        stage: 現在の段階（制限時間を超えた場合の例外のメッセージに使用）
+
+    Returns:
+        aiohttp.ClientTimeout: リクエストのタイムアウト
+
+    Raises:
+        DeadlineExceededError: 呼び出し全体の制限時間を過ぎている場合
+    """
+    connect, read = request_timeout(stage=stage)
+    return aiohttp.ClientTimeout(total=remaining(), connect=connect, sock_read=read)
+
+
+def _to_requests_error(
+    status: int,
+    reason: Optional[str],
+    url: str,
+    content: bytes
+) -> requests.exceptions.HTTPError:
+    """HTTPエラー応答を requests と同じ例外型に変換します。
+
+    同期版 APIClient と同じ except 節で扱えるよう、response 属性も設定します。
+
+    Args:
+        status: ステータスコード
+        reason: ステータスの説明
+        url: リクエストURL
+        content: レスポンスボディ
+
+    Returns:
+        requests.exceptions.HTTPError: 変換した例外
+    """
+    response = requests.Response()
+    response.status_code = status
+    response.reason = reason
+    response.url = url
+    response._content = content
+    kind = 'Client' if status < 500 else 'Server'
+    return requests.exceptions.HTTPError(
+        f"{status} {kind} Error: {reason} for url: {url}", response=response
+    )
+
+
+async def async_get_access_token(
+    private_key: Any = None,
+    signer: Optional[JWTSigner] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    auth_url: Optional[str] = None,
+    credentials: Optional[ClientCredentials] = None
+) -> Optional[str]:
+    """JWTトークンを生成し、非同期でアクセストークンを取得します。
+
+    Args:
+        private_key: 秘密鍵データ（signer を指定しない場合に使用）
+        signer: 事前構築済みのJWT署名器（省略可）
+        session: 使用する aiohttp セッション（省略時は一時的に作成）
+        auth_url: トークンエンドポイントのURL（省略時は現在の設定の AUTH_URL）
+        credentials: クライアント認証情報（省略時は現在の設定を使用）
+
+    Returns:
+        Optional[str]: アクセストークン。エラー時はNone
+    """
+    settings = get_settings()
+    if credentials is None:
+        credentials = ClientCredentials(settings.client_id, settings.client_secret, settings.service_account)
+    auth_url = auth_url or settings.auth_url
+    payload = build_jwt_payload(credentials)
+    client_id, client_secret = credentials.client_id, credentials.client_secret
+    if signer is not None:
+        jwt_token = signer.sign(payload)
+    else:
+        jwt_token = jwt.encode(payload, private_key, algorithm='RS256')
+
+    form = {
+        'assertion': jwt_token,
+        'grant_type': 'urn:ietf:params:oauth:grant-type:jwt-bearer',
+        'client_id': client_id or '',
+        'client_secret': client_secret or '',
+        'scope': 'bot bot.message',
+    }
+
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession()
+    try:
+        async with session.post(auth_url, data=form, timeout=_client_timeout('token')) as response:
+            content = await response.read()
+            if response.status >= 400:
+                raise _to_requests_error(response.status, response.reason, auth_url, content)
+            return (await response.json(content_type=None))['access_token']
+    except (requests.RequestException, aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error("トークン取得に失敗しました: %s", e)
+        return None
+    except (KeyError, TypeError, ValueError) as e:
+        logger.error("トークン取得のレスポンスが不正です: %s", e)
+        return None
+    finally:
+        if own_session:
+            await session.close()
+
+
+class AsyncAPIClient:
+    """LINEWORKS APIと非同期に通信を行うクラス
+
+    1つのイベントループ上で多数の送信を同時に実行できます。
+    エラー時は同期版 APIClient と同じ requests の例外を送出します。
+    """
+
+    def __init__(
+        self,
+        access_token: str,
+        session: Optional[aiohttp.ClientSession] = None,
+        limit: int = HTTP_POOL_MAXSIZE,
+        base_url: Optional[str] = None
+    ):
+        """非同期APIクライアントの初期化
+
+        Args:
+            access_token: APIアクセストークン
+            session: 使用する aiohttp セッション（省略時は初回リクエスト時に作成）
+            limit: セッションを作成する場合の最大同時接続数
+            base_url: APIのベースURL（省略時は現在の設定の BASE_API_URL）
+        """
+        self.access_token = access_token
+        self.base_url = base_url or get_settings().base_api_url
+        self.headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f"Bearer {access_token}"
+        }
+        self._session = session
+        self._own_session = session is None
+        self._limit = limit
+
+    async def __aenter__(self) -> 'AsyncAPIClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """自身で作成したセッションを閉じます。"""
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """接続プールを共有する aiohttp セッションを返します。"""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._limit)
+            )
+        return self._session
+
+    async def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        body: Optional[bytes] = None
+    ) -> Dict[str, Any]:
+        """API リクエストを実行する
+
+        Args:
+            method: HTTPメソッド（'GET', 'POST', 'PUT', 'DELETE'）
+            endpoint: APIエンドポイント
+            data: リクエストボディ（省略可）
+            body: シリアライズ済みのリクエストボディ（指定時は data より優先）
+
+        Returns:
+            Dict[str, Any]: レスポンスデータ
+
+        Raises:
+            requests.exceptions.ConnectTimeout: 接続がタイムアウトした場合
+            requests.exceptions.ReadTimeout: 応答の受信がタイムアウトした場合
+            requests.exceptions.ConnectionError: ネットワークエラー発生時
+            requests.exceptions.RequestException: APIリクエストエラー発生時
+        """
+        _, content = await self._send_request(method, endpoint, data, body)
+        if content:
+            return json.loads(content)
+        return {}
+
+    async def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        body: Optional[bytes] = None
+    ) -> Tuple[int, bytes]:
+        """API リクエストを実行し、ステータスコードとボディを返す
+
+        Args:
+            method: HTTPメソッド（'GET', 'POST', 'PUT', 'DELETE'）
+            endpoint: APIエンドポイント
+            data: リクエストボディ（省略可）
+            body: シリアライズ済みのリクエストボディ（指定時は data より優先）
+
+        Returns:
+            Tuple[int, bytes]: ステータスコードとレスポンスボディ
+
+        Raises:
+            requests.exceptions.ConnectTimeout: 接続がタイムアウトした場合
+            requests.exceptions.ReadTimeout: 応答の受信がタイムアウトした場合
+            requests.exceptions.ConnectionError: ネットワークエラー発生時
+            requests.exceptions.RequestException: APIリクエストエラー発生時
+        """
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            raise ValueError(f"サポートされていないHTTPメソッド: {method}")
+
+        url = f"{self.base_url}{endpoint}"
+        if body is None and data is not None and method in ('POST', 'PUT'):
+            body = dumps(data)
+
+        try:
+            async with self._get_session().request(
+                method, url, data=body, headers=self.headers, timeout=_client_timeout()
+            ) as response:
+                content = await response.read()
+                if response.status >= 400:
+                    raise _to_requests_error(response.status, response.reason, url, content)
+                return response.status, content
+
+        except aiohttp.ConnectionTimeoutError as e:
+            # 接続の確立前のタイムアウト（リクエストは送信されていない）
+            logger.error("接続がタイムアウトしました: %s", e, exc_info=e)
+            raise requests.exceptions.ConnectTimeout(str(e)) from e
+        except (aiohttp.ServerTimeoutError, asyncio.TimeoutError) as e:
+            # 送信後の応答待ち、または全体の制限時間のタイムアウト（送信済みの可能性がある）
+            logger.error("応答の受信がタイムアウトしました: %s", e, exc_info=e)
+            raise requests.exceptions.ReadTimeout(str(e)) from e
+        except aiohttp.ClientConnectionError as e:
+            logger.error("ネットワークエラーが発生しました: %s", e, exc_info=e)
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except aiohttp.ClientPayloadError as e:
+            # 応答ボディの途中で切断された場合（requests の ChunkedEncodingError に相当）
+            logger.error("レスポンスの受信に失敗しました: %s", e, exc_info=e)
+            raise requests.exceptions.ChunkedEncodingError(str(e)) from e
+        except aiohttp.ClientError as e:
+            logger.error("APIエラーが発生しました: %s", e, exc_info=e)
+            raise requests.exceptions.RequestException(str(e)) from e
+        except requests.exceptions.RequestException as e:
+            if e.response is not None:
+                logger.error("APIエラーが発生しました: %s - レスポンス: %s", e, e.response.text, exc_info=e)
+            else:
+                logger.error("APIエラーが発生しました: %s", e, exc_info=e)
+            raise
+
+    async def send_bot_message(
+        self,
+        bot_id: str,
+        user_id: str,
+        content: Union[Dict[str, Any], bytes, MessageTemplate],
+        values: Optional[Mapping[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """ボットメッセージを送信する
+
+        Args:
+            bot_id: ボットID
+            user_id: 送信先のユーザーID
+            content: メッセージコンテンツ、シリアライズ済みのボディ、または MessageTemplate
+            values: テンプレートのプレースホルダーに差し込む値（{user_id} は自動で設定）
+
+        Returns:
+            Dict[str, Any]: APIレスポンス
+        """
+        endpoint = message_endpoint(bot_id, user_id)
+        logger.info("ユーザー %s へメッセージ送信開始", user_id)
+
+        body = render_message_body(content, user_id, values)
+        response = await self._make_request('POST', endpoint, body=body)
+
+        logger.info("メッセージ送信成功")
+        return response
+
+    async def get_bot_info(self, bot_id: str) -> Dict[str, Any]:
+        """ボット情報を取得する
+
+        Args:
+            bot_id: ボットID
+
+        Returns:
+            Dict[str, Any]: ボット情報
+        """
+        endpoint = f"/bots/{bot_id}"
+        logger.info("ボット情報取得: %s", bot_id)
+
+        return await self._make_request('GET', endpoint)
+
+    async def send_many(
+        self,
+        bot_id: str,
+        user_ids: Iterable[str],
+        content: Union[Dict[str, Any], bytes, MessageTemplate],
+        concurrency: int = 100,
+        values: Optional[Mapping[str, Mapping[str, Any]]] = None
+    ) -> List[SendResult]:
+        """同じメッセージ（またはテンプレート）を複数のユーザーへ並列に送信します。
+
+        Args:
+            bot_id: ボットID
+            user_ids: 送信先ユーザーIDの列
+            content: メッセージコンテンツ、シリアライズ済みのボディ、または MessageTemplate
+            concurrency: 同時送信数の上限
+            values: ユーザーIDごとのテンプレートのプレースホルダーに差し込む値
+
+        Returns:
+            List[SendResult]: user_ids と同じ順序の送信結果
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency は1以上を指定してください: {concurrency}")
+
+        if not isinstance(content, (bytes, MessageTemplate)):
+            content = encode_message_body(content)
+        values = values or {}
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send_one(user_id: str) -> SendResult:
+            async with semaphore:
+                start = time.perf_counter()
+                endpoint = message_endpoint(bot_id, user_id)
+                try:
+                    body = render_message_body(content, user_id, values.get(user_id))
+                    status, _ = await self._send_request('POST', endpoint, body=body)
+                    return SendResult(
+                        user_id=user_id,
+                        success=True,
+                        status=status,
+                        latency_ms=(time.perf_counter() - start) * 1000
+                    )
+                except Exception as e:
+                    status = None
+                    if isinstance(e, requests.exceptions.RequestException) and e.response is not None:
+                        status = e.response.status_code
+                    return SendResult(
+                        user_id=user_id,
+                        success=False,
+                        status=status,
+                        latency_ms=(time.perf_counter() - start) * 1000,
+                        error=str(e) or type(e).__name__
+                    )
+
+        results = await asyncio.gather(*(send_one(user_id) for user_id in user_ids))
+        succeeded = sum(1 for result in results if result.success)
+        logger.info("一斉送信完了: 成功 %s 件 / 失敗 %s 件", succeeded, len(results) - succeeded)
+        return list(results)
@@ -1,13 +1,27 @@
 """認証関連の処理を管理するモジュール"""
+import base64
+import contextlib
+import json
 import jwt
+import os
+import threading
 import time
 import requests
-from cryptography.hazmat.primitives import serialization
+from dataclasses import dataclass
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.backends import default_backend
-from typing import Optional, Any
+from typing import Optional, Any, Callable, Dict
 
-from config.settings import CLIENT_ID, SERVICE_ACCOUNT, CLIENT_SECRET, AUTH_URL
+from config.settings import get_settings
+from .circuit import CallOutcome, get_circuit_breakers
+from .deadline import remaining, request_timeout
 from .logger import logger
+from .metrics import (
+    TOKEN_REQUESTS, TOKEN_REQUEST_DURATION, TOKEN_CACHE, PRIVATE_KEY_LOAD_DURATION
+)
+from .session import get_session
+from .tracing import tracer
 
 def get_private_key(key_path: str) -> Optional[Any]:
     """秘密鍵ファイルを読み込み、秘密鍵オブジェクトを返します。
@@ -24,67 +38,465 @@ def get_private_key(key_path: str) -> Optional[Any]:
         ValueError: 秘密鍵ファイルの形式が不正な場合
         Exception: その他のエラーが発生した場合
     """
-    try:
-        with open(key_path, 'rb') as key_file:
-            key_data = key_file.read()
+    with tracer.span('auth.load_key', key_path=key_path):
+        started = time.perf_counter()
+        try:
+            with open(key_path, 'rb') as key_file:
+                key_data = key_file.read()
+                try:
+                    private_key = serialization.load_pem_private_key(
+                        key_data,
+                        password=None,
+                        backend=default_backend()
+                    )
+                    PRIVATE_KEY_LOAD_DURATION.observe(time.perf_counter() - started)
+                    return private_key
+                except ValueError as e:
+                    logger.error("秘密鍵ファイルの形式が不正です: %s", e)
+                    raise
+        except FileNotFoundError:
+            logger.error("秘密鍵ファイルが見つかりません: %s", key_path)
+            raise
+        except PermissionError:
+            logger.error("秘密鍵ファイルへのアクセス権がありません: %s", key_path)
+            raise
+        except Exception as e:
+            logger.error("秘密鍵の読み込み中に予期せぬエラーが発生しました: %s", e)
+            raise
+
+class PrivateKeyProvider:
+    """秘密鍵を一度だけ読み込んでキャッシュするクラス
+
+    ファイルの mtime / inode / サイズが変化した場合のみ再読み込みするため、
+    鍵のローテーションにも対応します。
+    """
+
+    def __init__(self, key_path: str, check_interval: float = 1.0):
+        """秘密鍵プロバイダーの初期化
+
+        Args:
+            key_path: 秘密鍵ファイルのパス
+            check_interval: ファイル変更を確認する最短間隔（秒）
+        """
+        self.key_path = key_path
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._key: Optional[Any] = None
+        self._signature: Optional[tuple] = None
+        self._checked_at = 0.0
+        self.loads = 0
+
+    def get(self) -> Any:
+        """キャッシュ済みの秘密鍵オブジェクトを返します。
+
+        Returns:
+            Any: 秘密鍵オブジェクト
+
+        Raises:
+            FileNotFoundError: 秘密鍵ファイルが見つからない場合
+            PermissionError: 秘密鍵ファイルにアクセス権がない場合
+            ValueError: 秘密鍵ファイルの形式が不正な場合
+        """
+        key = self._key
+        if key is not None and time.monotonic() - self._checked_at < self._check_interval:
+            return key
+
+        with self._lock:
+            now = time.monotonic()
+            if self._key is not None and now - self._checked_at < self._check_interval:
+                return self._key
+
             try:
-                return serialization.load_pem_private_key(
-                    key_data,
-                    password=None,
-                    backend=default_backend()
-                )
-            except ValueError as e:
-                logger.error(f"秘密鍵ファイルの形式が不正です: {e}")
-                raise
-    except FileNotFoundError:
-        logger.error(f"秘密鍵ファイルが見つかりません: {key_path}")
-        raise
-    except PermissionError:
-        logger.error(f"秘密鍵ファイルへのアクセス権がありません: {key_path}")
-        raise
-    except Exception as e:
-        logger.error(f"秘密鍵の読み込み中に予期せぬエラーが発生しました: {e}")
-        raise
+                stat = os.stat(self.key_path)
+                signature = (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+            except OSError:
+                signature = None
 
-def get_access_token(private_key: Any) -> Optional[str]:
-    """JWTトークンを生成し、アクセストークンを取得します。
+            if self._key is None or signature is None or signature != self._signature:
+                if self._key is not None:
+                    logger.info("秘密鍵ファイルの変更を検知しました: %s", self.key_path)
+                self._key = get_private_key(self.key_path)
+                self._signature = signature
+                self.loads += 1
+
+            self._checked_at = now
+            return self._key
+
+    def set_path(self, key_path: str) -> None:
+        """秘密鍵ファイルのパスを変更します（次回の取得時に新しいファイルを読み込みます）。
+
+        Args:
+            key_path: 新しい秘密鍵ファイルのパス
+        """
+        with self._lock:
+            if key_path == self.key_path:
+                return
+            self.key_path = key_path
+            self._signature = None
+            self._checked_at = 0.0
+
+
+class JWTSigner:
+    """RS256 JWTを生成する再利用可能な署名器
+
+    ヘッダー部のエンコード結果と署名パラメータを事前に構築しておき、
+    署名ごとの処理をペイロードのエンコードと RSA 署名のみに絞ります。
+    """
+
+    _HEADER_SEGMENT = base64.urlsafe_b64encode(
+        json.dumps({"alg": "RS256", "typ": "JWT"}, separators=(',', ':')).encode()
+    ).rstrip(b'=')
+
+    def __init__(self, key_loader: Callable[[], Any]):
+        """署名器の初期化
+
+        Args:
+            key_loader: 秘密鍵オブジェクトを返す関数（PrivateKeyProvider.get など）
+        """
+        self._key_loader = key_loader
+        self._padding = padding.PKCS1v15()
+        self._hash = hashes.SHA256()
+
+    def sign(self, payload: Dict[str, Any]) -> str:
+        """ペイロードに署名し、JWT文字列を返します。
+
+        Args:
+            payload: JWTクレーム
+
+        Returns:
+            str: 署名済みJWT
+        """
+        with tracer.span('auth.sign_jwt'):
+            payload_segment = base64.urlsafe_b64encode(
+                json.dumps(payload, separators=(',', ':')).encode()
+            ).rstrip(b'=')
+            signing_input = self._HEADER_SEGMENT + b'.' + payload_segment
+            signature = self._key_loader().sign(signing_input, self._padding, self._hash)
+            return (
+                signing_input + b'.' + base64.urlsafe_b64encode(signature).rstrip(b'=')
+            ).decode('ascii')
+
+
+@dataclass(frozen=True)
+class ClientCredentials:
+    """トークン取得に使用するクライアント認証情報（テナントごとに異なる）"""
+
+    client_id: str
+    client_secret: str
+    service_account: str
+
+
+def build_jwt_payload(credentials: Optional[ClientCredentials] = None) -> Dict[str, Any]:
+    """クライアント認証用のJWTペイロードを作成します。
 
     Args:
-        private_key: 秘密鍵データ
+        credentials: クライアント認証情報（省略時は現在の設定の CLIENT_ID と SERVICE_ACCOUNT）
 
     Returns:
-        Optional[str]: アクセストークン。エラー時はNone
+        Dict[str, Any]: JWTクレーム
     """
-    # JWTペイロード作成
     now = int(time.time())
-    payload = {
-        "iss": CLIENT_ID,
-        "sub": SERVICE_ACCOUNT,
+    if credentials is None:
+        settings = get_settings()
+        client_id, service_account = settings.client_id, settings.service_account
+    else:
+        client_id, service_account = credentials.client_id, credentials.service_account
+    return {
+        "iss": client_id,
+        "sub": service_account,
         "iat": now,
         "exp": now + 3600,
     }
 
+def request_access_token(
+    private_key: Any = None,
+    signer: Optional[JWTSigner] = None,
+    credentials: Optional[ClientCredentials] = None
+) -> Optional[Dict[str, Any]]:
+    """JWTトークンを生成し、トークンエンドポイントのレスポンスを取得します。
+
+    Args:
+        private_key: 秘密鍵データ（signer を指定しない場合に使用）
+        signer: 事前構築済みのJWT署名器（省略可）
+        credentials: クライアント認証情報（省略時は現在の設定を使用）
+
+    Returns:
+        Optional[Dict[str, Any]]: access_token、expires_in 等を含むレスポンス。
+            エラー時（トークンエンドポイントのサーキットブレーカーが開いている場合を含む）はNone
+    """
+    # 設定は1回の取得処理の間だけ参照する（再読み込みされた場合は次回の取得から反映）
+    settings = get_settings()
+    if credentials is None:
+        credentials = ClientCredentials(settings.client_id, settings.client_secret, settings.service_account)
+    # JWTペイロード作成
+    payload = build_jwt_payload(credentials)
+    client_id, client_secret = credentials.client_id, credentials.client_secret
+
     # JWT生成（RS256署名）
-    jwt_token = jwt.encode(payload, private_key, algorithm='RS256')
+    if signer is not None:
+        jwt_token = signer.sign(payload)
+    else:
+        with tracer.span('auth.sign_jwt'):
+            jwt_token = jwt.encode(payload, private_key, algorithm='RS256')
 
     # アクセストークン取得のためのリクエスト
+    started = time.perf_counter()
+    breakers = get_circuit_breakers()
+    circuit = breakers.get('token').call() if breakers is not None else contextlib.nullcontext(CallOutcome())
     try:
-        response = requests.post(
-            AUTH_URL,
-            headers={'Content-Type': 'application/x-www-form-urlencoded'},
-            data={
-                'assertion': jwt_token,
-                'grant_type': 'urn:ietf:params:oauth:grant-type:jwt-bearer',
-                'client_id': CLIENT_ID,
-                'client_secret': CLIENT_SECRET,
-                'scope': 'bot bot.message',
-            }
-        )
+        with tracer.span('auth.token_request') as span, circuit as outcome:
+            response = get_session().post(
+                settings.auth_url,
+                timeout=request_timeout(stage='token'),
+                headers={'Content-Type': 'application/x-www-form-urlencoded'},
+                data={
+                    'assertion': jwt_token,
+                    'grant_type': 'urn:ietf:params:oauth:grant-type:jwt-bearer',
+                    'client_id': client_id,
+                    'client_secret': client_secret,
+                    'scope': 'bot bot.message',
+                }
+            )
+            span.set_attribute('http.status_code', response.status_code)
+            outcome.failed = response.status_code >= 500
         response.raise_for_status()  # エラーレスポンスの場合は例外を発生
-        return response.json()['access_token']
+        token_data = response.json()
+        if 'access_token' not in token_data:
+            raise KeyError('access_token')
+        TOKEN_REQUESTS.inc(result='success')
+        return token_data
     except requests.RequestException as e:
-        logger.error(f"トークン取得に失敗しました: {e}")
+        TOKEN_REQUESTS.inc(result='error')
+        logger.error("トークン取得に失敗しました: %s", e)
         return None
     except KeyError as e:
-        logger.error(f"トークン取得のレスポンスが不正です: {e}")
+        TOKEN_REQUESTS.inc(result='invalid_response')
+        logger.error("トークン取得のレスポンスが不正です: %s", e)
+        return None
+    finally:
+        TOKEN_REQUEST_DURATION.observe(time.perf_counter() - started)
+
+def get_access_token(private_key: Any) -> Optional[str]:
+    """JWTトークンを生成し、アクセストークンを取得します。
+
+    Args:
+        private_key: 秘密鍵データ
+
+    Returns:
+        Optional[str]: アクセストークン。エラー時はNone
+    """
+    token_data = request_access_token(private_key)
+    if token_data is None:
         return None
+    return token_data['access_token']
+
+
+class TokenManager:
+    """アクセストークンをプロセス内でキャッシュし、期限切れ前に更新するクラス
+
+    複数スレッドから同時に呼び出されても、トークン取得リクエストは1回にまとめられます。
+    """
+
+    DEFAULT_EXPIRES_IN = 3600
+
+    def __init__(
+        self,
+        key_loader: Optional[Callable[[], Any]] = None,
+        refresh_margin: float = 300.0,
+        min_validity: float = 60.0,
+        background_refresh: bool = True,
+        signer: Optional[JWTSigner] = None,
+        credentials: Optional[ClientCredentials] = None
+    ):
+        """トークンマネージャーの初期化
+
+        Args:
+            key_loader: 秘密鍵オブジェクトを返す関数（トークン更新時のみ呼ばれる）
+            refresh_margin: 有効期限の何秒前にバックグラウンド更新を行うか
+            min_validity: キャッシュ済みトークンを利用する最低残り有効秒数
+            background_refresh: バックグラウンド更新を行うかどうか
+            signer: JWT署名器（指定時は key_loader より優先）
+            credentials: クライアント認証情報（省略時はトークン取得時点の設定を使用）
+        """
+        if key_loader is None and signer is None:
+            raise ValueError("key_loader または signer を指定してください")
+        self._key_loader = key_loader
+        self._signer = signer
+        self._credentials = credentials
+        self._refresh_margin = refresh_margin
+        self._min_validity = min_validity
+        self._background_refresh = background_refresh
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    def get_token(self) -> Optional[str]:
+        """有効なアクセストークンを返します。
+
+        Returns:
+            Optional[str]: アクセストークン。取得に失敗した場合はNone
+        """
+        with tracer.span('auth.get_token') as span:
+            with self._lock:
+                token = self._token
+                if token is not None and time.monotonic() < self._expires_at - self._min_validity:
+                    self.hits += 1
+                    TOKEN_CACHE.inc(result='hit')
+                    span.set_attribute('cache', 'hit')
+                    return token
+                self.misses += 1
+                TOKEN_CACHE.inc(result='miss')
+                generation = self._generation
+
+            span.set_attribute('cache', 'miss')
+            return self._refresh(generation)
+
+    def invalidate(self) -> None:
+        """キャッシュ済みトークンを破棄します（401応答時など）。"""
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+            self._generation += 1
+
+    def rotate(self) -> None:
+        """認証情報の変更後に、新しい認証情報でトークンを取り直します。
+
+        バックグラウンド更新が有効な場合は直ちに更新を開始し、新しいトークンを取得するまでは
+        有効期限内の既存トークンを返し続けます（無効な場合は次回の取得時に更新します）。
+        """
+        with self._lock:
+            if not self._background_refresh or self._token is None:
+                self._token = None
+                self._expires_at = 0.0
+                self._generation += 1
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(0, self._background_refresh_task)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def refresh_if_stale(self, stale_token: str) -> Optional[str]:
+        """失効したトークンを破棄し、新しいトークンを返します（401応答時など）。
+
+        他スレッドが既に更新済みの場合は、再取得せずに更新後のトークンを返します。
+
+        Args:
+            stale_token: 失効したアクセストークン
+
+        Returns:
+            Optional[str]: 新しいアクセストークン。取得に失敗した場合はNone
+        """
+        with self._lock:
+            if self._token == stale_token:
+                self._token = None
+                self._expires_at = 0.0
+                self._generation += 1
+        return self.get_token()
+
+    def stats(self) -> Dict[str, int]:
+        """キャッシュのヒット/ミス/更新回数を返します。
+
+        Returns:
+            Dict[str, int]: 各カウンターの値
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'failures': self.failures,
+            }
+
+    def close(self) -> None:
+        """バックグラウンド更新タイマーを停止します。"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _refresh(self, generation: int) -> Optional[str]:
+        """トークンを更新します（同時実行時は1回のみ取得を行う）。
+
+        Args:
+            generation: 呼び出し元が参照したキャッシュの世代
+
+        Returns:
+            Optional[str]: アクセストークン。取得に失敗した場合はNone
+        """
+        # 他スレッドの更新を待つ時間も呼び出し全体の制限時間に含める
+        left = remaining()
+        if not self._refresh_lock.acquire(timeout=max(left, 0.0) if left is not None else -1):
+            logger.warning("制限時間内にアクセストークンの更新が完了しませんでした")
+            with self._lock:
+                if self._token is not None and time.monotonic() < self._expires_at:
+                    return self._token
+            return None
+        try:
+            with self._lock:
+                # 待機中に他スレッドが更新を完了していればそれを利用する
+                if self._generation != generation and self._token is not None:
+                    return self._token
+
+            # 認証情報はテナントごとに指定された場合のみ渡す（省略時はその時点の設定）
+            options = {'credentials': self._credentials} if self._credentials is not None else {}
+            if self._signer is not None:
+                token_data = request_access_token(signer=self._signer, **options)
+            else:
+                token_data = request_access_token(self._key_loader(), **options)
+
+            with self._lock:
+                if token_data is None:
+                    self.failures += 1
+                    # 更新に失敗しても有効期限内であれば既存トークンを返す
+                    if self._token is not None and time.monotonic() < self._expires_at:
+                        return self._token
+                    return None
+
+                try:
+                    expires_in = float(token_data.get('expires_in', self.DEFAULT_EXPIRES_IN))
+                except (TypeError, ValueError):
+                    expires_in = self.DEFAULT_EXPIRES_IN
+
+                self._token = token_data['access_token']
+                self._expires_at = time.monotonic() + expires_in
+                self._generation += 1
+                self.refreshes += 1
+                self._schedule_refresh(expires_in)
+                logger.info("アクセストークンを更新しました（有効期間: %s秒）", int(expires_in))
+                return self._token
+        finally:
+            self._refresh_lock.release()
+
+    def _schedule_refresh(self, expires_in: float) -> None:
+        """有効期限前のバックグラウンド更新を予約します。
+
+        Args:
+            expires_in: トークンの有効期間（秒）
+        """
+        if not self._background_refresh:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        delay = max(expires_in - self._refresh_margin, 0.0)
+        self._timer = threading.Timer(delay, self._background_refresh_task)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh_task(self) -> None:
+        """バックグラウンドでトークンを更新します。"""
+        with self._lock:
+            generation = self._generation
+        try:
+            self._refresh(generation)
+        except Exception as e:
+            logger.error("バックグラウンドでのトークン更新に失敗しました: %s", e, exc_info=e)
@@ -0,0 +1,235 @@
+"""ボット情報（GET /bots/{botId}）のキャッシュを管理するモジュール
+
+LRU + TTL のメモリキャッシュで、期限切れ後は ETag（If-None-Match）で再検証します。
+存在しないボットは短時間だけ否定応答としてキャッシュし、期限切れ直後は古い値を返しつつ
+バックグラウンドで再取得します（stale-while-revalidate）。
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from config.settings import (
+    BOT_INFO_CACHE_SIZE, BOT_INFO_CACHE_TTL, BOT_INFO_CACHE_NEGATIVE_TTL, BOT_INFO_CACHE_STALE_TTL
+)
+from .logger import logger
+from .metrics import BOT_INFO_CACHE
+
+
+class BotNotFoundError(requests.exceptions.HTTPError):
+    """ボットが存在しない（404応答を受けた、または否定応答のキャッシュが有効な）場合の例外"""
+
+    def __init__(self, bot_id: str):
+        super().__init__(f"ボットが見つかりません: {bot_id}")
+        self.bot_id = bot_id
+
+
+@dataclass
+class FetchResult:
+    """ボット情報の取得結果
+
+    Attributes:
+        status: HTTPステータス（200: 取得、304: 変更なし、404: 存在しない）
+        data: ボット情報（200の場合）
+        etag: レスポンスの ETag
+    """
+
+    status: int
+    data: Optional[Dict[str, Any]] = None
+    etag: Optional[str] = None
+
+
+# bot_id と If-None-Match に使う ETag を受け取り、取得結果を返す関数
+Fetcher = Callable[[str, Optional[str]], FetchResult]
+
+
+@dataclass
+class _Entry:
+    """キャッシュエントリ（data が None の場合は否定応答）"""
+
+    data: Optional[Dict[str, Any]]
+    etag: Optional[str]
+    expires_at: float
+    stale_until: float
+    refreshing: bool = False
+
+
+class BotInfoCache:
+    """ボット情報の LRU + TTL キャッシュ"""
+
+    def __init__(
+        self,
+        maxsize: int = BOT_INFO_CACHE_SIZE,
+        ttl: float = BOT_INFO_CACHE_TTL,
+        negative_ttl: float = BOT_INFO_CACHE_NEGATIVE_TTL,
+        stale_ttl: float = BOT_INFO_CACHE_STALE_TTL
+    ):
+        """キャッシュの初期化
+
+        Args:
+            maxsize: 保持するボット数の上限（超えた場合は最も古く参照されたものから破棄）
+            ttl: 取得した情報を再検証なしで返す秒数
+            negative_ttl: 存在しないボットを記憶する秒数
+            stale_ttl: 期限切れ後、バックグラウンドで再取得しながら古い値を返す秒数
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def get(self, bot_id: str, fetch: Fetcher) -> Dict[str, Any]:
+        """ボット情報を返します（キャッシュにない、または期限切れの場合は fetch で取得）。
+
+        Args:
+            bot_id: ボットID
+            fetch: ボット情報を取得する関数
+
+        Returns:
+            Dict[str, Any]: ボット情報（呼び出し元で変更してもキャッシュには影響しない）
+
+        Raises:
+            BotNotFoundError: ボットが存在しない場合
+            requests.exceptions.RequestException: 取得に失敗した場合
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(bot_id)
+            if entry is not None:
+                if now < entry.expires_at:
+                    self._entries.move_to_end(bot_id)
+                    if entry.data is None:
+                        self.negative_hits += 1
+                        BOT_INFO_CACHE.inc(result='negative')
+                        raise BotNotFoundError(bot_id)
+                    self.hits += 1
+                    BOT_INFO_CACHE.inc(result='hit')
+                    return dict(entry.data)
+                if entry.data is not None and now < entry.stale_until:
+                    self._entries.move_to_end(bot_id)
+                    self.stale_hits += 1
+                    BOT_INFO_CACHE.inc(result='stale')
+                    if not entry.refreshing:
+                        entry.refreshing = True
+                        threading.Thread(
+                            target=self._background_refresh, args=(bot_id, fetch, entry),
+                            name=f"bot-info-refresh-{bot_id}", daemon=True
+                        ).start()
+                    return dict(entry.data)
+            self.misses += 1
+            BOT_INFO_CACHE.inc(result='miss')
+
+        data = self._load(bot_id, fetch, entry)
+        if data is None:
+            raise BotNotFoundError(bot_id)
+        return dict(data)
+
+    def invalidate(self, bot_id: Optional[str] = None) -> None:
+        """キャッシュを破棄します。
+
+        Args:
+            bot_id: 破棄するボットID（省略時はすべて破棄）
+        """
+        with self._lock:
+            if bot_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(bot_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """キャッシュの統計情報を返します。
+
+        Returns:
+            Dict[str, int]: size, hits, stale_hits, negative_hits, misses, revalidations, evictions
+        """
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'revalidations': self.revalidations,
+                'evictions': self.evictions,
+            }
+
+    def _load(self, bot_id: str, fetch: Fetcher, previous: Optional[_Entry]) -> Optional[Dict[str, Any]]:
+        """ボット情報を取得してキャッシュに格納する
+
+        Args:
+            bot_id: ボットID
+            fetch: ボット情報を取得する関数
+            previous: 期限切れのエントリ（ETag による再検証に使用）
+
+        Returns:
+            Optional[Dict[str, Any]]: ボット情報（存在しない場合はNone）
+        """
+        etag = previous.etag if previous is not None and previous.data is not None else None
+        result = fetch(bot_id, etag)
+        if result.status == 304 and etag is not None:
+            data = previous.data
+            etag = result.etag or etag
+            BOT_INFO_CACHE.inc(result='not_modified')
+            with self._lock:
+                self.revalidations += 1
+        elif result.status == 304:
+            # 再検証の対象がないのに304が返った場合は条件なしで取得し直す
+            return self._load(bot_id, fetch, None)
+        elif result.status == 404:
+            data, etag = None, None
+        else:
+            data, etag = result.data or {}, result.etag
+
+        now = time.monotonic()
+        if data is None:
+            entry = _Entry(None, None, now + self.negative_ttl, now + self.negative_ttl)
+        else:
+            entry = _Entry(data, etag, now + self.ttl, now + self.ttl + self.stale_ttl)
+        with self._lock:
+            self._entries[bot_id] = entry
+            self._entries.move_to_end(bot_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return data
+
+    def _background_refresh(self, bot_id: str, fetch: Fetcher, entry: _Entry) -> None:
+        """期限切れのエントリをバックグラウンドで再取得する"""
+        try:
+            self._load(bot_id, fetch, entry)
+        except Exception as e:
+            logger.warning("ボット情報のバックグラウンド再取得に失敗しました: %s - %s", bot_id, e)
+        finally:
+            entry.refreshing = False
+
+
+_bot_info_cache: Optional[BotInfoCache] = None
+_bot_info_cache_lock = threading.Lock()
+
+
+def get_bot_info_cache() -> Optional[BotInfoCache]:
+    """プロセス全体で共有するボット情報キャッシュを返します。
+
+    Returns:
+        Optional[BotInfoCache]: 共有キャッシュ（BOT_INFO_CACHE_TTL が0以下の場合はNone）
+    """
+    global _bot_info_cache
+    if BOT_INFO_CACHE_TTL <= 0:
+        return None
+    cache = _bot_info_cache
+    if cache is None:
+        with _bot_info_cache_lock:
+            if _bot_info_cache is None:
+                _bot_info_cache = BotInfoCache()
+            cache = _bot_info_cache
+    return cache
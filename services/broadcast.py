@@ -0,0 +1,529 @@
+"""大量の送信先をファイルから読み込んで一斉送信するモジュール
+
+CSV または JSONL の送信先を1行ずつ読み込むジェネレーターで処理するため、
+数百万行の入力でもメモリ使用量は同時送信数に比例する分だけに抑えられます。
+送信結果は1行ごとに出力ファイルへ書き込み、処理済みの行番号をチェックポイントに記録して、
+中断後は続きから再開できます。
+"""
+import contextvars
+import csv
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, Optional, Set, Union
+
+import requests
+
+from config.settings import HTTP_POOL_MAXSIZE, SEND_DEADLINE
+from .api import encode_message_body, render_message_body
+from .bulk import SendResult
+from .content import validate_content
+from .deadline import deadline_scope
+from .dedup import get_dedup_index
+from .logger import logger
+from .payload import MessageTemplate, dumps
+from .tenants import TenantRegistry
+
+FORMATS = ('csv', 'jsonl')
+
+# 送信先以外の情報を表す列（それ以外の列はテンプレートに差し込む値になる）
+_RESERVED_FIELDS = ('message', 'bot_id', 'tenant', 'values')
+
+
+@dataclass
+class Recipient:
+    """入力ファイルの1行分の送信先
+
+    Attributes:
+        row: 行番号（ヘッダーと空行を除いた0始まりの番号）
+        user_id: 送信先ユーザーID
+        message: この行のメッセージ（テキストまたはコンテンツ、省略時は既定のメッセージ）
+        bot_id: 送信に使用するボットID（省略可）
+        tenant: テナント名（省略可）
+        values: テンプレートのプレースホルダーに差し込む値
+        error: 行の解析に失敗した場合のエラー内容（送信せずに失敗として記録する）
+    """
+
+    row: int
+    user_id: str
+    message: Optional[Union[str, Dict[str, Any]]] = None
+    bot_id: Optional[str] = None
+    tenant: Optional[str] = None
+    values: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def detect_format(path: str) -> str:
+    """ファイルの拡張子から入力形式を判定します。
+
+    Args:
+        path: 入力ファイルのパス
+
+    Returns:
+        str: 'csv' または 'jsonl'
+
+    Raises:
+        ValueError: 拡張子から判定できない場合
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.csv', '.tsv'):
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"入力形式を判定できません（--format で指定してください）: {path}")
+
+
+def _recipient(row: int, record: Dict[str, Any], user_field: str) -> Recipient:
+    """1行分のレコードから送信先を作成する"""
+    user_id = record.get(user_field)
+    if not user_id:
+        return Recipient(row, '', error=f"{user_field} がありません")
+    values = {
+        key: value for key, value in record.items()
+        if key != user_field and key not in _RESERVED_FIELDS and key is not None
+    }
+    nested = record.get('values')
+    if isinstance(nested, dict):
+        values.update(nested)
+    return Recipient(
+        row=row,
+        user_id=str(user_id),
+        message=record.get('message') or None,
+        bot_id=str(record['bot_id']) if record.get('bot_id') else None,
+        tenant=record.get('tenant') or None,
+        values=values
+    )
+
+
+def read_recipients(
+    path: str,
+    format: Optional[str] = None,
+    user_field: str = 'user_id',
+    start: int = 0
+) -> Iterator[Recipient]:
+    """入力ファイルから送信先を1行ずつ読み込みます。
+
+    CSV は1行目をヘッダーとし、JSONL は1行に1つのJSONオブジェクトを記述します。
+    user_field 以外の message・bot_id・tenant 列はメッセージと送信元の指定、
+    それ以外の列（JSONL の values オブジェクトを含む）はテンプレートに差し込む値として扱います。
+
+    Args:
+        path: 入力ファイルのパス
+        format: 'csv' または 'jsonl'（省略時は拡張子から判定）
+        user_field: 送信先ユーザーIDの列名
+        start: 読み飛ばす行数（チェックポイントから再開する場合）
+
+    Yields:
+        Recipient: 送信先（解析できない行は error を設定して返す）
+    """
+    format = format or detect_format(path)
+    if format not in FORMATS:
+        raise ValueError(f"不明な入力形式: {format}")
+
+    if format == 'csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            delimiter = '\t' if path.lower().endswith('.tsv') else ','
+            for row, record in enumerate(csv.DictReader(f, delimiter=delimiter)):
+                if row >= start:
+                    yield _recipient(row, record, user_field)
+        return
+
+    with open(path, encoding='utf-8') as f:
+        row = -1
+        for line in f:
+            if not line.strip():
+                continue
+            row += 1
+            if row < start:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield Recipient(row, '', error=f"JSONを解析できません: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield Recipient(row, '', error="行がJSONオブジェクトではありません")
+                continue
+            yield _recipient(row, record, user_field)
+
+
+def count_recipients(path: str, format: Optional[str] = None) -> int:
+    """入力ファイルの行数（ヘッダーと空行を除く）を数えます（進捗と残り時間の表示に使用）。
+
+    Args:
+        path: 入力ファイルのパス
+        format: 'csv' または 'jsonl'（省略時は拡張子から判定）
+
+    Returns:
+        int: 送信先の数
+    """
+    format = format or detect_format(path)
+    if format == 'csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            delimiter = '\t' if path.lower().endswith('.tsv') else ','
+            return max(sum(1 for _ in csv.reader(f, delimiter=delimiter)) - 1, 0)
+    with open(path, 'rb') as f:
+        return sum(1 for line in f if line.strip())
+
+
+class Checkpoint:
+    """処理済みの行番号を記録するチェックポイント
+
+    並列送信では完了順が前後するため、先頭から途切れなく完了した行数（offset）を記録します。
+    再開時は offset 以降の行を送信するため、中断直前に完了していた一部の行は再送される場合があります。
+    """
+
+    def __init__(self, path: str, offset: int = 0):
+        """
+        Args:
+            path: チェックポイントファイルのパス
+            offset: 完了済みの行数
+        """
+        self.path = path
+        self.offset = offset
+        self._done: Set[int] = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> 'Checkpoint':
+        """チェックポイントファイルを読み込みます（ファイルがない場合は先頭から）。
+
+        Args:
+            path: チェックポイントファイルのパス
+
+        Returns:
+            Checkpoint: 読み込んだチェックポイント
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                return cls(path, int(json.load(f)['offset']))
+        except FileNotFoundError:
+            return cls(path)
+
+    def mark_done(self, row: int) -> None:
+        """行の処理が完了したことを記録します。
+
+        Args:
+            row: 行番号
+        """
+        with self._lock:
+            self._done.add(row)
+            while self.offset in self._done:
+                self._done.discard(self.offset)
+                self.offset += 1
+
+    def save(self) -> None:
+        """チェックポイントをファイルに書き込みます（一時ファイルから置き換える）。"""
+        with self._lock:
+            document = {'offset': self.offset, 'updated_at': time.time()}
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(document, f)
+        os.replace(temporary, self.path)
+
+
+class ResultWriter:
+    """送信結果を1行1件のJSONで書き込むクラス"""
+
+    def __init__(self, path: str, append: bool = False):
+        """
+        Args:
+            path: 出力ファイルのパス
+            append: 既存のファイルに追記するかどうか（再開時）
+        """
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def write(self, recipient: Recipient, result: SendResult) -> None:
+        """1行分の送信結果を書き込みます。
+
+        Args:
+            recipient: 送信先
+            result: 送信結果
+        """
+        line = dumps({
+            'row': recipient.row,
+            'user_id': recipient.user_id,
+            'success': result.success,
+            'status': result.status,
+            'latency_ms': round(result.latency_ms, 1),
+            'attempts': result.attempts,
+            'duplicate': result.duplicate,
+            'error': result.error,
+        }).decode('utf-8')
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def flush(self) -> None:
+        """書き込んだ結果をファイルに反映します（チェックポイントの保存前に呼び出す）。"""
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        """出力ファイルを閉じます。"""
+        with self._lock:
+            self._file.close()
+
+
+class ProgressReporter:
+    """送信件数・スループット・残り時間を定期的に表示するクラス"""
+
+    def __init__(
+        self,
+        total: Optional[int] = None,
+        interval: float = 1.0,
+        stream: Optional[IO[str]] = None,
+        done: int = 0
+    ):
+        """
+        Args:
+            total: 送信先の総数（不明な場合はNone、残り時間を表示しない）
+            interval: 表示間隔（秒）
+            stream: 出力先（省略時は標準エラー出力）
+            done: 開始前に完了済みの件数（再開時）
+        """
+        self.total = total
+        self.interval = interval
+        self.stream = stream if stream is not None else sys.stderr
+        self.initial = done
+        self.succeeded = 0
+        self.failed = 0
+        self.duplicates = 0
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+
+    def update(self, result: SendResult) -> None:
+        """送信結果を集計します。
+
+        Args:
+            result: 送信結果
+        """
+        with self._lock:
+            if not result.success:
+                self.failed += 1
+            else:
+                self.succeeded += 1
+                self.duplicates += result.duplicate
+
+    def start(self) -> None:
+        """定期表示のスレッドを開始します。"""
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='broadcast-progress', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """定期表示を停止し、最終結果を表示します。"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.stream.write(self.line() + '\n')
+        self.stream.flush()
+
+    def snapshot(self) -> Dict[str, float]:
+        """現在の集計値（処理件数、成功・失敗・重複件数、スループット、残り秒数）を返します。"""
+        with self._lock:
+            processed = self.succeeded + self.failed
+            elapsed = time.monotonic() - self._started
+            rate = processed / elapsed if elapsed > 0 else 0.0
+            remaining = None
+            if self.total is not None and rate > 0:
+                remaining = max(self.total - self.initial - processed, 0) / rate
+            return {
+                'processed': processed,
+                'succeeded': self.succeeded,
+                'failed': self.failed,
+                'duplicates': self.duplicates,
+                'rate': rate,
+                'eta': remaining,
+            }
+
+    def line(self) -> str:
+        """進捗を1行の文字列で返します。"""
+        stats = self.snapshot()
+        done = self.initial + stats['processed']
+        position = f"{done:,} / {self.total:,}" if self.total is not None else f"{done:,}"
+        text = (
+            f"送信 {position} 件（成功 {stats['succeeded']:,} / 失敗 {stats['failed']:,}"
+            f" / 重複 {stats['duplicates']:,}） {stats['rate']:,.1f} 件/秒"
+        )
+        if stats['eta'] is not None:
+            text += f" 残り {_format_duration(stats['eta'])}"
+        return text
+
+    def _run(self) -> None:
+        """一定間隔で進捗を表示するスレッド"""
+        while not self._stop.wait(self.interval):
+            self.stream.write(('\r' if self._tty else '') + self.line() + ('' if self._tty else '\n'))
+            self.stream.flush()
+        if self._tty:
+            self.stream.write('\n')
+
+
+def _format_duration(seconds: float) -> str:
+    """秒数を HH:MM:SS 形式に変換する"""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class RecipientSender:
+    """送信先ごとにテナントとメッセージを決定して送信するクラス"""
+
+    def __init__(
+        self,
+        registry: TenantRegistry,
+        message: Optional[Union[str, Dict[str, Any]]] = None,
+        bot_id: Optional[str] = None,
+        tenant: Optional[str] = None,
+        deadline: Optional[float] = SEND_DEADLINE
+    ):
+        """
+        Args:
+            registry: テナントレジストリ
+            message: 行にメッセージがない場合に送信するテキストまたはコンテンツ
+                （{列名} のプレースホルダーに行の値を差し込む。波括弧そのものは {{ と }}）
+            bot_id: 行にボットIDがない場合に使用するボットID
+            tenant: 行にテナントがない場合に使用するテナント名
+            deadline: 1行あたりの制限時間（秒、0で無制限）
+
+        Raises:
+            ContentValidationError: 既定のメッセージが不正な場合
+            ValueError: 既定のメッセージのプレースホルダーの書式が不正な場合
+        """
+        self.registry = registry
+        self.bot_id = bot_id
+        self.tenant = tenant
+        self.deadline = deadline
+        self.template: Optional[MessageTemplate] = None
+        if message is not None:
+            content = {"type": "text", "text": message} if isinstance(message, str) else message
+            self.template = MessageTemplate(validate_content(content))
+        self._dedup = get_dedup_index()
+
+    def body(self, recipient: Recipient) -> bytes:
+        """送信先のリクエストボディを作成します。
+
+        Args:
+            recipient: 送信先
+
+        Returns:
+            bytes: シリアライズ済みのリクエストボディ
+
+        Raises:
+            ValueError: メッセージが指定されていない場合
+            KeyError: テンプレートに差し込む値が行にない場合
+            ContentValidationError: 行のメッセージが不正な場合
+        """
+        if recipient.message is None:
+            if self.template is None:
+                raise ValueError("メッセージが指定されていません")
+            return render_message_body(self.template, recipient.user_id, recipient.values)
+        if isinstance(recipient.message, str):
+            return _encode_text(recipient.message)
+        return encode_message_body(recipient.message)
+
+    def __call__(self, recipient: Recipient) -> SendResult:
+        """送信先へメッセージを送信します（例外は発生させず、結果に記録します）。
+
+        Args:
+            recipient: 送信先
+
+        Returns:
+            SendResult: 送信結果
+        """
+        start = time.perf_counter()
+        if recipient.error is not None:
+            return SendResult(user_id=recipient.user_id, success=False, error=recipient.error, attempts=0)
+
+        client = None
+        recorded = False
+        try:
+            with deadline_scope(self.deadline):
+                body = self.body(recipient)
+                target, bot_id = self.registry.resolve(
+                    recipient.tenant or self.tenant, recipient.bot_id or self.bot_id
+                )
+                if self._dedup is not None:
+                    if self._dedup.reserve(bot_id, recipient.user_id, body):
+                        return SendResult(user_id=recipient.user_id, success=True, attempts=0, duplicate=True)
+                    recorded = True
+                client = target.client()
+                response = client.post_bot_message(bot_id, recipient.user_id, body)
+            if recorded:
+                self._dedup.confirm(bot_id, recipient.user_id, body)
+            return SendResult(
+                user_id=recipient.user_id,
+                success=True,
+                status=response.status_code,
+                latency_ms=(time.perf_counter() - start) * 1000,
+                attempts=max(len(client.last_attempts), 1)
+            )
+        except Exception as e:
+            if recorded:
+                self._dedup.forget(bot_id, recipient.user_id, body)
+            status = None
+            if isinstance(e, requests.exceptions.RequestException) and e.response is not None:
+                status = e.response.status_code
+            return SendResult(
+                user_id=recipient.user_id,
+                success=False,
+                status=status,
+                latency_ms=(time.perf_counter() - start) * 1000,
+                error=str(e) or type(e).__name__,
+                attempts=max(len(client.last_attempts), 1) if client is not None else 0
+            )
+
+
+@functools.lru_cache(maxsize=1024)
+def _encode_text(text: str) -> bytes:
+    """テキストメッセージのボディを返す（同じ本文の行が続く場合に使い回す）"""
+    return encode_message_body({"type": "text", "text": text})
+
+
+def broadcast(
+    recipients: Iterable[Recipient],
+    sender: Callable[[Recipient], SendResult],
+    concurrency: int = 10,
+    on_result: Optional[Callable[[Recipient, SendResult], None]] = None
+) -> None:
+    """送信先を順に読み込みながら並列に送信します。
+
+    未処理のタスクは同時送信数の2倍までに制限するため、入力全体をメモリに読み込みません。
+    KeyboardInterrupt を受けた場合は新たな送信を止め、送信中のものの完了を待ってから再送出します。
+
+    Args:
+        recipients: 送信先の列（ジェネレーター可）
+        sender: 1件を送信して結果を返す関数（RecipientSender など）
+        concurrency: 同時送信数の上限
+        on_result: 送信完了ごとに送信先と結果を受け取る関数（送信スレッドから呼び出される）
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency は1以上を指定してください: {concurrency}")
+    if concurrency > HTTP_POOL_MAXSIZE:
+        logger.warning(
+            "同時送信数 %s がコネクションプールの上限 %s を超えています", concurrency, HTTP_POOL_MAXSIZE
+        )
+
+    def send_one(recipient: Recipient) -> None:
+        try:
+            result = sender(recipient)
+            if on_result is not None:
+                on_result(recipient, result)
+        except Exception as e:
+            logger.error("送信結果の処理中にエラーが発生しました: 行 %s - %s", recipient.row, e, exc_info=e)
+        finally:
+            slots.release()
+
+    slots = threading.BoundedSemaphore(concurrency * 2)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='broadcast') as executor:
+        for recipient in recipients:
+            slots.acquire()
+            # 相関IDなどのコンテキストをワーカースレッドへ引き継ぐ
+            executor.submit(contextvars.copy_context().run, send_one, recipient)
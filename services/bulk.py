@@ -0,0 +1,105 @@
+"""一斉送信（ファンアウト）処理を管理するモジュール"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Union
+
+import requests
+
+from .api import APIClient, encode_message_body, render_message_body
+from .logger import logger
+from .payload import MessageTemplate
+from config.settings import HTTP_POOL_MAXSIZE
+
+
+@dataclass
+class SendResult:
+    """ユーザーごとの送信結果"""
+
+    user_id: str
+    success: bool
+    status: Optional[int] = None
+    latency_ms: float = 0.0
+    error: Optional[str] = None
+    attempts: int = 1
+    duplicate: bool = False
+
+
+def send_bulk(
+    api_client: APIClient,
+    bot_id: str,
+    user_ids: Iterable[str],
+    content: Union[Dict[str, Any], bytes, MessageTemplate],
+    concurrency: int = 10,
+    values: Optional[Mapping[str, Mapping[str, Any]]] = None
+) -> List[SendResult]:
+    """同じメッセージ（またはテンプレート）を複数のユーザーへ並列に送信します。
+
+    メッセージボディは一度だけシリアライズし、全ユーザーで使い回します。
+    MessageTemplate の場合は、エンコード済みのテンプレートにユーザーごとの値だけを差し込みます。
+    一部のユーザーへの送信が失敗しても、残りのユーザーへの送信は継続されます。
+
+    Args:
+        api_client: 送信に使用するAPIクライアント（トークン・セッションを共有）
+        bot_id: ボットID
+        user_ids: 送信先ユーザーIDの列
+        content: メッセージコンテンツ、シリアライズ済みのボディ、または MessageTemplate
+        concurrency: 同時送信数の上限
+        values: ユーザーIDごとのテンプレートのプレースホルダーに差し込む値（{user_id} は自動で設定）
+
+    Returns:
+        List[SendResult]: user_ids と同じ順序の送信結果
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency は1以上を指定してください: {concurrency}")
+    if concurrency > HTTP_POOL_MAXSIZE:
+        logger.warning(
+            "同時送信数 %s がコネクションプールの上限 %s を超えています", concurrency, HTTP_POOL_MAXSIZE
+        )
+
+    if not isinstance(content, (bytes, MessageTemplate)):
+        content = encode_message_body(content)
+    values = values or {}
+
+    def send_one(user_id: str) -> SendResult:
+        start = time.perf_counter()
+        try:
+            body = render_message_body(content, user_id, values.get(user_id))
+            response = api_client.post_bot_message(bot_id, user_id, body)
+            return SendResult(
+                user_id=user_id,
+                success=True,
+                status=response.status_code,
+                latency_ms=(time.perf_counter() - start) * 1000,
+                attempts=max(len(api_client.last_attempts), 1)
+            )
+        except Exception as e:
+            status = None
+            if isinstance(e, requests.exceptions.RequestException) and e.response is not None:
+                status = e.response.status_code
+            return SendResult(
+                user_id=user_id,
+                success=False,
+                status=status,
+                latency_ms=(time.perf_counter() - start) * 1000,
+                error=str(e) or type(e).__name__,
+                attempts=max(len(api_client.last_attempts), 1)
+            )
+        finally:
+            slots.release()
+
+    # 入力が巨大でも未処理のタスクを溜め込まないよう、投入数を制限する
+    slots = threading.BoundedSemaphore(concurrency * 2)
+    futures = []
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bulk-send') as executor:
+        for user_id in user_ids:
+            slots.acquire()
+            # 相関IDなどのコンテキストをワーカースレッドへ引き継ぐ
+            futures.append(executor.submit(contextvars.copy_context().run, send_one, user_id))
+
+    results = [future.result() for future in futures]
+    succeeded = sum(1 for result in results if result.success)
+    logger.info("一斉送信完了: 成功 %s 件 / 失敗 %s 件", succeeded, len(results) - succeeded)
+    return results
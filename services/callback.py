@@ -0,0 +1,486 @@
+"""ボットのコールバック（Webhook）を受信して処理するモジュール
+
+LINE WORKS から送られるコールバックを受け付けるHTTPサーバーと、イベントを登録済みの
+ハンドラへ振り分けるディスパッチャーを提供します。
+サーバーは X-WORKS-Signature の署名を検証してイベントをディスパッチャーのキューに入れ、
+ハンドラの完了を待たずにすぐ200を返します。ハンドラはワーカースレッドで並行に実行され、
+戻り値のテキストやメッセージコンテンツは APIClient.send_bot_message で送信元のユーザーへ返信されます。
+
+使用方法:
+    dispatcher = CallbackDispatcher(tenants.client_for_bot)
+
+    @dispatcher.on('message')
+    def echo(event):
+        return f"受け付けました: {event.text}"
+
+    with CallbackServer(dispatcher, secret=BOT_SECRET):
+        ...
+"""
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Mapping, Optional, Union
+
+from config.settings import (
+    BOT_SECRET, CALLBACK_HOST, CALLBACK_PORT, CALLBACK_PATH, CALLBACK_WORKERS, CALLBACK_QUEUE_SIZE,
+    CALLBACK_MAX_BODY
+)
+from .api import APIClient
+from .content import validate_content
+from .logger import logger, correlation_scope
+from .metrics import CALLBACK_EVENTS, CALLBACK_HANDLER_DURATION
+
+SIGNATURE_HEADER = 'X-WORKS-Signature'
+BOT_ID_HEADER = 'X-WORKS-BotId'
+ANY_EVENT = '*'
+
+# イベントを受け取り、返信するテキストまたはメッセージコンテンツ（返信しない場合はNone）を返す関数
+Handler = Callable[['CallbackEvent'], Optional[Union[str, Dict[str, Any]]]]
+
+
+def sign(body: bytes, secret: str) -> str:
+    """コールバックのボディの署名（Bot Secret をキーとした HMAC-SHA256 の Base64）を作成します。
+
+    Args:
+        body: リクエストボディ
+        secret: ボットの Bot Secret
+
+    Returns:
+        str: X-WORKS-Signature に設定される署名
+    """
+    digest = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode('ascii')
+
+
+def verify_signature(body: bytes, signature: Optional[str], secret: Optional[str]) -> bool:
+    """コールバックの署名を検証します。
+
+    Args:
+        body: リクエストボディ
+        signature: X-WORKS-Signature ヘッダーの値
+        secret: ボットの Bot Secret
+
+    Returns:
+        bool: 署名が一致する場合はTrue（署名またはシークレットがない場合はFalse）
+    """
+    if not signature or not secret:
+        return False
+    return hmac.compare_digest(sign(body, secret).encode('ascii'), signature.encode('ascii', 'replace'))
+
+
+@dataclass(frozen=True)
+class CallbackEvent:
+    """ボットが受信したコールバックイベント
+
+    Attributes:
+        type: イベントの種類（'message'、'postback'、'join'、'leave'、'joined'、'left' など）
+        bot_id: イベントを受信したボットのID（X-WORKS-BotId ヘッダー）
+        user_id: 送信元のユーザーID
+        channel_id: トークルームのID（1:1 のトークの場合はNone）
+        domain_id: ドメインID
+        issued_time: イベントの発生日時
+        content: メッセージコンテンツ（message イベント以外は空）
+        data: ポストバックのデータ
+        raw: 受信したペイロード
+    """
+
+    type: str
+    bot_id: Optional[str] = None
+    user_id: Optional[str] = None
+    channel_id: Optional[str] = None
+    domain_id: Optional[int] = None
+    issued_time: Optional[str] = None
+    content: Dict[str, Any] = field(default_factory=dict)
+    data: Optional[str] = None
+    raw: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def text(self) -> Optional[str]:
+        """テキストメッセージの本文（テキスト以外の場合はNone）"""
+        return self.content.get('text') if self.content.get('type') == 'text' else None
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any], bot_id: Optional[str] = None) -> 'CallbackEvent':
+        """コールバックのペイロードからイベントを作成します。
+
+        Args:
+            payload: JSONを解析したペイロード
+            bot_id: イベントを受信したボットのID
+
+        Returns:
+            CallbackEvent: イベント
+
+        Raises:
+            ValueError: ペイロードが不正な場合
+        """
+        if not isinstance(payload, dict) or not isinstance(payload.get('type'), str):
+            raise ValueError("イベントの type がありません")
+        source = payload.get('source') or {}
+        content = payload.get('content') or {}
+        if not isinstance(source, dict):
+            raise ValueError("イベントの source が不正です")
+        if not isinstance(content, dict):
+            raise ValueError("イベントの content が不正です")
+        data = payload.get('data')
+        if data is None:
+            # ボタンのポストバック付きメッセージは content.postback にデータが入る
+            data = content.get('postback')
+        return cls(
+            type=payload['type'],
+            bot_id=bot_id,
+            user_id=source.get('userId'),
+            channel_id=source.get('channelId'),
+            domain_id=source.get('domainId'),
+            issued_time=payload.get('issuedTime'),
+            content=content,
+            data=data,
+            raw=payload
+        )
+
+
+class CallbackDispatcher:
+    """コールバックイベントを登録済みのハンドラへ振り分け、ワーカースレッドで並行に実行するクラス
+
+    処理待ちのイベント数は queue_size を上限とし、上限に達した場合は submit がFalseを返します
+    （サーバーは503を返し、LINE WORKS 側の再送に任せます）。
+    """
+
+    def __init__(
+        self,
+        client_factory: Optional[Callable[[str], APIClient]] = None,
+        workers: int = CALLBACK_WORKERS,
+        queue_size: int = CALLBACK_QUEUE_SIZE
+    ):
+        """
+        Args:
+            client_factory: ボットIDから返信に使用するAPIクライアントを返す関数
+                （例: TenantRegistry.client_for_bot、省略時は返信しない）
+            workers: ハンドラを実行するスレッド数
+            queue_size: 処理待ちにできるイベント数の上限
+        """
+        self._client_factory = client_factory
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='callback')
+        self._slots = threading.BoundedSemaphore(max(1, queue_size))
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._closed = False
+        self.received = 0
+        self.handled = 0
+        self.failed = 0
+        self.rejected = 0
+        self.replied = 0
+
+    def on(self, event_type: str = ANY_EVENT, handler: Optional[Handler] = None):
+        """イベントの種類にハンドラを登録します（デコレーターとしても使用可）。
+
+        同じ種類に複数のハンドラを登録した場合は登録順に実行し、'*' のハンドラはすべての種類で実行します。
+
+        Args:
+            event_type: イベントの種類（'*' ですべての種類）
+            handler: 登録するハンドラ（省略時はデコレーターを返す）
+
+        Returns:
+            登録したハンドラ、またはデコレーター
+        """
+        def register(func: Handler) -> Handler:
+            with self._cond:
+                self._handlers.setdefault(event_type, []).append(func)
+            return func
+
+        if handler is not None:
+            return register(handler)
+        return register
+
+    def handlers_for(self, event_type: str) -> List[Handler]:
+        """イベントの種類に対して実行するハンドラを返します。"""
+        with self._cond:
+            return list(self._handlers.get(event_type, ())) + list(self._handlers.get(ANY_EVENT, ()))
+
+    def submit(self, event: CallbackEvent) -> bool:
+        """イベントをワーカーで処理するためにキューに入れます（待機しません）。
+
+        Args:
+            event: 処理するイベント
+
+        Returns:
+            bool: 受け付けた場合はTrue、処理待ちが上限に達しているか終了済みの場合はFalse
+        """
+        if self._closed or not self._slots.acquire(blocking=False):
+            with self._cond:
+                self.rejected += 1
+            CALLBACK_EVENTS.inc(type=event.type, result='rejected')
+            return False
+        with self._cond:
+            self._pending += 1
+            self.received += 1
+        CALLBACK_EVENTS.inc(type=event.type, result='accepted')
+        try:
+            self._executor.submit(self._run, event)
+        except RuntimeError:
+            # 終了処理と競合した場合
+            self._done()
+            return False
+        return True
+
+    def dispatch(self, event: CallbackEvent) -> bool:
+        """イベントのハンドラを呼び出し元のスレッドで実行し、戻り値があれば返信します。
+
+        Args:
+            event: 処理するイベント
+
+        Returns:
+            bool: すべてのハンドラと返信が成功した場合はTrue（例外は記録して送出しない）
+        """
+        success = True
+        started = time.perf_counter()
+        for handler in self.handlers_for(event.type):
+            try:
+                reply = handler(event)
+                if reply is not None:
+                    self.reply(event, reply)
+            except Exception as e:
+                success = False
+                logger.error("コールバックの処理中にエラーが発生しました: %s（%s）", event.type, e, exc_info=e)
+        CALLBACK_HANDLER_DURATION.observe(time.perf_counter() - started, type=event.type)
+        CALLBACK_EVENTS.inc(type=event.type, result='handled' if success else 'error')
+        with self._cond:
+            if success:
+                self.handled += 1
+            else:
+                self.failed += 1
+        return success
+
+    def reply(self, event: CallbackEvent, message: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """イベントの送信元のユーザーへ、イベントを受信したボットからメッセージを送信します。
+
+        Args:
+            event: 返信元のイベント
+            message: テキスト、またはメッセージコンテンツ
+
+        Returns:
+            Dict[str, Any]: APIレスポンス
+
+        Raises:
+            ValueError: 返信先が判別できない場合、またはコンテンツが不正な場合
+            requests.exceptions.RequestException: 送信に失敗した場合
+        """
+        if self._client_factory is None:
+            raise ValueError("返信に使用するAPIクライアントが設定されていません")
+        if not event.bot_id or not event.user_id:
+            raise ValueError("返信先のボットIDまたはユーザーIDがありません")
+        content = {"type": "text", "text": message} if isinstance(message, str) else message
+        validate_content(content)
+        client = self._client_factory(event.bot_id)
+        response = client.send_bot_message(event.bot_id, event.user_id, content)
+        with self._cond:
+            self.replied += 1
+        return response
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """キューに入れたイベントの処理が終わるまで待ちます。
+
+        Args:
+            timeout: 待機する最大秒数（Noneで無制限）
+
+        Returns:
+            bool: すべて処理済みになった場合はTrue
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, wait: bool = True) -> None:
+        """新しいイベントの受け付けを止め、ワーカーを終了します。
+
+        Args:
+            wait: 処理待ちのイベントの完了を待つかどうか
+        """
+        self._closed = True
+        self._executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, int]:
+        """統計情報（受け付け・処理・失敗・拒否・返信した件数、処理待ちの件数）を返します。"""
+        with self._cond:
+            return {
+                'received': self.received,
+                'handled': self.handled,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'replied': self.replied,
+                'pending': self._pending,
+            }
+
+    def _run(self, event: CallbackEvent) -> None:
+        """ワーカースレッドでイベントを処理する"""
+        try:
+            with correlation_scope():
+                self.dispatch(event)
+        finally:
+            self._done()
+
+    def _done(self) -> None:
+        """処理待ちの枠を解放する"""
+        self._slots.release()
+        with self._cond:
+            self._pending -= 1
+            if self._pending == 0:
+                self._cond.notify_all()
+
+
+class _ThreadingServer(ThreadingHTTPServer):
+    """多数の同時接続を受け付けるHTTPサーバー"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class CallbackServer:
+    """コールバックを受信し、署名を検証してディスパッチャーへ渡すHTTPサーバー
+
+    応答ステータス:
+        200: 受け付けた（ハンドラの完了は待たない）
+        400: ボディがJSONのイベントではない
+        401: 署名が一致しない
+        404: パスが異なる
+        413: ボディが CALLBACK_MAX_BODY を超えている
+        503: 処理待ちのイベントが上限に達している
+    """
+
+    def __init__(
+        self,
+        dispatcher: CallbackDispatcher,
+        secret: Union[str, Mapping[str, str], None] = BOT_SECRET,
+        host: str = CALLBACK_HOST,
+        port: int = CALLBACK_PORT,
+        path: str = CALLBACK_PATH,
+        max_body: int = CALLBACK_MAX_BODY
+    ):
+        """
+        Args:
+            dispatcher: イベントを渡すディスパッチャー
+            secret: Bot Secret、またはボットIDごとの Bot Secret（'*' のキーはその他のボット用）
+            host: 待ち受けアドレス
+            port: 待ち受けポート（0で空きポートを自動選択）
+            path: コールバックを受け付けるパス
+            max_body: 受け付けるボディの最大バイト数
+
+        Raises:
+            ValueError: Bot Secret が設定されていない場合
+        """
+        if not secret:
+            raise ValueError("BOT_SECRET が設定されていません")
+        self.dispatcher = dispatcher
+        self._secrets: Mapping[str, str] = {ANY_EVENT: secret} if isinstance(secret, str) else dict(secret)
+        self.path = path
+        self.max_body = max_body
+        self._server = _ThreadingServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """コールバックURL（Developer Console に登録するURL）"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.path}"
+
+    def secret_for(self, bot_id: Optional[str]) -> Optional[str]:
+        """ボットの Bot Secret を返します。"""
+        return self._secrets.get(bot_id or '') or self._secrets.get(ANY_EVENT)
+
+    def start(self) -> 'CallbackServer':
+        """バックグラウンドスレッドでサーバーを起動します。"""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, name='callback-server', daemon=True
+            )
+            self._thread.start()
+            logger.info("コールバックの受信を開始しました: %s", self.url)
+        return self
+
+    def stop(self) -> None:
+        """サーバーを停止します（ディスパッチャーは終了しません）。"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> 'CallbackServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def handle(self, body: bytes, headers: Mapping[str, str]) -> int:
+        """受信したコールバックを検証してディスパッチャーに渡し、応答ステータスを返します。
+
+        Args:
+            body: リクエストボディ
+            headers: リクエストヘッダー
+
+        Returns:
+            int: 応答ステータス
+        """
+        bot_id = headers.get(BOT_ID_HEADER)
+        if not verify_signature(body, headers.get(SIGNATURE_HEADER), self.secret_for(bot_id)):
+            logger.warning("コールバックの署名が一致しません: ボット %s", bot_id)
+            CALLBACK_EVENTS.inc(type='unknown', result='invalid_signature')
+            return 401
+        try:
+            event = CallbackEvent.from_payload(json.loads(body), bot_id)
+        except ValueError as e:
+            logger.warning("コールバックのペイロードが不正です: %s", e)
+            CALLBACK_EVENTS.inc(type='unknown', result='invalid_payload')
+            return 400
+        if not self.dispatcher.submit(event):
+            logger.warning("処理待ちのイベントが上限に達したため拒否しました: %s", event.type)
+            return 503
+        return 200
+
+    def _handler_class(self):
+        """このサーバーを参照するリクエストハンドラを作成する"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int) -> None:
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_POST(self):
+                value = self.headers.get('Content-Length')
+                if value is None:
+                    # ボディの長さが分からないため接続を閉じる（chunked には対応しない）
+                    self.close_connection = True
+                    self._reply(411)
+                    return
+                try:
+                    length = int(value)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self.close_connection = True
+                    self._reply(400)
+                    return
+                if length > server.max_body:
+                    # 残りのボディを読まずに接続を閉じる
+                    self.close_connection = True
+                    self._reply(413)
+                    return
+                body = self.rfile.read(length) if length else b''
+                if self.path.split('?')[0] != server.path:
+                    self._reply(404)
+                    return
+                self._reply(server.handle(body, self.headers))
+
+        return Handler
@@ -0,0 +1,346 @@
+"""エンドポイントの種類ごとのサーキットブレーカーを提供するモジュール
+
+トークン取得・メッセージ送信・ボット情報取得の種類ごとに直近の呼び出し結果を記録し、
+エラー率または遅延した呼び出しの割合がしきい値を超えた場合は回路を開いて、
+一定時間はHTTPリクエストを送らずに直ちに失敗させます（障害中のAPIへの再試行の集中を防ぐ）。
+開いてから一定時間が経過すると少数の試験的な呼び出し（ハーフオープン）を許可し、
+すべて成功すれば回路を閉じて通常の送信に戻します。
+"""
+import collections
+import contextlib
+import threading
+import time
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+import requests
+
+from config.settings import (
+    CIRCUIT_BREAKER_ENABLED,
+    CIRCUIT_BREAKER_FAILURE_RATE,
+    CIRCUIT_BREAKER_SLOW_CALL_DURATION,
+    CIRCUIT_BREAKER_SLOW_CALL_RATE,
+    CIRCUIT_BREAKER_MIN_REQUESTS,
+    CIRCUIT_BREAKER_WINDOW,
+    CIRCUIT_BREAKER_OPEN_DURATION,
+    CIRCUIT_BREAKER_HALF_OPEN_PROBES,
+)
+from .deadline import DeadlineExceededError
+from .logger import logger
+from .metrics import CIRCUIT_EVENTS, CIRCUIT_STATE
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# 監視用ゲージに出力する状態の値
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """回路が開いているためリクエストを送信しなかった場合の例外
+
+    ネットワークエラー（ConnectionError）ではないため、再試行ポリシーによる再試行は行われません。
+    """
+
+    def __init__(self, name: str, retry_after: float):
+        """
+        Args:
+            name: 回路の名前（エンドポイントの種類）
+            retry_after: 次に呼び出しを許可するまでの目安の秒数
+        """
+        super().__init__(f"サーキットブレーカーが開いています: {name}（{retry_after:.1f}秒後に再開）")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CallOutcome:
+    """CircuitBreaker.call の中で呼び出し結果を指定するためのオブジェクト"""
+
+    def __init__(self):
+        self.failed = False
+        self.started = time.monotonic()
+
+    def start(self) -> None:
+        """所要時間の計測を開始し直す（レート制限の待機などを遅延に含めない場合に呼び出す）"""
+        self.started = time.monotonic()
+
+
+class CircuitBreaker:
+    """1種類のエンドポイントのサーキットブレーカー"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = CIRCUIT_BREAKER_FAILURE_RATE,
+        slow_call_duration: float = CIRCUIT_BREAKER_SLOW_CALL_DURATION,
+        slow_call_rate: float = CIRCUIT_BREAKER_SLOW_CALL_RATE,
+        min_requests: int = CIRCUIT_BREAKER_MIN_REQUESTS,
+        window: float = CIRCUIT_BREAKER_WINDOW,
+        open_duration: float = CIRCUIT_BREAKER_OPEN_DURATION,
+        half_open_probes: int = CIRCUIT_BREAKER_HALF_OPEN_PROBES
+    ):
+        """サーキットブレーカーの初期化
+
+        Args:
+            name: 回路の名前（エンドポイントの種類）
+            failure_rate: 回路を開く失敗率（0〜1）
+            slow_call_duration: 遅延とみなす呼び出しの秒数
+            slow_call_rate: 回路を開く遅延した呼び出しの割合（0〜1）
+            min_requests: 判定に必要な最小の呼び出し数（ウィンドウ内）
+            window: 失敗率を集計する秒数
+            open_duration: 回路を開いてからハーフオープンに移るまでの秒数
+            half_open_probes: ハーフオープン中に許可する呼び出し数（すべて成功すると閉じる）
+        """
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.min_requests = max(1, min_requests)
+        self.window = window
+        self.open_duration = open_duration
+        self.half_open_probes = max(1, half_open_probes)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        # ウィンドウ内の呼び出し結果（時刻、失敗、遅延）
+        self._calls: Deque[Tuple[float, bool, bool]] = collections.deque()
+        self._failures = 0
+        self._slow = 0
+        self._probes_inflight = 0
+        self._probe_successes = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """現在の状態（'closed'、'open' または 'half_open'）"""
+        with self._lock:
+            return self._state
+
+    def before_call(self) -> bool:
+        """呼び出しを許可するかどうかを判定します。
+
+        Returns:
+            bool: ハーフオープン中の試験的な呼び出しとして許可した場合はTrue
+
+        Raises:
+            CircuitOpenError: 回路が開いている場合（ハーフオープン中で試験枠が埋まっている場合を含む）
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            now = time.monotonic()
+            if self._state == OPEN:
+                remaining = self._opened_at + self.open_duration - now
+                if remaining > 0:
+                    self._reject(remaining)
+                self._transition(HALF_OPEN)
+            if self._probes_inflight + self._probe_successes >= self.half_open_probes:
+                self._reject(min(self.open_duration, 1.0))
+            self._probes_inflight += 1
+            return True
+
+    def record(self, duration: float, failed: bool, probe: bool = False) -> None:
+        """呼び出し結果を記録し、必要に応じて状態を切り替えます。
+
+        Args:
+            duration: 呼び出しにかかった秒数
+            failed: 失敗した場合はTrue
+            probe: before_call が試験的な呼び出しとして許可した場合はTrue
+        """
+        slow = duration >= self.slow_call_duration
+        now = time.monotonic()
+        with self._lock:
+            if probe:
+                self._probes_inflight = max(0, self._probes_inflight - 1)
+                if self._state != HALF_OPEN:
+                    return
+                if failed or slow:
+                    self._open(now)
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(CLOSED)
+                return
+
+            if self._state != CLOSED:
+                return
+            self._calls.append((now, failed, slow))
+            self._failures += failed
+            self._slow += slow
+            self._trim(now)
+            total = len(self._calls)
+            if total >= self.min_requests and (
+                self._failures / total >= self.failure_rate or self._slow / total >= self.slow_call_rate
+            ):
+                logger.warning(
+                    "サーキットブレーカーを開きます: %s（失敗 %s / 遅延 %s / 呼び出し %s 件）",
+                    self.name, self._failures, self._slow, total
+                )
+                self._open(now)
+
+    def release(self, probe: bool) -> None:
+        """結果を記録せずに呼び出しを終えます（リクエスト以外の例外で中断した場合）。
+
+        Args:
+            probe: before_call が試験的な呼び出しとして許可した場合はTrue
+        """
+        if probe:
+            with self._lock:
+                self._probes_inflight = max(0, self._probes_inflight - 1)
+
+    @contextlib.contextmanager
+    def call(self) -> Iterator[CallOutcome]:
+        """呼び出しを回路で保護するコンテキストマネージャー
+
+        ブロック内で requests.exceptions.RequestException が発生した場合は失敗として記録します
+        （呼び出し全体の制限時間による打ち切りは送信先の障害ではないため記録しません）。
+        応答のステータスで失敗を判定する場合は、返されるオブジェクトの failed をTrueにします。
+
+        Example:
+            >>> with breaker.call() as outcome:
+            ...     response = session.get(url)
+            ...     outcome.failed = response.status_code >= 500
+
+        Raises:
+            CircuitOpenError: 回路が開いている場合（ブロックは実行されない）
+        """
+        probe = self.before_call()
+        outcome = CallOutcome()
+        try:
+            yield outcome
+        except DeadlineExceededError:
+            self.release(probe)
+            raise
+        except requests.exceptions.RequestException:
+            self.record(time.monotonic() - outcome.started, True, probe)
+            raise
+        except BaseException:
+            self.release(probe)
+            raise
+        self.record(time.monotonic() - outcome.started, outcome.failed, probe)
+
+    def reset(self) -> None:
+        """記録を破棄して回路を閉じます。"""
+        with self._lock:
+            self._calls.clear()
+            self._failures = 0
+            self._slow = 0
+            self._probes_inflight = 0
+            self._probe_successes = 0
+            self._state = CLOSED
+
+    def stats(self) -> Dict[str, object]:
+        """状態と統計情報（ウィンドウ内の呼び出し数・失敗数・遅延数、拒否した呼び出し数）を返します。"""
+        with self._lock:
+            self._trim(time.monotonic())
+            return {
+                'state': self._state,
+                'requests': len(self._calls),
+                'failures': self._failures,
+                'slow_calls': self._slow,
+                'rejected': self.rejected,
+            }
+
+    def _trim(self, now: float) -> None:
+        """ウィンドウを過ぎた記録を破棄する（ロック取得済みで呼び出す）"""
+        threshold = now - self.window
+        calls = self._calls
+        while calls and calls[0][0] < threshold:
+            _, failed, slow = calls.popleft()
+            self._failures -= failed
+            self._slow -= slow
+
+    def _open(self, now: float) -> None:
+        """回路を開く（ロック取得済みで呼び出す）"""
+        self._opened_at = now
+        self._calls.clear()
+        self._failures = 0
+        self._slow = 0
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        """状態を切り替えて記録する（ロック取得済みで呼び出す）"""
+        self._state = state
+        self._probe_successes = 0
+        CIRCUIT_EVENTS.inc(endpoint=self.name, event={OPEN: 'opened', HALF_OPEN: 'half_opened'}.get(state, state))
+        if state == CLOSED:
+            logger.info("サーキットブレーカーを閉じました: %s", self.name)
+        elif state == HALF_OPEN:
+            logger.info("サーキットブレーカーをハーフオープンにしました: %s", self.name)
+
+    def _reject(self, retry_after: float) -> None:
+        """呼び出しを拒否する（ロック取得済みで呼び出す）"""
+        self.rejected += 1
+        CIRCUIT_EVENTS.inc(endpoint=self.name, event='rejected')
+        raise CircuitOpenError(self.name, retry_after)
+
+
+class CircuitBreakerRegistry:
+    """エンドポイントの種類ごとのサーキットブレーカーを管理するクラス"""
+
+    def __init__(self, **options: float):
+        """
+        Args:
+            **options: 各サーキットブレーカーに渡す設定（CircuitBreaker の引数）
+        """
+        self._options = options
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        CIRCUIT_STATE.set_function(self.state_values)
+
+    def get(self, name: str) -> CircuitBreaker:
+        """エンドポイントの種類のサーキットブレーカーを返します（初回は作成します）。
+
+        Args:
+            name: エンドポイントの種類（'token'、'message'、'bot_info' など）
+
+        Returns:
+            CircuitBreaker: サーキットブレーカー
+        """
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(name)
+                if breaker is None:
+                    breaker = CircuitBreaker(name, **self._options)
+                    self._breakers[name] = breaker
+        return breaker
+
+    def states(self) -> Dict[str, str]:
+        """エンドポイントの種類ごとの状態を返します。"""
+        return {name: breaker.state for name, breaker in list(self._breakers.items())}
+
+    def state_values(self) -> Dict[Tuple[str], int]:
+        """監視用ゲージの値（0: closed、1: half_open、2: open）を返します。"""
+        return {(name,): _STATE_VALUES[state] for name, state in self.states().items()}
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """エンドポイントの種類ごとの統計情報を返します。"""
+        return {name: breaker.stats() for name, breaker in list(self._breakers.items())}
+
+    def reset(self) -> None:
+        """すべての回路を閉じます。"""
+        for breaker in list(self._breakers.values()):
+            breaker.reset()
+
+
+_circuit_breakers: Optional[CircuitBreakerRegistry] = None
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breakers() -> Optional[CircuitBreakerRegistry]:
+    """プロセス全体で共有するサーキットブレーカーを返します。
+
+    Returns:
+        Optional[CircuitBreakerRegistry]: 共有のレジストリ（CIRCUIT_BREAKER_ENABLED が false の場合はNone）
+    """
+    global _circuit_breakers
+    if not CIRCUIT_BREAKER_ENABLED:
+        return None
+    registry = _circuit_breakers
+    if registry is None:
+        with _circuit_breakers_lock:
+            if _circuit_breakers is None:
+                _circuit_breakers = CircuitBreakerRegistry()
+            registry = _circuit_breakers
+    return registry
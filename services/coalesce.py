@@ -0,0 +1,270 @@
+"""同じユーザーへの短時間の連続メッセージを1通にまとめる（コアレシング）モジュール
+
+(bot_id, user_id) ごとに一定時間（ウィンドウ）メッセージを溜め、テキストメッセージを
+改行で連結して1回のAPI呼び出しで送信します。障害時のアラート連投などで
+API呼び出し回数とレート制限の消費を抑えます。
+"""
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from config.settings import COALESCE_WINDOW, COALESCE_MAX_MESSAGES, COALESCE_MAX_LENGTH, COALESCE_WORKERS
+from .logger import logger
+from .metrics import COALESCED_MESSAGES
+
+# send_message と同じ引数（content, bot_id, user_id, access_token, token_refresher）で送信する関数
+Sender = Callable[..., Dict[str, Any]]
+
+
+@dataclass
+class _Pending:
+    """送信待ちのメッセージ"""
+
+    content: Dict[str, Any]
+    future: Future
+    text: Optional[str]
+
+
+@dataclass
+class _Buffer:
+    """(bot_id, user_id) ごとの送信待ちメッセージ"""
+
+    seq: int
+    deadline: float
+    access_token: str = ''
+    token_refresher: Optional[Callable[[str], Optional[str]]] = None
+    items: List[_Pending] = field(default_factory=list)
+    length: int = 0
+
+
+def mergeable_text(content: Dict[str, Any]) -> Optional[str]:
+    """他のメッセージと連結できるテキストメッセージであれば本文を返す
+
+    Args:
+        content: メッセージコンテンツ
+
+    Returns:
+        Optional[str]: 本文（連結できないメッセージの場合はNone）
+    """
+    if content.get('type') == 'text' and len(content) == 2 and isinstance(content.get('text'), str):
+        return content['text']
+    return None
+
+
+class MessageCoalescer:
+    """(bot_id, user_id) ごとにメッセージをまとめて送信するクラス"""
+
+    def __init__(
+        self,
+        sender: Sender,
+        window: float = COALESCE_WINDOW,
+        max_messages: int = COALESCE_MAX_MESSAGES,
+        max_length: int = COALESCE_MAX_LENGTH,
+        workers: int = COALESCE_WORKERS,
+        separator: str = '\n'
+    ):
+        """コアレッサーの初期化
+
+        Args:
+            sender: まとめたメッセージを送信する関数（services.message.send_message など）
+            window: 最初のメッセージを受け付けてから送信するまでの最大秒数
+            max_messages: 1回にまとめるメッセージ数の上限（達した時点で送信）
+            max_length: 連結後の本文の最大文字数（超える場合は分けて送信）
+            workers: 送信を行うスレッド数
+            separator: 本文の区切り文字
+        """
+        self._sender = sender
+        self.window = window
+        self.max_messages = max_messages
+        self.max_length = max_length
+        self.separator = separator
+        self._buffers: Dict[Tuple[str, str], _Buffer] = {}
+        self._deadlines: List[Tuple[float, int, Tuple[str, str]]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        # 送信に回したバッファ（キーごとに1つのワーカーが順番に送信する）
+        self._outgoing: Dict[Tuple[str, str], Deque[_Buffer]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='coalesce')
+        self._thread = threading.Thread(target=self._run, name='coalesce-timer', daemon=True)
+        self._thread.start()
+        self.submitted = 0
+        self.sent = 0
+
+    def submit(
+        self,
+        content: Dict[str, Any],
+        bot_id: str,
+        user_id: str,
+        access_token: str,
+        token_refresher: Optional[Callable[[str], Optional[str]]] = None
+    ) -> Future:
+        """メッセージを送信待ちに追加します。
+
+        テキスト以外のメッセージは、それまでに溜まったメッセージと順序を保って直ちに送信されます。
+
+        Args:
+            content: メッセージの内容
+            bot_id: ボットのID
+            user_id: 送信先ユーザーID
+            access_token: アクセストークン（送信時はキーごとに最後に渡されたものを使用）
+            token_refresher: 401応答時にトークンを再取得する関数（省略可）
+
+        Returns:
+            Future: まとめて送信したAPIレスポンス（送信失敗時は例外）を結果とする Future
+
+        Raises:
+            RuntimeError: close 後に呼び出された場合
+        """
+        future: Future = Future()
+        text = mergeable_text(content)
+        key = (bot_id, user_id)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MessageCoalescer は既に終了しています")
+            buffer = self._buffers.get(key)
+            if (
+                buffer is not None and text is not None
+                and buffer.length + len(self.separator) + len(text) > self.max_length
+            ):
+                self._dispatch(key)
+                buffer = None
+            if buffer is None:
+                buffer = self._new_buffer(key)
+
+            buffer.items.append(_Pending(content, future, text))
+            if text is not None:
+                buffer.length += len(text) + (len(self.separator) if len(buffer.items) > 1 else 0)
+            buffer.access_token = access_token
+            buffer.token_refresher = token_refresher
+            self.submitted += 1
+            COALESCED_MESSAGES.inc(stage='submitted')
+
+            if text is None or len(buffer.items) >= self.max_messages or buffer.length >= self.max_length:
+                self._dispatch(key)
+        return future
+
+    def flush(self) -> None:
+        """送信待ちのメッセージをウィンドウの経過を待たずに送信します。"""
+        with self._cond:
+            for key in list(self._buffers):
+                self._dispatch(key)
+
+    def close(self) -> None:
+        """送信待ちのメッセージを送信し、送信の完了を待って終了します。"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            for key in list(self._buffers):
+                self._dispatch(key)
+            self._cond.notify_all()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        """統計情報（受け付けたメッセージ数、API呼び出し回数、送信待ちのキー数）を返します。"""
+        with self._cond:
+            return {'submitted': self.submitted, 'sent': self.sent, 'pending': len(self._buffers)}
+
+    def _new_buffer(self, key: Tuple[str, str]) -> _Buffer:
+        """送信待ちバッファを作成し、送信期限を登録する（ロック取得済みで呼び出す）"""
+        buffer = _Buffer(seq=next(self._seq), deadline=time.monotonic() + self.window)
+        self._buffers[key] = buffer
+        heapq.heappush(self._deadlines, (buffer.deadline, buffer.seq, key))
+        self._cond.notify()
+        return buffer
+
+    def _dispatch(self, key: Tuple[str, str]) -> None:
+        """バッファを取り出して送信待ちの列に追加する（ロック取得済みで呼び出す）
+
+        同じキーの送信中のワーカーがいればその列に追加し、いなければワーカーを開始します。
+        """
+        buffer = self._buffers.pop(key, None)
+        if buffer is None or not buffer.items:
+            return
+        outgoing = self._outgoing.get(key)
+        if outgoing is not None:
+            outgoing.append(buffer)
+            return
+        self._outgoing[key] = deque([buffer])
+        self._executor.submit(self._drain, key)
+
+    def _drain(self, key: Tuple[str, str]) -> None:
+        """キーの送信待ちの列を空になるまで順番に送信する"""
+        while True:
+            with self._cond:
+                outgoing = self._outgoing[key]
+                if not outgoing:
+                    del self._outgoing[key]
+                    return
+                buffer = outgoing.popleft()
+            try:
+                self._send(key, buffer)
+            except Exception as e:
+                # 後続のバッファの送信を止めない
+                logger.error("メッセージの送信処理に失敗しました: ユーザー %s", key[1], exc_info=e)
+
+    def _run(self) -> None:
+        """ウィンドウが経過したバッファを送信に回すタイマースレッド"""
+        with self._cond:
+            while not self._closed:
+                if not self._deadlines:
+                    self._cond.wait()
+                    continue
+                deadline, seq, key = self._deadlines[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                heapq.heappop(self._deadlines)
+                buffer = self._buffers.get(key)
+                if buffer is not None and buffer.seq == seq:
+                    self._dispatch(key)
+
+    def _groups(self, items: List[_Pending]) -> List[List[_Pending]]:
+        """連続するテキストメッセージを文字数の上限内でまとめる"""
+        groups: List[List[_Pending]] = []
+        length = 0
+        for item in items:
+            last = groups[-1] if groups else None
+            if (
+                last is not None and item.text is not None and last[-1].text is not None
+                and length + len(self.separator) + len(item.text) <= self.max_length
+            ):
+                last.append(item)
+                length += len(self.separator) + len(item.text)
+            else:
+                groups.append([item])
+                length = len(item.text) if item.text is not None else 0
+        return groups
+
+    def _send(self, key: Tuple[str, str], buffer: _Buffer) -> None:
+        """まとめたメッセージを送信し、各メッセージの Future に結果を設定する"""
+        bot_id, user_id = key
+        items = [item for item in buffer.items if item.future.set_running_or_notify_cancel()]
+        for group in self._groups(items):
+            if len(group) == 1:
+                content = group[0].content
+            else:
+                content = {"type": "text", "text": self.separator.join(item.text for item in group)}
+            try:
+                result = self._sender(content, bot_id, user_id, buffer.access_token, buffer.token_refresher)
+            except Exception as e:
+                logger.error("まとめたメッセージの送信に失敗しました: ユーザー %s（%s 件）", user_id, len(group))
+                for item in group:
+                    item.future.set_exception(e)
+                continue
+            finally:
+                with self._cond:
+                    self.sent += 1
+                COALESCED_MESSAGES.inc(stage='sent')
+            if len(group) > 1:
+                logger.debug("メッセージ %s 件を1通にまとめて送信しました: ユーザー %s", len(group), user_id)
+            for item in group:
+                item.future.set_result(result)
@@ -0,0 +1,502 @@
+"""メッセージコンテンツの作成と検証を担当するモジュール
+
+テキスト以外のメッセージ（ボタン、リスト、カルーセル、画像など）を組み立てる関数と、
+送信前にコンテンツを検証する validate_content を提供します。
+検証関数はメッセージタイプごとに初回の検証時に一度だけ組み立ててキャッシュするため、
+不正なコンテンツはHTTPリクエストの前にすぐ検出されます。
+"""
+import functools
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+# 検証関数: (値, エラー表示用のパス) を受け取り、不正な場合は ContentValidationError を送出する
+Validator = Callable[[Any, str], None]
+
+
+class ContentValidationError(ValueError):
+    """メッセージコンテンツが不正な場合の例外"""
+
+    def __init__(self, path: str, message: str):
+        super().__init__(f"{path}: {message}")
+        self.path = path
+
+
+@dataclass(frozen=True)
+class Field:
+    """コンテンツの項目の定義
+
+    Attributes:
+        name: 項目名
+        kind: 値の種類（'str'、'url'、'int'、'bool'、'object'、'list'、'action'、'any'）
+        required: 必須かどうか
+        max_length: 文字列の最大文字数、またはリストの最大要素数
+        min_items: リストの最小要素数
+        choices: 指定できる値
+        schema: kind が 'object' の場合は項目の定義、'list' の場合は要素の定義
+    """
+
+    name: str
+    kind: str = 'str'
+    required: bool = True
+    max_length: Optional[int] = None
+    min_items: int = 0
+    choices: Tuple[Any, ...] = ()
+    schema: Any = None
+
+
+@dataclass(frozen=True)
+class Schema:
+    """オブジェクトの定義
+
+    Attributes:
+        fields: 項目の定義
+        one_of: いずれか1組がそろっている必要がある項目名の組（例: URL かファイルID）
+    """
+
+    fields: Tuple[Field, ...]
+    one_of: Tuple[Tuple[str, ...], ...] = field(default_factory=tuple)
+
+
+# LINE WORKS API 2.0 のメッセージ送信の制限に合わせた定義
+_ACTION_SCHEMAS: Dict[str, Schema] = {
+    'message': Schema((
+        Field('label', max_length=20, required=False),
+        Field('text', max_length=300, required=False),
+        Field('postback', max_length=1000, required=False),
+    ), one_of=(('text',), ('postback',))),
+    'uri': Schema((
+        Field('label', max_length=20, required=False),
+        Field('uri', 'url'),
+    )),
+    'copy': Schema((
+        Field('label', max_length=20, required=False),
+        Field('copyText', max_length=1000),
+    )),
+}
+
+_IMAGE_SOURCE = (('originalContentUrl',), ('fileId',))
+
+_CONTENT_SCHEMAS: Dict[str, Schema] = {
+    'text': Schema((
+        Field('text', max_length=2000),
+    )),
+    'sticker': Schema((
+        Field('packageId'),
+        Field('stickerId'),
+    )),
+    'image': Schema((
+        Field('previewImageUrl', 'url', required=False),
+        Field('originalContentUrl', 'url', required=False),
+        Field('fileId', required=False),
+    ), one_of=(('previewImageUrl', 'originalContentUrl'), ('fileId',))),
+    'file': Schema((
+        Field('originalContentUrl', 'url', required=False),
+        Field('fileId', required=False),
+    ), one_of=_IMAGE_SOURCE),
+    'link': Schema((
+        Field('contentText', max_length=1000),
+        Field('linkText', max_length=1000),
+        Field('link', 'url'),
+    )),
+    'button_template': Schema((
+        Field('contentText', max_length=1000),
+        Field('actions', 'list', min_items=1, max_length=10, schema=Field('action', 'action')),
+    )),
+    'list_template': Schema((
+        Field('coverData', 'object', required=False, schema=Schema((
+            Field('backgroundImageUrl', 'url', required=False),
+            Field('backgroundFileId', required=False),
+            Field('title', max_length=100, required=False),
+            Field('subtitle', max_length=100, required=False),
+        ))),
+        Field('elements', 'list', min_items=1, max_length=4, schema=Field('element', 'object', schema=Schema((
+            Field('title', max_length=100),
+            Field('subtitle', max_length=100, required=False),
+            Field('originalContentUrl', 'url', required=False),
+            Field('fileId', required=False),
+            Field('action', 'action', required=False),
+        )))),
+        Field('actions', 'list', required=False, max_length=2, schema=Field(
+            'row', 'list', min_items=1, max_length=2, schema=Field('action', 'action')
+        )),
+    )),
+    'carousel': Schema((
+        Field('imageAspectRatio', required=False, choices=('rectangle', 'square')),
+        Field('imageSize', required=False, choices=('cover', 'contain')),
+        Field('columns', 'list', min_items=1, max_length=10, schema=Field('column', 'object', schema=Schema((
+            Field('originalContentUrl', 'url', required=False),
+            Field('fileId', required=False),
+            Field('title', max_length=40, required=False),
+            Field('text', max_length=60),
+            Field('defaultAction', 'action', required=False),
+            Field('actions', 'list', min_items=1, max_length=3, schema=Field('action', 'action')),
+        )))),
+    )),
+    'image_carousel': Schema((
+        Field('columns', 'list', min_items=1, max_length=10, schema=Field('column', 'object', schema=Schema((
+            Field('originalContentUrl', 'url', required=False),
+            Field('fileId', required=False),
+            Field('action', 'action', required=False),
+        ), one_of=_IMAGE_SOURCE))),
+    )),
+    'flex': Schema((
+        Field('altText', max_length=400),
+        Field('contents', 'object', schema=Schema((
+            Field('type', choices=('bubble', 'carousel')),
+        ))),
+    )),
+}
+
+CONTENT_TYPES = frozenset(_CONTENT_SCHEMAS)
+ACTION_TYPES = frozenset(_ACTION_SCHEMAS)
+
+
+def _compile_field(spec: Field) -> Validator:
+    """項目の定義から値の検証関数を組み立てる"""
+    kind = spec.kind
+    max_length = spec.max_length
+    choices = frozenset(spec.choices)
+
+    if kind in ('str', 'url'):
+        def check_str(value: Any, path: str) -> None:
+            if not isinstance(value, str) or not value:
+                raise ContentValidationError(path, "空でない文字列を指定してください")
+            if max_length is not None and len(value) > max_length:
+                raise ContentValidationError(path, f"{max_length}文字以内で指定してください（{len(value)}文字）")
+            if kind == 'url' and not value.startswith('https://'):
+                raise ContentValidationError(path, "https:// で始まるURLを指定してください")
+            if choices and value not in choices:
+                raise ContentValidationError(path, f"{', '.join(sorted(choices))} のいずれかを指定してください")
+        return check_str
+
+    if kind in ('int', 'bool'):
+        expected = int if kind == 'int' else bool
+
+        def check_scalar(value: Any, path: str) -> None:
+            if not isinstance(value, expected) or (kind == 'int' and isinstance(value, bool)):
+                raise ContentValidationError(path, f"{expected.__name__} を指定してください")
+        return check_scalar
+
+    if kind == 'object':
+        return _compile_schema(spec.schema)
+
+    if kind == 'action':
+        return _validate_action
+
+    if kind == 'list':
+        check_item = _compile_field(spec.schema)
+        min_items = spec.min_items
+
+        def check_list(value: Any, path: str) -> None:
+            if not isinstance(value, (list, tuple)):
+                raise ContentValidationError(path, "配列を指定してください")
+            if len(value) < min_items:
+                raise ContentValidationError(path, f"{min_items}件以上指定してください")
+            if max_length is not None and len(value) > max_length:
+                raise ContentValidationError(path, f"{max_length}件以内で指定してください（{len(value)}件）")
+            for index, item in enumerate(value):
+                check_item(item, f"{path}[{index}]")
+        return check_list
+
+    return lambda value, path: None
+
+
+def _compile_schema(schema: Schema) -> Validator:
+    """オブジェクトの定義から検証関数を組み立てる"""
+    checks = [(spec.name, spec.required, _compile_field(spec)) for spec in schema.fields]
+    one_of = schema.one_of
+
+    def check_object(value: Any, path: str) -> None:
+        if not isinstance(value, dict):
+            raise ContentValidationError(path, "オブジェクトを指定してください")
+        for name, required, check in checks:
+            item = value.get(name)
+            if item is None:
+                if required:
+                    raise ContentValidationError(f"{path}.{name}", "必須項目です")
+                continue
+            check(item, f"{path}.{name}")
+        if one_of and not any(all(value.get(name) is not None for name in group) for group in one_of):
+            groups = ' または '.join('+'.join(group) for group in one_of)
+            raise ContentValidationError(path, f"{groups} を指定してください")
+    return check_object
+
+
+@functools.lru_cache(maxsize=None)
+def _content_validator(content_type: str) -> Validator:
+    """メッセージタイプの検証関数を返す（タイプごとに一度だけ組み立てる）"""
+    return _compile_schema(_CONTENT_SCHEMAS[content_type])
+
+
+@functools.lru_cache(maxsize=None)
+def _action_validator(action_type: str) -> Validator:
+    """アクションタイプの検証関数を返す（タイプごとに一度だけ組み立てる）"""
+    return _compile_schema(_ACTION_SCHEMAS[action_type])
+
+
+def _validate_action(value: Any, path: str) -> None:
+    """アクションを検証する"""
+    action_type = value.get('type') if isinstance(value, dict) else None
+    if action_type not in ACTION_TYPES:
+        raise ContentValidationError(f"{path}.type", f"未対応のアクションです: {action_type!r}")
+    _action_validator(action_type)(value, path)
+
+
+def validate_content(content: Dict[str, Any]) -> Dict[str, Any]:
+    """メッセージコンテンツを検証します。
+
+    Args:
+        content: メッセージコンテンツ
+
+    Returns:
+        Dict[str, Any]: 検証したコンテンツ（そのまま返す）
+
+    Raises:
+        ContentValidationError: コンテンツが不正な場合（path 属性に不正な項目の位置）
+    """
+    content_type = content.get('type') if isinstance(content, dict) else None
+    if content_type not in CONTENT_TYPES:
+        raise ContentValidationError('content.type', f"未対応のメッセージタイプです: {content_type!r}")
+    _content_validator(content_type)(content, 'content')
+    return content
+
+
+def _build(content_type: str, **fields: Any) -> Dict[str, Any]:
+    """None の項目を除いてコンテンツを作成し、検証して返す"""
+    content = {'type': content_type}
+    content.update((name, value) for name, value in fields.items() if value is not None)
+    return validate_content(content)
+
+
+def _action(action_type: str, **fields: Any) -> Dict[str, Any]:
+    """None の項目を除いてアクションを作成し、検証して返す"""
+    action = {'type': action_type}
+    action.update((name, value) for name, value in fields.items() if value is not None)
+    _validate_action(action, 'action')
+    return action
+
+
+def message_action(label: Optional[str] = None, text: Optional[str] = None,
+                   postback: Optional[str] = None) -> Dict[str, Any]:
+    """タップするとメッセージを送信するアクションを作成します。
+
+    Args:
+        label: ボタンの表示名
+        text: ユーザーの発言として送信されるテキスト
+        postback: ボットへ通知されるデータ（text と postback のどちらかは必須）
+
+    Returns:
+        Dict[str, Any]: アクション
+    """
+    return _action('message', label=label, text=text, postback=postback)
+
+
+def uri_action(label: str, uri: str) -> Dict[str, Any]:
+    """タップするとURLを開くアクションを作成します。
+
+    Args:
+        label: ボタンの表示名
+        uri: 開くURL（https）
+
+    Returns:
+        Dict[str, Any]: アクション
+    """
+    return _action('uri', label=label, uri=uri)
+
+
+def copy_action(label: str, copy_text: str) -> Dict[str, Any]:
+    """タップするとテキストをクリップボードにコピーするアクションを作成します。
+
+    Args:
+        label: ボタンの表示名
+        copy_text: コピーするテキスト
+
+    Returns:
+        Dict[str, Any]: アクション
+    """
+    return _action('copy', label=label, copyText=copy_text)
+
+
+def text(message: str) -> Dict[str, Any]:
+    """テキストメッセージを作成します。
+
+    Args:
+        message: 本文（2000文字以内）
+
+    Returns:
+        Dict[str, Any]: メッセージコンテンツ
+    """
+    return _build('text', text=message)
+
+
+def sticker(package_id: str, sticker_id: str) -> Dict[str, Any]:
+    """スタンプメッセージを作成します。
+
+    Args:
+        package_id: パッケージID
+        sticker_id: スタンプID
+
+    Returns:
+        Dict[str, Any]: メッセージコンテンツ
+    """
+    return _build('sticker', packageId=package_id, stickerId=sticker_id)
+
+
+def image(original_url: Optional[str] = None, preview_url: Optional[str] = None,
+          file_id: Optional[str] = None) -> Dict[str, Any]:
+    """画像メッセージを作成します（URL かアップロード済みのファイルIDのどちらかを指定）。
+
+    Args:
+        original_url: 画像のURL（https）
+        preview_url: プレビュー画像のURL（省略時は original_url）
+        file_id: アップロード済みの画像のファイルID
+
+    Returns:
+        Dict[str, Any]: メッセージコンテンツ
+    """
+    if original_url is not None and preview_url is None:
+        preview_url = original_url
+    return _build('image', previewImageUrl=preview_url, originalContentUrl=original_url, fileId=file_id)
+
+
+def file(original_url: Optional[str] = None, file_id: Optional[str] = None) -> Dict[str, Any]:
+    """ファイルメッセージを作成します（URL かアップロード済みのファイルIDのどちらかを指定）。
+
+    Args:
+        original_url: ファイルのURL（https）
+        file_id: アップロード済みのファイルID
+
+    Returns:
+        Dict[str, Any]: メッセージコンテンツ
+    """
+    return _build('file', originalContentUrl=original_url, fileId=file_id)
+
+
+def link(content_text: str, link_text: str, url: str) -> Dict[str, Any]:
+    """リンク付きメッセージを作成します。
+
+    Args:
+        content_text: 本文
+        link_text: リンクの表示テキスト
+        url: リンク先のURL（https）
+
+    Returns:
+        Dict[str, Any]: メッセージコンテンツ
+    """
+    return _build('link', contentText=content_text, linkText=link_text, link=url)
+
+
+def button_template(content_text: str, actions: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """ボタン付きメッセージを作成します。
+
+    Args:
+        content_text: 本文
+        actions: ボタンのアクション（1〜10件）
+
+    Returns:
+        Dict[str, Any]: メッセージコンテンツ
+    """
+    return _build('button_template', contentText=content_text, actions=list(actions))
+
+
+def list_element(title: str, subtitle: Optional[str] = None, image_url: Optional[str] = None,
+                 action: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """リストメッセージの項目を作成します。
+
+    Args:
+        title: 項目のタイトル
+        subtitle: 項目のサブタイトル
+        image_url: 項目の画像のURL（https）
+        action: 項目に表示するボタンのアクション
+
+    Returns:
+        Dict[str, Any]: リストの項目
+    """
+    element = {'title': title, 'subtitle': subtitle, 'originalContentUrl': image_url, 'action': action}
+    return {name: value for name, value in element.items() if value is not None}
+
+
+def list_template(elements: Sequence[Dict[str, Any]], cover: Optional[Dict[str, Any]] = None,
+                  actions: Optional[Sequence[Sequence[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+    """リストメッセージを作成します。
+
+    Args:
+        elements: リストの項目（list_element で作成、1〜4件）
+        cover: カバー（backgroundImageUrl、title、subtitle など）
+        actions: 下部のボタンのアクション（最大2行 × 2件）
+
+    Returns:
+        Dict[str, Any]: メッセージコンテンツ
+    """
+    return _build(
+        'list_template',
+        coverData=cover,
+        elements=list(elements),
+        actions=[list(row) for row in actions] if actions is not None else None
+    )
+
+
+def carousel_column(text: str, actions: Sequence[Dict[str, Any]], title: Optional[str] = None,
+                    image_url: Optional[str] = None,
+                    default_action: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """カルーセルの列を作成します。
+
+    Args:
+        text: 本文（60文字以内）
+        actions: ボタンのアクション（1〜3件）
+        title: タイトル（40文字以内）
+        image_url: 画像のURL（https）
+        default_action: 画像・本文をタップしたときのアクション
+
+    Returns:
+        Dict[str, Any]: カルーセルの列
+    """
+    column = {
+        'originalContentUrl': image_url,
+        'title': title,
+        'text': text,
+        'defaultAction': default_action,
+        'actions': list(actions),
+    }
+    return {name: value for name, value in column.items() if value is not None}
+
+
+def carousel(columns: Sequence[Dict[str, Any]], image_aspect_ratio: Optional[str] = None,
+             image_size: Optional[str] = None) -> Dict[str, Any]:
+    """カルーセルメッセージを作成します。
+
+    Args:
+        columns: 列（carousel_column で作成、1〜10件）
+        image_aspect_ratio: 画像の縦横比（'rectangle' または 'square'）
+        image_size: 画像の表示方法（'cover' または 'contain'）
+
+    Returns:
+        Dict[str, Any]: メッセージコンテンツ
+    """
+    return _build('carousel', imageAspectRatio=image_aspect_ratio, imageSize=image_size, columns=list(columns))
+
+
+def image_carousel(columns: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """画像カルーセルメッセージを作成します。
+
+    Args:
+        columns: 列（{'originalContentUrl': ..., 'action': ...} の形式、1〜10件）
+
+    Returns:
+        Dict[str, Any]: メッセージコンテンツ
+    """
+    return _build('image_carousel', columns=list(columns))
+
+
+def flex(alt_text: str, contents: Dict[str, Any]) -> Dict[str, Any]:
+    """Flexible Template メッセージを作成します（contents の中身は検証しません）。
+
+    Args:
+        alt_text: 通知などに表示する代替テキスト
+        contents: bubble または carousel のコンテナ
+
+    Returns:
+        Dict[str, Any]: メッセージコンテンツ
+    """
+    return _build('flex', altText=alt_text, contents=contents)
+
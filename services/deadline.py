@@ -0,0 +1,111 @@
+"""HTTPリクエストのタイムアウトと呼び出し全体の制限時間（デッドライン）を管理するモジュール
+
+deadline_scope で設定した制限時間は、同じスレッド・タスク内のトークン取得、レート制限の待機、
+再試行のバックオフ、HTTPリクエストに引き継がれ、各段階は残り時間の範囲内で実行されます。
+"""
+import contextlib
+import contextvars
+import time
+from typing import Iterator, Optional, Tuple
+
+import requests
+
+from config.settings import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+
+# 現在の制限時刻（time.monotonic 基準、スレッド・タスク単位で引き継がれる）
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('deadline', default=None)
+
+
+class DeadlineExceededError(requests.exceptions.RequestException):
+    """呼び出し全体の制限時間を超えたため処理を打ち切った場合の例外"""
+
+    def __init__(self, stage: str):
+        """
+        Args:
+            stage: 制限時間を超えた段階（'token'、'rate_limit'、'request' など）
+        """
+        super().__init__(f"制限時間を超えました: {stage}")
+        self.stage = stage
+
+
+@contextlib.contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """ブロック内の処理に制限時間を設定します。
+
+    外側で既により早い制限時刻が設定されている場合はそれを引き継ぎます。
+
+    Args:
+        seconds: 制限時間（秒、None または0以下の場合は外側の設定のみ）
+
+    Yields:
+        Optional[float]: 有効な制限時刻（time.monotonic 基準、制限なしの場合はNone）
+    """
+    current = _deadline.get()
+    if seconds is None or seconds <= 0:
+        yield current
+        return
+    deadline = time.monotonic() + seconds
+    if current is not None and current < deadline:
+        deadline = current
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """制限時刻までの残り秒数を返します。
+
+    Returns:
+        Optional[float]: 残り秒数（超過している場合は0以下、制限なしの場合はNone）
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check(stage: str) -> None:
+    """制限時刻を過ぎていれば例外を発生させます。
+
+    Args:
+        stage: 現在の段階（例外のメッセージに使用）
+
+    Raises:
+        DeadlineExceededError: 制限時刻を過ぎている場合
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededError(stage)
+
+
+def request_timeout(
+    connect: Optional[float] = HTTP_CONNECT_TIMEOUT,
+    read: Optional[float] = HTTP_READ_TIMEOUT,
+    stage: str = 'request'
+) -> Tuple[Optional[float], Optional[float]]:
+    """requests に渡す (接続, 読み取り) のタイムアウトを残り時間で切り詰めて返します。
+
+    Args:
+        connect: 接続のタイムアウト秒数（None または0以下で無制限）
+        read: 読み取りのタイムアウト秒数（None または0以下で無制限）
+        stage: 現在の段階（例外のメッセージに使用）
+
+    Returns:
+        Tuple[Optional[float], Optional[float]]: 接続と読み取りのタイムアウト秒数
+
+    Raises:
+        DeadlineExceededError: 制限時刻を過ぎている場合
+    """
+    connect = connect if connect is not None and connect > 0 else None
+    read = read if read is not None and read > 0 else None
+    left = remaining()
+    if left is None:
+        return connect, read
+    if left <= 0:
+        raise DeadlineExceededError(stage)
+    return (
+        left if connect is None else min(connect, left),
+        left if read is None else min(read, left),
+    )
@@ -0,0 +1,260 @@
+"""同じ内容のメッセージの重複送信を抑止するモジュール
+
+(bot_id, user_id, content) のハッシュを送信時刻とともに記録し、一定時間（ウィンドウ）内に
+同じメッセージが再送されようとした場合は、HTTPリクエスト・レート制限・ログ出力の前に破棄します。
+記録はメモリ上の上限付きの辞書で保持し、必要に応じて SQLite に永続化して再起動後も引き継ぎます。
+
+送信前に reserve で予約し、送信に成功したら confirm、失敗したら forget を呼び出します。
+重複として破棄するのは送信に成功した（confirm 済みの）メッセージのみで、同じメッセージの送信中に
+reserve した場合は結果を待ち、失敗していれば代わりに送信します。
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Union
+
+from config.settings import DEDUP_WINDOW, DEDUP_MAX_ENTRIES, DEDUP_PATH
+from .deadline import DeadlineExceededError, remaining
+from .metrics import DEDUP_RESULTS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dedup (
+    fingerprint BLOB PRIMARY KEY,
+    sent_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dedup_sent_at ON dedup (sent_at);
+"""
+
+# 永続化先から期限切れの記録を削除する間隔（記録件数）
+_PURGE_INTERVAL = 1000
+
+
+def fingerprint(bot_id: str, user_id: str, content: Union[Dict[str, Any], bytes]) -> bytes:
+    """メッセージを識別するハッシュ値を返します。
+
+    Args:
+        bot_id: ボットID
+        user_id: 送信先ユーザーID
+        content: メッセージコンテンツ、またはシリアライズ済みのボディ
+
+    Returns:
+        bytes: 16バイトのハッシュ値（キーの順序が異なる同じ内容は同じ値）
+    """
+    if not isinstance(content, bytes):
+        content = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(bot_id.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(user_id.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(content)
+    return digest.digest()
+
+
+class DedupIndex:
+    """送信済みメッセージのハッシュを一定時間保持する重複判定インデックス"""
+
+    def __init__(
+        self,
+        window: float = DEDUP_WINDOW,
+        max_entries: int = DEDUP_MAX_ENTRIES,
+        path: Optional[str] = DEDUP_PATH or None
+    ):
+        """重複判定インデックスの初期化
+
+        Args:
+            window: 同じメッセージを重複とみなす秒数（最初の送信時刻から数える）
+            max_entries: メモリに保持する件数の上限（超えた場合は古いものから破棄）
+            path: 永続化先の SQLite データベースファイルのパス（Noneの場合はメモリのみ）
+        """
+        self.window = window
+        self.max_entries = max_entries
+        self.path = path
+        self._lock = threading.Lock()
+        # 送信中のメッセージの結果（confirm / forget）を待つための条件変数
+        self._cond = threading.Condition(self._lock)
+        # 送信時刻の昇順に並ぶ（重複時に時刻を更新しないため、先頭が常に最も古い）
+        self._entries: 'OrderedDict[bytes, float]' = OrderedDict()
+        # 予約済みで送信中のメッセージ
+        self._pending: Set[bytes] = set()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._since_purge = 0
+        self.duplicates = 0
+        self.recorded = 0
+
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(_SCHEMA)
+            self._load()
+
+    def reserve(
+        self,
+        bot_id: str,
+        user_id: str,
+        content: Union[Dict[str, Any], bytes],
+        timeout: Optional[float] = None
+    ) -> bool:
+        """メッセージが重複かどうかを判定し、重複でなければ送信中として予約します。
+
+        予約した場合は、送信に成功したら confirm、失敗したら forget を必ず呼び出してください。
+        同じメッセージを送信中の場合は、その結果が出るまで待ちます（失敗した場合はこちらで予約します）。
+
+        Args:
+            bot_id: ボットID
+            user_id: 送信先ユーザーID
+            content: メッセージコンテンツ、またはシリアライズ済みのボディ
+            timeout: 送信中の結果を待つ最大秒数（省略時は呼び出し全体の残り時間、制限がなければ無制限）
+
+        Returns:
+            bool: ウィンドウ内に同じメッセージを送信済みの場合はTrue（送信しない）
+
+        Raises:
+            DeadlineExceededError: 送信中の同じメッセージの結果が待機時間内に出なかった場合（予約しない）
+        """
+        key = fingerprint(bot_id, user_id, content)
+        if timeout is None:
+            timeout = remaining()
+        wait_until = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self._expire(time.time())
+                if key in self._entries:
+                    self.duplicates += 1
+                    DEDUP_RESULTS.inc(result='duplicate')
+                    return True
+                if key not in self._pending:
+                    self._pending.add(key)
+                    return False
+                left = None if wait_until is None else wait_until - time.monotonic()
+                if left is not None and left <= 0:
+                    raise DeadlineExceededError('dedup')
+                self._cond.wait(left)
+
+    def confirm(self, bot_id: str, user_id: str, content: Union[Dict[str, Any], bytes]) -> None:
+        """予約したメッセージを送信済みとして記録します（ウィンドウ内の同じメッセージは重複になる）。
+
+        Args:
+            bot_id: ボットID
+            user_id: 送信先ユーザーID
+            content: メッセージコンテンツ、またはシリアライズ済みのボディ
+        """
+        key = fingerprint(bot_id, user_id, content)
+        now = time.time()
+        with self._cond:
+            self._pending.discard(key)
+            self._entries[key] = now
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.recorded += 1
+            DEDUP_RESULTS.inc(result='unique')
+            if self._conn is not None:
+                self._conn.execute('INSERT OR REPLACE INTO dedup (fingerprint, sent_at) VALUES (?, ?)', (key, now))
+                self._since_purge += 1
+                if self._since_purge >= _PURGE_INTERVAL:
+                    self._since_purge = 0
+                    self._conn.execute('DELETE FROM dedup WHERE sent_at < ?', (now - self.window,))
+            self._cond.notify_all()
+
+    def check_and_record(self, bot_id: str, user_id: str, content: Union[Dict[str, Any], bytes]) -> bool:
+        """メッセージが重複かどうかを判定し、重複でなければ直ちに送信済みとして記録します。
+
+        送信キューへの追加など、受け付けた時点で配送が保証される場合に使用します。
+
+        Args:
+            bot_id: ボットID
+            user_id: 送信先ユーザーID
+            content: メッセージコンテンツ、またはシリアライズ済みのボディ
+
+        Returns:
+            bool: ウィンドウ内に同じメッセージが記録済みの場合はTrue（送信しない）
+        """
+        if self.reserve(bot_id, user_id, content):
+            return True
+        self.confirm(bot_id, user_id, content)
+        return False
+
+    def forget(self, bot_id: str, user_id: str, content: Union[Dict[str, Any], bytes]) -> None:
+        """予約または記録を取り消します（送信に失敗したメッセージを再送できるようにする）。
+
+        Args:
+            bot_id: ボットID
+            user_id: 送信先ユーザーID
+            content: メッセージコンテンツ、またはシリアライズ済みのボディ
+        """
+        key = fingerprint(bot_id, user_id, content)
+        with self._cond:
+            self._pending.discard(key)
+            self._entries.pop(key, None)
+            if self._conn is not None:
+                self._conn.execute('DELETE FROM dedup WHERE fingerprint = ?', (key,))
+            self._cond.notify_all()
+
+    def clear(self) -> None:
+        """すべての記録を破棄します。"""
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute('DELETE FROM dedup')
+
+    def stats(self) -> Dict[str, int]:
+        """統計情報（保持件数、記録件数、抑止した重複件数、送信中の件数）を返します。"""
+        with self._lock:
+            return {
+                'size': len(self._entries), 'recorded': self.recorded, 'duplicates': self.duplicates,
+                'pending': len(self._pending),
+            }
+
+    def close(self) -> None:
+        """永続化先のデータベース接続を閉じます。"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _expire(self, now: float) -> None:
+        """ウィンドウを過ぎた記録を先頭から破棄する（ロック取得済みで呼び出す）"""
+        threshold = now - self.window
+        entries = self._entries
+        while entries:
+            key, sent_at = next(iter(entries.items()))
+            if sent_at >= threshold:
+                break
+            entries.popitem(last=False)
+
+    def _load(self) -> None:
+        """永続化先からウィンドウ内の記録を読み込む"""
+        threshold = time.time() - self.window
+        self._conn.execute('DELETE FROM dedup WHERE sent_at < ?', (threshold,))
+        rows = self._conn.execute(
+            'SELECT fingerprint, sent_at FROM dedup ORDER BY sent_at DESC LIMIT ?', (self.max_entries,)
+        ).fetchall()
+        for key, sent_at in reversed(rows):
+            self._entries[bytes(key)] = sent_at
+
+
+_dedup_index: Optional[DedupIndex] = None
+_dedup_index_lock = threading.Lock()
+
+
+def get_dedup_index() -> Optional[DedupIndex]:
+    """プロセス全体で共有する重複判定インデックスを返します。
+
+    Returns:
+        Optional[DedupIndex]: 共有インデックス（DEDUP_WINDOW が0以下の場合はNone）
+    """
+    global _dedup_index
+    if DEDUP_WINDOW <= 0:
+        return None
+    index = _dedup_index
+    if index is None:
+        with _dedup_index_lock:
+            if _dedup_index is None:
+                _dedup_index = DedupIndex()
+            index = _dedup_index
+    return index
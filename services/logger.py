@@ -1,9 +1,258 @@
 """ロギング機能を提供するモジュール"""
+import atexit
+import contextlib
+import contextvars
+import json
 import logging
 import os
+import queue
+import random
 import sys
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+import threading
+import time
+import uuid
+from logging.handlers import QueueHandler, RotatingFileHandler
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from config.settings import (
+    LOG_LEVEL, LOG_FORMAT, LOG_ASYNC, LOG_QUEUE_SIZE, LOG_OVERFLOW_POLICY, LOG_SAMPLE_RATE,
+    LOG_BATCH_SIZE
+)
+
+OVERFLOW_POLICIES = ('block', 'drop', 'sample')
+
+# 送信処理ごとの相関ID（スレッド・タスク単位で引き継がれる）
+_correlation_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    'correlation_id', default=None
+)
+
+
+def get_correlation_id() -> Optional[str]:
+    """現在の相関IDを返します。
+
+    Returns:
+        Optional[str]: 相関ID（未設定の場合はNone）
+    """
+    return _correlation_id.get()
+
+
+@contextlib.contextmanager
+def correlation_scope(correlation_id: Optional[str] = None) -> Iterator[str]:
+    """ブロック内のログに相関IDを付与します。
+
+    既に相関IDが設定されている場合は、引数を省略するとそれを引き継ぎます。
+
+    Args:
+        correlation_id: 使用する相関ID（省略時は既存のIDか新規ID）
+
+    Yields:
+        str: 有効な相関ID
+    """
+    if correlation_id is None:
+        correlation_id = _correlation_id.get() or uuid.uuid4().hex
+    token = _correlation_id.set(correlation_id)
+    try:
+        yield correlation_id
+    finally:
+        _correlation_id.reset(token)
+
+
+class CorrelationIdFilter(logging.Filter):
+    """ログレコードに現在の相関IDを付与するフィルター"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = _correlation_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """ログレコードを1行のJSONに変換するフォーマッター
+
+    extra で渡された項目（bot_id, status, duration_ms など）もそのまま出力します。
+    """
+
+    # LogRecord が標準で持つ属性（extra の判別に使用）
+    _RESERVED = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {
+        'message', 'asctime', 'correlation_id'
+    }
+
+    def __init__(self):
+        super().__init__()
+        self._encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=str)
+        # (秒, 秒までの文字列) の組を1回の代入で差し替える（複数スレッドから書式化されるため）
+        self._cached = (-1, '')
+
+    def _timestamp(self, created: float) -> str:
+        """ISO 8601形式のタイムスタンプを返す（秒部分は1秒ごとにキャッシュ）"""
+        second = int(created)
+        cached_second, prefix = self._cached
+        if second != cached_second:
+            prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second))
+            self._cached = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1000):03d}"
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self._timestamp(record.created),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        correlation_id = getattr(record, 'correlation_id', None)
+        if correlation_id is not None:
+            entry['correlation_id'] = correlation_id
+        for key, value in record.__dict__.items():
+            if key not in self._RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return self._encoder.encode(entry)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """上限付きキューにログレコードを積むハンドラー
+
+    キューが埋まった場合の挙動は overflow_policy で指定します：
+    - block: 空きができるまで待機する（ログは失われない）
+    - drop: 積めなかったレコードを破棄する
+    - sample: キューが半分以上埋まったら WARNING 未満のレコードを sample_rate の割合だけ残す
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        overflow_policy: str = 'block',
+        sample_rate: float = 0.1
+    ):
+        """ハンドラーの初期化
+
+        Args:
+            log_queue: ログレコードを積むキュー
+            overflow_policy: キューが埋まった場合の挙動（'block', 'drop', 'sample'）
+            sample_rate: sample 指定時に残すレコードの割合
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"サポートされていないオーバーフローポリシー: {overflow_policy}")
+        super().__init__(log_queue)
+        self.overflow_policy = overflow_policy
+        self.sample_rate = sample_rate
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    @property
+    def dropped(self) -> int:
+        """破棄したレコード数"""
+        return self._dropped
+
+    def _drop(self) -> None:
+        """破棄したレコード数を数える（複数スレッドから呼ばれるためロックを取る）"""
+        with self._dropped_lock:
+            self._dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """書式化は書き込み側のスレッドで行うため、レコードをそのまま積む"""
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """オーバーフローポリシーに従ってレコードをキューに積む"""
+        if self.overflow_policy == 'block':
+            self.queue.put(record)
+            return
+
+        if self.overflow_policy == 'sample' and record.levelno < logging.WARNING:
+            maxsize = self.queue.maxsize
+            if maxsize and self.queue.qsize() * 2 >= maxsize and random.random() >= self.sample_rate:
+                self._drop()
+                return
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._drop()
+
+
+class BatchQueueListener:
+    """キューからログレコードをまとめて取り出し、ハンドラーへ書き込むリスナー
+
+    ストリーム系のハンドラーにはバッチ単位で書き込み、flush もバッチごとに1回だけ行います。
+    """
+
+    _SENTINEL = None
+
+    def __init__(self, log_queue: queue.Queue, handlers: List[logging.Handler], batch_size: int = 100):
+        """リスナーの初期化
+
+        Args:
+            log_queue: ログレコードを取り出すキュー
+            handlers: 書き込み先のハンドラー
+            batch_size: 1回にまとめて書き込む最大レコード数
+        """
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """書き込みスレッドを起動する"""
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """キューに残ったレコードを書き込んでからスレッドを停止する"""
+        if self._thread is None:
+            return
+        self.queue.put(self._SENTINEL)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        """書き込みスレッドのメインループ"""
+        while True:
+            record = self.queue.get()
+            batch = []
+            stop = record is self._SENTINEL
+            if not stop:
+                batch.append(record)
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is self._SENTINEL:
+                    stop = True
+                else:
+                    batch.append(record)
+            if batch:
+                for handler in self.handlers:
+                    self._emit_batch(handler, batch)
+            if stop:
+                return
+
+    @staticmethod
+    def _emit_batch(handler: logging.Handler, records: List[logging.LogRecord]) -> None:
+        """ハンドラーへレコードをまとめて書き込む"""
+        if not isinstance(handler, logging.StreamHandler):
+            for record in records:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+            return
+
+        handler.acquire()
+        try:
+            for record in records:
+                if record.levelno < handler.level or not handler.filter(record):
+                    continue
+                try:
+                    if isinstance(handler, RotatingFileHandler) and handler.shouldRollover(record):
+                        handler.doRollover()
+                    if handler.stream is None and isinstance(handler, logging.FileHandler):
+                        handler.stream = handler._open()
+                    handler.stream.write(handler.format(record) + handler.terminator)
+                except Exception:
+                    handler.handleError(record)
+            handler.flush()
+        finally:
+            handler.release()
 
 
 class Logger:
@@ -22,16 +271,24 @@ class Logger:
         """初期化メソッド（シングルトンのため一度のみ実行）"""
         if not Logger._initialized:
             self._logger = logging.getLogger('lineworks_bot')
-            self._logger.setLevel(logging.INFO)
+            self._logger.setLevel(logging.getLevelName(LOG_LEVEL))
+            self._logger.addFilter(CorrelationIdFilter())
+            self._listener: Optional[BatchQueueListener] = None
+            self._queue_handler: Optional[BoundedQueueHandler] = None
             self._setup_handlers()
             Logger._initialized = True
+            if LOG_ASYNC:
+                self.enable_async()
 
     def _setup_handlers(self) -> None:
         """ログハンドラーの設定"""
-        # フォーマッタを作成
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+        # フォーマッタを作成（LOG_FORMAT=json の場合は構造化ログ）
+        if LOG_FORMAT == 'json':
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
 
         # コンソールハンドラー
         console_handler = logging.StreamHandler(sys.stdout)
@@ -48,47 +305,165 @@ class Logger:
             file_handler.setFormatter(formatter)
             self._logger.addHandler(file_handler)
 
-    def info(self, message: str) -> None:
+    def enable_async(
+        self,
+        max_queue: int = LOG_QUEUE_SIZE,
+        overflow_policy: str = LOG_OVERFLOW_POLICY,
+        sample_rate: float = LOG_SAMPLE_RATE,
+        batch_size: int = LOG_BATCH_SIZE
+    ) -> None:
+        """ログの書き込みを専用スレッドへ移し、呼び出し元がI/Oを待たないようにする
+
+        Args:
+            max_queue: キューに保持する最大レコード数
+            overflow_policy: キューが埋まった場合の挙動（'block', 'drop', 'sample'）
+            sample_rate: sample 指定時に残すレコードの割合
+            batch_size: 1回にまとめて書き込む最大レコード数
+        """
+        if self._listener is not None:
+            return
+        log_queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        queue_handler = BoundedQueueHandler(log_queue, overflow_policy, sample_rate)
+
+        handlers = list(self._logger.handlers)
+        for handler in handlers:
+            self._logger.removeHandler(handler)
+        self._logger.addHandler(queue_handler)
+
+        self._queue_handler = queue_handler
+        self._listener = BatchQueueListener(log_queue, handlers, batch_size)
+        self._listener.start()
+        atexit.register(self.disable_async)
+
+    def disable_async(self) -> None:
+        """キューに残ったログを書き込み、同期書き込みに戻す"""
+        if self._listener is None:
+            return
+        listener, self._listener = self._listener, None
+        self._logger.removeHandler(self._queue_handler)
+        self._queue_handler = None
+        listener.stop()
+        for handler in listener.handlers:
+            self._logger.addHandler(handler)
+        atexit.unregister(self.disable_async)
+
+    def stats(self) -> Dict[str, int]:
+        """非同期ログのキュー状況を返す
+
+        Returns:
+            Dict[str, int]: キュー内のレコード数と破棄したレコード数
+        """
+        if self._queue_handler is None:
+            return {'queued': 0, 'dropped': 0}
+        return {
+            'queued': self._queue_handler.queue.qsize(),
+            'dropped': self._queue_handler.dropped,
+        }
+
+    def is_enabled_for(self, level: int) -> bool:
+        """指定レベルのログが出力されるかどうかを返す
+
+        引数の生成自体が重い場合（ペイロードのダンプなど）のガードに使用します。
+
+        Args:
+            level: ログレベル（logging.DEBUG など）
+
+        Returns:
+            bool: 出力される場合はTrue
+        """
+        return self._logger.isEnabledFor(level)
+
+    def set_level(self, level: Union[int, str]) -> None:
+        """ログレベルを変更する
+
+        Args:
+            level: ログレベル（logging.DEBUG や 'DEBUG' など）
+        """
+        self._logger.setLevel(level)
+
+    def info(self, message: str, *args: Any, **kwargs: Any) -> None:
         """情報レベルのログを記録
 
+        メッセージは %-形式で指定し、引数の書式化はログが出力される場合のみ行われます。
+
         Args:
-            message: ログメッセージ
+            message: ログメッセージ（例：'ユーザー %s へ送信'）
+            *args: メッセージに埋め込む引数
+            **kwargs: logging に渡すキーワード引数（extra など）
         """
-        self._logger.info(message)
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info(message, *args, **kwargs)
 
-    def debug(self, message: str) -> None:
+    def debug(self, message: str, *args: Any, **kwargs: Any) -> None:
         """デバッグレベルのログを記録
 
         Args:
             message: ログメッセージ
+            *args: メッセージに埋め込む引数
+            **kwargs: logging に渡すキーワード引数
         """
-        self._logger.debug(message)
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug(message, *args, **kwargs)
 
-    def warning(self, message: str) -> None:
+    def warning(self, message: str, *args: Any, **kwargs: Any) -> None:
         """警告レベルのログを記録
 
         Args:
             message: ログメッセージ
+            *args: メッセージに埋め込む引数
+            **kwargs: logging に渡すキーワード引数
         """
-        self._logger.warning(message)
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._logger.warning(message, *args, **kwargs)
 
-    def error(self, message: str, exc_info: Optional[Exception] = None) -> None:
+    def error(
+        self,
+        message: str,
+        *args: Any,
+        exc_info: Optional[Exception] = None,
+        **kwargs: Any
+    ) -> None:
         """エラーレベルのログを記録
 
         Args:
             message: ログメッセージ
+            *args: メッセージに埋め込む引数
             exc_info: 例外情報（オプション）
+            **kwargs: logging に渡すキーワード引数
         """
-        self._logger.error(message, exc_info=exc_info)
+        if self._logger.isEnabledFor(logging.ERROR):
+            args, exc_info = self._split_exc_info(message, args, exc_info)
+            self._logger.error(message, *args, exc_info=exc_info, **kwargs)
 
-    def critical(self, message: str, exc_info: Optional[Exception] = None) -> None:
+    def critical(
+        self,
+        message: str,
+        *args: Any,
+        exc_info: Optional[Exception] = None,
+        **kwargs: Any
+    ) -> None:
         """クリティカルレベルのログを記録
 
         Args:
             message: ログメッセージ
+            *args: メッセージに埋め込む引数
             exc_info: 例外情報（オプション）
+            **kwargs: logging に渡すキーワード引数
         """
-        self._logger.critical(message, exc_info=exc_info)
+        if self._logger.isEnabledFor(logging.CRITICAL):
+            args, exc_info = self._split_exc_info(message, args, exc_info)
+            self._logger.critical(message, *args, exc_info=exc_info, **kwargs)
+
+    @staticmethod
+    def _split_exc_info(
+        message: str,
+        args: Tuple[Any, ...],
+        exc_info: Optional[Exception]
+    ) -> Tuple[Tuple[Any, ...], Optional[Exception]]:
+        """従来の error(message, exc) 形式の呼び出しを exc_info として扱う"""
+        if exc_info is None and len(args) == 1 and isinstance(args[0], BaseException) and '%' not in message:
+            return (), args[0]
+        return args, exc_info
 
 
 # シングルトンインスタンスをエクスポート
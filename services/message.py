@@ -1,10 +1,52 @@
 """メッセージ送信関連の処理を管理するモジュール"""
-from typing import Dict, Any
+import atexit
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Optional
 
 from .api import APIClient
+from .coalesce import MessageCoalescer
 from .logger import logger
 
-def send_message(content: Dict[str, Any], bot_id: str, user_id: str, access_token: str) -> Dict[str, Any]:
+_coalescer: Optional[MessageCoalescer] = None
+_coalescer_lock = threading.Lock()
+
+# トークン再取得関数（テナントのトークン管理）ごとのAPIクライアント
+_api_clients: Dict[Optional[Callable[[str], Optional[str]]], APIClient] = {}
+_api_clients_lock = threading.Lock()
+
+
+def _get_api_client(
+    access_token: str,
+    token_refresher: Optional[Callable[[str], Optional[str]]] = None
+) -> APIClient:
+    """トークン再取得関数ごとのAPIクライアントを返します（共有セッションを利用）。
+
+    テナントごとに1つのクライアントを保持し、アクセストークンが変わった場合のみ作り直すため、
+    テナント数に関わらずクライアント（準備済みリクエストなど）が追い出されることはありません。
+
+    Args:
+        access_token: アクセストークン
+        token_refresher: 401応答時にトークンを再取得する関数
+
+    Returns:
+        APIClient: APIクライアント
+    """
+    with _api_clients_lock:
+        client = _api_clients.get(token_refresher)
+        if client is None or client.access_token != access_token:
+            client = APIClient(access_token, token_refresher=token_refresher)
+            _api_clients[token_refresher] = client
+        return client
+
+
+def send_message(
+    content: Dict[str, Any],
+    bot_id: str,
+    user_id: str,
+    access_token: str,
+    token_refresher: Optional[Callable[[str], Optional[str]]] = None
+) -> Dict[str, Any]:
     """ボットメッセージを送信します。
 
     Args:
@@ -12,6 +54,7 @@ def send_message(content: Dict[str, Any], bot_id: str, user_id: str, access_toke
         bot_id: ボットのID
         user_id: 送信先ユーザーID
         access_token: アクセストークン
+        token_refresher: 401応答時にトークンを再取得する関数（省略可）
 
     Returns:
         Dict[str, Any]: APIレスポンス
@@ -20,8 +63,52 @@ def send_message(content: Dict[str, Any], bot_id: str, user_id: str, access_toke
         requests.exceptions.RequestException: APIリクエストが失敗した場合
         requests.exceptions.ConnectionError: ネットワークエラーが発生した場合
     """
-    logger.info(f"メッセージ送信開始: ユーザー {user_id}")
+    logger.info("メッセージ送信開始: ユーザー %s", user_id)
     
-    # APIクライアントを初期化してメッセージ送信
-    api_client = APIClient(access_token)
+    # 共有セッションを利用するAPIクライアントでメッセージ送信
+    api_client = _get_api_client(access_token, token_refresher)
     return api_client.send_bot_message(bot_id, user_id, content)
+
+
+def get_coalescer() -> MessageCoalescer:
+    """プロセス全体で共有するメッセージコアレッサーを返します。
+
+    プロセス終了時には送信待ちのメッセージを送信してから終了します。
+
+    Returns:
+        MessageCoalescer: send_message で送信する共有コアレッサー（初回呼び出し時に作成）
+    """
+    global _coalescer
+    coalescer = _coalescer
+    if coalescer is None:
+        with _coalescer_lock:
+            if _coalescer is None:
+                _coalescer = MessageCoalescer(send_message)
+                atexit.register(_coalescer.close)
+            coalescer = _coalescer
+    return coalescer
+
+
+def send_message_coalesced(
+    content: Dict[str, Any],
+    bot_id: str,
+    user_id: str,
+    access_token: str,
+    token_refresher: Optional[Callable[[str], Optional[str]]] = None
+) -> Future:
+    """同じユーザーへの短時間の連続メッセージをまとめて送信します。
+
+    メッセージは COALESCE_WINDOW 秒まで溜められ、テキストメッセージは改行で連結して
+    1回の send_message で送信されます。
+
+    Args:
+        content: メッセージの内容
+        bot_id: ボットのID
+        user_id: 送信先ユーザーID
+        access_token: アクセストークン
+        token_refresher: 401応答時にトークンを再取得する関数（省略可）
+
+    Returns:
+        Future: APIレスポンス（送信失敗時は例外）を結果とする Future
+    """
+    return get_coalescer().submit(content, bot_id, user_id, access_token, token_refresher)
@@ -0,0 +1,432 @@
+"""送信処理の計測値（カウンター・ヒストグラム）を管理するモジュール
+
+計測値はスレッドごとのシャードに書き込むため、記録時にロックを取りません。
+読み出し時（スナップショット・Prometheus形式の出力）にシャードを集計します。
+終了したスレッドのシャードは集計済みの値に合算して破棄します（スレッドプールを作り直してもシャードは増え続けません）。
+"""
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    """計測値の基底クラス（スレッドごとのシャードを管理する）"""
+
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """計測値の初期化
+
+        Args:
+            name: 計測値の名前
+            documentation: 説明
+            labelnames: ラベル名
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        # 終了したスレッドのシャードを合算した値
+        self._retired: dict = {}
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        """呼び出し元スレッド専用のシャードを返す（初回のみロックを取る）"""
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = {}
+            with self._lock:
+                self._retire_dead()
+                self._shards.append((threading.current_thread(), shard))
+            self._local.shard = shard
+        return shard
+
+    def _retire_dead(self) -> None:
+        """終了したスレッドのシャードを合算して破棄する（ロックを取得して呼び出す）"""
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                # 終了したスレッドはもう書き込まないため、そのまま合算できる
+                for key, value in shard.items():
+                    self._retired[key] = self._merge(self._retired.get(key), value)
+        self._shards = alive
+
+    def _merge(self, total, value):
+        """合算済みの値にシャードの値を加える"""
+        return value if total is None else total + value
+
+    def _label_values(self, labels: Dict[str, object]) -> LabelValues:
+        """ラベルの値を定義順のタプルに変換する"""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"ラベルが一致しません: {sorted(labels)} != {sorted(self.labelnames)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _copy_shards(self) -> List[dict]:
+        """集計用にシャードの複製を返す"""
+        with self._lock:
+            self._retire_dead()
+            shards = [shard for _, shard in self._shards]
+            retired = dict(self._retired)
+        return [retired] + [dict(shard) for shard in shards]
+
+    def _format_labels(self, values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        """Prometheus形式のラベル文字列を作成する"""
+        pairs = list(zip(self.labelnames, values))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def reset(self) -> None:
+        """全シャードの値を破棄する（テスト用）"""
+        with self._lock:
+            for _, shard in self._shards:
+                shard.clear()
+            self._retired.clear()
+
+
+class Counter(_Metric):
+    """単調増加するカウンター"""
+
+    metric_type = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        """カウンターを加算する
+
+        Args:
+            amount: 加算値
+            **labels: ラベルの値
+        """
+        key = self._label_values(labels)
+        shard = self._shard()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def collect(self) -> Dict[LabelValues, float]:
+        """ラベルごとの合計値を返す"""
+        totals: Dict[LabelValues, float] = {}
+        for shard in self._copy_shards():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def expose(self) -> List[str]:
+        """Prometheus形式の行を返す"""
+        return [
+            f"{self.name}{self._format_labels(key)} {_format_value(value)}"
+            for key, value in sorted(self.collect().items())
+        ]
+
+
+class Histogram(_Metric):
+    """値の分布を記録するヒストグラム"""
+
+    metric_type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """ヒストグラムの初期化
+
+        Args:
+            name: 計測値の名前
+            documentation: 説明
+            labelnames: ラベル名
+            buckets: バケットの上限値（昇順）
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: object) -> None:
+        """値を記録する
+
+        Args:
+            value: 記録する値
+            **labels: ラベルの値
+        """
+        key = self._label_values(labels)
+        shard = self._shard()
+        state = shard.get(key)
+        if state is None:
+            # [バケットごとの件数..., +Inf の件数, 合計値]
+            state = [0] * (len(self.buckets) + 1) + [0.0]
+            shard[key] = state
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def _merge(self, total, value):
+        """合算済みのバケット件数・合計値にシャードの値を加える"""
+        return list(value) if total is None else [a + b for a, b in zip(total, value)]
+
+    def collect(self) -> Dict[LabelValues, Dict[str, object]]:
+        """ラベルごとのバケット件数（累積）・件数・合計値を返す"""
+        merged: Dict[LabelValues, List[float]] = {}
+        for shard in self._copy_shards():
+            for key, state in shard.items():
+                state = list(state)
+                total = merged.get(key)
+                if total is None:
+                    merged[key] = state
+                else:
+                    merged[key] = [a + b for a, b in zip(total, state)]
+
+        result = {}
+        for key, state in merged.items():
+            cumulative = []
+            running = 0
+            for count in state[:-1]:
+                running += count
+                cumulative.append(running)
+            result[key] = {
+                'buckets': dict(zip([*self.buckets, float('inf')], cumulative)),
+                'count': running,
+                'sum': state[-1],
+            }
+        return result
+
+    def expose(self) -> List[str]:
+        """Prometheus形式の行を返す"""
+        lines = []
+        for key, data in sorted(self.collect().items()):
+            for bound, count in data['buckets'].items():
+                le = '+Inf' if bound == float('inf') else _format_value(bound)
+                lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', le))} {count}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_format_value(data['sum'])}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {data['count']}")
+        return lines
+
+
+class Gauge(_Metric):
+    """現在値を表すゲージ（値は出力時に関数から取得する）"""
+
+    metric_type = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """ゲージの初期化
+
+        Args:
+            name: 計測値の名前
+            documentation: 説明
+            labelnames: ラベル名（指定した場合、関数はラベル値のタプルから値への辞書を返す）
+        """
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], object]] = None
+        self._values: Dict[LabelValues, float] = {(): 0.0} if not self.labelnames else {}
+
+    def set(self, value: float, **labels: object) -> None:
+        """現在値を設定する
+
+        Args:
+            value: 現在値
+            **labels: ラベルの値
+        """
+        self._values[self._label_values(labels)] = value
+
+    def set_function(self, function: Optional[Callable[[], object]]) -> None:
+        """出力時に現在値を取得する関数を設定する
+
+        Args:
+            function: 現在値（ラベルがある場合はラベル値のタプルから値への辞書）を返す関数（None で解除）
+        """
+        self._function = function
+
+    def collect(self) -> Dict[LabelValues, float]:
+        """現在値を返す"""
+        if self._function is not None:
+            try:
+                value = self._function()
+                if self.labelnames:
+                    return {tuple(str(item) for item in key): float(item_value)
+                            for key, item_value in value.items()}
+                return {(): float(value)}
+            except Exception:
+                return {}
+        return dict(self._values)
+
+    def expose(self) -> List[str]:
+        """Prometheus形式の行を返す"""
+        return [
+            f"{self.name}{self._format_labels(key)} {_format_value(value)}"
+            for key, value in sorted(self.collect().items())
+        ]
+
+
+def _escape(value: str) -> str:
+    """Prometheus形式のラベル値をエスケープする"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    """Prometheus形式の数値文字列を作成する"""
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """計測値を登録し、まとめて出力するレジストリ"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        """同名の計測値があればそれを返し、なければ登録する"""
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """カウンターを登録して返す"""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """ヒストグラムを登録して返す"""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """ゲージを登録して返す"""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """全計測値の現在値を辞書で返す
+
+        Returns:
+            Dict[str, Dict[str, object]]: 計測値名ごとの {'type', 'values'}
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {
+                'type': metric.metric_type,
+                'values': {
+                    ','.join(f"{name}={value}" for name, value in zip(metric.labelnames, key)): data
+                    for key, data in metric.collect().items()
+                },
+            }
+            for metric in metrics
+        }
+
+    def export_prometheus(self) -> str:
+        """全計測値を Prometheus のテキスト形式で返す
+
+        Returns:
+            str: Prometheus テキスト形式（text/plain; version=0.0.4）
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            lines.extend(metric.expose())
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        """全計測値をリセットする（テスト用）"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Prometheus から取得できるよう、/metrics を公開するHTTPサーバーを起動します。
+
+    Args:
+        port: 待ち受けポート
+        host: 待ち受けアドレス
+
+    Returns:
+        ThreadingHTTPServer: 起動したサーバー（shutdown() で停止）
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.export_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
+
+
+# プロセス全体で共有するレジストリ
+registry = MetricsRegistry()
+
+API_REQUESTS = registry.counter(
+    'lineworks_api_requests_total', 'LINEWORKS API requests by endpoint and status',
+    ('endpoint', 'method', 'status')
+)
+API_REQUEST_DURATION = registry.histogram(
+    'lineworks_api_request_duration_seconds', 'LINEWORKS API request latency including retries',
+    ('endpoint',)
+)
+API_RETRIES = registry.counter(
+    'lineworks_api_retries_total', 'LINEWORKS API request retries by reason', ('endpoint', 'reason')
+)
+TOKEN_REQUESTS = registry.counter(
+    'lineworks_token_requests_total', 'Access token requests by result', ('result',)
+)
+TOKEN_REQUEST_DURATION = registry.histogram(
+    'lineworks_token_request_duration_seconds', 'Access token request latency'
+)
+TOKEN_CACHE = registry.counter(
+    'lineworks_token_cache_total', 'Access token cache lookups by result', ('result',)
+)
+PRIVATE_KEY_LOAD_DURATION = registry.histogram(
+    'lineworks_private_key_load_duration_seconds', 'Private key load and parse latency',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+BOT_INFO_CACHE = registry.counter(
+    'lineworks_bot_info_cache_total', 'Bot info cache lookups by result', ('result',)
+)
+COALESCED_MESSAGES = registry.counter(
+    'lineworks_coalesced_messages_total', 'Messages submitted to and API calls made by the coalescer', ('stage',)
+)
+DEDUP_RESULTS = registry.counter(
+    'lineworks_dedup_total', 'Deduplication checks by result', ('result',)
+)
+OUTBOX_DEPTH = registry.gauge('lineworks_outbox_depth', 'Undelivered messages in the outbox')
+CIRCUIT_STATE = registry.gauge(
+    'lineworks_circuit_state', 'Circuit breaker state by endpoint (0: closed, 1: half-open, 2: open)', ('endpoint',)
+)
+CIRCUIT_EVENTS = registry.counter(
+    'lineworks_circuit_events_total', 'Circuit breaker transitions and rejected calls', ('endpoint', 'event')
+)
+CALLBACK_EVENTS = registry.counter(
+    'lineworks_callback_events_total', 'Bot callback events received and handled by result', ('type', 'result')
+)
+CALLBACK_HANDLER_DURATION = registry.histogram(
+    'lineworks_callback_handler_duration_seconds', 'Bot callback handler latency including the reply', ('type',)
+)
@@ -0,0 +1,382 @@
+"""永続化された送信キュー（アウトボックス）を管理するモジュール
+
+メッセージは SQLite のジャーナルに記録してから送信されるため、
+プロセスがクラッシュしても未確認のメッセージはリース期間の経過後に再送されます（at-least-once）。
+同じファイルを複数のプロセスで共有でき、リース中のエントリは他のプロセスから取り出されません。
+"""
+import collections
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Any, List, Optional, Union
+
+from .api import APIClient, encode_message_body
+from .circuit import CircuitOpenError
+from .logger import logger, correlation_scope
+from .metrics import OUTBOX_DEPTH
+from config.settings import OUTBOX_PATH, OUTBOX_MAX_ATTEMPTS, OUTBOX_LEASE_SECONDS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    bot_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    body BLOB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_ready ON outbox (status, available_at);
+"""
+
+
+@dataclass
+class OutboxEntry:
+    """送信キューのエントリ"""
+
+    id: int
+    bot_id: str
+    user_id: str
+    body: bytes
+    attempts: int
+    # リースの期限（claim / renew で設定、リースを保持しているかの判定に使用）
+    lease_until: float = 0.0
+
+
+class Outbox:
+    """SQLite をジャーナルとする永続送信キュー"""
+
+    def __init__(
+        self,
+        path: str = OUTBOX_PATH,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        lease_seconds: float = OUTBOX_LEASE_SECONDS
+    ):
+        """送信キューの初期化
+
+        Args:
+            path: SQLite データベースファイルのパス
+            max_attempts: 配送を諦めるまでの最大試行回数
+            lease_seconds: 取り出したエントリを他のワーカー（他のプロセスを含む）から隠す秒数
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+
+        self._enqueue_latencies: Deque[float] = collections.deque(maxlen=1000)
+        self._acks: Deque[float] = collections.deque(maxlen=10000)
+        self.enqueued = 0
+        self.delivered = 0
+        self.dead = 0
+
+        # 前回プロセスで未確認のまま残ったエントリは、リース期間の経過後に claim で取り出される
+        # （起動時に戻すと、同じファイルを使用中の他のプロセスのリースを奪ってしまう）
+        OUTBOX_DEPTH.set_function(self.depth)
+
+    def close(self) -> None:
+        """データベース接続を閉じます。"""
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(
+        self,
+        bot_id: str,
+        user_id: str,
+        content: Union[Dict[str, Any], bytes]
+    ) -> int:
+        """メッセージを送信キューに追加します。
+
+        Args:
+            bot_id: ボットID
+            user_id: 送信先ユーザーID
+            content: メッセージコンテンツ、またはシリアライズ済みのボディ
+
+        Returns:
+            int: エントリID
+        """
+        start = time.perf_counter()
+        body = content if isinstance(content, bytes) else encode_message_body(content)
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT INTO outbox (bot_id, user_id, body, available_at, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (bot_id, user_id, body, now, now)
+            )
+            self.enqueued += 1
+            self._enqueue_latencies.append(time.perf_counter() - start)
+        return cursor.lastrowid
+
+    def claim(self, limit: int = 10) -> List[OutboxEntry]:
+        """送信可能なエントリを取り出し、リース期間中は他のワーカーから隠します。
+
+        Args:
+            limit: 取り出す最大件数
+
+        Returns:
+            List[OutboxEntry]: 取り出したエントリ
+        """
+        now = time.time()
+        with self._lock:
+            # 同じファイルを共有する他のプロセスが同じエントリを取り出さないよう、
+            # 書き込みロックを取ってから選択と更新を1つのトランザクションで行う
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, bot_id, user_id, body, attempts FROM outbox "
+                    "WHERE status IN ('pending', 'inflight') AND available_at <= ? "
+                    "ORDER BY id LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE outbox SET status = 'inflight', attempts = attempts + 1, "
+                        "available_at = ? WHERE id = ?",
+                        [(now + self.lease_seconds, row[0]) for row in rows]
+                    )
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+        return [
+            OutboxEntry(
+                id=row[0], bot_id=row[1], user_id=row[2], body=row[3], attempts=row[4] + 1,
+                lease_until=now + self.lease_seconds
+            )
+            for row in rows
+        ]
+
+    def renew(self, entry: OutboxEntry) -> bool:
+        """取り出したエントリのリースを延長します（送信の直前に呼び出す）。
+
+        リースが切れて他のワーカーに取り出された場合や、既に配送済みの場合は延長しません。
+
+        Args:
+            entry: 取り出したエントリ
+
+        Returns:
+            bool: リースを保持している場合はTrue（False の場合は送信しないでください）
+        """
+        lease_until = time.time() + self.lease_seconds
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET available_at = ? WHERE id = ? AND status = 'inflight' AND available_at = ?",
+                (lease_until, entry.id, entry.lease_until)
+            )
+        if cursor.rowcount == 0:
+            return False
+        entry.lease_until = lease_until
+        return True
+
+    def ack(self, entry_id: int) -> None:
+        """配送完了したエントリを削除します。
+
+        リースが切れて他のワーカーが取り出していた場合も削除します（そのワーカーは renew に失敗して送信しません）。
+
+        Args:
+            entry_id: エントリID
+        """
+        with self._lock:
+            self._conn.execute('DELETE FROM outbox WHERE id = ?', (entry_id,))
+            self.delivered += 1
+            self._acks.append(time.monotonic())
+
+    def nack(self, entry: OutboxEntry, error: str, retry_delay: float = 1.0) -> None:
+        """配送に失敗したエントリを再送待ちに戻します（上限到達時は dead にする）。
+
+        Args:
+            entry: 失敗したエントリ
+            error: エラー内容
+            retry_delay: 再送までの待機秒数
+        """
+        with self._lock:
+            # リースが切れて他のワーカーが取り出した場合は、そのワーカーの結果に任せる
+            if entry.attempts >= self.max_attempts:
+                cursor = self._conn.execute(
+                    "UPDATE outbox SET status = 'dead', last_error = ? "
+                    "WHERE id = ? AND status = 'inflight' AND available_at = ?",
+                    (error, entry.id, entry.lease_until)
+                )
+                if cursor.rowcount:
+                    self.dead += 1
+                    logger.error(
+                        "メッセージの配送を断念しました: ID %s ユーザー %s - %s", entry.id, entry.user_id, error
+                    )
+            else:
+                self._conn.execute(
+                    "UPDATE outbox SET status = 'pending', available_at = ?, last_error = ? "
+                    "WHERE id = ? AND status = 'inflight' AND available_at = ?",
+                    (time.time() + retry_delay, error, entry.id, entry.lease_until)
+                )
+
+    def defer(self, entry: OutboxEntry, delay: float, reason: str) -> None:
+        """エントリを試行回数に数えずに再送待ちに戻します（送信先の回路が開いている場合など）。
+
+        Args:
+            entry: 取り出したエントリ
+            delay: 再送までの待機秒数
+            reason: 延期の理由
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'pending', attempts = attempts - 1, available_at = ?, last_error = ? "
+                "WHERE id = ? AND status = 'inflight' AND available_at = ?",
+                (time.time() + delay, reason, entry.id, entry.lease_until)
+            )
+
+    def recover(self) -> int:
+        """リース期間が過ぎた未確認のエントリを再送待ちに戻します（リース中のエントリは変更しません）。
+
+        Returns:
+            int: 戻したエントリ数
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = 'pending', available_at = ? "
+                "WHERE status = 'inflight' AND available_at <= ?",
+                (now, now)
+            )
+            return cursor.rowcount
+
+    def depth(self) -> int:
+        """未配送のエントリ数を返します。
+
+        Returns:
+            int: キューの深さ
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status IN ('pending', 'inflight')"
+            ).fetchone()[0]
+
+    def stats(self, window: float = 60.0) -> Dict[str, float]:
+        """キューの統計情報を返します。
+
+        Args:
+            window: 配送レートを算出する期間（秒）
+
+        Returns:
+            Dict[str, float]: 深さ、エンキュー遅延、配送レートなど
+        """
+        depth = self.depth()
+        with self._lock:
+            latencies = sorted(self._enqueue_latencies)
+            cutoff = time.monotonic() - window
+            recent_acks = sum(1 for acked_at in self._acks if acked_at >= cutoff)
+            return {
+                'depth': depth,
+                'enqueued': self.enqueued,
+                'delivered': self.delivered,
+                'dead': self.dead,
+                'enqueue_latency_avg_us': (sum(latencies) / len(latencies) * 1e6) if latencies else 0.0,
+                'enqueue_latency_p99_us': (latencies[int(len(latencies) * 0.99)] * 1e6) if latencies else 0.0,
+                'drain_rate_per_sec': recent_acks / window,
+            }
+
+
+class OutboxWorkerPool:
+    """送信キューを APIClient 経由で配送するワーカースレッド群"""
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        client_factory: Callable[[], Optional[APIClient]],
+        workers: int = 4,
+        batch_size: int = 10,
+        poll_interval: float = 0.2,
+        retry_delay: float = 5.0
+    ):
+        """ワーカープールの初期化
+
+        Args:
+            outbox: 配送対象の送信キュー
+            client_factory: 有効なトークンを持つ APIClient を返す関数（取得失敗時はNone）
+            workers: ワーカースレッド数
+            batch_size: 1回に取り出すエントリ数
+            poll_interval: キューが空の場合の待機秒数
+            retry_delay: 配送失敗時に再送するまでの基準秒数
+        """
+        self.outbox = outbox
+        self._client_factory = client_factory
+        self._workers = workers
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._retry_delay = retry_delay
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """ワーカースレッドを起動します。"""
+        if self._threads:
+            return
+        self._stop.clear()
+        for index in range(self._workers):
+            thread = threading.Thread(
+                target=self._run, name=f'outbox-worker-{index}', daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info("送信キューのワーカーを %s 件起動しました", self._workers)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """ワーカースレッドを停止します（処理中のバッチは完了させます）。
+
+        Args:
+            timeout: 各スレッドの終了を待つ秒数
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def drain_once(self) -> int:
+        """キューからバッチを1回取り出して配送します。
+
+        Returns:
+            int: 処理したエントリ数
+        """
+        entries = self.outbox.claim(self._batch_size)
+        if not entries:
+            return 0
+
+        client = self._client_factory()
+        for entry in entries:
+            if client is None:
+                self.outbox.nack(entry, "アクセストークンの取得に失敗しました", self._retry_delay)
+                continue
+            # 前のエントリの送信中にリースが切れていないか確認し、送信の間リースを延長する
+            if not self.outbox.renew(entry):
+                logger.warning("リースが切れたため送信しません（他のワーカーが処理します）: ID %s", entry.id)
+                continue
+            with correlation_scope(f"outbox-{entry.id}"):
+                try:
+                    client.post_bot_message(entry.bot_id, entry.user_id, entry.body)
+                    self.outbox.ack(entry.id)
+                except CircuitOpenError as e:
+                    # 送信していないため試行回数に数えず、回路がハーフオープンになる頃に再送する
+                    self.outbox.defer(entry, e.retry_after, str(e))
+                except Exception as e:
+                    self.outbox.nack(
+                        entry, str(e) or type(e).__name__,
+                        self._retry_delay * (2 ** min(entry.attempts - 1, 6))
+                    )
+        return len(entries)
+
+    def _run(self) -> None:
+        """ワーカースレッドのメインループ"""
+        while not self._stop.is_set():
+            try:
+                if self.drain_once() == 0:
+                    self._stop.wait(self._poll_interval)
+            except Exception as e:
+                logger.error("送信キューの処理中にエラーが発生しました: %s", e, exc_info=e)
+                self._stop.wait(self._poll_interval)
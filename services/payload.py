@@ -0,0 +1,164 @@
+"""リクエストボディのシリアライズを担当するモジュール
+
+JSONのエンコードには、インストールされていれば orjson を使用します（JSON_BACKEND で選択）。
+同じ形のメッセージを多数送る場合は MessageTemplate で一度だけエンコードし、
+プレースホルダーの値だけを差し込んでボディを組み立てます。
+"""
+import json
+import string
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+from config.settings import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:  # orjson は任意の依存パッケージ
+    orjson = None
+
+# プレースホルダーを一時的に置き換える文字（Unicode の私用領域）
+_MARKER = '\ue000'
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _orjson_dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _select_backend(name: str) -> Tuple[str, Any]:
+    """JSONエンコーダーを選択する
+
+    Args:
+        name: 'auto'（orjson があれば使用）、'orjson' または 'json'
+
+    Returns:
+        Tuple[str, Any]: 使用するバックエンド名とエンコード関数
+
+    Raises:
+        ValueError: 不明なバックエンド名、または orjson がインストールされていない場合
+    """
+    if name == 'json' or (name == 'auto' and orjson is None):
+        return 'json', _stdlib_dumps
+    if name in ('auto', 'orjson'):
+        if orjson is None:
+            raise ValueError("JSON_BACKEND=orjson には orjson パッケージが必要です")
+        return 'orjson', _orjson_dumps
+    raise ValueError(f"不明なJSONバックエンド: {name}")
+
+
+BACKEND, _dumps = _select_backend(JSON_BACKEND)
+
+
+def dumps(obj: Any) -> bytes:
+    """オブジェクトを UTF-8 のJSON（区切りの空白なし）にエンコードします。
+
+    Args:
+        obj: エンコードするオブジェクト
+
+    Returns:
+        bytes: JSONエンコード済みのバイト列
+    """
+    return _dumps(obj)
+
+
+class MessageTemplate:
+    """プレースホルダーを含むメッセージを事前にエンコードしたテンプレート
+
+    文字列の値に含まれる {name} を render 時に差し込みます（{{ と }} は波括弧そのもの）。
+    JSONのエンコードは作成時の一度だけで、render では差し込む値のエスケープと連結のみを行います。
+
+    Example:
+        >>> template = MessageTemplate({"type": "text", "text": "{name}さん、{count}件の通知があります"})
+        >>> template.render({"name": "山田", "count": 3}).decode()
+        '{"content":{"type":"text","text":"山田さん、3件の通知があります"}}'
+    """
+
+    def __init__(self, content: Dict[str, Any]):
+        """テンプレートの作成
+
+        Args:
+            content: メッセージコンテンツ（文字列の値にプレースホルダーを含められる）
+
+        Raises:
+            ValueError: プレースホルダーの書式が不正な場合
+        """
+        self.content = content
+        fields: List[List[Union[str, Tuple[str]]]] = []
+        marked = self._mark({"content": content}, fields)
+        encoded = dumps(marked)
+
+        # エンコード結果をマーカーで分割し、固定部分とプレースホルダーの並びに変換する
+        marker = _MARKER.encode('utf-8')
+        pieces = encoded.split(marker)
+        segments: List[Union[bytes, str]] = [pieces[0]]
+        for index in range(1, len(pieces), 2):
+            for part in fields[int(pieces[index])]:
+                if isinstance(part, tuple):
+                    segments.append(part[0])
+                else:
+                    segments.append(dumps(part)[1:-1])
+            segments.append(pieces[index + 1])
+
+        # 隣り合う固定部分を結合しておく
+        self._segments: List[Union[bytes, str]] = []
+        for segment in segments:
+            if isinstance(segment, bytes) and self._segments and isinstance(self._segments[-1], bytes):
+                self._segments[-1] += segment
+            else:
+                self._segments.append(segment)
+        self.placeholders = frozenset(segment for segment in self._segments if isinstance(segment, str))
+        self._static: Optional[bytes] = None if self.placeholders else b''.join(self._segments)
+
+    @staticmethod
+    def _mark(value: Any, fields: List[List[Union[str, Tuple[str]]]]) -> Any:
+        """プレースホルダーを含む文字列をマーカーに置き換えた複製を返す"""
+        if isinstance(value, dict):
+            return {key: MessageTemplate._mark(item, fields) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [MessageTemplate._mark(item, fields) for item in value]
+        if not isinstance(value, str):
+            return value
+        if _MARKER in value:
+            raise ValueError("テンプレートに使用できない文字が含まれています")
+
+        parts: List[Union[str, Tuple[str]]] = []
+        has_field = False
+        try:
+            parsed = list(string.Formatter().parse(value))
+        except ValueError as e:
+            raise ValueError(f"プレースホルダーの書式が不正です: {value!r}") from e
+        for literal, name, spec, conversion in parsed:
+            if literal:
+                parts.append(literal)
+            if name is None:
+                continue
+            if not name.isidentifier() or spec or conversion:
+                raise ValueError(f"プレースホルダーには名前のみを指定してください: {{{name}}}")
+            parts.append((name,))
+            has_field = True
+        if not has_field:
+            return ''.join(part for part in parts if isinstance(part, str))
+        fields.append(parts)
+        return f"{_MARKER}{len(fields) - 1}{_MARKER}"
+
+    def render(self, values: Optional[Mapping[str, Any]] = None) -> bytes:
+        """プレースホルダーに値を差し込んだリクエストボディを返します。
+
+        Args:
+            values: プレースホルダー名と値（値は str() で文字列に変換）
+
+        Returns:
+            bytes: encode_message_body と同じ形式のリクエストボディ
+
+        Raises:
+            KeyError: 値が指定されていないプレースホルダーがある場合
+        """
+        if self._static is not None:
+            return self._static
+        values = values or {}
+        return b''.join(
+            segment if isinstance(segment, bytes) else _dumps(str(values[segment]))[1:-1]
+            for segment in self._segments
+        )
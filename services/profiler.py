@@ -0,0 +1,169 @@
+"""稼働中のプロセスで使用するサンプリングプロファイラ
+
+バックグラウンドスレッドが一定間隔で全スレッドのスタックを採取し、
+flamegraph.pl / speedscope で読み込める collapsed 形式（"a;b;c 回数"）で集計します。
+環境変数 PROFILER_ENABLED で起動時に開始するほか、シグナル（PROFILER_SIGNAL）で
+再起動せずに開始・停止を切り替えられます。
+"""
+import os
+import signal
+import sys
+import threading
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from config.settings import PROFILER_ENABLED, PROFILER_INTERVAL, PROFILER_OUTPUT, PROFILER_SIGNAL
+from .logger import logger
+
+MAX_STACK_DEPTH = 128
+
+
+class SamplingProfiler:
+    """全スレッドのスタックを定期的に採取するプロファイラ"""
+
+    def __init__(self, interval: float = PROFILER_INTERVAL, output: Optional[str] = PROFILER_OUTPUT):
+        """
+        Args:
+            interval: 採取間隔（秒）
+            output: 停止時に collapsed 形式で書き出すファイル（Noneの場合は書き出さない）
+        """
+        self.interval = interval
+        self.output = output
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """採取中かどうか"""
+        return self._thread is not None
+
+    def start(self) -> None:
+        """採取を開始する（既に採取中の場合は何もしない）"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+        logger.info("サンプリングプロファイラを開始しました（間隔 %s 秒）", self.interval)
+
+    def stop(self) -> None:
+        """採取を停止し、出力先が設定されていれば結果を書き出す"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        if thread is not threading.current_thread():
+            thread.join()
+        logger.info("サンプリングプロファイラを停止しました（%s サンプル）", self.samples)
+        if self.output:
+            self.dump(self.output)
+
+    def toggle(self) -> bool:
+        """採取の開始・停止を切り替える
+
+        Returns:
+            bool: 切り替え後に採取中であればTrue
+        """
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+        return self.running
+
+    def reset(self) -> None:
+        """採取済みのスタックを破棄する"""
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def collapsed(self) -> str:
+        """collapsed 形式（1行に "スレッド;呼び出し元;...;関数 回数"）の集計結果を返す"""
+        with self._lock:
+            items = sorted(self._stacks.items(), key=lambda item: -item[1])
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in items)
+
+    def top(self, limit: int = 20) -> List[Tuple[str, int]]:
+        """スタックの先頭（実行中の関数）ごとの採取回数を多い順に返す
+
+        Args:
+            limit: 返す件数
+
+        Returns:
+            List[Tuple[str, int]]: (関数, 採取回数) のリスト
+        """
+        leaves: Counter = Counter()
+        with self._lock:
+            for stack, count in self._stacks.items():
+                leaves[stack[-1]] += count
+        return leaves.most_common(limit)
+
+    def dump(self, path: str) -> None:
+        """集計結果を collapsed 形式でファイルへ書き出す
+
+        Args:
+            path: 出力先のファイルパス
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.collapsed())
+        logger.info("プロファイル結果を書き出しました: %s", path)
+
+    def _run(self) -> None:
+        """採取スレッドの本体"""
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            sampled = []
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                sampled.append(tuple(reversed(stack)))
+            del frames
+            with self._lock:
+                self._stacks.update(sampled)
+                self.samples += 1
+
+
+def install_signal_handler(profiler: 'SamplingProfiler', signal_name: str = PROFILER_SIGNAL) -> bool:
+    """シグナル受信時にプロファイラの開始・停止を切り替えるハンドラを登録する
+
+    メインスレッドから呼び出してください（例: kill -USR2 <pid> で切り替え）。
+    開始・停止はロックの取得や結果の書き出しを伴うため、シグナルハンドラの外（別スレッド）で行います。
+
+    Args:
+        profiler: 対象のプロファイラ
+        signal_name: シグナル名（例: 'SIGUSR2'）。空文字の場合は登録しない
+
+    Returns:
+        bool: 登録できた場合はTrue
+    """
+    signum = getattr(signal, signal_name, None) if signal_name else None
+    if signum is None:
+        return False
+
+    def handle(*_):
+        threading.Thread(target=profiler.toggle, name='profiler-toggle', daemon=True).start()
+
+    try:
+        signal.signal(signum, handle)
+    except ValueError:  # メインスレッド以外から呼ばれた場合
+        logger.warning("プロファイラのシグナルハンドラを登録できませんでした: %s", signal_name)
+        return False
+    return True
+
+
+# プロセス全体で共有するプロファイラ
+profiler = SamplingProfiler()
+if PROFILER_ENABLED:
+    profiler.start()
@@ -0,0 +1,246 @@
+"""クライアント側のレート制限を管理するモジュール"""
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from .deadline import DeadlineExceededError, remaining
+from .logger import logger
+from config.settings import (
+    RATE_LIMIT_GLOBAL, RATE_LIMIT_GLOBAL_BURST, RATE_LIMIT_PER_BOT, RATE_LIMIT_PER_BOT_BURST
+)
+
+DEFAULT_RETRY_AFTER = 1.0
+
+
+def parse_retry_after(value: Optional[str], default: float = DEFAULT_RETRY_AFTER) -> float:
+    """Retry-After ヘッダーの値を待機秒数に変換します。
+
+    Args:
+        value: ヘッダー値（秒数またはHTTP日付）
+        default: ヘッダーがない、または解釈できない場合の待機秒数
+
+    Returns:
+        float: 待機秒数
+    """
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucket:
+    """スレッドセーフなトークンバケット
+
+    429 応答を受けた場合は Retry-After の間停止し、レートを半減させます。
+    その後は成功応答ごとに設定値までレートを徐々に戻します（AIMD）。
+    """
+
+    def __init__(self, rate: float, capacity: float, min_rate_ratio: float = 0.1):
+        """トークンバケットの初期化
+
+        Args:
+            rate: 1秒あたりの補充数（上限レート）
+            capacity: バケットの容量（バースト数）
+            min_rate_ratio: 429 応答で下げるレートの下限（上限レートに対する比率）
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._min_rate = rate * min_rate_ratio
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """経過時間に応じてトークンを補充します（停止中は補充しない）。"""
+        start = max(self._updated, self._paused_until)
+        if now > start:
+            self._tokens = min(self.capacity, self._tokens + (now - start) * self.rate)
+            self._updated = now
+
+    def reserve(self) -> float:
+        """トークンを1つ予約し、送信可能になるまでの待機秒数を返します。
+
+        Returns:
+            float: 待機秒数（0 の場合は即時送信可能）
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = max(self._paused_until - now, 0.0)
+            if self._tokens < 0:
+                wait += -self._tokens / self.rate
+            return wait
+
+    def cancel(self) -> None:
+        """予約したトークンを1つ返却します（送信しなかった場合）。"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+    def throttle(self, retry_after: float) -> None:
+        """429 応答を受けてバケットを停止し、レートを下げます。
+
+        Args:
+            retry_after: 停止する秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + retry_after)
+            self._tokens = min(self._tokens, 0.0)
+            self.rate = max(self.rate / 2, self._min_rate)
+
+    def record_success(self) -> None:
+        """成功応答を受けて、下げたレートを上限まで徐々に戻します。"""
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.rate + self.max_rate * 0.05, self.max_rate)
+
+
+class RateLimiter:
+    """全体とボットごとのレート制限を組み合わせたリミッター
+
+    複数スレッドの APIClient から共有して使用します。
+    """
+
+    def __init__(
+        self,
+        global_rate: float = RATE_LIMIT_GLOBAL,
+        global_burst: float = RATE_LIMIT_GLOBAL_BURST,
+        per_bot_rate: float = RATE_LIMIT_PER_BOT,
+        per_bot_burst: float = RATE_LIMIT_PER_BOT_BURST
+    ):
+        """レートリミッターの初期化
+
+        Args:
+            global_rate: プロセス全体の1秒あたりのリクエスト数（0 で無制限）
+            global_burst: プロセス全体のバースト数
+            per_bot_rate: ボットごとの1秒あたりのリクエスト数（0 で無制限）
+            per_bot_burst: ボットごとのバースト数
+        """
+        self._global = TokenBucket(global_rate, global_burst) if global_rate > 0 else None
+        self._per_bot_rate = per_bot_rate
+        self._per_bot_burst = per_bot_burst
+        self._bots: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bot_bucket(self, bot_id: Optional[str]) -> Optional[TokenBucket]:
+        """ボットごとのバケットを返します（初回のみ作成）。"""
+        if bot_id is None or self._per_bot_rate <= 0:
+            return None
+        bucket = self._bots.get(bot_id)
+        if bucket is None:
+            with self._lock:
+                bucket = self._bots.get(bot_id)
+                if bucket is None:
+                    bucket = TokenBucket(self._per_bot_rate, self._per_bot_burst)
+                    self._bots[bot_id] = bucket
+        return bucket
+
+    def reserve(self, bot_id: Optional[str] = None) -> float:
+        """送信枠を予約し、待機すべき秒数を返します（待機はしない）。
+
+        Args:
+            bot_id: ボットID（省略時は全体の制限のみ適用）
+
+        Returns:
+            float: 待機秒数
+        """
+        wait = 0.0
+        if self._global is not None:
+            wait = self._global.reserve()
+        bucket = self._bot_bucket(bot_id)
+        if bucket is not None:
+            wait = max(wait, bucket.reserve())
+        return wait
+
+    def cancel(self, bot_id: Optional[str] = None) -> None:
+        """reserve で予約した送信枠を返却します（送信しなかった場合）。
+
+        Args:
+            bot_id: 予約時に指定したボットID
+        """
+        if self._global is not None:
+            self._global.cancel()
+        bucket = self._bot_bucket(bot_id)
+        if bucket is not None:
+            bucket.cancel()
+
+    def acquire(self, bot_id: Optional[str] = None) -> float:
+        """送信枠を確保できるまで待機します。
+
+        Args:
+            bot_id: ボットID（省略時は全体の制限のみ適用）
+
+        Returns:
+            float: 実際に待機した秒数
+
+        Raises:
+            DeadlineExceededError: 待機すると呼び出し全体の制限時間を超える場合（待機せず、予約した枠は返却する）
+        """
+        wait = self.reserve(bot_id)
+        if wait > 0:
+            left = remaining()
+            if left is not None and wait > left:
+                # 送信しない枠を残すと、後続の呼び出しの待機が長くなる
+                self.cancel(bot_id)
+                raise DeadlineExceededError('rate_limit')
+            time.sleep(wait)
+        return wait
+
+    def throttle(self, retry_after: float, bot_id: Optional[str] = None) -> None:
+        """429 応答を反映して送信を一時停止します。
+
+        Args:
+            retry_after: Retry-After ヘッダーから求めた待機秒数
+            bot_id: 429 を受けたボットID（省略時は全体を停止）
+        """
+        logger.warning("レート制限を受けました。%.2f秒間送信を停止します（ボット: %s）", retry_after, bot_id)
+        bucket = self._bot_bucket(bot_id)
+        if bucket is not None:
+            bucket.throttle(retry_after)
+        elif self._global is not None:
+            self._global.throttle(retry_after)
+
+    def record_success(self, bot_id: Optional[str] = None) -> None:
+        """成功応答を反映してレートを回復させます。
+
+        Args:
+            bot_id: ボットID
+        """
+        if self._global is not None:
+            self._global.record_success()
+        bucket = self._bot_bucket(bot_id)
+        if bucket is not None:
+            bucket.record_success()
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """プロセス全体で共有するレートリミッターを返します。
+
+    Returns:
+        RateLimiter: 共有レートリミッター（初回呼び出し時に作成）
+    """
+    global _rate_limiter
+    limiter = _rate_limiter
+    if limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter()
+            limiter = _rate_limiter
+    return limiter
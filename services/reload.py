@@ -0,0 +1,167 @@
+"""設定の再読み込み（ホットリロード）を管理するモジュール
+
+.env ファイルの変更の監視（SETTINGS_WATCH_INTERVAL）またはシグナル（SETTINGS_RELOAD_SIGNAL）で
+config.settings を読み込み直し、値が変わった場合に登録済みのリスナーへ通知します。
+新しい設定の検証に失敗した場合は、現在の設定をそのまま使い続けます。
+再読み込みで反映されない項目（Settings.reloadable() 以外）の変更は、再起動後に反映される旨を記録します。
+"""
+import os
+import signal
+import threading
+from typing import Callable, Dict, FrozenSet, List, Optional
+
+from config.settings import (
+    ENV_FILE, SETTINGS_RELOAD_SIGNAL, SETTINGS_WATCH_INTERVAL, Settings, SettingsError, reload_settings
+)
+from .logger import logger
+
+# 差し替える前と後の設定を受け取る関数
+Listener = Callable[[Settings, Settings], None]
+
+
+class SettingsReloader:
+    """設定を読み込み直し、変更をリスナーへ通知するクラス"""
+
+    def __init__(self, env_file: Optional[str] = None):
+        """
+        Args:
+            env_file: 読み込む .env ファイル（省略時は ENV_FILE）
+        """
+        self.env_file = env_file or ENV_FILE
+        self._listeners: List[Listener] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reloads = 0
+        self.failures = 0
+
+    def on_change(self, listener: Listener) -> Listener:
+        """設定が変わったときに呼び出すリスナーを登録します（デコレーターとしても使用可）。
+
+        Args:
+            listener: 差し替える前と後の設定を受け取る関数
+
+        Returns:
+            Listener: 登録したリスナー
+        """
+        with self._lock:
+            self._listeners.append(listener)
+        return listener
+
+    def reload(self) -> FrozenSet[str]:
+        """設定を読み込み直し、値が変わった場合はリスナーへ通知します。
+
+        Returns:
+            FrozenSet[str]: 値が変わった項目（属性名、変更がないか検証に失敗した場合は空）
+        """
+        with self._lock:
+            try:
+                previous, current = reload_settings(self.env_file)
+            except SettingsError as e:
+                self.failures += 1
+                logger.error("設定を再読み込みできませんでした（現在の設定を使い続けます）: %s", e)
+                return frozenset()
+            changed = current.changed(previous)
+            if not changed:
+                return changed
+            self.reloads += 1
+            # 認証情報を含むため値は出力しない
+            reloadable = Settings.reloadable()
+            applied = _env_names(changed & reloadable)
+            pending = _env_names(changed - reloadable)
+            if applied:
+                logger.info("設定を再読み込みしました: %s", ', '.join(applied))
+            if pending:
+                logger.warning("次の設定は再起動後に反映されます: %s", ', '.join(pending))
+            for listener in list(self._listeners):
+                try:
+                    listener(previous, current)
+                except Exception as e:
+                    logger.error("設定の変更の反映に失敗しました: %s", e, exc_info=e)
+            return changed
+
+    def watch(self, interval: float = SETTINGS_WATCH_INTERVAL) -> bool:
+        """.env ファイルの変更を一定間隔で確認し、変更されたら読み込み直すスレッドを開始します。
+
+        Args:
+            interval: 確認間隔（秒、0以下の場合は開始しない）
+
+        Returns:
+            bool: 開始した場合はTrue
+        """
+        if interval <= 0 or not self.env_file or self._thread is not None:
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval, self._signature()), name='settings-watcher', daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """変更の監視を停止します。
+
+        Args:
+            timeout: スレッドの終了を待つ秒数
+        """
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """統計情報（反映した回数、検証に失敗した回数）を返します。"""
+        return {'reloads': self.reloads, 'failures': self.failures}
+
+    def _signature(self) -> Optional[tuple]:
+        """.env ファイルの変更を判定する値（mtime / inode / サイズ）を返す"""
+        try:
+            stat = os.stat(self.env_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+    def _run(self, interval: float, signature: Optional[tuple]) -> None:
+        """.env ファイルの変更を監視する（signature は監視開始時点の値）"""
+        while not self._stop.wait(interval):
+            current = self._signature()
+            if current != signature:
+                signature = current
+                self.reload()
+
+
+def _env_names(names: FrozenSet[str]) -> List[str]:
+    """設定項目の属性名を環境変数名に変換する"""
+    return sorted(Settings.__dataclass_fields__[name].metadata['env'] for name in names)
+
+
+def install_signal_handler(reloader: SettingsReloader, signal_name: str = SETTINGS_RELOAD_SIGNAL) -> bool:
+    """シグナル受信時に設定を読み込み直すハンドラを登録する
+
+    メインスレッドから呼び出してください（例: kill -HUP <pid> で再読み込み）。
+    再読み込みはシグナルハンドラの外（別スレッド）で行います。
+
+    Args:
+        reloader: 対象の SettingsReloader
+        signal_name: シグナル名（例: 'SIGHUP'）。空文字の場合は登録しない
+
+    Returns:
+        bool: 登録できた場合はTrue
+    """
+    signum = getattr(signal, signal_name, None) if signal_name else None
+    if signum is None:
+        return False
+
+    def handle(*_):
+        threading.Thread(target=reloader.reload, name='settings-reload', daemon=True).start()
+
+    try:
+        signal.signal(signum, handle)
+    except ValueError:  # メインスレッド以外から呼ばれた場合
+        logger.warning("設定の再読み込みのシグナルハンドラを登録できませんでした: %s", signal_name)
+        return False
+    return True
+
+
+# プロセス全体で共有する再読み込み処理
+reloader = SettingsReloader()
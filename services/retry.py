@@ -0,0 +1,116 @@
+"""APIリクエストの再試行ポリシーを管理するモジュール"""
+import random
+from dataclasses import dataclass
+from typing import FrozenSet, Optional, Tuple, Type
+
+import requests
+import urllib3
+
+from config.settings import RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY, RETRY_DEADLINE
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """再試行の対象と間隔を定義するポリシー
+
+    Attributes:
+        max_attempts: 最大試行回数（初回を含む）
+        base_delay: バックオフの基準秒数
+        max_delay: バックオフの上限秒数
+        deadline: 全試行を通した制限時間（秒、None で無制限）
+        retry_on_exceptions: 再試行する例外の型
+        retry_on_status: 再試行するステータスコード
+        idempotent_methods: 冪等なHTTPメソッド
+        retry_non_idempotent: 冪等でないメソッド（POST）も冪等なメソッドと同じ条件で再試行するかどうか
+            （False の場合、POST は送信前の接続エラーと non_idempotent_retry_status のみ再試行する）
+        non_idempotent_retry_status: 冪等でないメソッドでも再試行するステータスコード
+            （サーバーが処理していないことが明らかなもの）
+    """
+
+    max_attempts: int = RETRY_MAX_ATTEMPTS
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+    deadline: Optional[float] = RETRY_DEADLINE
+    retry_on_exceptions: Tuple[Type[BaseException], ...] = (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+    )
+    retry_on_status: FrozenSet[int] = frozenset({500, 502, 503, 504})
+    idempotent_methods: FrozenSet[str] = frozenset({'GET', 'PUT', 'DELETE'})
+    # 502/504 はゲートウェイの背後で処理済みの可能性があるため、冪等キーのない POST は再試行しない
+    retry_non_idempotent: bool = False
+    non_idempotent_retry_status: FrozenSet[int] = frozenset({429, 503})
+
+    def should_retry_exception(self, method: str, error: BaseException) -> bool:
+        """例外発生時に再試行すべきかどうかを判定します。
+
+        冪等でないメソッドでは、接続の確立に失敗した（リクエストを送信していない）場合のみ再試行します。
+        retry_non_idempotent が True の場合も、送信済みの可能性がある読み取りタイムアウトは再試行しません。
+
+        Args:
+            method: HTTPメソッド
+            error: 発生した例外
+
+        Returns:
+            bool: 再試行すべき場合はTrue
+        """
+        if not isinstance(error, self.retry_on_exceptions):
+            return False
+        if method in self.idempotent_methods:
+            return True
+        if self.retry_non_idempotent:
+            return not isinstance(error, requests.exceptions.ReadTimeout)
+        return _connect_failed(error)
+
+    def should_retry_status(self, method: str, status: int) -> bool:
+        """エラー応答時に再試行すべきかどうかを判定します。
+
+        冪等でないメソッドは、retry_non_idempotent が False の場合 non_idempotent_retry_status のみ再試行します。
+
+        Args:
+            method: HTTPメソッド
+            status: ステータスコード
+
+        Returns:
+            bool: 再試行すべき場合はTrue
+        """
+        if method in self.idempotent_methods or self.retry_non_idempotent:
+            return status in self.retry_on_status
+        return status in self.non_idempotent_retry_status
+
+    def backoff(self, attempt: int) -> float:
+        """次の試行までの待機秒数を返します（Full Jitter）。
+
+        Args:
+            attempt: 完了した試行回数（1始まり）
+
+        Returns:
+            float: 待機秒数
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+def _connect_failed(error: BaseException) -> bool:
+    """接続の確立に失敗した（リクエストを送信していない）例外かどうかを返す"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError) or not error.args:
+        return False
+    # requests は urllib3 の MaxRetryError（reason に原因）を ConnectionError で包む
+    reason = getattr(error.args[0], 'reason', error.args[0])
+    return isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+
+@dataclass
+class RequestAttempt:
+    """1回の試行の記録"""
+
+    attempt: int
+    latency_ms: float
+    status: Optional[int] = None
+    error: Optional[str] = None
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+NO_RETRY_POLICY = RetryPolicy(max_attempts=1)
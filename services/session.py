@@ -0,0 +1,76 @@
+"""HTTPセッション（コネクションプール）を管理するモジュール"""
+import os
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import getproxies
+
+from config.settings import (
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_POOL_BLOCK, HTTP_KEEP_ALIVE
+)
+
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def create_session(
+    pool_connections: int = HTTP_POOL_CONNECTIONS,
+    pool_maxsize: int = HTTP_POOL_MAXSIZE,
+    pool_block: bool = HTTP_POOL_BLOCK,
+    keep_alive: bool = HTTP_KEEP_ALIVE
+) -> requests.Session:
+    """コネクションプールを設定したHTTPセッションを作成します。
+
+    Args:
+        pool_connections: プールするホスト数
+        pool_maxsize: ホストごとに保持する最大コネクション数
+        pool_block: プールが枯渇した際に空きを待つかどうか
+        keep_alive: コネクションを再利用するかどうか
+
+    Returns:
+        requests.Session: 作成したセッション
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    if not getproxies():
+        # プロキシの環境変数がなければ、リクエストごとの環境変数の走査を省く
+        session.trust_env = False
+        ca_bundle = os.environ.get('REQUESTS_CA_BUNDLE') or os.environ.get('CURL_CA_BUNDLE')
+        if ca_bundle:
+            session.verify = ca_bundle
+    return session
+
+
+def get_session() -> requests.Session:
+    """プロセス全体で共有するHTTPセッションを返します。
+
+    Returns:
+        requests.Session: 共有セッション（初回呼び出し時に作成）
+    """
+    global _session
+    session = _session
+    if session is None:
+        with _lock:
+            if _session is None:
+                _session = create_session()
+            session = _session
+    return session
+
+
+def close_session() -> None:
+    """共有HTTPセッションを閉じ、保持しているコネクションを解放します。"""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
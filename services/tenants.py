@@ -0,0 +1,325 @@
+"""複数テナント（ドメイン）・複数ボットの認証情報を1プロセスで管理するモジュール
+
+テナントごとに秘密鍵とアクセストークンのキャッシュを持ち、
+HTTPコネクションプール・レートリミッター・送信キューのワーカーは全テナントで共有します。
+"""
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from config.settings import get_settings
+from .api import APIClient
+from .auth import ClientCredentials, JWTSigner, PrivateKeyProvider, TokenManager
+from .logger import logger
+
+
+class UnknownTenantError(KeyError):
+    """登録されていないテナントが指定された場合の例外"""
+
+
+class TokenUnavailableError(requests.exceptions.RequestException):
+    """テナントのアクセストークンを取得できなかった場合の例外"""
+
+
+@dataclass(frozen=True)
+class TenantConfig:
+    """テナントの設定
+
+    Attributes:
+        name: テナント名
+        client_id: クライアントID
+        client_secret: クライアントシークレット
+        service_account: サービスアカウント
+        private_key_file: 秘密鍵ファイルのパス
+        bot_ids: このテナントのボットID（ボットIDからテナントを判別するために使用）
+        default_bot_id: ボットIDを省略した場合に使用するボットID（省略時は bot_ids の先頭）
+    """
+
+    name: str
+    client_id: str
+    client_secret: str
+    service_account: str
+    private_key_file: str
+    bot_ids: Tuple[str, ...] = field(default_factory=tuple)
+    default_bot_id: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TenantConfig':
+        """辞書（設定ファイルの1要素）からテナントの設定を作成します。
+
+        Args:
+            data: テナントの設定
+
+        Returns:
+            TenantConfig: テナントの設定
+
+        Raises:
+            ValueError: 必須項目が不足している場合
+        """
+        missing = [
+            key for key in ('name', 'client_id', 'client_secret', 'service_account', 'private_key_file')
+            if not data.get(key)
+        ]
+        if missing:
+            raise ValueError(f"テナントの設定に必須項目がありません: {', '.join(missing)}")
+        return cls(
+            name=data['name'],
+            client_id=data['client_id'],
+            client_secret=data['client_secret'],
+            service_account=data['service_account'],
+            private_key_file=data['private_key_file'],
+            bot_ids=tuple(str(bot_id) for bot_id in data.get('bot_ids', ())),
+            default_bot_id=str(data['default_bot_id']) if data.get('default_bot_id') else None
+        )
+
+
+class Tenant:
+    """1テナント分の認証状態（アクセストークンのキャッシュとAPIクライアント）"""
+
+    def __init__(
+        self,
+        name: str,
+        token_manager: TokenManager,
+        bot_ids: Tuple[str, ...] = (),
+        default_bot_id: Optional[str] = None
+    ):
+        """テナントの初期化
+
+        Args:
+            name: テナント名
+            token_manager: このテナントのアクセストークンを管理するトークンマネージャー
+            bot_ids: このテナントのボットID
+            default_bot_id: ボットIDを省略した場合に使用するボットID
+        """
+        self.name = name
+        self.token_manager = token_manager
+        self.bot_ids = tuple(bot_ids)
+        self.default_bot_id = default_bot_id or (self.bot_ids[0] if self.bot_ids else None)
+        self._client: Optional[APIClient] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: TenantConfig) -> 'Tenant':
+        """設定からテナントを作成します（秘密鍵はトークン取得時に読み込みます）。
+
+        Args:
+            config: テナントの設定
+
+        Returns:
+            Tenant: テナント
+        """
+        key_provider = PrivateKeyProvider(config.private_key_file)
+        token_manager = TokenManager(
+            signer=JWTSigner(key_provider.get),
+            credentials=ClientCredentials(config.client_id, config.client_secret, config.service_account)
+        )
+        return cls(config.name, token_manager, config.bot_ids, config.default_bot_id)
+
+    def client(self) -> APIClient:
+        """このテナントの有効なアクセストークンを持つAPIクライアントを返します。
+
+        トークンと BASE_API_URL が変わらない限り同じクライアントを使い回します。
+
+        Returns:
+            APIClient: APIクライアント（HTTPセッションは全テナントで共有）
+
+        Raises:
+            TokenUnavailableError: アクセストークンを取得できなかった場合
+        """
+        access_token = self.token_manager.get_token()
+        if not access_token:
+            raise TokenUnavailableError(f"アクセストークンの取得に失敗しました（テナント: {self.name}）")
+        base_url = get_settings().base_api_url
+        with self._lock:
+            client = self._client
+            if client is None or client.access_token != access_token or client.base_url != base_url:
+                client = APIClient(access_token, token_refresher=self.token_manager.refresh_if_stale)
+                self._client = client
+            return client
+
+    def close(self) -> None:
+        """バックグラウンドのトークン更新を停止します。"""
+        self.token_manager.close()
+
+
+class TenantRegistry:
+    """テナントとボットの対応を管理するレジストリ"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tenants: Dict[str, Tenant] = {}
+        self._bots: Dict[str, str] = {}
+        self._default: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tenants
+
+    def add(self, tenant: Tenant, default: bool = False) -> Tenant:
+        """テナントを登録します。
+
+        Args:
+            tenant: 登録するテナント
+            default: テナントもボットIDも指定されない場合に使用するテナントにするかどうか
+                （最初に登録したテナントは自動的に既定になります）
+
+        Returns:
+            Tenant: 登録したテナント
+
+        Raises:
+            ValueError: テナント名またはボットIDが既に登録されている場合
+        """
+        with self._lock:
+            if tenant.name in self._tenants:
+                raise ValueError(f"テナントは既に登録されています: {tenant.name}")
+            for bot_id in tenant.bot_ids:
+                if bot_id in self._bots:
+                    raise ValueError(f"ボット {bot_id} は既にテナント {self._bots[bot_id]} に登録されています")
+            self._tenants[tenant.name] = tenant
+            for bot_id in tenant.bot_ids:
+                self._bots[bot_id] = tenant.name
+            if default or self._default is None:
+                self._default = tenant.name
+        return tenant
+
+    def register(self, config: TenantConfig, default: bool = False) -> Tenant:
+        """設定からテナントを作成して登録します。
+
+        Args:
+            config: テナントの設定
+            default: 既定のテナントにするかどうか
+
+        Returns:
+            Tenant: 登録したテナント
+        """
+        return self.add(Tenant.from_config(config), default=default)
+
+    def load(self, path: str) -> List[Tenant]:
+        """JSONファイルからテナントを読み込んで登録します。
+
+        ファイルは {"tenants": [{"name": ..., "client_id": ..., "bot_ids": [...], "default": true}, ...]}
+        の形式です（トップレベルを配列にすることもできます）。
+
+        Args:
+            path: 設定ファイルのパス
+
+        Returns:
+            List[Tenant]: 登録したテナント
+        """
+        with open(path, encoding='utf-8') as f:
+            document = json.load(f)
+        entries = document['tenants'] if isinstance(document, dict) else document
+        tenants = [
+            self.register(TenantConfig.from_dict(entry), default=bool(entry.get('default')))
+            for entry in entries
+        ]
+        logger.info("テナント設定を読み込みました: %s 件（%s）", len(tenants), path)
+        return tenants
+
+    def get(self, name: str) -> Tenant:
+        """テナントを返します。
+
+        Args:
+            name: テナント名
+
+        Returns:
+            Tenant: テナント
+
+        Raises:
+            UnknownTenantError: テナントが登録されていない場合
+        """
+        try:
+            return self._tenants[name]
+        except KeyError:
+            raise UnknownTenantError(name) from None
+
+    def resolve(self, tenant: Optional[str] = None, bot_id: Optional[str] = None) -> Tuple[Tenant, str]:
+        """送信に使用するテナントとボットIDを決定します。
+
+        テナントを省略した場合はボットIDから判別し、判別できなければ既定のテナントを使用します。
+        ボットIDを省略した場合はテナントの既定のボットを使用します。
+
+        Args:
+            tenant: テナント名（省略可）
+            bot_id: ボットID（省略可）
+
+        Returns:
+            Tuple[Tenant, str]: テナントとボットID
+
+        Raises:
+            UnknownTenantError: テナントが登録されていない場合
+            ValueError: ボットIDを決定できない、またはボットが指定テナントに属さない場合
+        """
+        if tenant is not None:
+            target = self.get(tenant)
+        elif bot_id is not None and bot_id in self._bots:
+            target = self._tenants[self._bots[bot_id]]
+        elif self._default is not None:
+            target = self._tenants[self._default]
+        else:
+            raise UnknownTenantError("テナントが登録されていません")
+
+        bot_id = bot_id or target.default_bot_id
+        if not bot_id:
+            raise ValueError(f"ボットIDを決定できません（テナント: {target.name}）")
+        owner = self._bots.get(bot_id)
+        if owner is not None and owner != target.name:
+            raise ValueError(f"ボット {bot_id} はテナント {target.name} に属していません")
+        return target, bot_id
+
+    def client_for_bot(self, bot_id: str) -> APIClient:
+        """ボットが属するテナントのAPIクライアントを返します。
+
+        Args:
+            bot_id: ボットID
+
+        Returns:
+            APIClient: APIクライアント
+        """
+        target, _ = self.resolve(bot_id=bot_id)
+        return target.client()
+
+    def names(self) -> List[str]:
+        """登録済みのテナント名を返します。"""
+        return list(self._tenants)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """テナントごとのトークンキャッシュの統計情報を返します。"""
+        return {name: tenant.token_manager.stats() for name, tenant in list(self._tenants.items())}
+
+    def close(self) -> None:
+        """全テナントのバックグラウンドのトークン更新を停止します。"""
+        for tenant in list(self._tenants.values()):
+            tenant.close()
+
+
+class TenantRoutingClient:
+    """ボットIDに応じて各テナントのAPIクライアントへ振り分けるクライアント
+
+    送信キューのワーカーのように、複数テナントのメッセージを1つのワーカープールで配送する場合に使用します。
+    """
+
+    def __init__(self, registry: TenantRegistry):
+        """
+        Args:
+            registry: テナントレジストリ
+        """
+        self.registry = registry
+
+    def post_bot_message(self, bot_id: str, user_id: str, body: bytes) -> requests.Response:
+        """ボットが属するテナントのトークンでメッセージを送信します。
+
+        Args:
+            bot_id: ボットID
+            user_id: 送信先のユーザーID
+            body: シリアライズ済みのリクエストボディ
+
+        Returns:
+            requests.Response: APIレスポンス
+        """
+        return self.registry.client_for_bot(bot_id).post_bot_message(bot_id, user_id, body)
@@ -0,0 +1,328 @@
+"""送信処理の区間（スパン）ごとの所要時間を記録するトレーシングモジュール
+
+鍵の読み込み・JWT署名・トークン取得・ペイロードのシリアライズ・メッセージ送信など、
+送信処理の各区間をスパンとして記録し、OpenTelemetry互換のJSON（1行1スパン）または
+OpenTelemetry SDK へ出力します。無効時のスパン作成は属性参照1回だけのコストで済みます。
+"""
+import json
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from config.settings import TRACE_ENABLED, TRACE_EXPORTER, TRACE_FILE, TRACE_SAMPLE_RATE
+
+SERVICE_NAME = 'lineworks_bot'
+
+
+class Span:
+    """1つの区間の記録"""
+
+    __slots__ = (
+        'name', 'trace_id', 'span_id', 'parent_id', 'start_time_ns', 'end_time_ns',
+        'attributes', 'status', '_started'
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = 'UNSET'
+        self._started = time.perf_counter_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        """所要時間（ミリ秒）"""
+        if self.end_time_ns is None:
+            return 0.0
+        return (self.end_time_ns - self.start_time_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """属性を設定する"""
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        """例外を記録し、スパンをエラー状態にする"""
+        self.status = 'ERROR'
+        self.attributes['exception.type'] = type(exc).__name__
+        self.attributes['exception.message'] = str(exc)
+
+    def end(self) -> None:
+        """スパンを終了する（終了時刻は単調時計で測った経過時間から求める）"""
+        self.end_time_ns = self.start_time_ns + (time.perf_counter_ns() - self._started)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON 形式のスパンに変換する"""
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,
+            'startTimeUnixNano': str(self.start_time_ns),
+            'endTimeUnixNano': str(self.end_time_ns),
+            'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in self.attributes.items()],
+            'status': {'code': {'UNSET': 0, 'OK': 1, 'ERROR': 2}[self.status]},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """属性値を OTLP/JSON の AnyValue に変換する"""
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class _NoopSpan:
+    """トレーシング無効時・サンプリング対象外のときに使う何もしないスパン"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# 現在のスパン（サンプリング対象外のトレース中は NOOP_SPAN）
+_current_span: ContextVar[Any] = ContextVar('lineworks_current_span', default=None)
+
+
+class SpanExporter:
+    """スパンの出力先の基底クラス"""
+
+    def on_start(self, span: Span) -> None:
+        """スパンの開始時に呼ばれる"""
+
+    def on_end(self, span: Span) -> None:
+        """スパンの終了時に呼ばれる"""
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        """出力先を閉じる"""
+
+
+class InMemorySpanExporter(SpanExporter):
+    """終了したスパンをメモリに保持する出力先（テスト・対話的な調査用）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: List[Span] = []
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self) -> None:
+        """保持しているスパンを破棄する"""
+        with self._lock:
+            self.spans.clear()
+
+
+class FileSpanExporter(SpanExporter):
+    """終了したスパンを OTLP/JSON 形式で1行ずつファイルへ追記する出力先"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 出力先のファイルパス
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def on_end(self, span: Span) -> None:
+        line = json.dumps(
+            {'resource': {'service.name': SERVICE_NAME}, **span.to_otlp()},
+            ensure_ascii=False, separators=(',', ':')
+        )
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + '\n')
+                self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class OpenTelemetrySpanExporter(SpanExporter):
+    """スパンを OpenTelemetry API へ転送する出力先
+
+    opentelemetry-api が必要です。実際の送信先（OTLP、Jaeger など）は
+    アプリケーション側で TracerProvider に設定してください。
+    """
+
+    def __init__(self):
+        from opentelemetry import trace as otel_trace
+
+        self._trace = otel_trace
+        self._tracer = otel_trace.get_tracer(SERVICE_NAME)
+        self._lock = threading.Lock()
+        self._open: Dict[str, Any] = {}
+
+    def on_start(self, span: Span) -> None:
+        with self._lock:
+            parent = self._open.get(span.parent_id) if span.parent_id else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        otel_span = self._tracer.start_span(span.name, context=context, start_time=span.start_time_ns)
+        with self._lock:
+            self._open[span.span_id] = otel_span
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            otel_span = self._open.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            otel_span.set_attribute(key, value if isinstance(value, (bool, int, float, str)) else str(value))
+        if span.status == 'ERROR':
+            from opentelemetry.trace import Status, StatusCode
+            otel_span.set_status(Status(StatusCode.ERROR, span.attributes.get('exception.message')))
+        otel_span.end(end_time=span.end_time_ns)
+
+
+class _SpanScope:
+    """スパンを現在のコンテキストに設定し、終了時に出力するコンテキストマネージャ"""
+
+    __slots__ = ('_tracer', '_span', '_token')
+
+    def __init__(self, tracer: 'Tracer', span: Any):
+        self._tracer = tracer
+        self._span = span
+        self._token = None
+
+    def __enter__(self) -> Any:
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_span.reset(self._token)
+        span = self._span
+        if span is NOOP_SPAN:
+            return
+        if exc is not None:
+            span.record_exception(exc)
+        span.end()
+        self._tracer._finish(span)
+
+
+class Tracer:
+    """スパンを作成・出力するトレーサー"""
+
+    def __init__(self, exporter: Optional[SpanExporter] = None, sample_rate: float = 1.0):
+        """
+        Args:
+            exporter: 出力先（指定した場合は有効な状態で作成）
+            sample_rate: ルートスパンを記録する割合（子スパンは親に従う）
+        """
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.enabled = exporter is not None
+        self._lock = threading.Lock()
+
+    def enable(self, exporter: SpanExporter, sample_rate: Optional[float] = None) -> None:
+        """トレーシングを有効にする
+
+        Args:
+            exporter: 出力先
+            sample_rate: ルートスパンを記録する割合
+        """
+        with self._lock:
+            previous, self.exporter = self.exporter, exporter
+            if sample_rate is not None:
+                self.sample_rate = sample_rate
+            self.enabled = True
+        if previous is not None and previous is not exporter:
+            previous.shutdown()
+
+    def disable(self) -> None:
+        """トレーシングを無効にし、出力先を閉じる"""
+        with self._lock:
+            self.enabled = False
+            exporter, self.exporter = self.exporter, None
+        if exporter is not None:
+            exporter.shutdown()
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        """区間を記録するコンテキストマネージャを返す
+
+        Args:
+            name: スパン名（例: 'auth.sign_jwt'）
+            **attributes: スパンの属性
+
+        Returns:
+            with 文で使用するコンテキストマネージャ（as で Span を受け取れる）
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if parent is NOOP_SPAN:
+            return NOOP_SPAN
+        if parent is None:
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                return _SpanScope(self, NOOP_SPAN)
+            span = Span(name, f"{random.getrandbits(128):032x}", None, attributes)
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, attributes)
+        exporter = self.exporter
+        if exporter is not None:
+            exporter.on_start(span)
+        return _SpanScope(self, span)
+
+    def _finish(self, span: Span) -> None:
+        """終了したスパンを出力する"""
+        exporter = self.exporter
+        if exporter is not None:
+            exporter.on_end(span)
+
+
+def current_span() -> Optional[Any]:
+    """現在のスパンを返す（記録中でない場合はNone）"""
+    return _current_span.get()
+
+
+def create_exporter(kind: str = TRACE_EXPORTER, path: str = TRACE_FILE) -> SpanExporter:
+    """設定に従ってスパンの出力先を作成する
+
+    Args:
+        kind: 'file'（OTLP/JSON のファイル）または 'otel'（OpenTelemetry API）
+        path: kind が 'file' の場合の出力先
+
+    Returns:
+        SpanExporter: 出力先
+
+    Raises:
+        ValueError: 不明な出力先が指定された場合
+    """
+    if kind == 'file':
+        return FileSpanExporter(path)
+    if kind == 'otel':
+        return OpenTelemetrySpanExporter()
+    raise ValueError(f"不明なトレース出力先です: {kind}")
+
+
+# プロセス全体で共有するトレーサー
+tracer = Tracer(sample_rate=TRACE_SAMPLE_RATE)
+if TRACE_ENABLED:
+    tracer.enable(create_exporter())
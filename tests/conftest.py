@@ -0,0 +1,41 @@
+"""テスト共通の設定"""
+import pytest
+
+from services.botinfo import get_bot_info_cache
+from services.circuit import get_circuit_breakers
+
+
+@pytest.fixture(autouse=True)
+def clear_bot_info_cache():
+    """プロセス共有のボット情報キャッシュをテストごとに破棄する"""
+    cache = get_bot_info_cache()
+    if cache is not None:
+        cache.invalidate()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """プロセス共有のサーキットブレーカーをテストごとに閉じる"""
+    breakers = get_circuit_breakers()
+    if breakers is not None:
+        breakers.reset()
+    yield
+
+
+@pytest.fixture
+def settings_env(tmp_path, monkeypatch):
+    """一時的な .env ファイルを読み込む設定（テスト後に設定と環境変数を元に戻す）"""
+    import os
+
+    from config import settings
+
+    environ = dict(os.environ)
+    monkeypatch.setattr(settings, '_settings', settings.get_settings())
+    monkeypatch.setattr(settings, '_file_keys', frozenset())
+    monkeypatch.setattr(settings, 'ENV_FILE', str(tmp_path / '.env'))
+    for spec in settings.Settings.__dataclass_fields__.values():
+        os.environ.pop(spec.metadata['env'], None)
+    yield tmp_path / '.env'
+    os.environ.clear()
+    os.environ.update(environ)
@@ -1,9 +1,14 @@
 """APIクライアントのテスト"""
+import threading
+
 import pytest
 import requests
 from unittest.mock import patch, MagicMock
 
 from services.api import APIClient
+from services.payload import MessageTemplate
+from services.ratelimit import RateLimiter
+from services.retry import RetryPolicy
 
 
 class TestAPIClient:
@@ -22,6 +27,10 @@ class TestAPIClient:
             'Authorization': 'Bearer dummy_token'
         }
 
+    def test_shared_session(self):
+        """APIクライアント間でHTTPセッションが共有されることを検証"""
+        assert APIClient("token1").session is APIClient("token2").session
+
     def test_make_request_get(self, api_client, requests_mock):
         """GET リクエストが正しく行われることを検証"""
         requests_mock.get(
@@ -92,6 +101,42 @@ class TestAPIClient:
         assert result == {"messageId": "123456"}
         assert requests_mock.request_history[0].json() == {"content": content}
 
+    def test_send_bot_message_template(self, api_client, requests_mock):
+        """MessageTemplate を渡すと値と {user_id} が差し込まれることを検証"""
+        requests_mock.post("https://www.worksapis.com/v1.0/bots/test_bot/users/u1/messages", status_code=201)
+        template = MessageTemplate({"type": "text", "text": "{user_id}: {status}"})
+
+        api_client.send_bot_message("test_bot", "u1", template, values={"status": "OK"})
+
+        assert requests_mock.request_history[0].json() == {"content": {"type": "text", "text": "u1: OK"}}
+
+    def test_prepared_request_reused(self, api_client, requests_mock):
+        """同じ送信先へのリクエストは準備済みのものを複製して送ることを検証"""
+        requests_mock.post("https://www.worksapis.com/v1.0/bots/test_bot/users/u1/messages", status_code=201)
+
+        api_client.post_bot_message("test_bot", "u1", b'{"content":{"type":"text","text":"1"}}')
+        api_client.post_bot_message("test_bot", "u1", b'{"content":{"type":"text","text":"22"}}')
+
+        first, second = requests_mock.request_history
+        assert second.json() == {"content": {"type": "text", "text": "22"}}
+        assert second.headers["Content-Length"] == str(len(second.body))
+        assert len(api_client._prepared[2]) == 1
+
+    def test_prepared_request_after_token_refresh(self, requests_mock):
+        """トークン再取得後は新しい認証ヘッダーで送信されることを検証"""
+        client = APIClient("old_token", token_refresher=MagicMock(return_value="new_token"))
+        requests_mock.post(
+            "https://www.worksapis.com/v1.0/bots/test_bot/users/u1/messages",
+            [{"status_code": 401}, {"status_code": 201}, {"status_code": 201}]
+        )
+
+        client.post_bot_message("test_bot", "u1", b'{}')
+        client.post_bot_message("test_bot", "u1", b'{}')
+
+        assert [request.headers["Authorization"] for request in requests_mock.request_history] == [
+            "Bearer old_token", "Bearer new_token", "Bearer new_token"
+        ]
+
     def test_get_bot_info(self, api_client, requests_mock):
         """get_bot_info メソッドの検証"""
         bot_id = "test_bot"
@@ -104,4 +149,147 @@ class TestAPIClient:
         
         result = api_client.get_bot_info(bot_id)
         
-        assert result == bot_info
\ No newline at end of file
+        assert result == bot_info
+
+    def test_rate_limited_retry(self, requests_mock):
+        """429応答時はRetry-Afterに従って再送されることを検証"""
+        limiter = RateLimiter(global_rate=0, global_burst=0, per_bot_rate=100, per_bot_burst=100)
+        client = APIClient("dummy_token", rate_limiter=limiter)
+        requests_mock.get(
+            "https://www.worksapis.com/v1.0/bots/test_bot",
+            [
+                {"status_code": 429, "headers": {"Retry-After": "0.05"}},
+                {"json": {"name": "テストボット"}},
+            ]
+        )
+
+        result = client.get_bot_info("test_bot")
+
+        assert result == {"name": "テストボット"}
+        assert requests_mock.call_count == 2
+
+    def test_rate_limited_exhausted(self, requests_mock):
+        """429応答が続く場合は再送上限後に例外を送出することを検証"""
+        limiter = RateLimiter(global_rate=0, global_burst=0, per_bot_rate=100, per_bot_burst=100)
+        client = APIClient("dummy_token", rate_limiter=limiter)
+        requests_mock.get(
+            "https://www.worksapis.com/v1.0/bots/test_bot",
+            status_code=429,
+            headers={"Retry-After": "0"}
+        )
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.get_bot_info("test_bot")
+        assert requests_mock.call_count == 4
+
+    def test_retry_on_server_error(self, requests_mock):
+        """5xx応答時は再試行され、各試行が記録されることを検証"""
+        client = APIClient("dummy_token", retry_policy=RetryPolicy(base_delay=0.01))
+        requests_mock.get(
+            "https://www.worksapis.com/v1.0/test-endpoint",
+            [{"status_code": 503}, {"json": {"status": "success"}}]
+        )
+
+        result = client._make_request("GET", "/test-endpoint")
+
+        assert result == {"status": "success"}
+        assert [attempt.status for attempt in client.last_attempts] == [503, 200]
+        assert all(attempt.latency_ms >= 0 for attempt in client.last_attempts)
+
+    def test_retry_on_connection_error(self, requests_mock):
+        """ネットワークエラー時は再試行されることを検証"""
+        client = APIClient("dummy_token", retry_policy=RetryPolicy(base_delay=0.01))
+        requests_mock.get(
+            "https://www.worksapis.com/v1.0/test-endpoint",
+            [{"exc": requests.exceptions.ConnectionError}, {"json": {"status": "success"}}]
+        )
+
+        assert client._make_request("GET", "/test-endpoint") == {"status": "success"}
+        assert client.last_attempts[0].error == "ConnectionError"
+
+    def test_retry_exhausted(self, requests_mock):
+        """最大試行回数に達した場合は例外を送出することを検証"""
+        client = APIClient("dummy_token", retry_policy=RetryPolicy(max_attempts=3, base_delay=0.01))
+        requests_mock.get("https://www.worksapis.com/v1.0/test-endpoint", status_code=500)
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            client._make_request("GET", "/test-endpoint")
+        assert requests_mock.call_count == 3
+
+    def test_retry_deadline(self, requests_mock):
+        """制限時間を超える場合は再試行しないことを検証"""
+        client = APIClient(
+            "dummy_token",
+            retry_policy=RetryPolicy(max_attempts=10, base_delay=1.0, max_delay=1.0, deadline=0.0)
+        )
+        requests_mock.get("https://www.worksapis.com/v1.0/test-endpoint", status_code=500)
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            client._make_request("GET", "/test-endpoint")
+        assert requests_mock.call_count == 1
+
+    def test_token_refresh_on_unauthorized(self, requests_mock):
+        """401応答時はトークンを再取得して再試行することを検証"""
+        refresher = MagicMock(return_value="new_token")
+        client = APIClient("old_token", token_refresher=refresher)
+        requests_mock.get(
+            "https://www.worksapis.com/v1.0/test-endpoint",
+            [{"status_code": 401}, {"json": {"status": "success"}}]
+        )
+
+        assert client._make_request("GET", "/test-endpoint") == {"status": "success"}
+        refresher.assert_called_once_with("old_token")
+        assert requests_mock.request_history[1].headers["Authorization"] == "Bearer new_token"
+        assert client.access_token == "new_token"
+
+    def test_concurrent_unauthorized_single_refresh(self, requests_mock):
+        """同じ古いトークンで401を受けた複数スレッドは、送信したトークンを渡して再取得は1回だけ行う"""
+        state = {'token': 'T1'}
+        minted = []
+        sent_stale = []
+        both_sent = threading.Event()
+        lock = threading.Lock()
+
+        def refresh_if_stale(stale_token):
+            # 両方のスレッドが古いトークンで送信してから再取得する
+            both_sent.wait(5)
+            # TokenManager.refresh_if_stale と同じく、渡されたトークンが現在のものの場合のみ取り直す
+            with lock:
+                if state['token'] == stale_token:
+                    state['token'] = f"T{len(minted) + 2}"
+                    minted.append(state['token'])
+                return state['token']
+
+        def respond(request, context):
+            if request.headers['Authorization'] == 'Bearer T1':
+                with lock:
+                    sent_stale.append(request)
+                    if len(sent_stale) == 2:
+                        both_sent.set()
+                context.status_code = 401
+                return {}
+            return {"status": "success"}
+
+        requests_mock.get("https://www.worksapis.com/v1.0/test-endpoint", json=respond)
+        client = APIClient("T1", token_refresher=refresh_if_stale)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(client._make_request("GET", "/test-endpoint")))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [{"status": "success"}] * 2
+        assert minted == ['T2']
+        assert client.access_token == 'T2'
+
+    def test_unauthorized_without_refresher(self, requests_mock):
+        """トークン再取得関数がない場合は401で例外を送出することを検証"""
+        requests_mock.get("https://www.worksapis.com/v1.0/test-endpoint", status_code=401)
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            APIClient("dummy_token")._make_request("GET", "/test-endpoint")
+        assert requests_mock.call_count == 1
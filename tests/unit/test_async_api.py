@@ -0,0 +1,211 @@
+"""非同期APIクライアントのテスト"""
+import asyncio
+import dataclasses
+
+import aiohttp
+import pytest
+import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from cryptography.hazmat.primitives.asymmetric import rsa
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from config.settings import get_settings
+from services.async_api import AsyncAPIClient, async_get_access_token
+
+
+def run_with_server(handler_routes, scenario):
+    """テスト用のローカルHTTPサーバーを起動してシナリオを実行する"""
+    async def main():
+        app = web.Application()
+        app.add_routes(handler_routes)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            return await scenario(str(server.make_url('')))
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+class TestAsyncAPIClient:
+    """AsyncAPIClient クラスのテストケース"""
+
+    def test_send_bot_message(self):
+        """send_bot_message メソッドの検証"""
+        received = {}
+
+        async def handler(request):
+            received['path'] = request.path
+            received['authorization'] = request.headers['Authorization']
+            received['body'] = await request.json()
+            return web.json_response({"messageId": "123456"}, status=201)
+
+        async def scenario(base_url):
+            async with AsyncAPIClient("dummy_token", base_url=base_url) as client:
+                return await client.send_bot_message(
+                    "test_bot", "test_user@example.com", {"type": "text", "text": "テスト"}
+                )
+
+        result = run_with_server(
+            [web.post('/bots/test_bot/users/{user_id}/messages', handler)], scenario
+        )
+
+        assert result == {"messageId": "123456"}
+        assert received['path'] == '/bots/test_bot/users/test_user@example.com/messages'
+        assert received['authorization'] == 'Bearer dummy_token'
+        assert received['body'] == {"content": {"type": "text", "text": "テスト"}}
+
+    def test_get_bot_info(self):
+        """get_bot_info メソッドの検証"""
+        async def handler(request):
+            return web.json_response({"name": "テストボット"})
+
+        async def scenario(base_url):
+            async with AsyncAPIClient("dummy_token", base_url=base_url) as client:
+                return await client.get_bot_info("test_bot")
+
+        assert run_with_server([web.get('/bots/test_bot', handler)], scenario) == {"name": "テストボット"}
+
+    def test_api_error(self, caplog):
+        """APIエラー時は requests と同じ例外を送出する"""
+        async def handler(request):
+            return web.Response(status=500, text="Internal Server Error")
+
+        async def scenario(base_url):
+            async with AsyncAPIClient("dummy_token", base_url=base_url) as client:
+                with pytest.raises(requests.exceptions.HTTPError) as exc_info:
+                    await client.get_bot_info("test_bot")
+                return exc_info.value
+
+        error = run_with_server([web.get('/bots/test_bot', handler)], scenario)
+        assert error.response.status_code == 500
+        assert "APIエラー" in caplog.text
+
+    def test_connection_error(self, caplog):
+        """ネットワークエラー時は ConnectionError を送出する"""
+        async def scenario():
+            async with AsyncAPIClient("dummy_token", base_url="http://127.0.0.1:1") as client:
+                with pytest.raises(requests.exceptions.ConnectionError):
+                    await client.get_bot_info("test_bot")
+
+        asyncio.run(scenario())
+        assert "ネットワークエラー" in caplog.text
+
+    @pytest.mark.parametrize('error, expected', [
+        (aiohttp.ClientPayloadError("Response payload is not completed"), requests.exceptions.ChunkedEncodingError),
+        (aiohttp.ClientResponseError(
+            aiohttp.RequestInfo(URL("http://localhost/"), 'GET', CIMultiDictProxy(CIMultiDict())), (),
+            status=400, message="Bad Request"
+        ), requests.exceptions.RequestException),
+        (aiohttp.InvalidURL("http://"), requests.exceptions.RequestException),
+        (aiohttp.ConnectionTimeoutError("Connection timeout"), requests.exceptions.ConnectTimeout),
+        (aiohttp.SocketTimeoutError("Timeout on reading data from socket"), requests.exceptions.ReadTimeout),
+        (asyncio.TimeoutError(), requests.exceptions.ReadTimeout),
+    ])
+    def test_client_error(self, monkeypatch, error, expected):
+        """aiohttp のその他の例外も requests の例外に変換して送出する"""
+        def request(*args, **kwargs):
+            raise error
+
+        monkeypatch.setattr(aiohttp.ClientSession, 'request', request)
+
+        async def scenario():
+            async with AsyncAPIClient("dummy_token") as client:
+                with pytest.raises(expected) as exc_info:
+                    await client.get_bot_info("test_bot")
+                return exc_info.value
+
+        assert asyncio.run(scenario()).__cause__ is error
+
+    def test_unsupported_method(self):
+        """サポートされていないHTTPメソッドの検証"""
+        async def scenario():
+            async with AsyncAPIClient("dummy_token") as client:
+                with pytest.raises(ValueError, match="サポートされていないHTTPメソッド"):
+                    await client._make_request("UNSUPPORTED", "/test")
+
+        asyncio.run(scenario())
+
+    def test_send_many(self):
+        """send_many が同時実行数を守りつつ全件送信することを検証"""
+        state = {'in_flight': 0, 'max_in_flight': 0}
+
+        async def handler(request):
+            state['in_flight'] += 1
+            state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+            await asyncio.sleep(0.01)
+            state['in_flight'] -= 1
+            if request.match_info['user_id'] == 'bad':
+                return web.Response(status=400, text="Bad Request")
+            return web.Response(status=201)
+
+        user_ids = [f"user{i}" for i in range(30)] + ['bad']
+
+        async def scenario(base_url):
+            async with AsyncAPIClient("dummy_token", base_url=base_url) as client:
+                return await client.send_many(
+                    "test_bot", user_ids, {"type": "text", "text": "テスト"}, concurrency=5
+                )
+
+        results = run_with_server(
+            [web.post('/bots/test_bot/users/{user_id}/messages', handler)], scenario
+        )
+
+        assert [result.user_id for result in results] == user_ids
+        assert all(result.success and result.status == 201 for result in results[:-1])
+        assert results[-1].success is False
+        assert results[-1].status == 400
+        assert state['max_in_flight'] <= 5
+
+
+class TestAsyncGetAccessToken:
+    """async_get_access_token 関数のテストケース"""
+
+    @pytest.fixture
+    def private_key(self, monkeypatch):
+        """テスト用の秘密鍵とクライアント設定"""
+        monkeypatch.setattr('config.settings._settings', dataclasses.replace(
+            get_settings(), client_id='client_id', service_account='service_account'
+        ))
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def test_success(self, private_key):
+        """正常系：アクセストークンの取得が成功する"""
+        received = {}
+
+        async def handler(request):
+            received.update(await request.post())
+            return web.json_response({"access_token": "async_token"})
+
+        async def scenario(base_url):
+            return await async_get_access_token(private_key, auth_url=f"{base_url}/token")
+
+        assert run_with_server([web.post('/token', handler)], scenario) == "async_token"
+        assert received['grant_type'] == 'urn:ietf:params:oauth:grant-type:jwt-bearer'
+        assert received['client_id'] == 'client_id'
+        assert 'assertion' in received
+
+    def test_api_error(self, private_key, caplog):
+        """異常系：APIリクエストが失敗する"""
+        async def handler(request):
+            return web.Response(status=500)
+
+        async def scenario(base_url):
+            return await async_get_access_token(private_key, auth_url=f"{base_url}/token")
+
+        assert run_with_server([web.post('/token', handler)], scenario) is None
+        assert "トークン取得に失敗しました" in caplog.text
+
+    def test_invalid_response(self, private_key, caplog):
+        """異常系：APIレスポンスが不正"""
+        async def handler(request):
+            return web.json_response({})
+
+        async def scenario(base_url):
+            return await async_get_access_token(private_key, auth_url=f"{base_url}/token")
+
+        assert run_with_server([web.post('/token', handler)], scenario) is None
+        assert "トークン取得のレスポンスが不正です" in caplog.text
@@ -1,10 +1,14 @@
 """認証関連機能のテスト"""
 from unittest.mock import mock_open, patch
+import threading
+import time
 import pytest
 import jwt
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
-from services.auth import get_private_key, get_access_token
+from services.auth import (
+    get_private_key, get_access_token, TokenManager, PrivateKeyProvider, JWTSigner
+)
 
 
 @pytest.fixture
@@ -58,6 +62,65 @@ class TestGetPrivateKey:
             assert "秘密鍵ファイルの形式が不正です" in caplog.text
 
 
+class TestPrivateKeyProvider:
+    """PrivateKeyProviderクラスのテストケース"""
+
+    def test_loads_once(self, mock_pem_data, tmp_path):
+        """正常系：ファイルが変わらなければ再読み込みしない"""
+        key_file = tmp_path / 'private.key'
+        key_file.write_bytes(mock_pem_data)
+
+        provider = PrivateKeyProvider(str(key_file), check_interval=0)
+        first = provider.get()
+        second = provider.get()
+
+        assert isinstance(first, rsa.RSAPrivateKey)
+        assert first is second
+        assert provider.loads == 1
+
+    def test_reload_on_change(self, mock_pem_data, tmp_path):
+        """正常系：ファイルが差し替えられた場合は再読み込みする"""
+        key_file = tmp_path / 'private.key'
+        key_file.write_bytes(mock_pem_data)
+
+        provider = PrivateKeyProvider(str(key_file), check_interval=0)
+        first = provider.get()
+
+        new_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        rotated = tmp_path / 'rotated.key'
+        rotated.write_bytes(new_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        ))
+        rotated.replace(key_file)
+
+        second = provider.get()
+        assert first is not second
+        assert provider.loads == 2
+
+    def test_file_not_found(self, tmp_path):
+        """異常系：ファイルが存在しない"""
+        provider = PrivateKeyProvider(str(tmp_path / 'not_exist.key'))
+        with pytest.raises(FileNotFoundError):
+            provider.get()
+
+
+class TestJWTSigner:
+    """JWTSignerクラスのテストケース"""
+
+    def test_sign(self, mock_private_key):
+        """正常系：PyJWTで検証可能なRS256トークンが生成される"""
+        signer = JWTSigner(lambda: mock_private_key)
+        payload = {"iss": "client", "sub": "account", "iat": 1700000000, "exp": 4102444800}
+
+        token = signer.sign(payload)
+
+        decoded = jwt.decode(token, mock_private_key.public_key(), algorithms=['RS256'])
+        assert decoded == payload
+        assert jwt.get_unverified_header(token) == {"alg": "RS256", "typ": "JWT"}
+
+
 class TestGetAccessToken:
     """get_access_token関数のテストケース"""
 
@@ -116,3 +179,103 @@ class TestGetAccessToken:
         result = get_access_token(mock_private_key)
         assert result is None
         assert "トークン取得のレスポンスが不正です" in caplog.text
+
+
+class TestTokenManager:
+    """TokenManagerクラスのテストケース"""
+
+    def test_cache_hit(self, mock_private_key):
+        """正常系：2回目以降はキャッシュから返される"""
+        with patch('services.auth.request_access_token',
+                   return_value={'access_token': 'token1', 'expires_in': '86400'}) as mock_request:
+            manager = TokenManager(lambda: mock_private_key, background_refresh=False)
+            assert manager.get_token() == 'token1'
+            assert manager.get_token() == 'token1'
+
+        assert mock_request.call_count == 1
+        assert manager.stats() == {'hits': 1, 'misses': 1, 'refreshes': 1, 'failures': 0}
+
+    def test_refresh_when_expiring(self, mock_private_key):
+        """正常系：残り有効期間が短い場合は再取得される"""
+        with patch('services.auth.request_access_token',
+                   side_effect=[{'access_token': 'token1', 'expires_in': '30'},
+                                {'access_token': 'token2', 'expires_in': '86400'}]):
+            manager = TokenManager(lambda: mock_private_key, min_validity=60, background_refresh=False)
+            assert manager.get_token() == 'token1'
+            assert manager.get_token() == 'token2'
+
+        assert manager.stats()['refreshes'] == 2
+
+    def test_single_flight(self, mock_private_key):
+        """正常系：同時に呼び出されてもトークン取得は1回のみ"""
+        def slow_request(private_key):
+            time.sleep(0.05)
+            return {'access_token': 'token1', 'expires_in': '86400'}
+
+        with patch('services.auth.request_access_token', side_effect=slow_request) as mock_request:
+            manager = TokenManager(lambda: mock_private_key, background_refresh=False)
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(manager.get_token()))
+                for _ in range(10)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert results == ['token1'] * 10
+        assert mock_request.call_count == 1
+        assert manager.stats()['misses'] == 10
+
+    def test_background_refresh(self, mock_private_key):
+        """正常系：有効期限前にバックグラウンドで更新される"""
+        with patch('services.auth.request_access_token',
+                   side_effect=[{'access_token': 'token1', 'expires_in': '300.05'},
+                                {'access_token': 'token2', 'expires_in': '86400'}]):
+            manager = TokenManager(lambda: mock_private_key, refresh_margin=300, min_validity=0)
+            assert manager.get_token() == 'token1'
+            time.sleep(0.3)
+            assert manager.get_token() == 'token2'
+            manager.close()
+
+        assert manager.stats()['refreshes'] == 2
+
+    def test_failure(self, mock_private_key):
+        """異常系：トークン取得に失敗した場合はNoneを返す"""
+        with patch('services.auth.request_access_token', return_value=None):
+            manager = TokenManager(lambda: mock_private_key, background_refresh=False)
+            assert manager.get_token() is None
+
+        assert manager.stats()['failures'] == 1
+
+    def test_signer(self, mock_private_key):
+        """正常系：署名器を指定した場合は署名器経由で取得する"""
+        signer = JWTSigner(lambda: mock_private_key)
+        with patch('services.auth.request_access_token',
+                   return_value={'access_token': 'token1'}) as mock_request:
+            manager = TokenManager(signer=signer, background_refresh=False)
+            assert manager.get_token() == 'token1'
+
+        mock_request.assert_called_once_with(signer=signer)
+
+    def test_refresh_if_stale(self, mock_private_key):
+        """正常系：失効したトークンのみ破棄して再取得する"""
+        with patch('services.auth.request_access_token',
+                   side_effect=[{'access_token': 'token1'}, {'access_token': 'token2'}]) as mock_request:
+            manager = TokenManager(lambda: mock_private_key, background_refresh=False)
+            assert manager.get_token() == 'token1'
+            assert manager.refresh_if_stale('token1') == 'token2'
+            # 既に更新済みの場合は再取得しない
+            assert manager.refresh_if_stale('token1') == 'token2'
+
+        assert mock_request.call_count == 2
+
+    def test_invalidate(self, mock_private_key):
+        """正常系：invalidate後は再取得される"""
+        with patch('services.auth.request_access_token',
+                   side_effect=[{'access_token': 'token1'}, {'access_token': 'token2'}]):
+            manager = TokenManager(lambda: mock_private_key, background_refresh=False)
+            assert manager.get_token() == 'token1'
+            manager.invalidate()
+            assert manager.get_token() == 'token2'
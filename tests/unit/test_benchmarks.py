@@ -0,0 +1,73 @@
+"""ベンチマーク用ローカルサーバー・集計処理のテスト"""
+import requests
+
+from benchmarks.bench_callback import DEFAULT_PAYLOADS, load_payloads, run_scenario
+from benchmarks.bench_send import compare, percentile
+from benchmarks.mock_server import MockLineWorksServer, MockServerConfig
+
+
+class TestMockLineWorksServer:
+    """MockLineWorksServerクラスのテストケース"""
+
+    def test_endpoints(self):
+        """トークン発行・メッセージ送信・ボット情報取得に応答する"""
+        with MockLineWorksServer() as server:
+            token = requests.post(server.auth_url, data={'grant_type': 'x'})
+            message = requests.post(f"{server.base_api_url}/bots/1/users/u%40example.com/messages", json={})
+            bot = requests.get(f"{server.base_api_url}/bots/1")
+            counts = server.counts()
+
+        assert token.status_code == 200 and 'access_token' in token.json()
+        assert message.status_code == 201
+        assert bot.json()['botId'] == '1'
+        assert counts == {'token 200': 1, 'message 201': 1, 'bot_info 200': 1}
+
+    def test_throttle_injection(self):
+        """設定した割合で429応答を返す"""
+        with MockLineWorksServer(MockServerConfig(throttle_rate=1.0, retry_after=2)) as server:
+            response = requests.get(f"{server.base_api_url}/bots/1")
+
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '2'
+
+    def test_error_injection(self):
+        """設定した割合で500応答を返す"""
+        with MockLineWorksServer(MockServerConfig(error_rate=1.0)) as server:
+            response = requests.get(f"{server.base_api_url}/bots/1")
+
+        assert response.status_code == 500
+
+
+class TestReport:
+    """集計処理のテストケース"""
+
+    def test_percentile(self):
+        """最近傍順位法でパーセンタイル値を求める"""
+        values = list(range(1, 101))
+        assert percentile(values, 0.5) == 50
+        assert percentile(values, 0.99) == 99
+        assert percentile([], 0.5) == 0.0
+
+    def test_compare(self):
+        """許容値を超えるスループット低下を検出する"""
+        baseline = [{'scenario': 'bulk', 'concurrency': 10, 'msgs_per_sec': 100.0, 'p99_ms': 1.0}]
+        slower = [{'scenario': 'bulk', 'concurrency': 10, 'msgs_per_sec': 80.0, 'p99_ms': 2.0}]
+        same = [{'scenario': 'bulk', 'concurrency': 10, 'msgs_per_sec': 95.0, 'p99_ms': 1.0}]
+
+        assert compare(slower, baseline, 0.1) == ['bulk c=10: -20.0%']
+        assert compare(same, baseline, 0.1) == []
+
+
+class TestCallbackLoad:
+    """コールバック受信の負荷テストのテストケース"""
+
+    def test_run_scenario(self):
+        """記録したペイロードを送信し、受信と処理の件数を集計する"""
+        payloads = load_payloads(DEFAULT_PAYLOADS)
+
+        row = run_scenario(payloads, events=50, clients=4, workers=2, handler_latency=0.0, reply=False)
+
+        assert row['accepted'] == 50
+        assert row['rejected'] == 0
+        assert row['handled'] == 50
+        assert row['ack_events_per_sec'] > 0
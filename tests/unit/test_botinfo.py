@@ -0,0 +1,137 @@
+"""ボット情報キャッシュのテスト"""
+import threading
+import time
+
+import pytest
+
+from services.api import APIClient
+from services.botinfo import BotInfoCache, BotNotFoundError, FetchResult
+
+BOT_URL = "https://www.worksapis.com/v1.0/bots/test_bot"
+
+
+class FakeFetcher:
+    """呼び出しを記録するボット情報の取得関数"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+        self.called = threading.Event()
+
+    def __call__(self, bot_id, etag):
+        self.calls.append((bot_id, etag))
+        self.called.set()
+        return self.results.pop(0)
+
+
+class TestBotInfoCache:
+    """BotInfoCacheクラスのテストケース"""
+
+    def test_hit(self):
+        """有効期間内は取得関数を呼ばずにキャッシュから返す"""
+        cache = BotInfoCache(ttl=60)
+        fetch = FakeFetcher(FetchResult(200, {"botName": "bot"}))
+
+        assert cache.get("bot1", fetch) == {"botName": "bot"}
+        assert cache.get("bot1", fetch) == {"botName": "bot"}
+        assert len(fetch.calls) == 1
+        assert cache.stats()['hits'] == 1
+
+    def test_returns_copy(self):
+        """返した値を変更してもキャッシュに影響しない"""
+        cache = BotInfoCache(ttl=60)
+        fetch = FakeFetcher(FetchResult(200, {"botName": "bot"}))
+
+        cache.get("bot1", fetch)["botName"] = "changed"
+
+        assert cache.get("bot1", fetch) == {"botName": "bot"}
+
+    def test_lru_eviction(self):
+        """上限を超えると最も古く参照されたボットから破棄する"""
+        cache = BotInfoCache(maxsize=2, ttl=60)
+        fetch = FakeFetcher(*(FetchResult(200, {"n": i}) for i in range(4)))
+
+        cache.get("a", fetch)
+        cache.get("b", fetch)
+        cache.get("a", fetch)
+        cache.get("c", fetch)  # b を破棄
+        cache.get("b", fetch)
+
+        assert [bot_id for bot_id, _ in fetch.calls] == ["a", "b", "c", "b"]
+        assert cache.stats()['evictions'] == 2
+
+    def test_revalidate_with_etag(self):
+        """期限切れ後は ETag で再検証し、304なら保持している値を返す"""
+        cache = BotInfoCache(ttl=0, stale_ttl=0)
+        fetch = FakeFetcher(FetchResult(200, {"botName": "bot"}, '"v1"'), FetchResult(304))
+
+        cache.get("bot1", fetch)
+        result = cache.get("bot1", fetch)
+
+        assert result == {"botName": "bot"}
+        assert fetch.calls == [("bot1", None), ("bot1", '"v1"')]
+        assert cache.stats()['revalidations'] == 1
+
+    def test_negative_cache(self):
+        """存在しないボットは否定応答として記憶する"""
+        cache = BotInfoCache(negative_ttl=60)
+        fetch = FakeFetcher(FetchResult(404))
+
+        with pytest.raises(BotNotFoundError):
+            cache.get("missing", fetch)
+        with pytest.raises(BotNotFoundError):
+            cache.get("missing", fetch)
+
+        assert len(fetch.calls) == 1
+        assert cache.stats()['negative_hits'] == 1
+
+    def test_stale_while_revalidate(self):
+        """期限切れ直後は古い値を返し、バックグラウンドで再取得する"""
+        cache = BotInfoCache(ttl=0, stale_ttl=60)
+        fetch = FakeFetcher(FetchResult(200, {"v": 1}), FetchResult(200, {"v": 2}))
+
+        assert cache.get("bot1", fetch) == {"v": 1}
+        fetch.called.clear()
+        assert cache.get("bot1", fetch) == {"v": 1}
+        assert fetch.called.wait(1)
+
+        deadline = time.monotonic() + 1
+        while cache._entries["bot1"].data != {"v": 2} and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert cache._entries["bot1"].data == {"v": 2}
+        assert cache.stats()['stale_hits'] == 1
+
+
+class TestAPIClientBotInfo:
+    """APIClient.get_bot_info のキャッシュ利用のテストケース"""
+
+    def test_cached(self, requests_mock):
+        """2回目以降はHTTPリクエストを送らない"""
+        requests_mock.get(BOT_URL, json={"botName": "bot"}, headers={"ETag": '"v1"'})
+        client = APIClient("dummy_token", bot_info_cache=BotInfoCache(ttl=60))
+
+        assert client.get_bot_info("test_bot") == {"botName": "bot"}
+        assert client.get_bot_info("test_bot") == {"botName": "bot"}
+        assert requests_mock.call_count == 1
+
+    def test_conditional_request(self, requests_mock):
+        """期限切れ後は If-None-Match を付けて再検証する"""
+        requests_mock.get(BOT_URL, [
+            {"json": {"botName": "bot"}, "headers": {"ETag": '"v1"'}},
+            {"status_code": 304},
+        ])
+        client = APIClient("dummy_token", bot_info_cache=BotInfoCache(ttl=0, stale_ttl=0))
+
+        client.get_bot_info("test_bot")
+        assert client.get_bot_info("test_bot") == {"botName": "bot"}
+        assert requests_mock.request_history[1].headers['If-None-Match'] == '"v1"'
+
+    def test_not_found(self, requests_mock):
+        """404応答は BotNotFoundError になり、以降はHTTPリクエストを送らない"""
+        requests_mock.get(BOT_URL, status_code=404)
+        client = APIClient("dummy_token", bot_info_cache=BotInfoCache(negative_ttl=60))
+
+        for _ in range(2):
+            with pytest.raises(BotNotFoundError):
+                client.get_bot_info("test_bot")
+        assert requests_mock.call_count == 1
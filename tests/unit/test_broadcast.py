@@ -0,0 +1,206 @@
+"""ファイルからの一斉送信（ブロードキャスト）のテスト"""
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+import lineworks_bot
+from services.broadcast import (
+    Checkpoint, ProgressReporter, Recipient, RecipientSender, broadcast, count_recipients, read_recipients
+)
+from services.bulk import SendResult
+from services.tenants import Tenant, TenantRegistry
+
+MESSAGE_URL = "https://www.worksapis.com/v1.0/bots/100/users/{}/messages"
+
+
+@pytest.fixture
+def registry():
+    """固定のトークンを返すテナントを登録したレジストリ"""
+    token_manager = MagicMock()
+    token_manager.get_token.return_value = 'dummy_token'
+    registry = TenantRegistry()
+    registry.add(Tenant('default', token_manager, default_bot_id='100'))
+    return registry
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    """5件の送信先を記述したCSVファイル"""
+    path = tmp_path / 'recipients.csv'
+    lines = ['user_id,name'] + [f'user{index}@example.com,ユーザー{index}' for index in range(5)]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+class TestReadRecipients:
+    """read_recipients のテストケース"""
+
+    def test_csv(self, csv_file):
+        """CSVの列はテンプレートに差し込む値になる"""
+        recipients = list(read_recipients(csv_file))
+
+        assert [recipient.row for recipient in recipients] == [0, 1, 2, 3, 4]
+        assert recipients[1].user_id == 'user1@example.com'
+        assert recipients[1].values == {'name': 'ユーザー1'}
+        assert recipients[1].message is None
+        assert count_recipients(csv_file) == 5
+
+    def test_csv_start(self, csv_file):
+        """開始位置より前の行は読み飛ばす"""
+        assert [recipient.row for recipient in read_recipients(csv_file, start=3)] == [3, 4]
+
+    def test_jsonl(self, tmp_path):
+        """JSONLは空行を数えず、解析できない行はエラーとして返す"""
+        path = tmp_path / 'recipients.jsonl'
+        path.write_text('\n'.join([
+            json.dumps({"user_id": "a@example.com", "message": "こんにちは", "bot_id": 200}),
+            '',
+            '{broken',
+            json.dumps({"user_id": "b@example.com", "values": {"count": 3}, "team": "営業"}),
+            json.dumps({"name": "IDなし"}),
+        ]) + '\n', encoding='utf-8')
+
+        recipients = list(read_recipients(str(path)))
+
+        assert [recipient.row for recipient in recipients] == [0, 1, 2, 3]
+        assert recipients[0].message == 'こんにちは'
+        assert recipients[0].bot_id == '200'
+        assert recipients[1].error is not None
+        assert recipients[2].values == {'team': '営業', 'count': 3}
+        assert recipients[3].error == 'user_id がありません'
+        assert count_recipients(str(path)) == 4
+
+    def test_unknown_extension(self, tmp_path):
+        """拡張子から形式を判定できない場合はエラー"""
+        with pytest.raises(ValueError):
+            list(read_recipients(str(tmp_path / 'recipients.txt')))
+
+
+class TestCheckpoint:
+    """Checkpointクラスのテストケース"""
+
+    def test_out_of_order(self, tmp_path):
+        """先頭から途切れなく完了した行数を記録する"""
+        checkpoint = Checkpoint(str(tmp_path / 'checkpoint'))
+        checkpoint.mark_done(1)
+        checkpoint.mark_done(2)
+        assert checkpoint.offset == 0
+
+        checkpoint.mark_done(0)
+        assert checkpoint.offset == 3
+
+    def test_save_and_load(self, tmp_path):
+        """保存したチェックポイントを読み込める"""
+        path = str(tmp_path / 'checkpoint')
+        assert Checkpoint.load(path).offset == 0
+
+        checkpoint = Checkpoint(path, offset=42)
+        checkpoint.save()
+
+        assert Checkpoint.load(path).offset == 42
+
+
+class TestRecipientSender:
+    """RecipientSenderクラスのテストケース"""
+
+    def test_template(self, registry, requests_mock):
+        """既定のメッセージに行の値を差し込んで送信する"""
+        requests_mock.post(MESSAGE_URL.format('a%40example.com'), status_code=201)
+        sender = RecipientSender(registry, "{name}さん、お知らせです")
+
+        result = sender(Recipient(0, 'a@example.com', values={'name': '山田'}))
+
+        assert result.success
+        assert result.status == 201
+        assert requests_mock.last_request.json() == {"content": {"type": "text", "text": "山田さん、お知らせです"}}
+
+    def test_row_message(self, registry, requests_mock):
+        """行のメッセージは既定のメッセージより優先する"""
+        requests_mock.post(MESSAGE_URL.format('a%40example.com'), status_code=201)
+        sender = RecipientSender(registry, "既定")
+
+        assert sender(Recipient(0, 'a@example.com', message='個別')).success
+        assert requests_mock.last_request.json()['content']['text'] == '個別'
+
+    def test_failures(self, registry, requests_mock):
+        """送信できない行は例外ではなく失敗の結果を返す"""
+        requests_mock.post(MESSAGE_URL.format('a%40example.com'), status_code=400)
+        sender = RecipientSender(registry, "{name}さん")
+
+        missing = sender(Recipient(0, 'a@example.com'))
+        rejected = sender(Recipient(1, 'a@example.com', values={'name': '山田'}))
+        invalid = sender(Recipient(2, '', error='user_id がありません'))
+
+        assert not missing.success and 'name' in missing.error
+        assert not rejected.success and rejected.status == 400
+        assert not invalid.success and invalid.attempts == 0
+        assert requests_mock.call_count == 1
+
+
+class TestBroadcast:
+    """broadcast のテストケース"""
+
+    def test_bounded_concurrency(self):
+        """全件を送信し、同時送信数を超えない"""
+        lock = threading.Lock()
+        active = [0, 0]
+        results = []
+
+        def sender(recipient):
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            time.sleep(0.005)
+            with lock:
+                active[0] -= 1
+            return SendResult(user_id=recipient.user_id, success=True)
+
+        recipients = (Recipient(row, f'user{row}') for row in range(50))
+        broadcast(recipients, sender, concurrency=4, on_result=lambda recipient, result: results.append(recipient.row))
+
+        assert sorted(results) == list(range(50))
+        assert active[1] <= 4
+
+    def test_progress(self):
+        """進捗の集計と残り時間"""
+        progress = ProgressReporter(total=10, done=5)
+        progress.update(SendResult(user_id='a', success=True))
+        progress.update(SendResult(user_id='b', success=False))
+
+        stats = progress.snapshot()
+        assert (stats['processed'], stats['succeeded'], stats['failed']) == (2, 1, 1)
+        assert stats['eta'] is not None
+        assert '7 / 10' in progress.line()
+
+
+class TestCommandLine:
+    """コマンドラインからの一斉送信のテストケース"""
+
+    def test_send_and_resume(self, registry, csv_file, tmp_path, requests_mock, monkeypatch, capsys):
+        """送信結果を出力し、チェックポイントから再開できる"""
+        monkeypatch.setattr(lineworks_bot, 'tenants', registry)
+        requests_mock.post(MESSAGE_URL.format('user3%40example.com'), status_code=400)
+        for index in (0, 1, 2, 4):
+            requests_mock.post(MESSAGE_URL.format(f'user{index}%40example.com'), status_code=201)
+        output = str(tmp_path / 'results.jsonl')
+
+        code = lineworks_bot.main([csv_file, '--message', '{name}さん', '--output', output, '--concurrency', '2'])
+
+        assert code == 1
+        rows = [json.loads(line) for line in open(output, encoding='utf-8')]
+        assert sorted(row['row'] for row in rows) == [0, 1, 2, 3, 4]
+        assert [row['user_id'] for row in rows if not row['success']] == ['user3@example.com']
+        assert Checkpoint.load(f"{output}.checkpoint").offset == 5
+        assert '5 / 5' in capsys.readouterr().err
+
+        # 途中から再開すると残りの行だけを送信し、結果を追記する
+        Checkpoint(f"{output}.checkpoint", offset=4).save()
+        requests_mock.reset_mock()
+        code = lineworks_bot.main([csv_file, '--message', '{name}さん', '--output', output, '--resume'])
+
+        assert code == 0
+        assert requests_mock.call_count == 1
+        assert len(open(output, encoding='utf-8').readlines()) == 6
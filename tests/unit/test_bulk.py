@@ -0,0 +1,110 @@
+"""一斉送信機能のテスト"""
+from unittest.mock import patch
+from urllib.parse import quote
+
+import pytest
+import requests
+
+from services.api import APIClient, encode_message_body
+from services.bulk import send_bulk, SendResult
+from services.payload import MessageTemplate
+
+
+@pytest.fixture
+def message_content():
+    """テスト用のメッセージコンテンツ"""
+    return {
+        "type": "text",
+        "text": "一斉送信テスト"
+    }
+
+
+def message_url(bot_id, user_id):
+    """メッセージ送信APIのURLを生成"""
+    return f"https://www.worksapis.com/v1.0/bots/{bot_id}/users/{quote(user_id)}/messages"
+
+
+class TestSendBulk:
+    """send_bulk関数のテストケース"""
+
+    def test_success(self, message_content, requests_mock):
+        """正常系：全ユーザーへ送信され、入力順に結果が返る"""
+        user_ids = [f"user{i}@example.com" for i in range(20)]
+        for user_id in user_ids:
+            requests_mock.post(message_url("test_bot", user_id), status_code=201)
+
+        results = send_bulk(APIClient("dummy_token"), "test_bot", user_ids, message_content, concurrency=4)
+
+        assert [result.user_id for result in results] == user_ids
+        assert all(result.success for result in results)
+        assert all(result.status == 201 for result in results)
+        assert all(result.latency_ms >= 0 for result in results)
+        assert requests_mock.call_count == 20
+        assert requests_mock.request_history[0].json() == {"content": message_content}
+
+    def test_partial_failure(self, message_content, requests_mock):
+        """異常系：一部の失敗が他のユーザーへの送信を止めない"""
+        requests_mock.post(message_url("test_bot", "ok1"), status_code=201)
+        requests_mock.post(message_url("test_bot", "bad"), status_code=400, text="Bad Request")
+        requests_mock.post(message_url("test_bot", "down"), exc=requests.exceptions.ConnectionError)
+        requests_mock.post(message_url("test_bot", "ok2"), status_code=201)
+
+        results = send_bulk(
+            APIClient("dummy_token"), "test_bot", ["ok1", "bad", "down", "ok2"], message_content
+        )
+
+        assert [result.success for result in results] == [True, False, False, True]
+        assert results[1].status == 400
+        assert results[1].error
+        assert results[2].status is None
+        assert results[2].error
+
+    def test_serialized_once(self, message_content, requests_mock):
+        """正常系：メッセージボディは一度だけシリアライズされる"""
+        for user_id in ["a", "b", "c"]:
+            requests_mock.post(message_url("test_bot", user_id), status_code=201)
+
+        with patch('services.bulk.encode_message_body', wraps=encode_message_body) as mock_encode:
+            send_bulk(APIClient("dummy_token"), "test_bot", iter(["a", "b", "c"]), message_content)
+
+        assert mock_encode.call_count == 1
+
+    def test_template(self, requests_mock):
+        """正常系：MessageTemplate にユーザーごとの値が差し込まれる"""
+        for user_id in ["a", "b"]:
+            requests_mock.post(message_url("test_bot", user_id), status_code=201)
+        template = MessageTemplate({"type": "text", "text": "{user_id}さんの残り{days}日"})
+
+        send_bulk(
+            APIClient("dummy_token"), "test_bot", ["a", "b"], template,
+            values={"a": {"days": 3}, "b": {"days": 10}}
+        )
+
+        texts = sorted(request.json()["content"]["text"] for request in requests_mock.request_history)
+        assert texts == ["aさんの残り3日", "bさんの残り10日"]
+
+    def test_template_missing_value(self, requests_mock):
+        """異常系：値が不足するユーザーは送信せずに失敗として返す"""
+        requests_mock.post(message_url("test_bot", "a"), status_code=201)
+        template = MessageTemplate({"type": "text", "text": "{days}日"})
+
+        results = send_bulk(APIClient("dummy_token"), "test_bot", ["a"], template)
+
+        assert results[0].success is False
+        assert requests_mock.call_count == 0
+
+    def test_invalid_concurrency(self, message_content):
+        """異常系：同時送信数が不正"""
+        with pytest.raises(ValueError):
+            send_bulk(APIClient("dummy_token"), "test_bot", ["a"], message_content, concurrency=0)
+
+
+class TestSendResult:
+    """SendResultクラスのテストケース"""
+
+    def test_defaults(self):
+        """既定値が正しく設定されることを検証"""
+        result = SendResult(user_id="user", success=True)
+        assert result.status is None
+        assert result.latency_ms == 0.0
+        assert result.error is None
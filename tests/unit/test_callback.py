@@ -0,0 +1,238 @@
+"""ボットのコールバック受信のテスト"""
+import json
+import os
+import socket
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from services.api import APIClient
+from services.callback import (
+    BOT_ID_HEADER, SIGNATURE_HEADER, CallbackDispatcher, CallbackEvent, CallbackServer, sign, verify_signature
+)
+
+SECRET = 'test-bot-secret'
+MESSAGE_URL = "https://www.worksapis.com/v1.0/bots/100/users/user%40example.com/messages"
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures', 'callback_payloads.jsonl')
+
+
+def recorded_payloads():
+    """記録したコールバックのボディ（1行1イベント）"""
+    with open(FIXTURES, 'rb') as f:
+        return [line.rstrip(b'\n') for line in f if line.strip()]
+
+
+def raw_post(url: str, headers: bytes, body: bytes = b'') -> bytes:
+    """ヘッダーをそのまま送信し、応答のステータス行を返す"""
+    host, port = url.split('//')[1].split('/')[0].split(':')
+    with socket.create_connection((host, int(port)), timeout=5) as sock:
+        sock.sendall(b'POST /callback HTTP/1.1\r\nHost: localhost\r\n' + headers + b'\r\n' + body)
+        return sock.makefile('rb').readline()
+
+
+def headers_for(body: bytes, secret: str = SECRET, bot_id: str = '100'):
+    """署名付きのリクエストヘッダー"""
+    return {SIGNATURE_HEADER: sign(body, secret), BOT_ID_HEADER: bot_id, 'Content-Type': 'application/json'}
+
+
+@pytest.fixture
+def dispatcher():
+    """固定のトークンのAPIクライアントで返信するディスパッチャー"""
+    dispatcher = CallbackDispatcher(lambda bot_id: APIClient('dummy_token'), workers=4)
+    yield dispatcher
+    dispatcher.close()
+
+
+class TestSignature:
+    """署名の検証のテストケース"""
+
+    def test_verify(self):
+        """Bot Secret による HMAC-SHA256 の署名を検証する"""
+        body = recorded_payloads()[0]
+        signature = sign(body, SECRET)
+
+        assert verify_signature(body, signature, SECRET)
+        assert not verify_signature(body + b' ', signature, SECRET)
+        assert not verify_signature(body, signature, 'other-secret')
+        assert not verify_signature(body, None, SECRET)
+        assert not verify_signature(body, 'ｘ', SECRET)
+
+
+class TestCallbackEvent:
+    """CallbackEventクラスのテストケース"""
+
+    def test_recorded_payloads(self):
+        """記録したペイロードからイベントを作成できる"""
+        events = [CallbackEvent.from_payload(json.loads(body), '100') for body in recorded_payloads()]
+
+        assert [event.type for event in events] == [
+            'message', 'message', 'message', 'postback', 'join', 'joined', 'leave'
+        ]
+        assert events[0].text == 'こんにちは'
+        assert events[0].user_id == 'user@example.com'
+        assert events[0].channel_id is None
+        assert events[1].channel_id == 'c0ffee00-0000-4000-8000-000000000001'
+        assert events[1].data == 'reserve'
+        assert events[2].text is None
+        assert events[3].data == 'action=approve&id=42'
+        assert events[4].user_id is None
+        assert events[5].raw['members'] == ['new@example.com']
+
+    def test_invalid(self):
+        """type のないペイロードは不正"""
+        with pytest.raises(ValueError):
+            CallbackEvent.from_payload({"source": {}})
+        with pytest.raises(ValueError):
+            CallbackEvent.from_payload([])
+        with pytest.raises(ValueError):
+            CallbackEvent.from_payload({"type": "message", "source": ["user@example.com"]})
+        with pytest.raises(ValueError):
+            CallbackEvent.from_payload({"type": "message", "content": "text"})
+
+
+class TestCallbackDispatcher:
+    """CallbackDispatcherクラスのテストケース"""
+
+    def test_handlers_and_reply(self, dispatcher, requests_mock):
+        """種類ごとのハンドラとすべての種類のハンドラを実行し、戻り値を返信する"""
+        requests_mock.post(MESSAGE_URL, status_code=201)
+        seen = []
+        dispatcher.on('*', lambda event: seen.append(('any', event.type)))
+
+        @dispatcher.on('message')
+        def echo(event):
+            seen.append(('message', event.text))
+            return f"受け付けました: {event.text}"
+
+        for body in recorded_payloads()[:1] + recorded_payloads()[4:5]:
+            assert dispatcher.submit(CallbackEvent.from_payload(json.loads(body), '100'))
+        assert dispatcher.join(5)
+
+        assert sorted(seen) == [('any', 'join'), ('any', 'message'), ('message', 'こんにちは')]
+        assert requests_mock.call_count == 1
+        assert requests_mock.last_request.json() == {
+            "content": {"type": "text", "text": "受け付けました: こんにちは"}
+        }
+        assert dispatcher.stats()['replied'] == 1
+        assert dispatcher.stats()['handled'] == 2
+
+    def test_handler_error(self, dispatcher):
+        """ハンドラの例外は記録し、他のハンドラは実行する"""
+        called = []
+
+        def broken(event):
+            raise RuntimeError("処理できません")
+
+        dispatcher.on('message', broken)
+        dispatcher.on('message', lambda event: called.append(event.type))
+
+        assert dispatcher.dispatch(CallbackEvent('message', user_id='user@example.com')) is False
+        assert called == ['message']
+        assert dispatcher.stats()['failed'] == 1
+
+    def test_reply_without_user(self, dispatcher):
+        """返信先のユーザーがいないイベントには返信できない"""
+        with pytest.raises(ValueError):
+            dispatcher.reply(CallbackEvent('join', bot_id='100'), "ようこそ")
+
+    def test_queue_full(self):
+        """処理待ちが上限に達すると受け付けない"""
+        release = threading.Event()
+        dispatcher = CallbackDispatcher(workers=1, queue_size=2)
+        dispatcher.on('message', lambda event: release.wait(5))
+
+        accepted = [dispatcher.submit(CallbackEvent('message')) for _ in range(3)]
+        release.set()
+        dispatcher.close()
+
+        assert accepted == [True, True, False]
+        assert dispatcher.stats()['rejected'] == 1
+
+
+class TestCallbackServer:
+    """CallbackServerクラスのテストケース"""
+
+    def test_ack_and_dispatch(self):
+        """署名が正しいコールバックにすぐ200を返し、ハンドラはワーカーで実行する"""
+        release = threading.Event()
+        handled = []
+        dispatcher = CallbackDispatcher(workers=2)
+
+        @dispatcher.on()
+        def slow(event):
+            release.wait(5)
+            handled.append(event.type)
+
+        with CallbackServer(dispatcher, secret=SECRET, port=0) as server, requests.Session() as session:
+            statuses = [
+                session.post(server.url, data=body, headers=headers_for(body), timeout=5).status_code
+                for body in recorded_payloads()
+            ]
+            release.set()
+            assert dispatcher.join(5)
+        dispatcher.close()
+
+        assert statuses == [200] * len(recorded_payloads())
+        assert len(handled) == len(recorded_payloads())
+
+    def test_rejects_invalid_requests(self):
+        """署名・ボディ・パスが不正なリクエストは拒否する"""
+        dispatcher = MagicMock()
+        body = recorded_payloads()[0]
+
+        with CallbackServer(dispatcher, secret={'100': SECRET}, port=0, max_body=1024) as server:
+            forged = requests.post(server.url, data=body, headers=headers_for(body, secret='forged'), timeout=5)
+            unknown_bot = requests.post(server.url, data=body, headers=headers_for(body, bot_id='200'), timeout=5)
+            broken = requests.post(server.url, data=b'{broken', headers=headers_for(b'{broken'), timeout=5)
+            too_large = requests.post(server.url, data=b'x' * 2048, headers=headers_for(b'x' * 2048), timeout=5)
+            wrong_path = requests.post(server.url + '/other', data=body, headers=headers_for(body), timeout=5)
+
+        assert forged.status_code == 401
+        assert unknown_bot.status_code == 401
+        assert broken.status_code == 400
+        assert too_large.status_code == 413
+        assert wrong_path.status_code == 404
+        dispatcher.submit.assert_not_called()
+
+    def test_invalid_content_length(self):
+        """Content-Length がない・負・数値でない場合はボディを読まずに拒否する"""
+        dispatcher = MagicMock()
+        body = recorded_payloads()[0]
+        signature = f"{SIGNATURE_HEADER}: {sign(body, SECRET)}\r\n".encode()
+
+        with CallbackServer(dispatcher, secret=SECRET, port=0) as server:
+            missing = raw_post(server.url, signature, body)
+            negative = raw_post(server.url, signature + b'Content-Length: -1\r\n', body)
+            not_integer = raw_post(server.url, signature + b'Content-Length: abc\r\n', body)
+
+        assert missing.split()[1] == b'411'
+        assert negative.split()[1] == b'400'
+        assert not_integer.split()[1] == b'400'
+        dispatcher.submit.assert_not_called()
+
+    def test_invalid_source(self):
+        """署名は正しいが source が不正なペイロードには400を返す"""
+        dispatcher = MagicMock()
+        server = CallbackServer(dispatcher, secret=SECRET, port=0)
+        body = b'{"type": "message", "source": "user@example.com"}'
+
+        assert server.handle(body, headers_for(body)) == 400
+        dispatcher.submit.assert_not_called()
+        server.stop()
+
+    def test_overloaded(self):
+        """処理待ちが上限に達している場合は503を返す"""
+        dispatcher = MagicMock()
+        dispatcher.submit.return_value = False
+        server = CallbackServer(dispatcher, secret=SECRET, port=0)
+        body = recorded_payloads()[0]
+
+        assert server.handle(body, headers_for(body)) == 503
+        server.stop()
+
+    def test_secret_required(self):
+        """Bot Secret がない場合はサーバーを作成できない"""
+        with pytest.raises(ValueError):
+            CallbackServer(MagicMock(), secret='', port=0)
@@ -0,0 +1,223 @@
+"""サーキットブレーカーのテスト"""
+import sqlite3
+import time
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+import lineworks_bot
+from services.api import APIClient
+from services.circuit import (
+    CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+)
+from services.dedup import DedupIndex
+from services.metrics import CIRCUIT_STATE
+from services.outbox import Outbox, OutboxWorkerPool
+from services.retry import RetryPolicy
+from services.tenants import Tenant, TenantRegistry
+
+MESSAGE_URL = "https://www.worksapis.com/v1.0/bots/test_bot/users/user%40example.com/messages"
+
+
+def fail(breaker: CircuitBreaker, count: int) -> None:
+    """失敗した呼び出しを記録する"""
+    for _ in range(count):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            with breaker.call():
+                raise requests.exceptions.ConnectionError("接続できません")
+
+
+def succeed(breaker: CircuitBreaker, count: int) -> None:
+    """成功した呼び出しを記録する"""
+    for _ in range(count):
+        with breaker.call():
+            pass
+
+
+class TestCircuitBreaker:
+    """CircuitBreakerクラスのテストケース"""
+
+    def test_opens_on_failure_rate(self):
+        """失敗率がしきい値に達すると回路が開く"""
+        breaker = CircuitBreaker('message', failure_rate=0.5, min_requests=4, open_duration=60)
+
+        succeed(breaker, 2)
+        fail(breaker, 1)
+        assert breaker.state == CLOSED
+        fail(breaker, 1)
+
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError) as excinfo:
+            succeed(breaker, 1)
+        assert excinfo.value.name == 'message'
+        assert 0 < excinfo.value.retry_after <= 60
+        assert breaker.stats()['rejected'] == 1
+
+    def test_min_requests(self):
+        """呼び出し数が最小数に満たない間は開かない"""
+        breaker = CircuitBreaker('message', failure_rate=0.5, min_requests=10)
+
+        fail(breaker, 9)
+
+        assert breaker.state == CLOSED
+
+    def test_opens_on_slow_calls(self):
+        """遅延した呼び出しの割合がしきい値に達すると回路が開く"""
+        breaker = CircuitBreaker('token', slow_call_duration=0.5, slow_call_rate=0.5, min_requests=2)
+
+        breaker.record(0.1, failed=False)
+        breaker.record(1.0, failed=False)
+
+        assert breaker.state == OPEN
+
+    def test_status_failure(self):
+        """failed を設定した呼び出しは失敗として記録される"""
+        breaker = CircuitBreaker('message', failure_rate=1.0, min_requests=2)
+
+        for _ in range(2):
+            with breaker.call() as outcome:
+                outcome.failed = True
+
+        assert breaker.state == OPEN
+
+    def test_window_expiry(self):
+        """ウィンドウを過ぎた記録は判定に含めない"""
+        breaker = CircuitBreaker('message', failure_rate=0.5, min_requests=2, window=0.05)
+
+        fail(breaker, 1)
+        time.sleep(0.06)
+        succeed(breaker, 1)
+
+        assert breaker.state == CLOSED
+        assert breaker.stats()['requests'] == 1
+
+    def test_half_open_closes(self):
+        """ハーフオープン中の試験的な呼び出しがすべて成功すると閉じる"""
+        breaker = CircuitBreaker('message', min_requests=1, open_duration=0, half_open_probes=2)
+        fail(breaker, 1)
+        assert breaker.state == OPEN
+
+        probe = breaker.before_call()
+        assert probe is True
+        assert breaker.state == HALF_OPEN
+        breaker.before_call()
+        # 試験枠が埋まっている間は拒否される
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record(0.01, failed=False, probe=True)
+        assert breaker.state == HALF_OPEN
+        breaker.record(0.01, failed=False, probe=True)
+        assert breaker.state == CLOSED
+
+    def test_half_open_reopens(self):
+        """ハーフオープン中の呼び出しが失敗すると再び開く"""
+        breaker = CircuitBreaker('message', min_requests=1, open_duration=0.05, half_open_probes=1)
+        fail(breaker, 1)
+        time.sleep(0.06)
+
+        fail(breaker, 1)
+
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError):
+            succeed(breaker, 1)
+
+    def test_other_exception_releases_probe(self):
+        """リクエスト以外の例外では結果を記録せず、試験枠を解放する"""
+        breaker = CircuitBreaker('message', min_requests=1, open_duration=0, half_open_probes=1)
+        fail(breaker, 1)
+
+        with pytest.raises(ValueError):
+            with breaker.call():
+                raise ValueError("不正な値")
+
+        assert breaker.state == HALF_OPEN
+        succeed(breaker, 1)
+        assert breaker.state == CLOSED
+
+
+class TestCircuitBreakerRegistry:
+    """CircuitBreakerRegistryクラスのテストケース"""
+
+    def test_states_and_gauge(self):
+        """エンドポイントの種類ごとの状態を監視用ゲージに出力する"""
+        registry = CircuitBreakerRegistry(min_requests=1, open_duration=60)
+        registry.get('message')
+        fail(registry.get('token'), 1)
+
+        assert registry.states() == {'message': CLOSED, 'token': OPEN}
+        assert CIRCUIT_STATE.collect() == {('message',): 0.0, ('token',): 2.0}
+
+        registry.reset()
+        assert registry.states() == {'message': CLOSED, 'token': CLOSED}
+
+
+class TestAPIClientCircuit:
+    """APIClient とサーキットブレーカーの連携のテストケース"""
+
+    def test_fast_fail(self, requests_mock):
+        """回路が開いている間はHTTPリクエストを送信せずに失敗する"""
+        registry = CircuitBreakerRegistry(min_requests=2, failure_rate=1.0, open_duration=60)
+        client = APIClient("dummy_token", retry_policy=RetryPolicy(max_attempts=1), circuit_breakers=registry)
+        requests_mock.post(MESSAGE_URL, status_code=503)
+
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.HTTPError):
+                client.send_bot_message("test_bot", "user@example.com", {"type": "text", "text": "テスト"})
+        assert registry.states() == {'message': OPEN}
+
+        with pytest.raises(CircuitOpenError):
+            client.send_bot_message("test_bot", "user@example.com", {"type": "text", "text": "テスト"})
+        assert requests_mock.call_count == 2
+
+    def test_client_error_not_counted(self, requests_mock):
+        """4xx応答は失敗として数えない"""
+        registry = CircuitBreakerRegistry(min_requests=1, failure_rate=1.0)
+        client = APIClient("dummy_token", circuit_breakers=registry)
+        requests_mock.post(MESSAGE_URL, status_code=400)
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.send_bot_message("test_bot", "user@example.com", {"type": "text", "text": "テスト"})
+
+        assert registry.states() == {'message': CLOSED}
+
+
+class TestOutboxCircuit:
+    """送信キューとサーキットブレーカーの連携のテストケース"""
+
+    def test_defer_on_open_circuit(self, tmp_path):
+        """回路が開いている場合は試行回数に数えずに再送待ちに戻す"""
+        outbox = Outbox(str(tmp_path / 'outbox.db'), max_attempts=1)
+        client = MagicMock()
+        client.post_bot_message.side_effect = CircuitOpenError('message', 0)
+        pool = OutboxWorkerPool(outbox, lambda: client)
+        outbox.enqueue("test_bot", "user@example.com", {"type": "text", "text": "テスト"})
+
+        assert pool.drain_once() == 1
+
+        entries = outbox.claim()
+        assert len(entries) == 1
+        assert entries[0].attempts == 1
+        assert outbox.stats()['dead'] == 0
+        outbox.close()
+
+    def test_divert_enqueue_failure(self, monkeypatch, caplog):
+        """回路が開いていて送信キューへの追加にも失敗した場合は、重複記録を取り消してFalseを返す"""
+        token_manager = MagicMock()
+        token_manager.get_token.return_value = 'dummy_token'
+        registry = TenantRegistry()
+        registry.add(Tenant('default', token_manager, default_bot_id='test_bot'))
+        dedup = DedupIndex(window=60, max_entries=100, path=None)
+        outbox = MagicMock()
+        outbox.enqueue.side_effect = sqlite3.OperationalError("database is locked")
+        monkeypatch.setattr(lineworks_bot, 'tenants', registry)
+        monkeypatch.setattr(lineworks_bot, 'get_dedup_index', lambda: dedup)
+        monkeypatch.setattr(lineworks_bot, 'CIRCUIT_BREAKER_DIVERT_TO_OUTBOX', True)
+        monkeypatch.setattr(lineworks_bot, '_get_outbox', lambda: outbox)
+        monkeypatch.setattr(lineworks_bot, 'send_message', MagicMock(side_effect=CircuitOpenError('message', 0)))
+
+        assert lineworks_bot.send_bot_message("user@example.com", "テスト") is False
+
+        assert "送信キューへの追加に失敗しました" in caplog.text
+        assert dedup.stats() == {'size': 0, 'recorded': 0, 'duplicates': 0, 'pending': 0}
@@ -0,0 +1,139 @@
+"""メッセージのコアレシング機能のテスト"""
+import threading
+
+import pytest
+
+from services.coalesce import MessageCoalescer, mergeable_text
+
+
+class RecordingSender:
+    """送信内容を記録する送信関数"""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+        self._lock = threading.Lock()
+
+    def __call__(self, content, bot_id, user_id, access_token, token_refresher=None):
+        with self._lock:
+            self.calls.append((content, bot_id, user_id, access_token))
+        if self.error:
+            raise self.error
+        return {"sent": len(self.calls)}
+
+
+def text(value):
+    return {"type": "text", "text": value}
+
+
+@pytest.fixture
+def sender():
+    return RecordingSender()
+
+
+class TestMessageCoalescer:
+    """MessageCoalescerクラスのテストケース"""
+
+    def test_merge_within_window(self, sender):
+        """ウィンドウ内の同じユーザーへのメッセージを1通にまとめる"""
+        coalescer = MessageCoalescer(sender, window=0.05)
+        futures = [coalescer.submit(text(f"alert {i}"), "bot", "u1", "token") for i in range(3)]
+
+        results = [future.result(timeout=1) for future in futures]
+        coalescer.close()
+
+        assert sender.calls == [(text("alert 0\nalert 1\nalert 2"), "bot", "u1", "token")]
+        assert results == [{"sent": 1}] * 3
+        assert coalescer.stats() == {'submitted': 3, 'sent': 1, 'pending': 0}
+
+    def test_separate_users(self, sender):
+        """ユーザーごとに別々にまとめる"""
+        coalescer = MessageCoalescer(sender, window=60)
+        coalescer.submit(text("a"), "bot", "u1", "token")
+        coalescer.submit(text("b"), "bot", "u2", "token")
+        coalescer.submit(text("c"), "bot", "u1", "token")
+        coalescer.close()
+
+        assert sorted((call[2], call[0]["text"]) for call in sender.calls) == [("u1", "a\nc"), ("u2", "b")]
+
+    def test_max_length(self, sender):
+        """連結後の本文が上限を超える場合は分けて送信する"""
+        coalescer = MessageCoalescer(sender, window=60, max_length=10)
+        for value in ("12345", "1234", "123"):
+            coalescer.submit(text(value), "bot", "u1", "token")
+        coalescer.close()
+
+        assert [call[0]["text"] for call in sender.calls] == ["12345\n1234", "123"]
+
+    def test_max_messages(self, sender):
+        """件数の上限に達した時点で送信する"""
+        coalescer = MessageCoalescer(sender, window=60, max_messages=2)
+        futures = [coalescer.submit(text(str(i)), "bot", "u1", "token") for i in range(2)]
+
+        futures[1].result(timeout=1)
+        coalescer.close()
+
+        assert [call[0]["text"] for call in sender.calls] == ["0\n1"]
+
+    def test_non_text_keeps_order(self, sender):
+        """テキスト以外のメッセージは連結せず、順序を保って直ちに送信する"""
+        image = {"type": "image", "previewImageUrl": "p", "originalContentUrl": "o"}
+        coalescer = MessageCoalescer(sender, window=60)
+        coalescer.submit(text("a"), "bot", "u1", "token")
+        coalescer.submit(text("b"), "bot", "u1", "token")
+        coalescer.submit(image, "bot", "u1", "token").result(timeout=1)
+        coalescer.close()
+
+        assert [call[0] for call in sender.calls] == [text("a\nb"), image]
+
+    def test_flushes_keep_order(self):
+        """同じユーザーへの送信は、前の送信の完了を待って受け付けた順に行う"""
+        release = threading.Event()
+        sent = []
+
+        def blocking_sender(content, bot_id, user_id, access_token, token_refresher=None):
+            if content["text"] == "0":
+                release.wait(5)
+            sent.append(content["text"])
+            return {}
+
+        coalescer = MessageCoalescer(blocking_sender, window=60, max_messages=1, workers=4)
+        futures = [coalescer.submit(text(str(i)), "bot", "u1", "token") for i in range(20)]
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+        coalescer.close()
+
+        assert sent == [str(i) for i in range(20)]
+
+    def test_error_propagates(self):
+        """送信失敗はまとめた全メッセージの Future に伝わる"""
+        coalescer = MessageCoalescer(RecordingSender(error=ValueError("boom")), window=60)
+        futures = [coalescer.submit(text(str(i)), "bot", "u1", "token") for i in range(2)]
+        coalescer.close()
+
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=1)
+
+    def test_cancelled_message_not_sent(self, sender):
+        """送信前にキャンセルしたメッセージは送信しない"""
+        coalescer = MessageCoalescer(sender, window=60)
+        coalescer.submit(text("a"), "bot", "u1", "token").cancel()
+        coalescer.submit(text("b"), "bot", "u1", "token")
+        coalescer.close()
+
+        assert [call[0]["text"] for call in sender.calls] == ["b"]
+
+    def test_closed(self, sender):
+        """終了後は受け付けない"""
+        coalescer = MessageCoalescer(sender)
+        coalescer.close()
+        with pytest.raises(RuntimeError):
+            coalescer.submit(text("a"), "bot", "u1", "token")
+
+    def test_mergeable_text(self):
+        """追加項目のないテキストメッセージのみ連結対象"""
+        assert mergeable_text(text("a")) == "a"
+        assert mergeable_text({"type": "text", "text": "a", "i18nTexts": []}) is None
+        assert mergeable_text({"type": "image"}) is None
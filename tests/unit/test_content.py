@@ -0,0 +1,109 @@
+"""メッセージコンテンツの作成・検証機能のテスト"""
+import pytest
+
+from services import content
+from services.api import APIClient
+from services.content import ContentValidationError, validate_content
+
+
+class TestBuilders:
+    """コンテンツ作成関数のテストケース"""
+
+    def test_text(self):
+        """テキストメッセージを作成できる"""
+        assert content.text("こんにちは") == {"type": "text", "text": "こんにちは"}
+
+    def test_image(self):
+        """画像メッセージはプレビューURLを省略すると元画像のURLを使う"""
+        assert content.image("https://example.com/a.png") == {
+            "type": "image",
+            "previewImageUrl": "https://example.com/a.png",
+            "originalContentUrl": "https://example.com/a.png",
+        }
+        assert content.image(file_id="file-1") == {"type": "image", "fileId": "file-1"}
+
+    def test_button_template(self):
+        """ボタン付きメッセージを作成できる"""
+        message = content.button_template("承認しますか？", [
+            content.message_action("承認", postback="approve"),
+            content.uri_action("詳細", "https://example.com/requests/1"),
+        ])
+
+        assert message["type"] == "button_template"
+        assert message["actions"][0] == {"type": "message", "label": "承認", "postback": "approve"}
+
+    def test_list_template(self):
+        """リストメッセージを作成できる"""
+        message = content.list_template(
+            [content.list_element("項目1", subtitle="説明"), content.list_element("項目2")],
+            cover={"title": "一覧"},
+            actions=[[content.message_action("もっと見る", text="more")]]
+        )
+
+        assert [element["title"] for element in message["elements"]] == ["項目1", "項目2"]
+        assert message["coverData"] == {"title": "一覧"}
+
+    def test_carousel(self):
+        """カルーセルメッセージを作成できる"""
+        column = content.carousel_column(
+            "本文", [content.uri_action("開く", "https://example.com")],
+            title="タイトル", image_url="https://example.com/a.png"
+        )
+        message = content.carousel([column, column], image_aspect_ratio="square")
+
+        assert len(message["columns"]) == 2
+        assert message["imageAspectRatio"] == "square"
+
+    def test_builder_rejects_invalid(self):
+        """作成時に検証され、不正な値は ContentValidationError"""
+        with pytest.raises(ContentValidationError) as excinfo:
+            content.carousel([content.carousel_column("x" * 61, [content.message_action("a", text="a")])])
+        assert excinfo.value.path == "content.columns[0].text"
+
+        with pytest.raises(ContentValidationError):
+            content.uri_action("開く", "http://insecure.example.com")
+
+
+class TestValidateContent:
+    """validate_content関数のテストケース"""
+
+    def test_valid(self):
+        """正しいコンテンツはそのまま返す"""
+        message = {"type": "sticker", "packageId": "1", "stickerId": "2"}
+        assert validate_content(message) is message
+
+    @pytest.mark.parametrize('message, path', [
+        ({"type": "unknown"}, "content.type"),
+        ({"type": "text"}, "content.text"),
+        ({"type": "text", "text": "x" * 2001}, "content.text"),
+        ({"type": "text", "text": 123}, "content.text"),
+        ({"type": "image"}, "content"),
+        ({"type": "link", "contentText": "a", "linkText": "b", "link": "ftp://x"}, "content.link"),
+        ({"type": "button_template", "contentText": "a", "actions": []}, "content.actions"),
+        ({"type": "button_template", "contentText": "a", "actions": [{"type": "jump"}]}, "content.actions[0].type"),
+        ({"type": "carousel", "imageSize": "huge", "columns": [{"text": "a", "actions": [
+            {"type": "message", "text": "a"}]}]}, "content.imageSize"),
+    ])
+    def test_invalid(self, message, path):
+        """不正な項目の位置が例外の path に設定される"""
+        with pytest.raises(ContentValidationError) as excinfo:
+            validate_content(message)
+        assert excinfo.value.path == path
+        assert isinstance(excinfo.value, ValueError)
+
+    def test_validator_cached_per_type(self):
+        """検証関数はタイプごとに一度だけ組み立てられる"""
+        content._content_validator.cache_clear()
+        for _ in range(3):
+            validate_content({"type": "text", "text": "a"})
+            validate_content({"type": "sticker", "packageId": "1", "stickerId": "2"})
+
+        info = content._content_validator.cache_info()
+        assert info.misses == 2
+        assert info.hits == 4
+
+    def test_invalid_content_not_sent(self, requests_mock):
+        """不正なコンテンツはHTTPリクエストを送信せずに例外となる"""
+        with pytest.raises(ContentValidationError):
+            APIClient("dummy_token").send_bot_message("bot", "u1", {"type": "text", "text": ""})
+        assert requests_mock.call_count == 0
@@ -0,0 +1,124 @@
+"""タイムアウトと制限時間（デッドライン）のテスト"""
+import time
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from services.api import APIClient
+from services.circuit import CircuitBreaker, CLOSED
+from services.deadline import DeadlineExceededError, check, deadline_scope, remaining, request_timeout
+from services.ratelimit import RateLimiter
+from services.retry import RetryPolicy
+
+TEST_URL = "https://www.worksapis.com/v1.0/test-endpoint"
+
+
+class TestDeadlineScope:
+    """deadline_scope のテストケース"""
+
+    def test_no_deadline(self):
+        """制限時間を設定しない場合は無制限"""
+        assert remaining() is None
+        with deadline_scope(None) as deadline:
+            assert deadline is None
+            assert remaining() is None
+        check('request')
+
+    def test_remaining(self):
+        """残り時間はブロックを抜けると元に戻る"""
+        with deadline_scope(10):
+            assert 9 < remaining() <= 10
+        assert remaining() is None
+
+    def test_nested_keeps_earlier(self):
+        """内側でより長い制限時間を指定しても外側の制限時刻を超えない"""
+        with deadline_scope(1) as outer:
+            with deadline_scope(60) as inner:
+                assert inner == outer
+            with deadline_scope(0.5) as inner:
+                assert inner < outer
+
+    def test_check_expired(self):
+        """制限時刻を過ぎると例外"""
+        with deadline_scope(0.01):
+            time.sleep(0.02)
+            with pytest.raises(DeadlineExceededError, match='token'):
+                check('token')
+
+
+class TestRequestTimeout:
+    """request_timeout のテストケース"""
+
+    def test_default(self):
+        """制限時間がなければ設定値をそのまま返す"""
+        assert request_timeout(3.05, 10) == (3.05, 10)
+        assert request_timeout(0, None) == (None, None)
+
+    def test_capped_by_deadline(self):
+        """残り時間が短い場合は残り時間に切り詰める"""
+        with deadline_scope(1):
+            connect, read = request_timeout(3.05, None)
+        assert 0 < connect <= 1
+        assert 0 < read <= 1
+
+    def test_expired(self):
+        """制限時刻を過ぎている場合は例外"""
+        with deadline_scope(0.01):
+            time.sleep(0.02)
+            with pytest.raises(DeadlineExceededError):
+                request_timeout(3.05, 10)
+
+
+class TestDeadlinePropagation:
+    """各段階への制限時間の引き継ぎのテストケース"""
+
+    def test_request_timeout_passed(self, requests_mock):
+        """HTTPリクエストに接続・読み取りのタイムアウトが指定される"""
+        client = APIClient("dummy_token", timeout=(1.5, 4.0))
+        requests_mock.get(TEST_URL, json={})
+        requests_mock.post(TEST_URL, json={})
+
+        client._make_request("GET", "/test-endpoint")
+        assert requests_mock.last_request.timeout == (1.5, 4.0)
+
+        with deadline_scope(2):
+            client._make_request("POST", "/test-endpoint", body=b'{}')
+        connect, read = requests_mock.last_request.timeout
+        assert connect == 1.5
+        assert 0 < read <= 2
+
+    def test_no_retry_past_deadline(self, requests_mock):
+        """再試行の待機で制限時間を超える場合は再試行しない"""
+        client = APIClient("dummy_token", retry_policy=RetryPolicy(max_attempts=5, deadline=None))
+        requests_mock.get(TEST_URL, status_code=503)
+
+        started = time.monotonic()
+        with patch.object(RetryPolicy, 'backoff', return_value=5.0), deadline_scope(1):
+            with pytest.raises(requests.exceptions.HTTPError):
+                client._make_request("GET", "/test-endpoint")
+
+        assert time.monotonic() - started < 1
+        assert requests_mock.call_count == 1
+
+    def test_rate_limit_wait_past_deadline(self):
+        """送信枠の待機で制限時間を超える場合は待機せずに例外"""
+        limiter = RateLimiter(global_rate=1, global_burst=1, per_bot_rate=0, per_bot_burst=0)
+        limiter.acquire()
+
+        started = time.monotonic()
+        with deadline_scope(0.1):
+            with pytest.raises(DeadlineExceededError, match='rate_limit'):
+                limiter.acquire()
+        assert time.monotonic() - started < 0.1
+
+    def test_circuit_not_counted(self):
+        """制限時間による打ち切りはサーキットブレーカーの失敗に数えない"""
+        breaker = CircuitBreaker('message', min_requests=1)
+
+        with pytest.raises(DeadlineExceededError):
+            with breaker.call():
+                raise DeadlineExceededError('request')
+
+        assert breaker.state == CLOSED
+        assert breaker.stats()['requests'] == 0
@@ -0,0 +1,146 @@
+"""重複送信抑止機能のテスト"""
+import threading
+import time
+
+import pytest
+
+from services.deadline import DeadlineExceededError
+from services.dedup import DedupIndex, fingerprint
+
+
+def text(value):
+    return {"type": "text", "text": value}
+
+
+class TestFingerprint:
+    """fingerprint関数のテストケース"""
+
+    def test_key_order_independent(self):
+        """キーの順序が異なる同じ内容は同じハッシュになる"""
+        a = {"type": "text", "text": "hello"}
+        b = {"text": "hello", "type": "text"}
+        assert fingerprint("bot", "u1", a) == fingerprint("bot", "u1", b)
+
+    def test_distinguishes_recipient(self):
+        """ボット・ユーザー・内容のいずれかが異なれば別のハッシュになる"""
+        base = fingerprint("bot", "u1", text("hello"))
+        assert base != fingerprint("bot", "u2", text("hello"))
+        assert base != fingerprint("bot2", "u1", text("hello"))
+        assert base != fingerprint("bot", "u1", text("hello!"))
+        # 区切りがあるため連結結果が同じでも衝突しない
+        assert fingerprint("ab", "c", b"x") != fingerprint("a", "bc", b"x")
+
+
+class TestDedupIndex:
+    """DedupIndexクラスのテストケース"""
+
+    def test_duplicate_within_window(self):
+        """ウィンドウ内の同じメッセージを重複と判定する"""
+        index = DedupIndex(window=60, max_entries=100, path=None)
+        assert index.check_and_record("bot", "u1", text("alert")) is False
+        assert index.check_and_record("bot", "u1", text("alert")) is True
+        assert index.check_and_record("bot", "u2", text("alert")) is False
+        assert index.stats() == {'size': 2, 'recorded': 2, 'duplicates': 1, 'pending': 0}
+
+    def test_expires_after_window(self):
+        """ウィンドウを過ぎると再び送信できる"""
+        index = DedupIndex(window=0.05, max_entries=100, path=None)
+        assert index.check_and_record("bot", "u1", text("alert")) is False
+        time.sleep(0.1)
+        assert index.check_and_record("bot", "u1", text("alert")) is False
+        assert index.stats()['size'] == 1
+
+    def test_duplicate_does_not_extend_window(self):
+        """重複判定では送信時刻を更新しない"""
+        index = DedupIndex(window=0.1, max_entries=100, path=None)
+        index.check_and_record("bot", "u1", text("alert"))
+        time.sleep(0.06)
+        assert index.check_and_record("bot", "u1", text("alert")) is True
+        time.sleep(0.06)
+        assert index.check_and_record("bot", "u1", text("alert")) is False
+
+    def test_forget(self):
+        """取り消した記録は重複と判定しない"""
+        index = DedupIndex(window=60, max_entries=100, path=None)
+        index.check_and_record("bot", "u1", text("alert"))
+        index.forget("bot", "u1", text("alert"))
+        assert index.check_and_record("bot", "u1", text("alert")) is False
+
+    def test_reserve_not_recorded_until_confirm(self):
+        """予約しただけでは送信済みとして扱わず、確定後に重複と判定する"""
+        index = DedupIndex(window=60, max_entries=100, path=None)
+        assert index.reserve("bot", "u1", text("alert")) is False
+        assert index.stats() == {'size': 0, 'recorded': 0, 'duplicates': 0, 'pending': 1}
+        index.confirm("bot", "u1", text("alert"))
+        assert index.stats() == {'size': 1, 'recorded': 1, 'duplicates': 0, 'pending': 0}
+        assert index.reserve("bot", "u1", text("alert")) is True
+
+    def test_pending_waits_for_confirm(self):
+        """送信中の同じメッセージは結果を待ち、成功していれば重複と判定する"""
+        index = DedupIndex(window=60, max_entries=100, path=None)
+        assert index.reserve("bot", "u1", text("alert")) is False
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(index.reserve("bot", "u1", text("alert"), timeout=5)))
+        waiter.start()
+        time.sleep(0.05)
+        assert results == []
+
+        index.confirm("bot", "u1", text("alert"))
+        waiter.join()
+        assert results == [True]
+
+    def test_pending_takes_over_after_forget(self):
+        """送信中の同じメッセージが失敗した場合は、待っていた側が改めて送信する"""
+        index = DedupIndex(window=60, max_entries=100, path=None)
+        assert index.reserve("bot", "u1", text("alert")) is False
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(index.reserve("bot", "u1", text("alert"), timeout=5)))
+        waiter.start()
+        time.sleep(0.05)
+
+        index.forget("bot", "u1", text("alert"))
+        waiter.join()
+        assert results == [False]
+        assert index.stats()['pending'] == 1
+
+    def test_pending_wait_timeout(self):
+        """送信中の結果が制限時間内に出なければ DeadlineExceededError を送出する"""
+        index = DedupIndex(window=60, max_entries=100, path=None)
+        index.reserve("bot", "u1", text("alert"))
+        with pytest.raises(DeadlineExceededError):
+            index.reserve("bot", "u1", text("alert"), timeout=0.05)
+
+    def test_max_entries(self):
+        """上限を超えた場合は古い記録から破棄する"""
+        index = DedupIndex(window=60, max_entries=3, path=None)
+        for i in range(5):
+            index.check_and_record("bot", f"u{i}", text("alert"))
+        assert index.stats()['size'] == 3
+        assert index.check_and_record("bot", "u0", text("alert")) is False
+        assert index.check_and_record("bot", "u4", text("alert")) is True
+
+    def test_persistence(self, tmp_path):
+        """永続化した記録は別のインスタンスにも引き継がれる"""
+        path = str(tmp_path / "dedup.db")
+        index = DedupIndex(window=60, max_entries=100, path=path)
+        index.check_and_record("bot", "u1", text("alert"))
+        index.check_and_record("bot", "u2", text("alert"))
+        index.forget("bot", "u2", text("alert"))
+        index.close()
+
+        reopened = DedupIndex(window=60, max_entries=100, path=path)
+        assert reopened.check_and_record("bot", "u1", text("alert")) is True
+        assert reopened.check_and_record("bot", "u2", text("alert")) is False
+        reopened.close()
+
+    def test_persistence_skips_expired(self, tmp_path):
+        """ウィンドウを過ぎた記録は読み込まない"""
+        path = str(tmp_path / "dedup.db")
+        index = DedupIndex(window=0.05, max_entries=100, path=path)
+        index.check_and_record("bot", "u1", text("alert"))
+        index.close()
+        time.sleep(0.1)
+
+        reopened = DedupIndex(window=0.05, max_entries=100, path=path)
+        assert reopened.stats()['size'] == 0
+        reopened.close()
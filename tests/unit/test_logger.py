@@ -1,11 +1,19 @@
 """ロガー機能のテスト"""
 from unittest.mock import patch, MagicMock
 import pytest
+import io
+import json
 import os
+import queue
 import sys
 import logging
+import threading
+import time
 
-from services.logger import Logger, logger
+from services.logger import (
+    Logger, logger, BoundedQueueHandler, BatchQueueListener, JsonFormatter, CorrelationIdFilter,
+    correlation_scope, get_correlation_id
+)
 
 
 class TestLogger:
@@ -80,4 +88,240 @@ class TestLogger:
             mock_logger.error.assert_called_with("例外付きエラーログ", exc_info=exception)
             
             test_logger.critical("テストクリティカルログ")
-            mock_logger.critical.assert_called_once_with("テストクリティカルログ", exc_info=None)
\ No newline at end of file
+            mock_logger.critical.assert_called_once_with("テストクリティカルログ", exc_info=None)
+
+class TestBoundedQueueHandler:
+    """BoundedQueueHandler クラスのテストケース"""
+
+    @staticmethod
+    def make_record(level=logging.INFO):
+        """テスト用のログレコードを作成"""
+        return logging.LogRecord('test', level, __file__, 1, 'message', None, None)
+
+    def test_drop(self):
+        """drop: キューが埋まったらレコードを破棄する"""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2), overflow_policy='drop')
+        for _ in range(5):
+            handler.emit(self.make_record())
+
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+
+    def test_sample(self):
+        """sample: キューが半分以上埋まったら INFO を間引き、WARNING 以上は残す"""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=4), overflow_policy='sample', sample_rate=0.0)
+        for _ in range(4):
+            handler.emit(self.make_record())
+        handler.emit(self.make_record(logging.WARNING))
+
+        assert handler.queue.qsize() == 3
+        assert handler.queue.queue[-1].levelno == logging.WARNING
+        assert handler.dropped == 2
+
+    def test_drop_count_threads(self):
+        """複数スレッドから破棄しても破棄数を数え漏らさない"""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1), overflow_policy='drop')
+        handler.emit(self.make_record())
+
+        def work():
+            for _ in range(5000):
+                handler.emit(self.make_record())
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert handler.dropped == 40000
+
+    def test_invalid_policy(self):
+        """サポートされていないポリシーはエラー"""
+        with pytest.raises(ValueError):
+            BoundedQueueHandler(queue.Queue(), overflow_policy='unknown')
+
+
+class TestBatchQueueListener:
+    """BatchQueueListener クラスのテストケース"""
+
+    def test_batch_write(self):
+        """キューのレコードがまとめて書き込まれ、停止時に残りも書き込まれる"""
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        log_queue = queue.Queue()
+        listener = BatchQueueListener(log_queue, [handler], batch_size=10)
+
+        for i in range(25):
+            log_queue.put(logging.LogRecord('test', logging.INFO, __file__, 1, f'msg{i}', None, None))
+        listener.start()
+        listener.stop()
+
+        assert stream.getvalue().splitlines() == [f'msg{i}' for i in range(25)]
+
+
+class TestAsyncLogging:
+    """非同期ログモードのテストケース"""
+
+    def test_enable_disable(self):
+        """非同期モードの切り替えでハンドラーが入れ替わり、元に戻る"""
+        original_handlers = list(logger._logger.handlers)
+
+        logger.enable_async(max_queue=100, overflow_policy='drop')
+        try:
+            assert len(logger._logger.handlers) == 1
+            assert isinstance(logger._logger.handlers[0], BoundedQueueHandler)
+            logger.info("非同期ログ")
+            assert logger.stats()['dropped'] == 0
+        finally:
+            logger.disable_async()
+
+        assert logger._logger.handlers == original_handlers
+        assert logger.stats() == {'queued': 0, 'dropped': 0}
+
+
+class TestLazyFormatting:
+    """遅延書式化のテストケース"""
+
+    class CountingArg:
+        """文字列化された回数を数える引数"""
+
+        def __init__(self):
+            self.count = 0
+
+        def __str__(self):
+            self.count += 1
+            return "arg"
+
+    @pytest.fixture
+    def lazy_logger(self):
+        """テスト専用の logging.Logger に差し替えたロガー"""
+        test_logger = logging.getLogger('lineworks_bot.test_lazy')
+        test_logger.setLevel(logging.INFO)
+        with patch.object(logger, '_logger', test_logger):
+            yield logger
+
+    def test_disabled_level_not_formatted(self, lazy_logger):
+        """無効なレベルでは引数が書式化されない"""
+        arg = self.CountingArg()
+        lazy_logger.debug("デバッグ: %s", arg)
+        assert arg.count == 0
+        assert lazy_logger.is_enabled_for(logging.DEBUG) is False
+
+    def test_enabled_level_formatted(self, lazy_logger, caplog):
+        """有効なレベルでは引数が埋め込まれる"""
+        with caplog.at_level(logging.INFO, logger='lineworks_bot.test_lazy'):
+            lazy_logger.info("ユーザー %s へ送信", "user@example.com")
+        assert "ユーザー user@example.com へ送信" in caplog.text
+
+    def test_error_with_positional_exception(self, lazy_logger, caplog):
+        """従来の error(message, exc) 形式は例外情報として扱われる"""
+        exception = ValueError("テスト例外")
+        lazy_logger.error("例外付きエラーログ", exception)
+        assert caplog.records[-1].exc_info[1] is exception
+        assert caplog.records[-1].getMessage() == "例外付きエラーログ"
+
+    def test_set_level(self, lazy_logger):
+        """ログレベルを変更できる"""
+        lazy_logger.set_level('DEBUG')
+        assert lazy_logger.is_enabled_for(logging.DEBUG) is True
+
+
+class TestStructuredLogging:
+    """構造化ログ・相関IDのテストケース"""
+
+    @staticmethod
+    def make_record(**extra):
+        """テスト用のログレコードを作成"""
+        record = logging.LogRecord('lineworks_bot', logging.INFO, __file__, 1, 'ユーザー %s', ('u1',), None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_json_formatter(self):
+        """JSON形式で出力され、extra の項目も含まれる"""
+        record = self.make_record(correlation_id='abc', bot_id='bot1', status=201, duration_ms=12.5)
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry['message'] == 'ユーザー u1'
+        assert entry['level'] == 'INFO'
+        assert entry['correlation_id'] == 'abc'
+        assert entry['bot_id'] == 'bot1'
+        assert entry['status'] == 201
+        assert entry['duration_ms'] == 12.5
+        assert 'args' not in entry
+
+    def test_json_formatter_timestamp_threads(self):
+        """秒が切り替わるレコードを複数スレッドで書式化しても、タイムスタンプの秒がずれない"""
+        formatter = JsonFormatter()
+        base = 1700000000
+        expected = {
+            second: time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second)) + '.500'
+            for second in (base, base + 1)
+        }
+        mismatches = []
+
+        def work(offset):
+            record = self.make_record()
+            for i in range(2000):
+                second = base + (i + offset) % 2
+                record.created = second + 0.5
+                ts = json.loads(formatter.format(record))['ts']
+                if ts != expected[second]:
+                    mismatches.append(ts)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert mismatches == []
+
+    def test_json_formatter_exception(self):
+        """例外情報が文字列として出力される"""
+        try:
+            raise ValueError("テスト例外")
+        except ValueError:
+            record = logging.LogRecord(
+                'lineworks_bot', logging.ERROR, __file__, 1, 'エラー', None, sys.exc_info()
+            )
+
+        entry = json.loads(JsonFormatter().format(record))
+        assert 'ValueError: テスト例外' in entry['exc_info']
+
+    def test_correlation_scope(self):
+        """スコープ内でのみ相関IDが設定され、入れ子では引き継がれる"""
+        assert get_correlation_id() is None
+        with correlation_scope() as outer:
+            assert get_correlation_id() == outer
+            with correlation_scope() as inner:
+                assert inner == outer
+            with correlation_scope('explicit'):
+                assert get_correlation_id() == 'explicit'
+        assert get_correlation_id() is None
+
+    def test_filter(self):
+        """フィルターがレコードに相関IDを付与する"""
+        record = self.make_record()
+        with correlation_scope('cid-1'):
+            CorrelationIdFilter().filter(record)
+        assert record.correlation_id == 'cid-1'
+
+    def test_api_request_fields(self, requests_mock, caplog):
+        """APIリクエストの完了ログに構造化項目が付与される"""
+        from services.api import APIClient
+
+        requests_mock.post("https://www.worksapis.com/v1.0/bots/bot1/users/u1/messages", status_code=201)
+        with patch.object(logger, '_logger', logging.getLogger('lineworks_bot')):
+            with caplog.at_level(logging.INFO, logger='lineworks_bot'):
+                with correlation_scope('cid-2'):
+                    APIClient("dummy_token").send_bot_message("bot1", "u1", {"type": "text", "text": "x"})
+
+        record = next(r for r in caplog.records if r.getMessage().startswith("APIリクエスト完了"))
+        assert record.bot_id == 'bot1'
+        assert record.status == 201
+        assert record.attempt == 1
+        assert record.bytes > 0
+        assert record.duration_ms >= 0
+        assert record.endpoint == '/bots/bot1/users/u1/messages'
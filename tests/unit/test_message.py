@@ -1,7 +1,9 @@
 """メッセージ送信機能のテスト"""
+from unittest.mock import MagicMock
+
 import pytest
 import requests
-from services.message import send_message
+from services.message import _get_api_client, send_message
 from urllib.parse import quote
 
 
@@ -111,3 +113,25 @@ class TestSendMessage:
                 access_token=access_token
             )
         assert "ネットワークエラー" in caplog.text
+
+
+class TestGetAPIClient:
+    """_get_api_client関数のテストケース"""
+
+    def test_one_client_per_tenant(self):
+        """テナント（トークン再取得関数）が多くてもクライアントを使い回す"""
+        refreshers = [MagicMock() for _ in range(32)]
+        clients = [_get_api_client(f"token{i}", refresher) for i, refresher in enumerate(refreshers)]
+
+        for i, refresher in enumerate(refreshers):
+            assert _get_api_client(f"token{i}", refresher) is clients[i]
+
+    def test_rebuild_on_new_token(self):
+        """アクセストークンが変わった場合は新しいトークンのクライアントに置き換える"""
+        refresher = MagicMock()
+        old = _get_api_client("old_token", refresher)
+        new = _get_api_client("new_token", refresher)
+
+        assert new is not old
+        assert new.access_token == "new_token"
+        assert _get_api_client("new_token", refresher) is new
@@ -0,0 +1,162 @@
+"""計測値（メトリクス）機能のテスト"""
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.api import APIClient, endpoint_class
+from services.metrics import MetricsRegistry, API_REQUESTS, start_metrics_server
+
+
+@pytest.fixture
+def metrics():
+    """テスト用のレジストリ"""
+    return MetricsRegistry()
+
+
+class TestCounter:
+    """Counterクラスのテストケース"""
+
+    def test_inc_across_threads(self, metrics):
+        """複数スレッドからの加算が正しく集計される"""
+        counter = metrics.counter('test_total', 'test', ('kind',))
+
+        def work():
+            for _ in range(1000):
+                counter.inc(kind='a')
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.inc(5, kind='b')
+
+        assert counter.collect() == {('a',): 8000.0, ('b',): 5.0}
+
+    def test_thread_pool_churn(self, metrics):
+        """終了したスレッドのシャードは合算され、シャード数は増え続けない"""
+        counter = metrics.counter('test_total', 'test', ('kind',))
+        histogram = metrics.histogram('test_seconds', 'test', buckets=(0.1, 1.0))
+
+        def work(_):
+            counter.inc(kind='a')
+            histogram.observe(0.5)
+
+        for _ in range(50):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(work, range(64)))
+        counter.collect()
+        histogram.collect()
+
+        assert len(counter._shards) <= 8
+        assert len(histogram._shards) <= 8
+        assert counter.collect() == {('a',): 3200.0}
+        assert histogram.collect()[()]['count'] == 3200
+
+    def test_label_mismatch(self, metrics):
+        """ラベルが定義と一致しない場合はエラー"""
+        counter = metrics.counter('test_total', 'test', ('kind',))
+        with pytest.raises(ValueError):
+            counter.inc(other='x')
+
+    def test_registered_once(self, metrics):
+        """同名の計測値は同じインスタンスが返る"""
+        assert metrics.counter('test_total', 'test') is metrics.counter('test_total', 'test')
+
+
+class TestHistogram:
+    """Histogramクラスのテストケース"""
+
+    def test_observe(self, metrics):
+        """値がバケットに累積で集計される"""
+        histogram = metrics.histogram('test_seconds', 'test', buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        data = histogram.collect()[()]
+
+        assert data['buckets'] == {0.1: 2, 1.0: 3, float('inf'): 4}
+        assert data['count'] == 4
+        assert data['sum'] == pytest.approx(2.65)
+
+
+class TestGauge:
+    """Gaugeクラスのテストケース"""
+
+    def test_function(self, metrics):
+        """出力時に関数から現在値を取得する"""
+        gauge = metrics.gauge('test_depth', 'test')
+        gauge.set(3)
+        assert gauge.collect() == {(): 3}
+        gauge.set_function(lambda: 7)
+        assert gauge.collect() == {(): 7.0}
+
+    def test_labels(self, metrics):
+        """ラベル付きのゲージは関数の返す辞書をラベルごとに出力する"""
+        gauge = metrics.gauge('test_state', 'test', ('endpoint',))
+        gauge.set_function(lambda: {('message',): 0, ('token',): 2})
+
+        assert gauge.expose() == ['test_state{endpoint="message"} 0', 'test_state{endpoint="token"} 2']
+
+
+class TestExport:
+    """出力形式のテストケース"""
+
+    def test_prometheus(self, metrics):
+        """Prometheusのテキスト形式で出力される"""
+        metrics.counter('req_total', 'Requests', ('status',)).inc(status='201')
+        metrics.histogram('lat_seconds', 'Latency', buckets=(0.5,)).observe(0.2)
+
+        text = metrics.export_prometheus()
+
+        assert '# HELP req_total Requests' in text
+        assert '# TYPE req_total counter' in text
+        assert 'req_total{status="201"} 1' in text
+        assert '# TYPE lat_seconds histogram' in text
+        assert 'lat_seconds_bucket{le="0.5"} 1' in text
+        assert 'lat_seconds_bucket{le="+Inf"} 1' in text
+        assert 'lat_seconds_count 1' in text
+
+    def test_label_escape(self, metrics):
+        """ラベル値の特殊文字がエスケープされる"""
+        metrics.counter('esc_total', 'test', ('value',)).inc(value='a"b\\c')
+        assert 'esc_total{value="a\\"b\\\\c"} 1' in metrics.export_prometheus()
+
+    def test_snapshot(self, metrics):
+        """スナップショットで現在値を取得できる"""
+        metrics.counter('req_total', 'Requests', ('status',)).inc(status='201')
+        assert metrics.snapshot()['req_total'] == {'type': 'counter', 'values': {'status=201': 1.0}}
+
+    def test_metrics_server(self, metrics):
+        """/metrics で共有レジストリの内容を取得できる"""
+        server = start_metrics_server(0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                body = response.read().decode('utf-8')
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert '# TYPE lineworks_api_requests_total counter' in body
+
+
+class TestInstrumentation:
+    """APIクライアントへの組み込みのテストケース"""
+
+    def test_endpoint_class(self):
+        """エンドポイントが分類名に変換される"""
+        assert endpoint_class('/bots/1/users/u%40example.com/messages') == 'message'
+        assert endpoint_class('/bots/1') == 'bot_info'
+        assert endpoint_class('/users') == 'other'
+
+    def test_api_requests_counted(self, requests_mock):
+        """APIリクエストがエンドポイント・ステータスごとに数えられる"""
+        requests_mock.get("https://www.worksapis.com/v1.0/bots/metrics_bot", json={})
+        key = ('bot_info', 'GET', '200')
+        before = API_REQUESTS.collect().get(key, 0)
+
+        APIClient("dummy_token").get_bot_info("metrics_bot")
+
+        assert API_REQUESTS.collect()[key] == before + 1
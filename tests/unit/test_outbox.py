@@ -0,0 +1,208 @@
+"""送信キュー（アウトボックス）のテスト"""
+import threading
+import time
+from unittest.mock import MagicMock
+from urllib.parse import quote
+
+import pytest
+
+from services.api import APIClient
+from services.outbox import Outbox, OutboxWorkerPool
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    """テスト用の送信キュー"""
+    box = Outbox(str(tmp_path / 'outbox.db'), max_attempts=2, lease_seconds=60)
+    yield box
+    box.close()
+
+
+@pytest.fixture
+def message_content():
+    """テスト用のメッセージコンテンツ"""
+    return {"type": "text", "text": "キューテスト"}
+
+
+class TestOutbox:
+    """Outboxクラスのテストケース"""
+
+    def test_enqueue_and_claim(self, outbox, message_content):
+        """エンキューしたメッセージを取り出せる"""
+        entry_id = outbox.enqueue("test_bot", "user@example.com", message_content)
+
+        entries = outbox.claim()
+
+        assert [entry.id for entry in entries] == [entry_id]
+        assert entries[0].attempts == 1
+        assert outbox.depth() == 1
+        # リース中は再度取り出されない
+        assert outbox.claim() == []
+
+    def test_ack(self, outbox, message_content):
+        """確認済みのメッセージはキューから削除される"""
+        outbox.enqueue("test_bot", "user@example.com", message_content)
+        entry = outbox.claim()[0]
+
+        outbox.ack(entry.id)
+
+        assert outbox.depth() == 0
+        assert outbox.stats()['delivered'] == 1
+
+    def test_nack_and_dead(self, outbox, message_content):
+        """失敗したメッセージは再送され、上限到達で dead になる"""
+        outbox.enqueue("test_bot", "user@example.com", message_content)
+
+        outbox.nack(outbox.claim()[0], "error", retry_delay=0)
+        entry = outbox.claim()[0]
+        assert entry.attempts == 2
+
+        outbox.nack(entry, "error", retry_delay=0)
+        assert outbox.claim() == []
+        assert outbox.depth() == 0
+        assert outbox.stats()['dead'] == 1
+
+    def test_crash_recovery(self, tmp_path, message_content):
+        """未確認のまま終了したメッセージはリース期間の経過後に再送対象になる"""
+        path = str(tmp_path / 'outbox.db')
+        first = Outbox(path, lease_seconds=0.5)
+        first.enqueue("test_bot", "user@example.com", message_content)
+        assert len(first.claim()) == 1
+        first.close()  # ack せずに終了（クラッシュを想定）
+
+        second = Outbox(path)
+        assert second.claim() == []
+        time.sleep(0.6)
+        entries = second.claim()
+        second.close()
+
+        assert len(entries) == 1
+        assert entries[0].attempts == 2
+
+    def test_open_keeps_live_leases(self, outbox, message_content):
+        """同じファイルを別のプロセスが開いても、リース中のエントリは取り出されない"""
+        outbox.enqueue("test_bot", "user@example.com", message_content)
+        assert len(outbox.claim()) == 1
+
+        other = Outbox(outbox.path)
+        assert other.recover() == 0
+        entries = other.claim()
+        other.close()
+
+        assert entries == []
+
+    def test_claim_shared_file(self, tmp_path, message_content):
+        """同じファイルを共有する複数の送信キュー（別プロセスを想定）が同じエントリを取り出さない"""
+        path = str(tmp_path / 'outbox.db')
+        boxes = [Outbox(path, lease_seconds=60) for _ in range(4)]
+        for i in range(200):
+            boxes[0].enqueue("test_bot", f"user{i}@example.com", message_content)
+        claimed = [[] for _ in boxes]
+
+        def work(box, ids):
+            while True:
+                entries = box.claim(limit=3)
+                if not entries:
+                    return
+                ids.extend(entry.id for entry in entries)
+
+        threads = [threading.Thread(target=work, args=pair) for pair in zip(boxes, claimed)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for box in boxes:
+            box.close()
+
+        ids = [entry_id for box_ids in claimed for entry_id in box_ids]
+        assert len(ids) == 200
+        assert len(set(ids)) == 200
+
+    def test_stats(self, outbox, message_content):
+        """統計情報にエンキュー遅延と深さが含まれる"""
+        for i in range(5):
+            outbox.enqueue("test_bot", f"user{i}", message_content)
+
+        stats = outbox.stats()
+
+        assert stats['depth'] == 5
+        assert stats['enqueued'] == 5
+        assert stats['enqueue_latency_avg_us'] > 0
+
+
+class TestOutboxWorkerPool:
+    """OutboxWorkerPoolクラスのテストケース"""
+
+    def test_drain_once(self, outbox, message_content, requests_mock):
+        """キューのメッセージがAPIクライアント経由で配送される"""
+        requests_mock.post(
+            f"https://www.worksapis.com/v1.0/bots/test_bot/users/{quote('ok@example.com')}/messages",
+            status_code=201
+        )
+        requests_mock.post(
+            f"https://www.worksapis.com/v1.0/bots/test_bot/users/{quote('bad@example.com')}/messages",
+            status_code=400
+        )
+        outbox.enqueue("test_bot", "ok@example.com", message_content)
+        outbox.enqueue("test_bot", "bad@example.com", message_content)
+
+        pool = OutboxWorkerPool(outbox, lambda: APIClient("dummy_token"), retry_delay=60)
+
+        assert pool.drain_once() == 2
+        assert outbox.depth() == 1
+        assert requests_mock.request_history[0].json() == {"content": message_content}
+
+    def test_expired_lease_not_sent(self, tmp_path, message_content):
+        """前のエントリの送信中にリースが切れ、他のワーカーが取り出したエントリは送信しない"""
+        path = str(tmp_path / 'outbox.db')
+        outbox = Outbox(path, lease_seconds=0.2)
+        other = Outbox(path, lease_seconds=60)
+        for user in ("slow@example.com", "late@example.com"):
+            outbox.enqueue("test_bot", user, message_content)
+        taken = []
+
+        def post(bot_id, user_id, body):
+            if user_id == "slow@example.com":
+                time.sleep(0.3)
+                taken.extend(other.claim())
+
+        client = MagicMock()
+        client.post_bot_message.side_effect = post
+        pool = OutboxWorkerPool(outbox, lambda: client)
+
+        assert pool.drain_once() == 2
+
+        assert [call.args[1] for call in client.post_bot_message.call_args_list] == ["slow@example.com"]
+        taken = {entry.user_id: entry for entry in taken}
+        assert sorted(taken) == ["late@example.com", "slow@example.com"]
+        # 送信済みのエントリは削除されるため他のワーカーは送信せず、未送信のエントリは他のワーカーが送信する
+        assert outbox.depth() == 1
+        assert not other.renew(taken["slow@example.com"])
+        assert other.renew(taken["late@example.com"])
+        outbox.close()
+        other.close()
+
+    def test_no_token(self, outbox, message_content):
+        """トークンが取得できない場合は再送待ちに戻す"""
+        outbox.enqueue("test_bot", "user@example.com", message_content)
+        pool = OutboxWorkerPool(outbox, lambda: None, retry_delay=60)
+
+        pool.drain_once()
+
+        assert outbox.depth() == 1
+        assert outbox.claim() == []
+
+    def test_start_stop(self, outbox, message_content):
+        """ワーカースレッドがキューを処理する"""
+        client = MagicMock()
+        pool = OutboxWorkerPool(outbox, lambda: client, workers=2, poll_interval=0.01)
+        outbox.enqueue("test_bot", "user@example.com", message_content)
+
+        pool.start()
+        deadline = time.monotonic() + 2
+        while outbox.depth() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        pool.stop(timeout=1)
+
+        assert outbox.depth() == 0
+        client.post_bot_message.assert_called_once()
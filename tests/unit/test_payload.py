@@ -0,0 +1,83 @@
+"""リクエストボディのシリアライズ機能のテスト"""
+import json
+
+import pytest
+
+from services import payload
+from services.api import encode_message_body
+from services.payload import MessageTemplate, dumps
+
+
+class TestDumps:
+    """dumps関数のテストケース"""
+
+    def test_compact_utf8(self):
+        """区切りの空白なし・UTF-8 でエンコードされる"""
+        assert dumps({"text": "日本語", "n": [1, 2]}) == '{"text":"日本語","n":[1,2]}'.encode('utf-8')
+
+    @pytest.mark.parametrize('backend', ['json', 'orjson'])
+    def test_backends_are_equivalent(self, backend):
+        """どのバックエンドでも同じJSONになる"""
+        if backend == 'orjson' and payload.orjson is None:
+            pytest.skip("orjson がインストールされていません")
+        _, encode = payload._select_backend(backend)
+        obj = {"type": "text", "text": "改行\nと\"引用符\"", "nested": {"flag": True, "none": None}}
+        assert json.loads(encode(obj)) == obj
+
+    def test_unknown_backend(self):
+        """不明なバックエンド名は ValueError"""
+        with pytest.raises(ValueError):
+            payload._select_backend('yaml')
+
+
+class TestMessageTemplate:
+    """MessageTemplateクラスのテストケース"""
+
+    def test_render(self):
+        """プレースホルダーに値が差し込まれる"""
+        template = MessageTemplate({"type": "text", "text": "{name}さん、{count}件の通知があります"})
+
+        body = template.render({"name": "山田", "count": 3})
+
+        assert json.loads(body) == {"content": {"type": "text", "text": "山田さん、3件の通知があります"}}
+        assert template.placeholders == {"name", "count"}
+
+    def test_values_are_escaped(self):
+        """差し込む値はJSON文字列としてエスケープされる"""
+        template = MessageTemplate({"type": "text", "text": "> {message}"})
+
+        body = template.render({"message": 'a"b\\c\n{x}'})
+
+        assert json.loads(body)["content"]["text"] == '> a"b\\c\n{x}'
+
+    def test_nested_and_escaped_braces(self):
+        """入れ子の値にも差し込まれ、{{ }} は波括弧そのものになる"""
+        template = MessageTemplate({
+            "type": "button_template",
+            "contentText": "{{重要}} {title}",
+            "actions": [{"type": "uri", "label": "開く", "uri": "https://example.com/{user_id}"}]
+        })
+
+        content = json.loads(template.render({"title": "障害", "user_id": "u1"}))["content"]
+
+        assert content["contentText"] == "{重要} 障害"
+        assert content["actions"][0]["uri"] == "https://example.com/u1"
+
+    def test_static_template(self):
+        """プレースホルダーがなければ encode_message_body と同じボディを返す"""
+        content = {"type": "text", "text": "固定"}
+        template = MessageTemplate(content)
+
+        assert template.render() == encode_message_body(content)
+        assert template.placeholders == frozenset()
+
+    def test_missing_value(self):
+        """値のないプレースホルダーは KeyError"""
+        with pytest.raises(KeyError):
+            MessageTemplate({"type": "text", "text": "{name}"}).render({})
+
+    @pytest.mark.parametrize('text', ['{0}', '{name!r}', '{name:>10}', '{name', 'a}b'])
+    def test_invalid_placeholder(self, text):
+        """名前以外の書式や閉じていない波括弧は ValueError"""
+        with pytest.raises(ValueError):
+            MessageTemplate({"type": "text", "text": text})
@@ -0,0 +1,105 @@
+"""レート制限機能のテスト"""
+import time
+from email.utils import formatdate
+
+import pytest
+
+from services.deadline import DeadlineExceededError, deadline_scope
+from services.ratelimit import TokenBucket, RateLimiter, parse_retry_after, get_rate_limiter
+
+
+class TestParseRetryAfter:
+    """parse_retry_after関数のテストケース"""
+
+    def test_seconds(self):
+        """秒数形式の値を解釈できる"""
+        assert parse_retry_after("3") == 3.0
+
+    def test_http_date(self):
+        """HTTP日付形式の値を解釈できる"""
+        value = formatdate(time.time() + 10, usegmt=True)
+        assert 8.0 < parse_retry_after(value) <= 10.0
+
+    def test_missing_or_invalid(self):
+        """値がない、または不正な場合は既定値を返す"""
+        assert parse_retry_after(None, default=2.0) == 2.0
+        assert parse_retry_after("invalid", default=2.0) == 2.0
+
+
+class TestTokenBucket:
+    """TokenBucketクラスのテストケース"""
+
+    def test_burst(self):
+        """容量分までは待機なしで送信できる"""
+        bucket = TokenBucket(rate=10, capacity=5)
+        waits = [bucket.reserve() for _ in range(5)]
+        assert waits == [0.0] * 5
+
+    def test_wait_after_burst(self):
+        """容量を超えるとレートに応じた待機が必要になる"""
+        bucket = TokenBucket(rate=10, capacity=1)
+        bucket.reserve()
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+    def test_throttle(self):
+        """429応答後はRetry-After分停止し、レートが半減する"""
+        bucket = TokenBucket(rate=10, capacity=10)
+        bucket.throttle(0.5)
+
+        assert bucket.rate == 5
+        assert bucket.reserve() >= 0.5
+
+    def test_record_success(self):
+        """成功応答でレートが上限まで回復する"""
+        bucket = TokenBucket(rate=10, capacity=10)
+        bucket.throttle(0)
+        for _ in range(20):
+            bucket.record_success()
+        assert bucket.rate == 10
+
+
+class TestRateLimiter:
+    """RateLimiterクラスのテストケース"""
+
+    def test_per_bot_limit(self):
+        """ボットごとの制限が独立して適用される"""
+        limiter = RateLimiter(global_rate=0, global_burst=0, per_bot_rate=10, per_bot_burst=1)
+        assert limiter.reserve("bot1") == 0.0
+        assert limiter.reserve("bot2") == 0.0
+        assert limiter.reserve("bot1") > 0.0
+
+    def test_global_limit(self):
+        """全体の制限はボットをまたいで適用される"""
+        limiter = RateLimiter(global_rate=10, global_burst=1, per_bot_rate=0, per_bot_burst=0)
+        assert limiter.reserve("bot1") == 0.0
+        assert limiter.reserve("bot2") > 0.0
+
+    def test_disabled(self):
+        """制限を0にすると待機は発生しない"""
+        limiter = RateLimiter(global_rate=0, global_burst=0, per_bot_rate=0, per_bot_burst=0)
+        assert all(limiter.reserve("bot") == 0.0 for _ in range(100))
+
+    def test_throttle_bot(self):
+        """429応答は該当ボットのみ停止させる"""
+        limiter = RateLimiter(global_rate=0, global_burst=0, per_bot_rate=100, per_bot_burst=100)
+        limiter.throttle(1.0, "bot1")
+        assert limiter.reserve("bot1") >= 0.9
+        assert limiter.reserve("bot2") == 0.0
+
+    def test_deadline_refunds_reservation(self):
+        """制限時間内に送信枠を確保できない場合は、予約した枠を返却してから拒否する"""
+        limiter = RateLimiter(global_rate=1, global_burst=1, per_bot_rate=1, per_bot_burst=1)
+        limiter.reserve("bot")
+        levels = (limiter._global._tokens, limiter._bot_bucket("bot")._tokens)
+
+        with deadline_scope(0.1):
+            for _ in range(3):
+                with pytest.raises(DeadlineExceededError):
+                    limiter.acquire("bot")
+
+        assert limiter._global._tokens == pytest.approx(levels[0], abs=0.05)
+        assert limiter._bot_bucket("bot")._tokens == pytest.approx(levels[1], abs=0.05)
+
+    def test_shared_instance(self):
+        """共有リミッターが再利用される"""
+        assert get_rate_limiter() is get_rate_limiter()
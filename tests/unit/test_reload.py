@@ -0,0 +1,226 @@
+"""設定の再読み込み（ホットリロード）のテスト"""
+import dataclasses
+import os
+import signal
+import threading
+import time
+from unittest.mock import MagicMock, patch
+from urllib.parse import parse_qs
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import lineworks_bot
+from config.settings import Settings, get_settings
+from services.auth import JWTSigner, PrivateKeyProvider, TokenManager, request_access_token
+from services.reload import SettingsReloader, install_signal_handler
+from services.tenants import Tenant
+
+
+def wait_until(condition, timeout=5.0):
+    """条件が満たされるまで待つ"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestSettingsReloader:
+    """SettingsReloaderクラスのテストケース"""
+
+    def test_notify_changes(self, settings_env):
+        """値が変わった場合のみリスナーへ通知する"""
+        settings_env.write_text("CLIENT_SECRET=first\n", encoding='utf-8')
+        reloader = SettingsReloader(str(settings_env))
+        calls = []
+        reloader.on_change(lambda previous, current: calls.append((previous.client_secret, current.client_secret)))
+
+        assert reloader.reload() == {'client_secret'}
+        assert reloader.reload() == frozenset()
+        settings_env.write_text("CLIENT_SECRET=second\n", encoding='utf-8')
+        reloader.reload()
+
+        assert calls == [(None, 'first'), ('first', 'second')]
+        assert reloader.stats() == {'reloads': 2, 'failures': 0}
+
+    def test_invalid_settings(self, settings_env):
+        """検証に失敗した場合は通知せず、現在の設定を使い続ける"""
+        settings_env.write_text("HTTP_POOL_MAXSIZE=0\n", encoding='utf-8')
+        reloader = SettingsReloader(str(settings_env))
+        listener = MagicMock()
+        reloader.on_change(listener)
+        current = get_settings()
+
+        assert reloader.reload() == frozenset()
+
+        assert get_settings() is current
+        listener.assert_not_called()
+        assert reloader.stats()['failures'] == 1
+
+    def test_listener_error(self, settings_env):
+        """リスナーの例外は記録し、他のリスナーへの通知を続ける"""
+        settings_env.write_text("BOT_ID=200\n", encoding='utf-8')
+        reloader = SettingsReloader(str(settings_env))
+        reloader.on_change(MagicMock(side_effect=RuntimeError("反映できません")))
+        listener = reloader.on_change(MagicMock())
+
+        reloader.reload()
+
+        listener.assert_called_once()
+
+    def test_restart_required(self, settings_env):
+        """再読み込みで反映されない項目は、再起動後に反映される項目として別に記録する"""
+        settings_env.write_text("BOT_ID=400\nSEND_DEADLINE=5\nHTTP_POOL_MAXSIZE=50\n", encoding='utf-8')
+        reloader = SettingsReloader(str(settings_env))
+
+        with patch('services.reload.logger') as logger:
+            assert reloader.reload() == {'bot_id', 'send_deadline', 'http_pool_maxsize'}
+
+        assert logger.info.call_args.args[1] == 'BOT_ID'
+        assert logger.warning.call_args.args[1] == 'HTTP_POOL_MAXSIZE, SEND_DEADLINE'
+        assert 'send_deadline' not in Settings.reloadable()
+        assert {'client_secret', 'bot_id', 'log_level'} <= Settings.reloadable()
+
+    def test_watch(self, settings_env):
+        """.env ファイルの変更を検知して読み込み直す"""
+        settings_env.write_text("BOT_ID=100\n", encoding='utf-8')
+        reloader = SettingsReloader(str(settings_env))
+        reloader.reload()
+        assert reloader.watch(interval=0.01)
+        try:
+            settings_env.write_text("BOT_ID=2000\n", encoding='utf-8')
+            assert wait_until(lambda: get_settings().bot_id == '2000')
+        finally:
+            reloader.stop()
+
+    def test_signal(self, settings_env):
+        """シグナルを受信すると読み込み直す"""
+        settings_env.write_text("BOT_ID=300\n", encoding='utf-8')
+        reloader = SettingsReloader(str(settings_env))
+        original = signal.getsignal(signal.SIGUSR1)
+        try:
+            assert install_signal_handler(reloader, 'SIGUSR1')
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert wait_until(lambda: get_settings().bot_id == '300')
+        finally:
+            signal.signal(signal.SIGUSR1, original)
+
+        assert not install_signal_handler(reloader, '')
+
+
+class TestCredentialRotation:
+    """認証情報の切り替えのテストケース"""
+
+    def test_token_request_uses_current_settings(self, monkeypatch, requests_mock):
+        """トークン取得時点の設定の認証情報とURLを使用する"""
+        monkeypatch.setattr('config.settings._settings', dataclasses.replace(
+            get_settings(), client_id='rotated-client', client_secret='rotated-secret',
+            auth_url='https://auth.example.com/token'
+        ))
+        requests_mock.post('https://auth.example.com/token', json={"access_token": "t"})
+        key = MagicMock()
+        key.sign.return_value = b'signature'
+
+        assert request_access_token(signer=JWTSigner(lambda: key)) == {"access_token": "t"}
+
+        form = parse_qs(requests_mock.last_request.text)
+        assert form['client_id'] == ['rotated-client']
+        assert form['client_secret'] == ['rotated-secret']
+
+    def test_rotate_without_downtime(self):
+        """新しいトークンを取得するまでは既存のトークンを返し続ける"""
+        release = threading.Event()
+        responses = iter([{'access_token': 'old', 'expires_in': 3600}, {'access_token': 'new', 'expires_in': 3600}])
+
+        def request(*args, **kwargs):
+            response = next(responses)
+            if response['access_token'] == 'new':
+                release.wait(5)
+            return response
+
+        with patch('services.auth.request_access_token', side_effect=request):
+            manager = TokenManager(lambda: None)
+            assert manager.get_token() == 'old'
+
+            manager.rotate()
+            assert manager.get_token() == 'old'
+            release.set()
+            assert wait_until(lambda: manager.get_token() == 'new')
+            manager.close()
+
+    def test_rotate_without_background_refresh(self):
+        """バックグラウンド更新が無効な場合は次回の取得時に取り直す"""
+        with patch('services.auth.request_access_token',
+                   side_effect=[{'access_token': 'old'}, {'access_token': 'new'}]):
+            manager = TokenManager(lambda: None, background_refresh=False)
+            assert manager.get_token() == 'old'
+            manager.rotate()
+            assert manager.get_token() == 'new'
+
+    def test_private_key_path(self, tmp_path):
+        """秘密鍵ファイルのパスを変更すると新しいファイルを読み込む"""
+        paths = []
+        for name in ('old.key', 'new.key'):
+            key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+            path = tmp_path / name
+            path.write_bytes(key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption()
+            ))
+            paths.append(str(path))
+        provider = PrivateKeyProvider(paths[0], check_interval=60)
+        old_key = provider.get()
+
+        provider.set_path(paths[1])
+
+        assert provider.get().private_numbers() != old_key.private_numbers()
+        assert provider.loads == 2
+
+    def test_client_follows_base_url(self, monkeypatch):
+        """BASE_API_URL が変わるとテナントのAPIクライアントを作り直す"""
+        token_manager = MagicMock()
+        token_manager.get_token.return_value = 'token'
+        tenant = Tenant('a', token_manager)
+        client = tenant.client()
+
+        monkeypatch.setattr('config.settings._settings', dataclasses.replace(
+            get_settings(), base_api_url='https://api.example.com/v1.0'
+        ))
+
+        assert tenant.client() is not client
+        assert tenant.client().base_url == 'https://api.example.com/v1.0'
+
+
+class TestApplySettings:
+    """lineworks_bot への設定の反映のテストケース"""
+
+    def test_apply(self, monkeypatch):
+        """認証情報の変更でトークンを取り直し、既定のボットを切り替える"""
+        token_manager = MagicMock()
+        key_provider = MagicMock()
+        monkeypatch.setattr(lineworks_bot, 'token_manager', token_manager)
+        monkeypatch.setattr(lineworks_bot, 'key_provider', key_provider)
+        default = lineworks_bot.tenants.get(lineworks_bot.DEFAULT_TENANT)
+        monkeypatch.setattr(default, 'default_bot_id', default.default_bot_id)
+        previous = Settings()
+
+        lineworks_bot._apply_settings(previous, dataclasses.replace(
+            previous, client_secret='rotated', private_key_file='/keys/new.key', bot_id='200'
+        ))
+
+        token_manager.rotate.assert_called_once()
+        key_provider.set_path.assert_called_once_with('/keys/new.key')
+        assert default.default_bot_id == '200'
+
+    def test_restart_required(self, monkeypatch):
+        """再起動が必要な項目の変更ではトークンを取り直さない"""
+        token_manager = MagicMock()
+        monkeypatch.setattr(lineworks_bot, 'token_manager', token_manager)
+        previous = Settings()
+
+        lineworks_bot._apply_settings(previous, dataclasses.replace(previous, http_pool_maxsize=50))
+
+        token_manager.rotate.assert_not_called()
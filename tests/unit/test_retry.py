@@ -0,0 +1,72 @@
+"""再試行ポリシーのテスト"""
+import requests
+import urllib3
+
+from services.retry import RetryPolicy
+
+
+class TestRetryPolicy:
+    """RetryPolicyクラスのテストケース"""
+
+    def test_retry_on_connection_error(self):
+        """ネットワークエラーは再試行対象"""
+        policy = RetryPolicy()
+        assert policy.should_retry_exception('GET', requests.exceptions.ConnectionError())
+        assert policy.should_retry_exception('GET', requests.exceptions.ConnectionError(
+            urllib3.exceptions.ProtocolError('Connection aborted.')
+        ))
+
+    def test_post_retried_only_before_sending(self):
+        """POSTは接続の確立に失敗した場合のみ再試行する（送信済みの可能性がある場合は再試行しない）"""
+        policy = RetryPolicy()
+        refused = urllib3.exceptions.NewConnectionError(None, 'Connection refused')
+        assert policy.should_retry_exception('POST', requests.exceptions.ConnectionError(
+            urllib3.exceptions.MaxRetryError(None, '/messages', refused)
+        ))
+        assert policy.should_retry_exception('POST', requests.exceptions.ConnectTimeout())
+        assert not policy.should_retry_exception('POST', requests.exceptions.ConnectionError(
+            urllib3.exceptions.ProtocolError('Connection aborted.')
+        ))
+        assert not policy.should_retry_exception('POST', requests.exceptions.ConnectionError())
+
+    def test_post_retry_status(self):
+        """POSTは処理されていないことが明らかな503/429のみ再試行する"""
+        policy = RetryPolicy()
+        assert policy.should_retry_status('POST', 503)
+        assert policy.should_retry_status('POST', 429)
+        assert not policy.should_retry_status('POST', 502)
+        assert not policy.should_retry_status('POST', 504)
+        assert not policy.should_retry_status('POST', 500)
+
+    def test_read_timeout_not_retried_for_post(self):
+        """POSTの読み取りタイムアウトは送信済みの可能性があるため再試行しない"""
+        policy = RetryPolicy()
+        assert policy.should_retry_exception('GET', requests.exceptions.ReadTimeout())
+        assert not policy.should_retry_exception('POST', requests.exceptions.ReadTimeout())
+
+    def test_non_idempotent_enabled(self):
+        """retry_non_idempotent=TrueではPOSTも冪等なメソッドと同じ条件で再試行する"""
+        policy = RetryPolicy(retry_non_idempotent=True)
+        assert policy.should_retry_exception('POST', requests.exceptions.ConnectionError())
+        assert not policy.should_retry_exception('POST', requests.exceptions.ReadTimeout())
+        assert policy.should_retry_status('POST', 502)
+        assert not policy.should_retry_status('POST', 429)
+
+    def test_retry_on_status(self):
+        """設定したステータスコードのみ再試行対象"""
+        policy = RetryPolicy(retry_on_status=frozenset({503}))
+        assert policy.should_retry_status('GET', 503)
+        assert not policy.should_retry_status('GET', 500)
+        assert not policy.should_retry_status('GET', 400)
+
+    def test_other_exception_not_retried(self):
+        """対象外の例外は再試行しない"""
+        policy = RetryPolicy()
+        assert not policy.should_retry_exception('GET', requests.exceptions.InvalidURL())
+
+    def test_backoff_full_jitter(self):
+        """バックオフは0から上限までの範囲でランダムに決まる"""
+        policy = RetryPolicy(base_delay=0.1, max_delay=0.3)
+        for attempt in range(1, 6):
+            delay = policy.backoff(attempt)
+            assert 0 <= delay <= min(0.3, 0.1 * 2 ** (attempt - 1))
@@ -0,0 +1,55 @@
+"""HTTPセッション管理のテスト"""
+import pytest
+
+from services import session as session_module
+from services.session import create_session, get_session, close_session
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_session():
+    """テストごとに共有セッションを破棄する"""
+    close_session()
+    yield
+    close_session()
+
+
+class TestCreateSession:
+    """create_session関数のテストケース"""
+
+    def test_pool_settings(self):
+        """コネクションプールの設定が反映されることを検証"""
+        session = create_session(pool_connections=3, pool_maxsize=7, pool_block=True)
+        adapter = session.get_adapter('https://www.worksapis.com/v1.0')
+
+        assert adapter._pool_connections == 3
+        assert adapter._pool_maxsize == 7
+        assert adapter._pool_block is True
+
+    def test_keep_alive_disabled(self):
+        """keep_alive=Falseの場合はConnection: closeを送ることを検証"""
+        session = create_session(keep_alive=False)
+        assert session.headers['Connection'] == 'close'
+
+    def test_environment_proxies(self, monkeypatch):
+        """プロキシの環境変数がなければ環境変数を参照しない設定になることを検証"""
+        for name in ('HTTP_PROXY', 'HTTPS_PROXY', 'ALL_PROXY', 'http_proxy', 'https_proxy', 'all_proxy'):
+            monkeypatch.delenv(name, raising=False)
+        assert create_session().trust_env is False
+
+        monkeypatch.setenv('HTTPS_PROXY', 'http://proxy.example.com:8080')
+        assert create_session().trust_env is True
+
+
+class TestGetSession:
+    """get_session / close_session関数のテストケース"""
+
+    def test_shared_instance(self):
+        """同じセッションが再利用されることを検証"""
+        assert get_session() is get_session()
+
+    def test_close_session(self):
+        """close_session後は新しいセッションが作成されることを検証"""
+        first = get_session()
+        close_session()
+        assert session_module._session is None
+        assert get_session() is not first
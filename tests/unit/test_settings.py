@@ -0,0 +1,117 @@
+"""設定の読み込み・検証・再読み込みのテスト"""
+import dataclasses
+import os
+
+import pytest
+
+from config.settings import Settings, SettingsError, get_settings, load_settings, reload_settings
+
+
+class TestSettings:
+    """Settingsクラスのテストケース"""
+
+    def test_defaults(self):
+        """環境変数が未設定の項目は既定値になる"""
+        settings = Settings.from_environ({})
+
+        assert settings == Settings()
+        assert settings.bot_id == "10087978"
+        assert settings.client_id is None
+        assert settings.retry_max_attempts == 3
+        assert settings.circuit_breaker_enabled is True
+
+    def test_immutable(self):
+        """設定は変更できない"""
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            Settings().bot_id = '200'
+
+    def test_parse(self):
+        """型の変換と大文字・小文字の統一"""
+        settings = Settings.from_environ({
+            'CLIENT_ID': 'client',
+            'RETRY_MAX_ATTEMPTS': '5',
+            'RATE_LIMIT_GLOBAL': '12.5',
+            'HTTP_KEEP_ALIVE': 'FALSE',
+            'TRACE_ENABLED': '1',
+            'LOG_LEVEL': 'debug',
+            'JSON_BACKEND': 'JSON',
+            'SEND_DEADLINE': '',
+        })
+
+        assert settings.client_id == 'client'
+        assert settings.retry_max_attempts == 5
+        assert settings.rate_limit_global == 12.5
+        assert settings.http_keep_alive is False
+        assert settings.trace_enabled is True
+        assert settings.log_level == 'DEBUG'
+        assert settings.json_backend == 'json'
+        assert settings.send_deadline == 30.0
+        assert settings.env()['RETRY_MAX_ATTEMPTS'] == 5
+
+    def test_validation(self):
+        """不正な項目はまとめて報告する"""
+        with pytest.raises(SettingsError) as excinfo:
+            Settings.from_environ({
+                'RETRY_MAX_ATTEMPTS': 'three',
+                'CIRCUIT_BREAKER_FAILURE_RATE': '1.5',
+                'LOG_FORMAT': 'xml',
+                'HTTP_POOL_BLOCK': 'maybe',
+                'BASE_API_URL': 'ftp://example.com',
+            })
+
+        assert [error.split('=')[0] for error in excinfo.value.errors] == [
+            'BASE_API_URL', 'HTTP_POOL_BLOCK', 'RETRY_MAX_ATTEMPTS', 'CIRCUIT_BREAKER_FAILURE_RATE', 'LOG_FORMAT'
+        ]
+
+    def test_changed(self):
+        """値が異なる項目を返す"""
+        settings = Settings()
+        rotated = dataclasses.replace(settings, client_secret='new', bot_id='200')
+
+        assert rotated.changed(settings) == {'client_secret', 'bot_id'}
+        assert settings.changed(settings) == frozenset()
+
+
+class TestReloadSettings:
+    """reload_settings のテストケース"""
+
+    def test_reload_from_file(self, settings_env):
+        """.env ファイルの変更を読み込み、設定と環境変数を差し替える"""
+        settings_env.write_text("CLIENT_ID=first\nBOT_ID=100\n", encoding='utf-8')
+        previous, current = reload_settings()
+
+        assert get_settings() is current
+        assert current.client_id == 'first'
+        assert os.environ['CLIENT_ID'] == 'first'
+
+        settings_env.write_text("CLIENT_ID=second\n", encoding='utf-8')
+        previous, current = reload_settings()
+
+        assert previous.client_id == 'first'
+        assert current.client_id == 'second'
+        assert current.bot_id == "10087978"
+        assert os.environ['CLIENT_ID'] == 'second'
+        assert 'BOT_ID' not in os.environ
+
+    def test_process_environment_wins(self, settings_env, monkeypatch):
+        """プロセスの環境変数は .env ファイルより優先する"""
+        monkeypatch.setenv('CLIENT_ID', 'from-env')
+        settings_env.write_text("CLIENT_ID=from-file\nCLIENT_SECRET=secret\n", encoding='utf-8')
+
+        _, current = reload_settings()
+
+        assert current.client_id == 'from-env'
+        assert current.client_secret == 'secret'
+        assert load_settings() == current
+
+    def test_invalid_keeps_current(self, settings_env):
+        """検証に失敗した場合は現在の設定と環境変数を変更しない"""
+        settings_env.write_text("CLIENT_ID=first\n", encoding='utf-8')
+        _, current = reload_settings()
+        settings_env.write_text("CLIENT_ID=second\nRETRY_MAX_ATTEMPTS=0\n", encoding='utf-8')
+
+        with pytest.raises(SettingsError, match='RETRY_MAX_ATTEMPTS'):
+            reload_settings()
+
+        assert get_settings() is current
+        assert os.environ['CLIENT_ID'] == 'first'
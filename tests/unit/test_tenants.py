@@ -0,0 +1,136 @@
+"""テナントレジストリのテスト"""
+import json
+from unittest.mock import MagicMock
+from urllib.parse import parse_qs
+
+import pytest
+
+from services.auth import ClientCredentials, JWTSigner, request_access_token
+from services.tenants import (
+    Tenant, TenantConfig, TenantRegistry, TenantRoutingClient, TokenUnavailableError, UnknownTenantError
+)
+
+
+def make_tenant(name, token='token', bot_ids=(), default_bot_id=None):
+    """固定のトークンを返すテナントを作成"""
+    token_manager = MagicMock()
+    token_manager.get_token.return_value = token
+    return Tenant(name, token_manager, bot_ids, default_bot_id)
+
+
+@pytest.fixture
+def registry():
+    """2テナントを登録したレジストリ"""
+    registry = TenantRegistry()
+    registry.add(make_tenant('default', 'token-default', default_bot_id='100'))
+    registry.add(make_tenant('acme', 'token-acme', bot_ids=('200', '201')))
+    return registry
+
+
+class TestTenantRegistry:
+    """TenantRegistryクラスのテストケース"""
+
+    def test_resolve_default(self, registry):
+        """テナントもボットも省略した場合は既定のテナントとボット"""
+        tenant, bot_id = registry.resolve()
+        assert (tenant.name, bot_id) == ('default', '100')
+
+    def test_resolve_by_bot(self, registry):
+        """ボットIDから所属テナントを判別する"""
+        tenant, bot_id = registry.resolve(bot_id='201')
+        assert (tenant.name, bot_id) == ('acme', '201')
+
+    def test_resolve_by_tenant(self, registry):
+        """テナントのみ指定した場合はテナントの既定のボット"""
+        tenant, bot_id = registry.resolve(tenant='acme')
+        assert (tenant.name, bot_id) == ('acme', '200')
+
+    def test_resolve_errors(self, registry):
+        """未登録のテナント・他テナントのボットはエラー"""
+        with pytest.raises(UnknownTenantError):
+            registry.resolve(tenant='unknown')
+        with pytest.raises(ValueError):
+            registry.resolve(tenant='default', bot_id='200')
+
+    def test_duplicate_bot(self, registry):
+        """同じボットIDを複数のテナントに登録できない"""
+        with pytest.raises(ValueError):
+            registry.add(make_tenant('other', bot_ids=('200',)))
+
+    def test_load(self, tmp_path):
+        """JSONファイルからテナントを読み込む"""
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps({"tenants": [
+            {"name": "a", "client_id": "ca", "client_secret": "sa", "service_account": "a@example.com",
+             "private_key_file": "a.key", "bot_ids": [1]},
+            {"name": "b", "client_id": "cb", "client_secret": "sb", "service_account": "b@example.com",
+             "private_key_file": "b.key", "bot_ids": ["2"], "default": True},
+        ]}), encoding='utf-8')
+        registry = TenantRegistry()
+        try:
+            registry.load(str(path))
+
+            assert registry.names() == ['a', 'b']
+            assert registry.resolve()[0].name == 'b'
+            assert registry.resolve(bot_id='1')[0].name == 'a'
+        finally:
+            registry.close()
+
+    def test_config_missing_fields(self):
+        """必須項目が不足している設定はエラー"""
+        with pytest.raises(ValueError):
+            TenantConfig.from_dict({"name": "a"})
+
+
+class TestTenant:
+    """Tenantクラスのテストケース"""
+
+    def test_client_reused(self):
+        """トークンが変わらない限り同じクライアントを返す"""
+        tenant = make_tenant('a', 'token1')
+        client = tenant.client()
+
+        assert tenant.client() is client
+        tenant.token_manager.get_token.return_value = 'token2'
+        assert tenant.client().access_token == 'token2'
+
+    def test_shared_session(self):
+        """テナント間でHTTPセッションを共有する"""
+        assert make_tenant('a', 'token-a').client().session is make_tenant('b', 'token-b').client().session
+
+    def test_token_unavailable(self):
+        """トークンを取得できない場合は例外"""
+        with pytest.raises(TokenUnavailableError):
+            make_tenant('a', None).client()
+
+
+class TestRouting:
+    """テナントごとの認証情報・振り分けのテストケース"""
+
+    def test_routing_client(self, registry, requests_mock):
+        """ボットが属するテナントのトークンで送信する"""
+        requests_mock.post("https://www.worksapis.com/v1.0/bots/200/users/u1/messages", status_code=201)
+        requests_mock.post("https://www.worksapis.com/v1.0/bots/100/users/u1/messages", status_code=201)
+        client = TenantRoutingClient(registry)
+
+        client.post_bot_message('200', 'u1', b'{}')
+        client.post_bot_message('100', 'u1', b'{}')
+
+        headers = [request.headers['Authorization'] for request in requests_mock.request_history]
+        assert headers == ['Bearer token-acme', 'Bearer token-default']
+
+    def test_token_request_credentials(self, requests_mock):
+        """テナントの認証情報でトークンを要求する"""
+        requests_mock.post("https://auth.worksmobile.com/oauth2/v2.0/token", json={"access_token": "t"})
+        key = MagicMock()
+        key.sign.return_value = b'signature'
+
+        result = request_access_token(
+            signer=JWTSigner(lambda: key),
+            credentials=ClientCredentials('tenant-client', 'tenant-secret', 'svc@example.com')
+        )
+
+        assert result == {"access_token": "t"}
+        form = parse_qs(requests_mock.last_request.text)
+        assert form['client_id'] == ['tenant-client']
+        assert form['client_secret'] == ['tenant-secret']
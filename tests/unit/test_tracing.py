@@ -0,0 +1,183 @@
+"""トレーシング・プロファイラ機能のテスト"""
+import json
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from services.api import APIClient
+from services.profiler import SamplingProfiler, install_signal_handler
+from services.tracing import (
+    NOOP_SPAN, FileSpanExporter, InMemorySpanExporter, Tracer, tracer as shared_tracer
+)
+
+
+@pytest.fixture
+def exporter():
+    """共有トレーサーをメモリ出力で有効にする"""
+    memory = InMemorySpanExporter()
+    shared_tracer.enable(memory, sample_rate=1.0)
+    yield memory
+    shared_tracer.disable()
+
+
+def _wait_until(predicate, timeout=5.0):
+    """条件が満たされるまで待つ（別スレッドでの切り替えを待つため）"""
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestTracer:
+    """Tracerクラスのテストケース"""
+
+    def test_disabled(self):
+        """無効時は何もしないスパンを返す"""
+        assert Tracer().span('noop') is NOOP_SPAN
+
+    def test_nested_spans(self):
+        """子スパンは親スパンのトレースIDとスパンIDを引き継ぐ"""
+        memory = InMemorySpanExporter()
+        tracer = Tracer(memory)
+
+        with tracer.span('parent', user='u1'):
+            with tracer.span('child') as child:
+                child.set_attribute('status', 201)
+
+        child, parent = memory.spans
+        assert parent.name == 'parent' and parent.parent_id is None
+        assert child.trace_id == parent.trace_id
+        assert child.parent_id == parent.span_id
+        assert child.attributes == {'status': 201}
+        assert parent.end_time_ns >= child.end_time_ns >= child.start_time_ns
+
+    def test_exception(self):
+        """例外はスパンに記録されて再送出される"""
+        memory = InMemorySpanExporter()
+        tracer = Tracer(memory)
+
+        with pytest.raises(ValueError):
+            with tracer.span('failing'):
+                raise ValueError("boom")
+
+        span = memory.spans[0]
+        assert span.status == 'ERROR'
+        assert span.attributes['exception.message'] == "boom"
+
+    def test_sampling(self):
+        """サンプリング対象外のトレースは子スパンも記録しない"""
+        memory = InMemorySpanExporter()
+        tracer = Tracer(memory, sample_rate=0.0)
+
+        with tracer.span('root'):
+            with tracer.span('child'):
+                pass
+
+        assert memory.spans == []
+
+    def test_file_exporter(self, tmp_path):
+        """OTLP/JSON形式で1行1スパンを書き出す"""
+        path = tmp_path / 'trace.jsonl'
+        tracer = Tracer(FileSpanExporter(str(path)))
+
+        with tracer.span('root', count=3):
+            pass
+        tracer.disable()
+
+        record = json.loads(path.read_text(encoding='utf-8').strip())
+        assert record['name'] == 'root'
+        assert len(record['traceId']) == 32 and len(record['spanId']) == 16
+        assert record['attributes'] == [{'key': 'count', 'value': {'intValue': '3'}}]
+        assert int(record['endTimeUnixNano']) >= int(record['startTimeUnixNano'])
+
+
+class TestInstrumentation:
+    """送信処理への組み込みのテストケース"""
+
+    def test_send_phases(self, exporter, requests_mock):
+        """メッセージ送信の各区間が1つのトレースとして記録される"""
+        requests_mock.post(
+            "https://www.worksapis.com/v1.0/bots/bot1/users/user1/messages", status_code=201
+        )
+
+        with shared_tracer.span('send'):
+            APIClient("dummy_token").send_bot_message("bot1", "user1", {"type": "text", "text": "hi"})
+
+        names = [span.name for span in exporter.spans]
+        assert names == ['api.serialize', 'api.rate_limit_wait', 'api.http', 'api.request', 'send']
+        assert len({span.trace_id for span in exporter.spans}) == 1
+        http = exporter.spans[2]
+        assert http.attributes['http.status_code'] == 201
+
+
+def _busy_wait(seconds):
+    """プロファイラに採取させるためのビジーループ"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestSamplingProfiler:
+    """SamplingProfilerクラスのテストケース"""
+
+    def test_collect_stacks(self, tmp_path):
+        """実行中の関数のスタックを collapsed 形式で集計する"""
+        output = tmp_path / 'profile.collapsed'
+        profiler = SamplingProfiler(interval=0.001, output=str(output))
+
+        profiler.start()
+        _busy_wait(0.2)
+        profiler.stop()
+
+        assert profiler.samples > 0
+        assert not profiler.running
+        assert 'test_tracing.py:_busy_wait' in output.read_text(encoding='utf-8')
+        assert any(name == 'test_tracing.py:_busy_wait' for name, _ in profiler.top())
+
+    def test_signal_toggle(self):
+        """シグナルで採取の開始・停止を切り替えられる"""
+        if not hasattr(signal, 'SIGUSR2'):
+            pytest.skip("SIGUSR2 is not available")
+        profiler = SamplingProfiler(interval=0.01, output=None)
+        previous = signal.getsignal(signal.SIGUSR2)
+        try:
+            assert install_signal_handler(profiler, 'SIGUSR2')
+            os.kill(os.getpid(), signal.SIGUSR2)
+            assert _wait_until(lambda: profiler.running)
+            os.kill(os.getpid(), signal.SIGUSR2)
+            assert _wait_until(lambda: not profiler.running)
+        finally:
+            profiler.stop()
+            signal.signal(signal.SIGUSR2, previous)
+
+    def test_signal_toggle_outside_handler(self):
+        """開始・停止はシグナルハンドラ（メインスレッド）ではなく別スレッドで行う"""
+        if not hasattr(signal, 'SIGUSR2'):
+            pytest.skip("SIGUSR2 is not available")
+        profiler = SamplingProfiler(interval=0.01, output=None)
+        toggled = []
+        done = threading.Event()
+
+        def toggle():
+            toggled.append(threading.current_thread())
+            done.set()
+
+        profiler.toggle = toggle
+        previous = signal.getsignal(signal.SIGUSR2)
+        try:
+            assert install_signal_handler(profiler, 'SIGUSR2')
+            os.kill(os.getpid(), signal.SIGUSR2)
+            assert done.wait(5)
+        finally:
+            signal.signal(signal.SIGUSR2, previous)
+        assert toggled[0] is not threading.main_thread()
+        assert toggled[0].name == 'profiler-toggle'
+
+    def test_no_signal(self):
+        """シグナル名が空の場合は登録しない"""
+        assert install_signal_handler(SamplingProfiler(), '') is False